@@ -2,6 +2,7 @@
 """Forex News Telegram Bot (modular version with database integration)."""
 
 import asyncio
+import os
 import time
 from datetime import datetime, date, timedelta
 from typing import Optional
@@ -16,9 +17,17 @@ from bot.config import Config, setup_logging
 from bot.telegram_handlers import TelegramBotManager, RenderKeepAlive, register_handlers
 from bot.scraper import ChatGPTAnalyzer, ForexNewsScraper, process_forex_news, MessageFormatter
 from bot.database_service import ForexNewsService
+from bot.bulk_importer import BulkNewsImporter
 from bot.daily_digest import DailyDigestScheduler
 from bot.notification_scheduler import NotificationScheduler
 from bot.notification_service import notification_deduplication
+from bot.dedup_store import SQLDedupBackend
+from bot.rate_limiter import yahoo_rate_limiter
+from bot.schema_capabilities import CHART_COLUMNS, NOTIFICATION_COLUMNS
+from bot.render_pool import chart_render_pool
+from bot.job_queue import JobJournal, UpdateJobQueue, telegram_update_key
+from bot.gpt_analysis import feature_cache, gpt_response_cache
+from bot.openai_client import openai_client
 from sqlalchemy import text
 
 config = Config()
@@ -109,6 +118,13 @@ except Exception as e:
     logger.error(f"Failed to initialize database service: {e}")
     db_service = None
 
+# Keep notification dedup markers in the database so restarts and other workers see them
+if db_service and os.getenv('NOTIFICATION_DEDUP_BACKEND', 'database').lower() == 'database':
+    try:
+        notification_deduplication.use_backend(SQLDedupBackend(db_service.db_manager.engine))
+    except Exception as e:
+        logger.error(f"Failed to enable database notification deduplication: {e}")
+
 # Initialize daily digest scheduler
 digest_scheduler = None
 if db_service and bot:
@@ -127,6 +143,40 @@ if db_service and bot:
     except Exception as e:
         logger.error(f"Failed to initialize notification scheduler: {e}")
 
+
+def _process_update_payload(payload: str):
+    bot.process_new_updates([telebot.types.Update.de_json(payload)])
+
+
+# Run webhook updates on background workers so Telegram gets its answer immediately
+update_queue = None
+if bot and os.getenv('JOB_QUEUE_ENABLED', '1').strip().lower() in ('1', 'true', 'yes'):
+    try:
+        journal_path = os.getenv('JOB_QUEUE_DB_PATH')
+        update_queue = UpdateJobQueue(_process_update_payload, journal=JobJournal(journal_path) if journal_path else None)
+        # Handlers run on the queue workers (with their per-user limits) instead of telebot's own pool
+        bot.threaded = False
+        if update_queue.journal is not None:
+            # Pick up updates left unfinished by the previous process
+            update_queue.start()
+        logger.info("Update job queue initialized successfully")
+    except Exception as e:
+        logger.error(f"Failed to initialize update job queue: {e}")
+        update_queue = None
+
+
+def _dispatch_update(update, payload: str) -> bool:
+    """Hand an update to the job queue; process it on this thread if there is no queue or it is full."""
+    if update_queue is not None and update_queue.submit(payload, telegram_update_key(update), update.update_id):
+        return True
+    try:
+        bot.process_new_updates([update])
+    except Exception as e:
+        # Answer the webhook anyway: a retried update would run the failed handler again
+        logger.error(f"Update handler failed: {e}")
+    return False
+
+
 if bot:
     register_handlers(bot, lambda date, impact, analysis, debug, user_id=None: process_forex_news_with_db(scraper, bot, config, db_service, date, impact, analysis, debug, user_id), config, db_service, digest_scheduler)
 
@@ -144,7 +194,7 @@ async def process_forex_news_with_db(scraper, bot, config, db_service, target_da
 
     if user_id and db_service:
         try:
-            user = db_service.get_or_create_user(user_id)
+            user = db_service.get_cached_preferences(user_id)
             user_currencies = user.get_currencies_list()
             user_impact_levels = user.get_impact_levels_list()
             user_analysis_required = False
@@ -453,15 +503,15 @@ def webhook():
                     logger.info("Group notification skipped (duplicate)")
 
                 # Still process the message normally
-                bot.process_new_updates([update])
-                return jsonify({"status": "ok", "group_event": True})
+                queued = _dispatch_update(update, json_str)
+                return jsonify({"status": "ok", "group_event": True, "queued": queued})
 
         elif hasattr(update, 'callback_query') and update.callback_query:
             logger.info(f"Processing callback query from user {update.callback_query.from_user.id if update.callback_query.from_user else 'unknown'}")
 
-        # Process the update
-        bot.process_new_updates([update])
-        return jsonify({"status": "ok"})
+        # Process the update (on a queue worker when available)
+        queued = _dispatch_update(update, json_str)
+        return jsonify({"status": "ok", "queued": queued})
     except Exception as e:
         logger.error(f"Error processing webhook: {e}")
         logger.error(f"Webhook data: {request.get_data().decode('UTF-8')[:500]}...")
@@ -519,7 +569,19 @@ def health():
                 "digest_scheduler": scheduler_status['running'],
                 "webhook": config.telegram_bot_token is not None
             },
-            "scheduler": scheduler_status
+            "scheduler": scheduler_status,
+            "rate_limits": {
+                "yahoo": yahoo_rate_limiter.get_stats()
+            },
+            "chart_render_pool": chart_render_pool.get_stats(),
+            "scraper": scraper.get_fetch_stats(),
+            "update_queue": update_queue.get_stats() if update_queue else None,
+            "user_preference_cache": db_service.preference_cache.get_stats() if db_service else None,
+            "analysis_cache": {
+                "features": feature_cache.get_stats(),
+                "gpt_responses": gpt_response_cache.get_stats()
+            },
+            "openai_client": openai_client.get_stats()
         })
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -672,36 +734,14 @@ async def bulk_import_news(start_date: date, end_date: date, impact_level: str =
         return
 
     try:
-        current_date = start_date
-        total_imported = 0
-
-        while current_date <= end_date:
-            logger.info(f"Importing news for {current_date}")
-
-            # Check if news already exists
-            if db_service.has_news_for_date(current_date, 'all'):
-                logger.info(f"News already exists for {current_date}, skipping")
-                current_date += timedelta(days=1)
-                continue
-
-            # Scrape news for the date
-            target_datetime = datetime.combine(current_date, datetime.min.time()).replace(tzinfo=pytz.timezone(config.timezone))
-            news_items = await scraper.scrape_news(target_datetime, analysis_required=False, debug=True)
-
-            if news_items:
-                # Store in database
-                success = db_service.store_news_items(news_items, current_date, 'all')
-                if success:
-                    total_imported += len(news_items)
-                    logger.info(f"Imported {len(news_items)} news items for {current_date}")
-                else:
-                    logger.error(f"Failed to store news for {current_date}")
-            else:
-                logger.info(f"No news found for {current_date}")
-
-            current_date += timedelta(days=1)
-
-        logger.info(f"Bulk import completed. Total imported: {total_imported}")
+        importer = BulkNewsImporter(
+            lambda: ForexNewsScraper(config, ChatGPTAnalyzer(config.chatgpt_api_key)),
+            db_service,
+            workers=int(os.getenv("BULK_IMPORT_WORKERS", "2"))
+        )
+        # Skip dates that already have any news, as before
+        stats = await asyncio.to_thread(importer.run, start_date, end_date, 'all', False)
+        logger.info(f"Bulk import completed. Total imported: {stats.get('imported_items', 0)}")
 
     except Exception as e:
         logger.error(f"Bulk import failed: {e}")
@@ -777,25 +817,11 @@ def add_notification_columns_endpoint():
         if not db_service:
             return jsonify({"error": "Database service not available"}), 500
 
-        # Check if notification columns already exist
-        with db_service.db_manager.get_session() as session:
-            # Try PostgreSQL first, then fallback to SQLite
-            try:
-                result = session.execute(text("""
-                    SELECT column_name
-                        FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN ('notifications_enabled', 'notification_minutes', 'notification_impact_levels', 'charts_enabled', 'chart_type', 'chart_window_hours')
-                """))
-                existing_columns = [row[0] for row in result]
-            except Exception:
-                # Fallback to SQLite pragma
-                result = session.execute(text("""
-                    SELECT name
-                        FROM pragma_table_info('users')
-                    WHERE name IN ('notifications_enabled', 'notification_minutes', 'notification_impact_levels', 'charts_enabled', 'chart_type', 'chart_window_hours')
-                """))
-                existing_columns = [row[0] for row in result]
+        # Check if notification columns already exist (re-read so the check reflects the live schema)
+        db_service.schema.refresh()
+        existing_columns = db_service.schema.present('users', NOTIFICATION_COLUMNS + CHART_COLUMNS)
 
+        with db_service.db_manager.get_session() as session:
             notification_columns = ['notifications_enabled', 'notification_minutes', 'notification_impact_levels']
             chart_columns = ['charts_enabled', 'chart_type', 'chart_window_hours']
 
@@ -860,12 +886,16 @@ def add_notification_columns_endpoint():
 
             session.commit()
 
-            return jsonify({
-                "status": "success",
-                "message": f"Added notification columns: {notification_columns_added}, chart columns: {chart_columns_added}",
-                "notification_columns_added": notification_columns_added,
-                "chart_columns_added": chart_columns_added
-            })
+        # Make the new columns visible to every request path; cached settings predate them
+        db_service.schema.refresh()
+        db_service.preference_cache.clear()
+
+        return jsonify({
+            "status": "success",
+            "message": f"Added notification columns: {notification_columns_added}, chart columns: {chart_columns_added}",
+            "notification_columns_added": notification_columns_added,
+            "chart_columns_added": chart_columns_added
+        })
 
     except Exception as e:
         logger.error(f"Error adding notification and chart columns: {e}")
@@ -880,40 +910,25 @@ def check_notification_columns():
         if not db_service:
             return jsonify({"error": "Database service not available"}), 500
 
-        with db_service.db_manager.get_session() as session:
-            # Try PostgreSQL first, then fallback to SQLite
-            try:
-                result = session.execute(text("""
-                    SELECT column_name
-                        FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN ('notifications_enabled', 'notification_minutes', 'notification_impact_levels', 'charts_enabled', 'chart_type', 'chart_window_hours')
-                """))
-                existing_columns = [row[0] for row in result]
-            except Exception:
-                # Fallback to SQLite pragma
-                result = session.execute(text("""
-                    SELECT name
-                        FROM pragma_table_info('users')
-                    WHERE name IN ('notifications_enabled', 'notification_minutes', 'notification_impact_levels', 'charts_enabled', 'chart_type', 'chart_window_hours')
-                """))
-                existing_columns = [row[0] for row in result]
+        db_service.schema.refresh()
+        existing_columns = db_service.schema.present('users', NOTIFICATION_COLUMNS + CHART_COLUMNS)
 
-            notification_columns = ['notifications_enabled', 'notification_minutes', 'notification_impact_levels']
-            chart_columns = ['charts_enabled', 'chart_type', 'chart_window_hours']
+        notification_columns = ['notifications_enabled', 'notification_minutes', 'notification_impact_levels']
+        chart_columns = ['charts_enabled', 'chart_type', 'chart_window_hours']
 
-            existing_notification_columns = [col for col in existing_columns if col in notification_columns]
-            existing_chart_columns = [col for col in existing_columns if col in chart_columns]
+        existing_notification_columns = [col for col in existing_columns if col in notification_columns]
+        existing_chart_columns = [col for col in existing_columns if col in chart_columns]
 
-            return jsonify({
-                "status": "success",
-                "existing_notification_columns": existing_notification_columns,
-                "existing_chart_columns": existing_chart_columns,
-                "all_notification_columns_exist": len(existing_notification_columns) == 3,
-                "all_chart_columns_exist": len(existing_chart_columns) == 3,
-                "all_columns_exist": len(existing_notification_columns) == 3 and len(existing_chart_columns) == 3,
-                "notifications_enabled_exists": 'notifications_enabled' in existing_columns,
-                "charts_enabled_exists": 'charts_enabled' in existing_columns
-            })
+        return jsonify({
+            "status": "success",
+            "existing_notification_columns": existing_notification_columns,
+            "existing_chart_columns": existing_chart_columns,
+            "all_notification_columns_exist": len(existing_notification_columns) == 3,
+            "all_chart_columns_exist": len(existing_chart_columns) == 3,
+            "all_columns_exist": len(existing_notification_columns) == 3 and len(existing_chart_columns) == 3,
+            "notifications_enabled_exists": 'notifications_enabled' in existing_columns,
+            "charts_enabled_exists": 'charts_enabled' in existing_columns
+        })
 
     except Exception as e:
         logger.error(f"Error checking notification and chart columns: {e}")
@@ -931,13 +946,7 @@ def test_settings(user_id):
         user = db_service.get_or_create_user(user_id)
 
         # Check notification columns
-        with db_service.db_manager.get_session() as session:
-            result = session.execute(text("""
-                SELECT column_name
-                    FROM information_schema.columns
-                WHERE table_name = 'users' AND column_name IN ('notifications_enabled', 'notification_minutes', 'notification_impact_levels')
-            """))
-            notification_columns = [row[0] for row in result]
+        notification_columns = db_service.schema.present('users', NOTIFICATION_COLUMNS)
 
         return jsonify({
             "status": "success",
@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def hash_text(text: str) -> str:
+    """Short stable digest of a prompt or feature summary, for use in cache keys."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """Bounded LRU of computed analysis results with a time-to-live per entry.
+
+    ``get_or_compute`` lets only one caller compute a missing key; concurrent
+    callers for the same key wait for it and reuse the result. None results are
+    not stored, so a failed computation is retried by the next caller.
+    """
+
+    def __init__(self, name: str, max_entries: int = 256, ttl_sec: float = 300.0):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._inflight: Dict[Hashable, threading.Lock] = {}
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+            else:
+                self._misses += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if value is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_sec, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing it at most once across threads."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._hits += 1
+                return value
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    # Another caller computed it while we waited
+                    self._hits += 1
+                    self._coalesced += 1
+                    return value
+                self._misses += 1
+            try:
+                value = compute()
+                self.put(key, value)
+                return value
+            finally:
+                with self._lock:
+                    if self._inflight.get(key) is key_lock:
+                        del self._inflight[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_sec': self.ttl_sec,
+                'hits': self._hits,
+                'misses': self._misses,
+                'coalesced': self._coalesced,
+                'hit_rate': round(self._hits / lookups, 3) if lookups else 0.0,
+            }
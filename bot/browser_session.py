@@ -0,0 +1,112 @@
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserSession:
+    """One long-lived Chrome driver reused across page loads.
+
+    Starting undetected-chromedriver costs several seconds per page, and a fresh
+    profile has to pass the Cloudflare challenge again. The session keeps the
+    driver (and with it the clearance cookies) alive between scrapes, checks it
+    is still responsive before each use, and recycles it after ``max_pages``
+    loads, after ``max_age_sec``, or whenever a load fails. Drivers are not
+    thread-safe, so callers hold ``lock`` while they use one.
+    """
+
+    def __init__(self, driver_factory: Callable[[], Any], max_pages: int = 50, max_age_sec: float = 1800):
+        self.driver_factory = driver_factory
+        self.max_pages = max_pages
+        self.max_age_sec = max_age_sec
+        self.lock = threading.RLock()
+        self._driver = None
+        self._started_at = 0.0
+        self.pages = 0
+        self.launches = 0
+        self.recycles = 0
+        self._registered_exit = False
+        # Cookies and user agent of the last successful load, for replay by plain HTTP clients
+        self.clearance: Optional[Dict[str, Any]] = None
+        self.clearance_version = 0
+
+    def _healthy(self) -> bool:
+        try:
+            return self._driver.execute_script("return 1") == 1
+        except Exception as e:
+            logger.warning(f"Browser session unresponsive: {e}")
+            return False
+
+    def acquire(self):
+        """Return a ready driver, starting or replacing one when needed."""
+        with self.lock:
+            if self._driver is not None:
+                if self.pages >= self.max_pages:
+                    self.recycle(f"served {self.pages} pages")
+                elif time.monotonic() - self._started_at >= self.max_age_sec:
+                    self.recycle("max age reached")
+                elif not self._healthy():
+                    self.recycle("health check failed")
+            if self._driver is None:
+                started = time.monotonic()
+                self._driver = self.driver_factory()
+                self._started_at = time.monotonic()
+                self.pages = 0
+                self.launches += 1
+                logger.info(f"Started browser session in {self._started_at - started:.1f}s")
+                if not self._registered_exit:
+                    atexit.register(self.close)
+                    self._registered_exit = True
+            return self._driver
+
+    def page_done(self):
+        """Count a successful load and remember the cookies that got it through."""
+        with self.lock:
+            self.pages += 1
+            try:
+                self.clearance = {
+                    'cookies': self._driver.get_cookies(),
+                    'user_agent': self._driver.execute_script("return navigator.userAgent"),
+                }
+                self.clearance_version += 1
+            except Exception as e:
+                logger.debug(f"Could not read browser cookies: {e}")
+
+    def recycle(self, reason: str):
+        """Quit the current driver; the next ``acquire`` starts a fresh one."""
+        with self.lock:
+            if self._driver is None:
+                return
+            logger.info(f"Recycling browser session after {self.pages} pages: {reason}")
+            self.recycles += 1
+            self._quit()
+
+    def _quit(self):
+        driver, self._driver = self._driver, None
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {e}")
+
+    def close(self):
+        with self.lock:
+            if self._driver is not None:
+                self._quit()
+
+    @property
+    def is_open(self) -> bool:
+        return self._driver is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'open': self._driver is not None,
+                'pages': self.pages,
+                'launches': self.launches,
+                'recycles': self.recycles,
+                'age_sec': int(time.monotonic() - self._started_at) if self._driver is not None else 0,
+                'max_pages': self.max_pages,
+            }
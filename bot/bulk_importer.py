@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Weeks with at least this many pending days are fetched with one week-view page load
+WEEK_VIEW_MIN_DAYS = 3
+# How long a worker waits for a pooled scraper before re-checking whether it may build one
+SCRAPER_WAIT_SEC = 1.0
+
+
+class ImportCheckpoint:
+    """Dates already imported, persisted as JSON so an interrupted run can resume."""
+
+    def __init__(self, path: Optional[str], impact_level: str):
+        self.path = path
+        self.impact_level = impact_level
+        self._lock = threading.Lock()
+        self.completed = set()
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get('impact_level') == impact_level:
+                    self.completed = {date.fromisoformat(d) for d in data.get('completed', [])}
+                    logger.info(f"Resuming bulk import: {len(self.completed)} dates already done")
+                else:
+                    logger.info(f"Ignoring checkpoint {path} written for impact level {data.get('impact_level')}")
+            except Exception as e:
+                logger.warning(f"Could not read bulk import checkpoint {path}: {e}")
+
+    def is_done(self, day: date) -> bool:
+        return day in self.completed
+
+    def mark_done(self, day: date):
+        with self._lock:
+            self.completed.add(day)
+            if not self.path:
+                return
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({'impact_level': self.impact_level,
+                               'completed': sorted(d.isoformat() for d in self.completed)}, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.warning(f"Could not write bulk import checkpoint {self.path}: {e}")
+
+    def clear(self):
+        """Remove the checkpoint file once the whole range is imported."""
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except Exception as e:
+                logger.warning(f"Could not remove bulk import checkpoint {self.path}: {e}")
+
+
+class BulkNewsImporter:
+    """Imports a date range with a bounded pool of scrapers working concurrently.
+
+    Each worker borrows a scraper from the pool, so at most ``workers`` browsers
+    exist at once and each one is reused for every page that worker loads. Dense
+    weeks are fetched through the week view (one page for up to seven days);
+    every unit of work is retried with backoff, and finished dates are written
+    to a checkpoint file so a restarted run skips them.
+    """
+
+    def __init__(self, scraper_factory: Callable[[], Any], db_service, workers: int = 2,
+                 max_retries: int = 3, retry_delay_sec: float = 5.0, page_delay_sec: float = 2.0,
+                 use_week_view: bool = True, checkpoint_path: Optional[str] = None):
+        self.scraper_factory = scraper_factory
+        self.db_service = db_service
+        self.workers = max(1, workers)
+        self.max_retries = max(1, max_retries)
+        self.retry_delay_sec = retry_delay_sec
+        self.page_delay_sec = page_delay_sec
+        self.use_week_view = use_week_view
+        self.checkpoint_path = checkpoint_path
+        self._scrapers: "queue.Queue[Any]" = queue.Queue()
+        self._created = 0
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+    def _acquire_scraper(self):
+        while True:
+            with self._pool_lock:
+                try:
+                    return self._scrapers.get_nowait()
+                except queue.Empty:
+                    pass
+                if self._created < self.workers:
+                    self._created += 1
+                    try:
+                        return self.scraper_factory()
+                    except Exception:
+                        # Give the slot back so a later unit can try to build a scraper again
+                        self._created -= 1
+                        raise
+            try:
+                return self._scrapers.get(timeout=SCRAPER_WAIT_SEC)
+            except queue.Empty:
+                continue
+
+    def _release_scraper(self, scraper):
+        self._scrapers.put(scraper)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    def plan(self, start_date: date, end_date: date, impact_level: str, force: bool,
+             checkpoint: ImportCheckpoint) -> List[List[date]]:
+        """Group the pending dates into units of work: whole weeks or single days."""
+        pending = []
+        current = start_date
+        while current <= end_date:
+            if checkpoint.is_done(current):
+                self._count('resumed')
+            elif not force and self.db_service.has_news_for_date(current, impact_level):
+                logger.info(f"Data already exists for {current}, skipping...")
+                self._count('skipped')
+            else:
+                pending.append(current)
+            current += timedelta(days=1)
+
+        if not self.use_week_view:
+            return [[day] for day in pending]
+
+        weeks: Dict[date, List[date]] = {}
+        for day in pending:
+            weeks.setdefault(self._week_start(day), []).append(day)
+        units = []
+        for days in weeks.values():
+            if len(days) >= WEEK_VIEW_MIN_DAYS:
+                units.append(days)
+            else:
+                units.extend([day] for day in days)
+        return units
+
+    def _week_start(self, day: date) -> date:
+        # ForexFactory weeks start on Sunday
+        return day - timedelta(days=(day.weekday() + 1) % 7)
+
+    def _store(self, day: date, news_items: List[Dict[str, Any]], impact_level: str,
+               checkpoint: ImportCheckpoint) -> bool:
+        if news_items:
+            if not self.db_service.store_news_items(news_items, day, impact_level):
+                logger.error(f"Failed to store news items for {day}")
+                self._count('failed_dates')
+                return False
+            logger.info(f"Imported {len(news_items)} items for {day}")
+            self._count('imported_items', len(news_items))
+        else:
+            logger.info(f"No news found for {day}")
+        self._count('imported_dates')
+        checkpoint.mark_done(day)
+        return True
+
+    async def _with_retries(self, label: str, fetch):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return await fetch()
+            except Exception as e:
+                self._count('retries')
+                if attempt == self.max_retries:
+                    logger.error(f"Giving up on {label} after {attempt} attempts: {e}")
+                    raise
+                delay = self.retry_delay_sec * 2 ** (attempt - 1)
+                logger.warning(f"Attempt {attempt} for {label} failed ({e}), retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+
+    async def _import_unit(self, scraper, days: List[date], impact_level: str, checkpoint: ImportCheckpoint):
+        remaining = list(days)
+        if len(days) > 1:
+            week_start = self._week_start(days[0])
+            try:
+                by_day = await self._with_retries(f"week of {week_start}", lambda: scraper.scrape_week(week_start))
+                self._count('pages')
+                for day in days:
+                    if day in by_day and self._store(day, by_day[day], impact_level, checkpoint):
+                        remaining.remove(day)
+            except Exception as e:
+                logger.warning(f"Week view failed for {week_start}, falling back to single days: {e}")
+            if remaining:
+                await asyncio.sleep(self.page_delay_sec)
+
+        for day in remaining:
+            try:
+                news_items = await self._with_retries(str(day), lambda: scraper.scrape_news(
+                    target_date=datetime.combine(day, datetime.min.time()), debug=False))
+                self._count('pages')
+                self._store(day, news_items, impact_level, checkpoint)
+            except Exception as e:
+                logger.error(f"Error importing {day}: {e}")
+                self._count('failed_dates')
+            # Add delay to avoid rate limiting
+            await asyncio.sleep(self.page_delay_sec)
+
+    def _run_unit(self, days: List[date], impact_level: str, checkpoint: ImportCheckpoint):
+        try:
+            scraper = self._acquire_scraper()
+        except Exception as e:
+            label = str(days[0]) if len(days) == 1 else f"{days[0]}..{days[-1]}"
+            logger.error(f"Could not create a scraper for {label}: {e}")
+            self._count('failed_dates', len(days))
+            return
+        try:
+            # Scrapers are async but drive a blocking browser; each worker thread gets its own loop
+            asyncio.run(self._import_unit(scraper, days, impact_level, checkpoint))
+        finally:
+            self._release_scraper(scraper)
+
+    def run(self, start_date: date, end_date: date, impact_level: str = "high",
+            force: bool = False) -> Dict[str, int]:
+        """Import every date in the range and return counters for the run."""
+        started = time.monotonic()
+        self.stats = {}
+        checkpoint = ImportCheckpoint(self.checkpoint_path, impact_level)
+        units = self.plan(start_date, end_date, impact_level, force, checkpoint)
+        logger.info(f"Bulk import of {sum(len(u) for u in units)} dates in {len(units)} page loads "
+                    f"with {self.workers} workers")
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bulk-import") as pool:
+            futures = [pool.submit(self._run_unit, days, impact_level, checkpoint) for days in units]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Bulk import worker failed: {e}")
+
+        self.close()
+        if not self.stats.get('failed_dates'):
+            checkpoint.clear()
+        self.stats['elapsed_sec'] = int(time.monotonic() - started)
+        logger.info(f"Bulk import completed: {self.stats}")
+        return dict(self.stats)
+
+    def close(self):
+        """Close pooled scrapers that hold resources."""
+        while not self._scrapers.empty():
+            scraper = self._scrapers.get()
+            close = getattr(scraper, 'close', None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"Error closing scraper: {e}")
+        self._created = 0
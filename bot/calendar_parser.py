@@ -0,0 +1,116 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Cell classes read from a calendar row, and the field each one fills
+FIELD_CLASSES = {
+    'calendar__time': 'time',
+    'calendar__currency': 'currency',
+    'calendar__event-title': 'event',
+    'calendar__actual': 'actual',
+    'calendar__forecast': 'forecast',
+    'calendar__previous': 'previous',
+    'calendar__date': 'date',
+}
+# Containers holding the impact icon, in order of preference
+IMPACT_CLASSES = ('calendar__impact', 'impact')
+
+_TABLE_START_RE = re.compile(r'<table\b[^>]*\bclass\s*=\s*["\'][^"\']*\bcalendar__table\b', re.IGNORECASE)
+_TABLE_TAG_RE = re.compile(r'<(/?)table\b', re.IGNORECASE)
+
+
+def _strain_calendar_table(html: str) -> Optional[str]:
+    """Cut the calendar table out of the page so the rest is never parsed."""
+    start = _TABLE_START_RE.search(html)
+    if start is None:
+        return None
+    depth = 0
+    for tag in _TABLE_TAG_RE.finditer(html, start.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[start.start():html.index('>', tag.end()) + 1]
+    # Unterminated table: parse to the end and let lxml close it
+    return html[start.start():]
+
+
+def _text(element) -> str:
+    return "".join(element.itertext()).strip()
+
+
+def _row_fields(row) -> Dict[str, Any]:
+    """Read every field of one row in a single walk over its elements.
+
+    Values are None when the row has no such cell; ``impact_classes`` is the
+    class list of the first impact icon, or None.
+    """
+    found: Dict[str, Any] = {}
+    impact_cells: Dict[str, list] = {name: [] for name in IMPACT_CLASSES}
+    for element in row.iterdescendants(tag=etree.Element):
+        class_attr = element.get('class')
+        if not class_attr:
+            continue
+        for class_name in class_attr.split():
+            field = FIELD_CLASSES.get(class_name)
+            if field is not None and field not in found:
+                found[field] = element
+            elif class_name in impact_cells:
+                impact_cells[class_name].append(element)
+
+    fields: Dict[str, Any] = {name: None for name in FIELD_CLASSES.values()}
+    for field, element in found.items():
+        if field == 'date':
+            fields['date'] = " ".join(s.strip() for s in element.itertext() if s.strip())
+        else:
+            fields[field] = _text(element)
+
+    fields['impact_classes'] = None
+    for name in IMPACT_CLASSES:
+        for cell in impact_cells[name]:
+            for span in cell.iter('span'):
+                classes = (span.get('class') or '').split()
+                if 'icon' in classes:
+                    fields['impact_classes'] = classes
+                    break
+            if fields['impact_classes'] is not None:
+                break
+        if fields['impact_classes'] is not None:
+            break
+
+    row_classes = (row.get('class') or '').split()
+    fields['event_id'] = row.get('data-event-id')
+    fields['has_event_id'] = fields['event_id'] is not None
+    fields['is_event_row'] = fields['has_event_id'] or found.get('event') is not None
+    fields['is_day_breaker'] = 'calendar__row--day-breaker' in row_classes
+    fields['is_calendar_row'] = 'calendar__row' in row_classes
+    if fields['is_day_breaker'] and fields['date'] is None:
+        fields['date'] = " ".join(s.strip() for s in row.itertext() if s.strip())
+    return fields
+
+
+def parse_calendar_rows(html: str) -> Optional[List[Dict[str, Any]]]:
+    """Field dicts for every row of the calendar table, or None if there is no such table."""
+    fragment = _strain_calendar_table(html or "")
+    if fragment is None:
+        return None
+    try:
+        # Plain etree elements (lxml.html's element classes cost a lookup per node),
+        # parsed with lxml's per-thread default HTML parser
+        root = etree.HTML(fragment)
+    except (etree.ParserError, etree.XMLSyntaxError, ValueError) as e:
+        logger.warning(f"Could not parse calendar table: {e}")
+        return None
+    if root is None:
+        return None
+    return [_row_fields(row) for row in root.iter('tr')]
+
+
+def select_day_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rows the day view lists as events: those with an event id, else every calendar row."""
+    with_id = [row for row in rows if row['is_calendar_row'] and row['has_event_id']]
+    if with_id:
+        return with_id
+    return [row for row in rows if row['is_calendar_row']]
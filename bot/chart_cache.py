@@ -0,0 +1,141 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class RenderedChartCache:
+    """LRU cache of rendered chart PNGs keyed by a content hash.
+
+    Entries live in memory up to ``max_entries`` and are mirrored to ``directory``
+    as ``render_<key>.png`` so a restart (or an evicted entry) can be served from
+    disk. The Telegram ``file_id`` of the first upload of each key is remembered
+    so identical charts can be re-sent without uploading the image again.
+    """
+
+    FILE_PREFIX = 'render_'
+
+    def __init__(self, directory: Optional[str], max_entries: int = 64):
+        self.directory = directory
+        self.max_entries = max(1, int(max_entries))
+        self._images: "OrderedDict[str, bytes]" = OrderedDict()
+        self._file_ids: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._file_id_hits = 0
+
+    @staticmethod
+    def make_key(*parts: Any, data: Optional[pd.DataFrame] = None) -> str:
+        """Hash the chart parameters together with a fingerprint of the plotted data."""
+        digest = hashlib.sha1()
+        for part in parts:
+            digest.update(repr(part).encode('utf-8'))
+            digest.update(b'\x1f')
+        if data is not None and not data.empty:
+            digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+            digest.update(repr(list(data.columns)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, f"{self.FILE_PREFIX}{key}.png")
+
+    def _remember(self, key: str, png: bytes):
+        self._images[key] = png
+        self._images.move_to_end(key)
+        while len(self._images) > self.max_entries:
+            evicted, _ = self._images.popitem(last=False)
+            self._file_ids.pop(evicted, None)
+
+    def get(self, key: str) -> Optional[BytesIO]:
+        """Return a fresh buffer for ``key`` or None on a miss."""
+        with self._lock:
+            png = self._images.get(key)
+            if png is not None:
+                self._images.move_to_end(key)
+                self._hits += 1
+        if png is None:
+            path = self._path(key)
+            try:
+                if path and os.path.isfile(path):
+                    with open(path, 'rb') as f:
+                        png = f.read()
+            except Exception as e:
+                logger.warning(f"Failed to read cached chart {path}: {e}")
+                png = None
+            with self._lock:
+                if png:
+                    self._disk_hits += 1
+                    self._remember(key, png)
+                else:
+                    self._misses += 1
+                    return None
+
+        buf = BytesIO(png)
+        buf.chart_cache_key = key
+        return buf
+
+    def put(self, key: str, png: bytes):
+        """Store a rendered PNG in memory and on disk."""
+        if not png:
+            return
+        with self._lock:
+            self._remember(key, png)
+        path = self._path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to persist rendered chart {path}: {e}")
+
+    def get_file_id(self, key: Optional[str]) -> Optional[str]:
+        """Return the Telegram file_id of a previous upload of ``key``."""
+        if not key:
+            return None
+        with self._lock:
+            file_id = self._file_ids.get(key)
+            if file_id:
+                self._file_id_hits += 1
+            return file_id
+
+    def set_file_id(self, key: Optional[str], file_id: Optional[str]):
+        if not key or not isinstance(file_id, str) or not file_id:
+            return
+        with self._lock:
+            self._file_ids[key] = file_id
+            self._file_ids.move_to_end(key)
+            while len(self._file_ids) > self.max_entries * 4:
+                self._file_ids.popitem(last=False)
+
+    def forget_file_id(self, key: Optional[str]):
+        if not key:
+            return
+        with self._lock:
+            self._file_ids.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._images),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'file_ids': len(self._file_ids),
+                'file_id_hits': self._file_id_hits,
+            }
@@ -0,0 +1,605 @@
+import logging
+from datetime import datetime, timedelta
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pytz
+import matplotlib.dates as mdates
+import matplotlib.ticker as mticker
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+
+logger = logging.getLogger(__name__)
+
+
+class FigureTemplate:
+    """Prebuilt layout for a family of charts: size, axes grid, grid lines and time axis.
+
+    Templates are shared and never mutated; ``new_figure`` stamps out a fresh Figure on
+    its own Agg canvas, so renders avoid pyplot's global figure manager entirely and
+    can run concurrently.
+    """
+
+    def __init__(self,
+                 figsize: Tuple[float, float],
+                 nrows: int = 1,
+                 height_ratios: Optional[Sequence[float]] = None,
+                 grid_alpha: Optional[float] = 0.3,
+                 time_format: Optional[str] = None,
+                 minute_interval: Optional[int] = None,
+                 hour_interval: Optional[int] = None,
+                 label_rotation: float = 45):
+        self.figsize = figsize
+        self.nrows = nrows
+        self.height_ratios = list(height_ratios) if height_ratios else None
+        self.grid_alpha = grid_alpha
+        self.time_format = time_format
+        self.minute_interval = minute_interval
+        self.hour_interval = hour_interval
+        self.label_rotation = label_rotation
+
+    def new_figure(self, display_tz=None) -> Tuple[Figure, List]:
+        """Return a new (figure, axes list) laid out per the template."""
+        fig = Figure(figsize=self.figsize)
+        FigureCanvasAgg(fig)
+        gridspec_kw = {'height_ratios': self.height_ratios} if self.height_ratios else None
+        axes = fig.subplots(self.nrows, 1, gridspec_kw=gridspec_kw, squeeze=False)[:, 0].tolist()
+        for ax in axes:
+            if self.grid_alpha is not None:
+                ax.grid(True, alpha=self.grid_alpha)
+            self.format_time_axis(ax, display_tz)
+        return fig, axes
+
+    def format_time_axis(self, ax, display_tz=None):
+        if not self.time_format:
+            return
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(self.time_format, tz=display_tz))
+        if self.hour_interval:
+            ax.xaxis.set_major_locator(mdates.HourLocator(interval=self.hour_interval))
+        elif self.minute_interval:
+            ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=self.minute_interval))
+        ax.tick_params(axis='x', labelrotation=self.label_rotation)
+
+
+# Event chart: candles over volume, 30-minute ticks
+EVENT_CHART_TEMPLATE = FigureTemplate((12, 8), nrows=2, height_ratios=[3, 1], time_format='%H:%M', minute_interval=30)
+# Single panel around an event (multi-pair, cross-rate and direct-pair charts)
+PAIR_CHART_TEMPLATE = FigureTemplate((12, 8), time_format='%H:%M', minute_interval=30)
+# Multi-day 5m analysis charts with GPT overlays
+ANALYSIS_CHART_TEMPLATE = FigureTemplate((13, 8), time_format='%m-%d %H:%M', hour_interval=2)
+# Compact post-event candles
+POST_EVENT_CHART_TEMPLATE = FigureTemplate((12, 8), time_format='%H:%M', label_rotation=0)
+
+
+def draw_candlesticks(ax,
+                      ohlc: pd.DataFrame,
+                      width: Optional[float] = None,
+                      up_color: str = 'green',
+                      down_color: str = 'red',
+                      wick_color: str = 'black',
+                      wick_width: float = 1.0,
+                      wick_alpha: float = 0.8,
+                      body_alpha: float = 0.7,
+                      edge_width: float = 0.5):
+    """Draw OHLC candles on ``ax`` as two artists: one LineCollection of wicks and
+    one PolyCollection of bodies.
+
+    ``width`` is the body width in days; by default 60% of the median bar spacing.
+    Returns the (wicks, bodies) collections, or None when there is nothing to draw.
+    """
+    if ohlc is None or ohlc.empty:
+        return None
+
+    index = pd.DatetimeIndex(ohlc.index)
+    opens = pd.to_numeric(ohlc['Open'], errors='coerce').to_numpy(dtype=float)
+    highs = pd.to_numeric(ohlc['High'], errors='coerce').to_numpy(dtype=float)
+    lows = pd.to_numeric(ohlc['Low'], errors='coerce').to_numpy(dtype=float)
+    closes = pd.to_numeric(ohlc['Close'], errors='coerce').to_numpy(dtype=float)
+
+    # Matplotlib date numbers are UTC based; aware indexes are converted, naive ones taken as-is
+    naive = index.tz_convert('UTC').tz_localize(None) if index.tz is not None else index
+    x = mdates.date2num(naive.to_numpy())
+
+    valid = ~(np.isnan(opens) | np.isnan(highs) | np.isnan(lows) | np.isnan(closes))
+    if not valid.any():
+        return None
+    x, opens, highs, lows, closes = x[valid], opens[valid], highs[valid], lows[valid], closes[valid]
+
+    if width is None:
+        width = float(np.median(np.diff(x))) * 0.6 if len(x) > 1 else 0.02
+    half = width / 2.0
+
+    wick_segments = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+    bottoms = np.minimum(opens, closes)
+    tops = np.maximum(opens, closes)
+    body_polys = np.stack([
+        np.column_stack([x - half, bottoms]),
+        np.column_stack([x - half, tops]),
+        np.column_stack([x + half, tops]),
+        np.column_stack([x + half, bottoms]),
+    ], axis=1)
+    body_colors = np.where(closes >= opens, up_color, down_color).tolist()
+
+    wicks = LineCollection(wick_segments, colors=wick_color, linewidths=wick_width, alpha=wick_alpha, zorder=2)
+    bodies = PolyCollection(body_polys, facecolors=body_colors, edgecolors=wick_color,
+                            linewidths=edge_width, alpha=body_alpha, zorder=3)
+    ax.add_collection(wicks)
+    ax.add_collection(bodies)
+
+    # Collections do not register date units or data limits on their own
+    if index.tz is not None:
+        ax.xaxis_date(index.tz)
+    else:
+        ax.xaxis_date()
+    ax.update_datalim([(x.min() - half, lows.min()), (x.max() + half, highs.max())])
+    ax.autoscale_view()
+    return wicks, bodies
+
+
+def synthesize_ohlc_from_close(data: pd.DataFrame) -> pd.DataFrame:
+    """Build a minimal OHLC frame from Close (ensures candlestick rendering).
+
+    - Open: previous close (first equals close)
+    - High/Low: max/min of Open/Close per bar
+    """
+    if 'Close' not in data.columns:
+        raise ValueError('No Close column available to synthesize OHLC')
+    closes = data['Close']
+    opens = closes.shift(1).fillna(closes)
+    highs = pd.concat([opens, closes], axis=1).max(axis=1)
+    lows = pd.concat([opens, closes], axis=1).min(axis=1)
+    return pd.DataFrame({
+        'Open': opens,
+        'High': highs,
+        'Low': lows,
+        'Close': closes
+    }, index=data.index)
+
+
+def plot_candlesticks(ax, ohlc_data: pd.DataFrame, pair_name: str):
+    """Plot candlestick chart on the given axes."""
+    try:
+        # All wicks and bodies are drawn as two collections
+        draw_candlesticks(ax, ohlc_data)
+
+        # Set labels and title
+        ax.set_title(f'Candlestick Chart: {pair_name}', fontsize=12, fontweight='bold')
+
+        # Format the price axis
+        ax.yaxis.set_major_formatter(mticker.StrMethodFormatter('{x:.4f}'))
+
+    except Exception as e:
+        logger.error(f"Error plotting candlesticks: {e}")
+        # As a last resort, try synthesizing from Close and replot
+        try:
+            synth = synthesize_ohlc_from_close(ohlc_data)
+            plot_candlesticks(ax, synth, pair_name)
+        except Exception:
+            # Give up silently to avoid infinite recursion; caller handles logging
+            pass
+
+
+def figure_to_png(fig, **kwargs) -> bytes:
+    """Encode a figure as the PNG the bot sends (150 dpi, tight bounding box)."""
+    buf = BytesIO()
+    fig.savefig(buf, format='png', dpi=150, bbox_inches='tight', **kwargs)
+    return buf.getvalue()
+
+
+# The render_*_png functions below take plain data and return PNG bytes so they can
+# run in the chart render pool's worker processes as well as inline.
+
+def render_event_chart_png(price_data: pd.DataFrame,
+                           event_time: datetime,
+                           event_name: str,
+                           currency: str,
+                           symbol: str,
+                           impact_level: str,
+                           display_tz_name: str) -> bytes:
+    """Render the single-pair event chart (candles, volume, event marker)."""
+    display_tz = pytz.timezone(display_tz_name)
+    # Set up the plot
+    fig, (ax1, ax2) = EVENT_CHART_TEMPLATE.new_figure(display_tz)
+    # Format the event date for display (in local/display TZ)
+    event_date_str = event_time.astimezone(display_tz).strftime('%Y-%m-%d')
+    fig.suptitle(f'{currency} News Event: {event_name}\n{event_date_str}', fontsize=14, fontweight='bold')
+
+    # Convert data and event time to display timezone for plotting
+    local_index = price_data.index.tz_convert(display_tz) if price_data.index.tzinfo else price_data.index.tz_localize(display_tz)
+    event_time_local = event_time.astimezone(display_tz)
+
+    # Plot price data as candlesticks when OHLC is available
+    try:
+        ohlc = price_data[['Open', 'High', 'Low', 'Close']].copy()
+        ohlc.index = local_index
+        plot_candlesticks(ax1, ohlc, f'{currency}/{symbol.split("=")[0][-3:]}')
+    except Exception as e:
+        logger.warning(f"Candlestick plot failed; synthesizing OHLC: {e}")
+        try:
+            synth = synthesize_ohlc_from_close(price_data)
+            synth.index = local_index
+            plot_candlesticks(ax1, synth, f'{currency}/{symbol.split("=")[0][-3:]}')
+        except Exception as e2:
+            logger.error(f"Failed to synthesize candlesticks: {e2}")
+    ax1.set_ylabel('Price', fontsize=12)
+
+    # Add event marker
+    ax1.axvline(x=event_time_local, color='red', linestyle='--', linewidth=2, alpha=0.8, label='Event Time')
+
+    # Add impact level indicator
+    impact_colors = {'high': '#d62728', 'medium': '#ff7f0e', 'low': '#2ca02c'}
+    impact_color = impact_colors.get(impact_level, '#ff7f0e')
+
+    # Add shaded area around event time
+    event_window = timedelta(minutes=30)
+    ax1.axvspan(
+        event_time_local - event_window,
+        event_time_local + event_window,
+        alpha=0.2,
+        color=impact_color,
+        label=f'{impact_level.title()} Impact'
+    )
+
+    # Plot volume
+    if 'Volume' in price_data.columns:
+        ax2.bar(local_index, price_data['Volume'], alpha=0.6, color='#2ca02c')
+        ax2.set_ylabel('Volume', fontsize=12)
+
+    # Add legend
+    ax1.legend(loc='upper right')
+
+    # Add price change annotation
+    if len(price_data) > 1:
+        start_price = price_data['Close'].iloc[0]
+        end_price = price_data['Close'].iloc[-1]
+        price_change = end_price - start_price
+        price_change_pct = (price_change / start_price) * 100
+
+        change_text = f"Change: {price_change:.4f} ({price_change_pct:+.2f}%)"
+        ax1.text(0.02, 0.98, change_text, transform=ax1.transAxes,
+                verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
+
+    fig.tight_layout()
+    return figure_to_png(fig)
+
+
+def render_cross_rate_chart_png(primary_data: pd.DataFrame,
+                                secondary_data: pd.DataFrame,
+                                primary_currency: str,
+                                secondary_currency: str,
+                                event_time: datetime,
+                                event_name: str,
+                                impact_level: str,
+                                display_tz_name: str) -> Optional[bytes]:
+    """Render the primary/secondary cross-rate chart. Returns None without common bars."""
+    display_tz = pytz.timezone(display_tz_name)
+    # Calculate cross-rate (primary/secondary)
+    # We need to align the data by time index
+    common_index = primary_data.index.intersection(secondary_data.index)
+
+    if len(common_index) == 0:
+        logger.warning("No common time points between primary and secondary currency data")
+        return None
+
+    # Get aligned data
+    primary_aligned = primary_data.loc[common_index]
+    secondary_aligned = secondary_data.loc[common_index]
+
+    # Calculate cross-rate: primary_currency / secondary_currency
+    # This gives us the price of primary currency in terms of secondary currency
+    cross_rate = primary_aligned['Close'] / secondary_aligned['Close']
+
+    # Create the chart
+    fig, (ax,) = PAIR_CHART_TEMPLATE.new_figure(display_tz)
+
+    # Convert event time to display timezone for plotting
+    event_time_local = event_time.astimezone(display_tz)
+
+    # Create cross-rate candlestick chart if we have OHLC data
+    if len(common_index) >= 4 and all(col in primary_aligned.columns for col in ['Open', 'High', 'Low', 'Close']):
+        try:
+            # Calculate cross-rate OHLC
+            cross_ohlc = pd.DataFrame(index=common_index)
+            cross_ohlc['Open'] = primary_aligned['Open'] / secondary_aligned['Open']
+            cross_ohlc['High'] = primary_aligned['High'] / secondary_aligned['Low']  # Max when secondary is lowest
+            cross_ohlc['Low'] = primary_aligned['Low'] / secondary_aligned['High']   # Min when secondary is highest
+            cross_ohlc['Close'] = primary_aligned['Close'] / secondary_aligned['Close']
+
+            # Plot candlesticks
+            plot_candlesticks(ax, cross_ohlc, f'{primary_currency}/{secondary_currency}')
+
+        except Exception as e:
+            logger.warning(f"Failed to create cross-rate candlestick chart, using line chart: {e}")
+            # Fallback to line chart
+            cross_rate = primary_aligned['Close'] / secondary_aligned['Close']
+            ax.plot(common_index, cross_rate, linewidth=2, color='#1f77b4', alpha=0.8,
+                   label=f'{primary_currency}/{secondary_currency}')
+    else:
+        # Use line chart for cross-rate
+        cross_rate = primary_aligned['Close'] / secondary_aligned['Close']
+        ax.plot(common_index, cross_rate, linewidth=2, color='#1f77b4', alpha=0.8,
+               label=f'{primary_currency}/{secondary_currency}')
+
+    ax.set_ylabel(f'{primary_currency} Price (in {secondary_currency})', fontsize=12)
+    ax.set_xlabel('Time', fontsize=12)
+
+    # Add event marker
+    ax.axvline(x=event_time_local, color='red', linestyle='--', linewidth=2, alpha=0.8, label='Event Time')
+
+    # Add impact level shading
+    impact_colors = {'high': '#d62728', 'medium': '#ff7f0e', 'low': '#2ca02c'}
+    impact_color = impact_colors.get(impact_level, '#ff7f0e')
+
+    event_window = timedelta(minutes=30)
+    ax.axvspan(
+        event_time_local - event_window,
+        event_time_local + event_window,
+        alpha=0.2,
+        color=impact_color,
+        label=f'{impact_level.title()} Impact'
+    )
+
+    # Set title
+    event_date_str = event_time.strftime('%Y-%m-%d')
+    ax.set_title(f'{primary_currency}/{secondary_currency} News Event: {event_name}\n{event_date_str}',
+                fontsize=14, fontweight='bold')
+
+    # Add price change annotation
+    if len(cross_rate) > 1:
+        start_price = cross_rate.iloc[0]
+        end_price = cross_rate.iloc[-1]
+        price_change = end_price - start_price
+        price_change_pct = (price_change / start_price) * 100
+
+        change_text = f"Change: {price_change:.4f} ({price_change_pct:+.2f}%)"
+        ax.text(0.02, 0.98, change_text, transform=ax.transAxes,
+               verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
+
+    fig.tight_layout()
+    return figure_to_png(fig)
+
+
+def render_gpt_analysis_chart_png(data: pd.DataFrame,
+                                  symbol: str,
+                                  pair_title: str,
+                                  features: Dict[str, object],
+                                  window_hours: int,
+                                  display_tz_name: str) -> bytes:
+    """Render the 5m GPT analysis chart with EMA, level, FVG and liquidity overlays."""
+    display_tz = pytz.timezone(display_tz_name)
+    # Ensure timezone-local index for plotting
+    try:
+        local_index = data.index.tz_convert(display_tz) if data.index.tzinfo else data.index.tz_localize(display_tz)
+    except Exception:
+        local_index = data.index
+
+    # Compute EMAs on Close (ensure alignment with price)
+    ema20 = data['Close'].ewm(span=20, adjust=False).mean()
+    ema50 = data['Close'].ewm(span=50, adjust=False).mean()
+
+    fig, (ax,) = ANALYSIS_CHART_TEMPLATE.new_figure(display_tz)
+
+    # Prepare OHLC for candlesticks
+    try:
+        ohlc = data[['Open', 'High', 'Low', 'Close']].copy()
+        ohlc.index = local_index
+        plot_candlesticks(ax, ohlc, pair_name=pair_title)
+    except Exception as e:
+        logger.warning(f"Candlestick plot failed in GPT chart; synthesizing: {e}")
+        try:
+            synth = synthesize_ohlc_from_close(data)
+            synth.index = local_index
+            plot_candlesticks(ax, synth, pair_name=pair_title)
+        except Exception as e2:
+            logger.error(f"Failed to synthesize candlesticks in GPT chart: {e2}")
+
+    # Overlay EMAs
+    try:
+        ax.plot(local_index, ema20.values, color='#1f77b4', linewidth=1.3, label='EMA20')
+        ax.plot(local_index, ema50.values, color='#ff7f0e', linewidth=1.3, label='EMA50')
+    except Exception:
+        pass
+
+    # Helper: draw horizontal level
+    def hline(y, color, lw=1.0, ls='--', alpha=0.8, label=None):
+        try:
+            ax.axhline(y=float(y), color=color, linewidth=lw, linestyle=ls, alpha=alpha, label=label)
+        except Exception:
+            pass
+
+    # Current price
+    try:
+        last_price = float(features.get('last_price')) if features.get('last_price') is not None else float(data['Close'].iloc[-1])
+        hline(last_price, color='#2ca02c', lw=1.2, ls='-', alpha=0.8, label='Last Price')
+    except Exception:
+        pass
+
+    # Prior session open
+    po = features.get('prior_session_open')
+    if po is not None:
+        hline(po, color='#9467bd', lw=1.0, ls=':', alpha=0.9, label='Prev Session Open')
+
+    # Round levels
+    rlevels = features.get('round_levels') or []
+    for lvl in rlevels:
+        hline(lvl, color='#7f7f7f', lw=0.8, ls='--', alpha=0.6)
+
+    # Recent swing high/low
+    if features.get('recent_swing_high') is not None:
+        hline(features.get('recent_swing_high'), color='#d62728', lw=1.0, ls='--', alpha=0.85, label='Recent High')
+    if features.get('recent_swing_low') is not None:
+        hline(features.get('recent_swing_low'), color='#17becf', lw=1.0, ls='--', alpha=0.85, label='Recent Low')
+
+    # Annotate swing high/low with labels and arrows
+    try:
+        swing_hi = features.get('recent_swing_high')
+        swing_hi_t = features.get('recent_swing_high_time')
+        swing_lo = features.get('recent_swing_low')
+        swing_lo_t = features.get('recent_swing_low_time')
+        # Helper to convert ISO time to local tz
+        def _to_local(ts_iso):
+            import pandas as _pd
+            try:
+                ts = _pd.to_datetime(ts_iso, utc=True)
+                return ts.tz_convert(display_tz)
+            except Exception:
+                return None
+        if swing_hi is not None and swing_hi_t:
+            ts_loc = _to_local(swing_hi_t)
+            if ts_loc is not None:
+                ax.annotate(f"Swing High: {swing_hi:.4f}",
+                            xy=(ts_loc, float(swing_hi)),
+                            xytext=(ts_loc + timedelta(hours=6), float(swing_hi) + (abs(float(swing_hi))*0.0002)),
+                            arrowprops=dict(arrowstyle="->", color='#d62728', lw=1.0),
+                            fontsize=9, color='#d62728', bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.6))
+        if swing_lo is not None and swing_lo_t:
+            ts_loc = _to_local(swing_lo_t)
+            if ts_loc is not None:
+                ax.annotate(f"Swing Low: {swing_lo:.4f}",
+                            xy=(ts_loc, float(swing_lo)),
+                            xytext=(ts_loc + timedelta(hours=6), float(swing_lo) - (abs(float(swing_lo))*0.0002)),
+                            arrowprops=dict(arrowstyle="->", color='#17becf', lw=1.0),
+                            fontsize=9, color='#17becf', bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.6))
+    except Exception:
+        pass
+
+    # Equal highs/lows clusters as bands (liquidity)
+    try:
+        eq_hi = features.get('equal_highs') or []
+        eq_lo = features.get('equal_lows') or []
+        if len(eq_hi) >= 1:
+            ax.axhspan(min(eq_hi), max(eq_hi), color='#ff9896', alpha=0.15, label='Equal Highs Zone')
+        if len(eq_lo) >= 1:
+            ax.axhspan(min(eq_lo), max(eq_lo), color='#98df8a', alpha=0.15, label='Equal Lows Zone')
+    except Exception:
+        pass
+
+    # FVG bands (price-only, spanning full x-range)
+    try:
+        fvgs = features.get('fvgs') or []
+        for g in fvgs:
+            start_p = g.get('start')
+            end_p = g.get('end')
+            if start_p is None or end_p is None:
+                continue
+            low = min(float(start_p), float(end_p))
+            high = max(float(start_p), float(end_p))
+            ax.axhspan(low, high, color='#c5b0d5', alpha=0.18, label='FVG')
+    except Exception:
+        pass
+
+    ax.set_ylabel('Price', fontsize=12)
+    ax.legend(loc='upper left', ncol=3, fontsize=8)
+
+    # Psychological levels (round numbers) across visible range
+    try:
+        # Determine decimals/step by symbol
+        dec = 2 if ('JPY' in symbol or '/JPY' in pair_title) else 4
+        step = 0.5 if dec == 2 else 0.005
+        # Determine min/max from plotted data and overlays
+        y_candidates = [
+            float(data['Low'].min()), float(data['High'].max()),
+            *(rlevels or []),
+        ]
+        if po is not None:
+            y_candidates.append(float(po))
+        if swing_hi is not None:
+            y_candidates.append(float(swing_hi))
+        if swing_lo is not None:
+            y_candidates.append(float(swing_lo))
+        for g in (fvgs or []):
+            if g.get('start') is not None and g.get('end') is not None:
+                y_candidates.append(float(min(g['start'], g['end'])))
+                y_candidates.append(float(max(g['start'], g['end'])))
+        y_min = min(y_candidates) if y_candidates else float(data['Low'].min())
+        y_max = max(y_candidates) if y_candidates else float(data['High'].max())
+        # Draw psych levels within range (coarse grid)
+        from math import floor, ceil
+        start_level = floor(y_min / step) * step
+        end_level = ceil(y_max / step) * step
+        lvl = start_level
+        while lvl <= end_level:
+            ax.axhline(y=float(lvl), color='#cccccc', linewidth=0.6, linestyle=':', alpha=0.6)
+            lvl = round(lvl + step, dec + 1)
+    except Exception:
+        pass
+
+    # Title
+    fig.suptitle(f'{pair_title} — GPT Analysis (5m, last {window_hours}h)', fontsize=14, fontweight='bold')
+
+    # Scenario annotations based on swings
+    try:
+        x_pos = local_index[int(len(local_index) * 0.8)] if len(local_index) > 0 else None
+        if x_pos is not None:
+            if features.get('recent_swing_low') is not None:
+                lo = float(features['recent_swing_low'])
+                ax.annotate('📉 Break below ' + f"{lo:.4f}" + ' → bearish continuation',
+                            xy=(x_pos, lo), xytext=(x_pos, lo - (abs(lo) * 0.0015)),
+                            arrowprops=dict(arrowstyle='->', color='#d62728', lw=1.0),
+                            fontsize=9, color='#d62728', bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.6))
+            if features.get('recent_swing_high') is not None:
+                hi = float(features['recent_swing_high'])
+                ax.annotate('📈 Break above ' + f"{hi:.4f}" + ' → possible reversal',
+                            xy=(x_pos, hi), xytext=(x_pos, hi + (abs(hi) * 0.0015)),
+                            arrowprops=dict(arrowstyle='->', color='#2ca02c', lw=1.0),
+                            fontsize=9, color='#2ca02c', bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.6))
+    except Exception:
+        pass
+
+    # Fit view to full 48h range (x) and auto-fit Y-axis to full price range
+    try:
+        # Full x-range
+        ax.set_xlim(local_index[0], local_index[-1])
+
+        # Choose a source for highs/lows aligned to local_index
+        price_source = None
+        try:
+            price_source = ohlc
+        except NameError:
+            try:
+                price_source = synth
+            except NameError:
+                import pandas as _pd
+                price_source = _pd.DataFrame({
+                    'High': data['High'].values,
+                    'Low': data['Low'].values,
+                }, index=local_index)
+
+        p_low = float(price_source['Low'].min())
+        p_high = float(price_source['High'].max())
+
+        # Include overlays in Y fit
+        if po is not None:
+            p_low = min(p_low, float(po))
+            p_high = max(p_high, float(po))
+        if features.get('recent_swing_low') is not None:
+            p_low = min(p_low, float(features['recent_swing_low']))
+        if features.get('recent_swing_high') is not None:
+            p_high = max(p_high, float(features['recent_swing_high']))
+        for g in (fvgs or []):
+            if g.get('start') is not None and g.get('end') is not None:
+                gl = float(min(g['start'], g['end']))
+                gh = float(max(g['start'], g['end']))
+                p_low = min(p_low, gl)
+                p_high = max(p_high, gh)
+        for lvl in (rlevels or []):
+            try:
+                p_low = min(p_low, float(lvl))
+                p_high = max(p_high, float(lvl))
+            except Exception:
+                pass
+
+        # Buffer by pair type
+        is_jpy = ('JPY' in symbol) or ('/JPY' in pair_title)
+        base_buffer = 0.1 if is_jpy else 0.0015
+        y_range = max(1e-12, p_high - p_low)
+        y_margin = max(y_range * 0.10, base_buffer)
+        ax.set_ylim(p_low - y_margin, p_high + y_margin)
+    except Exception:
+        pass
+
+    fig.tight_layout(rect=[0, 0.03, 1, 0.97])
+    return figure_to_png(fig)
@@ -5,14 +5,13 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.patches import Rectangle
 import mplfinance as mpf
 import numpy as np
 from io import BytesIO
 import pytz
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -21,13 +20,87 @@ from datetime import datetime, timedelta
 import pytz
 import yfinance as yf
 
+from .chart_cache import RenderedChartCache
+from .chart_render import (
+    ANALYSIS_CHART_TEMPLATE,
+    PAIR_CHART_TEMPLATE,
+    POST_EVENT_CHART_TEMPLATE,
+    figure_to_png,
+    draw_candlesticks,
+    plot_candlesticks,
+    render_cross_rate_chart_png,
+    render_event_chart_png,
+    render_gpt_analysis_chart_png,
+    synthesize_ohlc_from_close,
+)
+from .price_store import PriceBarStore
+from .rate_limiter import TokenBucketRateLimiter, yahoo_rate_limiter
+from .render_pool import chart_render_pool
+
 logger = logging.getLogger(__name__)
 
+# Bar length per Yahoo interval, used to decide which fetched bars are settled
+_INTERVAL_SECONDS = {
+    '1m': 60,
+    '2m': 120,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '60m': 3600,
+    '1h': 3600,
+    '1d': 86400,
+}
+
+_OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Major pairs that are more likely to have data, tried first when charting two currencies
+_MAJOR_PAIRS = ['EURUSD=X', 'GBPUSD=X', 'USDJPY=X', 'AUDUSD=X', 'USDCAD=X', 'USDCHF=X', 'NZDUSD=X']
+
+# Bump when the look of cached charts changes so stale renders are not reused
+_CHART_STYLE_VERSION = 1
+
+# How far back Yahoo keeps each intraday interval, and the longest span it serves
+# in a single request. Slightly conservative so borderline windows are skipped.
+_INTERVAL_RETENTION = {
+    '1m': timedelta(days=29),
+    '2m': timedelta(days=59),
+    '5m': timedelta(days=59),
+    '15m': timedelta(days=59),
+    '30m': timedelta(days=59),
+    '60m': timedelta(days=729),
+    '1h': timedelta(days=729),
+}
+_INTERVAL_MAX_SPAN = {
+    '1m': timedelta(days=7),
+    '2m': timedelta(days=59),
+    '5m': timedelta(days=59),
+    '15m': timedelta(days=59),
+    '30m': timedelta(days=59),
+    '60m': timedelta(days=729),
+    '1h': timedelta(days=729),
+}
+
+
+def _feasible_intervals(start_time: datetime, end_time: datetime, intervals: List[str]) -> List[str]:
+    """Filter an interval ladder down to the intervals Yahoo can serve for this window."""
+    age = timedelta(seconds=max(0.0, time.time() - start_time.timestamp()))
+    span = timedelta(seconds=max(0.0, end_time.timestamp() - start_time.timestamp()))
+    feasible = []
+    for interval in intervals:
+        retention = _INTERVAL_RETENTION.get(interval)
+        max_span = _INTERVAL_MAX_SPAN.get(interval)
+        if retention is not None and age > retention:
+            continue
+        if max_span is not None and span > max_span:
+            continue
+        feasible.append(interval)
+    return feasible
+
 
 class ChartService:
     """Service for generating forex charts around news events."""
 
-    def __init__(self, cache_dir: str = None, allow_mock_data: Optional[bool] = None, enable_alpha_vantage: Optional[bool] = None, enable_alternative_symbols: Optional[bool] = None):
+    def __init__(self, cache_dir: str = None, allow_mock_data: Optional[bool] = None, enable_alpha_vantage: Optional[bool] = None, enable_alternative_symbols: Optional[bool] = None, rate_limiter: Optional[TokenBucketRateLimiter] = None):
         self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'forex_charts')
         self._ensure_cache_dir()
         # Persistent charts directory and retention policy
@@ -35,6 +108,8 @@ class ChartService:
         self._ensure_charts_dir()
         self.chart_retention_days = int(os.getenv('CHART_RETENTION_DAYS', '3'))
         self._last_chart_prune = datetime.min
+        # Rendered PNGs are shared by every user requesting the same chart
+        self.rendered_charts = RenderedChartCache(self.charts_dir, int(os.getenv('CHART_RENDER_CACHE_SIZE', '64')))
 
         # Control whether mock data is allowed as a last resort
         if allow_mock_data is None:
@@ -58,10 +133,8 @@ class ChartService:
         else:
             self.enable_alternative_symbols = bool(enable_alternative_symbols)
 
-        # Basic rate-limit controls for Yahoo/yfinance
-        self._min_request_interval_sec: float = float(os.getenv('YF_MIN_REQUEST_INTERVAL_SEC', '3.0'))
-        self._last_request_ts: float = 0.0
-        self._cooldown_until_ts: float = 0.0
+        # Token-bucket limiter shared by every Yahoo/yfinance request in the process
+        self.rate_limiter = rate_limiter or yahoo_rate_limiter
 
         # Display timezone (for plotting and labels)
         self.display_timezone_name = os.getenv('DISPLAY_TIMEZONE', 'Europe/Prague')
@@ -104,8 +177,29 @@ class ChartService:
 
         # Cache for price data to avoid repeated API calls
         self._price_cache = {}
+        self._price_cache_lock = threading.Lock()
         self._cache_ttl = timedelta(minutes=15)  # Cache data for 15 minutes
 
+        # Windows Yahoo answered with no bars: (symbol, interval) -> [(start_ts, end_ts, expires_at)],
+        # and symbols Yahoo does not know at all: symbol -> expires_at
+        self._empty_windows: Dict[Tuple[str, str], List[Tuple[float, float, float]]] = {}
+        self._unknown_symbols: Dict[str, float] = {}
+        self._empty_lock = threading.Lock()
+        self._empty_recent_ttl_sec = 300.0
+        self._empty_history_ttl_sec = 6 * 3600.0
+
+        # In-flight fetches per symbol: (start_ts, end_ts, Future) for single-flight coalescing
+        self._inflight_fetches: Dict[str, List[Tuple[float, float, Future]]] = {}
+        self._inflight_lock = threading.Lock()
+        self._inflight_wait_sec = 180.0
+        # Worker threads used by fetch_price_data_many (requests still pass the rate limiter)
+        self._fetch_concurrency = max(1, int(os.getenv('PRICE_FETCH_CONCURRENCY', '4')))
+
+        # Persistent bar store so overlapping windows only fetch the missing gaps
+        self.price_store = self._init_price_store()
+        # Bars younger than one interval plus this margin may still change upstream
+        self._bar_settle_sec = float(os.getenv('PRICE_STORE_SETTLE_SEC', '120'))
+
         # Configure retry strategy for requests
         self.session = requests.Session()
         retry_strategy = Retry(
@@ -137,7 +231,8 @@ class ChartService:
     def _init_yf_session(self) -> requests.Session:
         """Initialize a session for yfinance with realistic headers and retries."""
         s = requests.Session()
-        retry_strategy = Retry(total=3, backoff_factor=0.8, status_forcelist=[429, 500, 502, 503, 504], respect_retry_after_header=True)
+        # 429s are not retried here: they must reach the shared rate limiter
+        retry_strategy = Retry(total=3, backoff_factor=0.8, status_forcelist=[500, 502, 503, 504])
         adapter = HTTPAdapter(max_retries=retry_strategy)
         s.mount("http://", adapter)
         s.mount("https://", adapter)
@@ -156,35 +251,30 @@ class ChartService:
             s.proxies.update({'http': proxy, 'https': proxy})
         return s
 
+    def _init_price_store(self) -> Optional[PriceBarStore]:
+        """Create the persistent bar store unless disabled via PRICE_STORE_ENABLED."""
+        env_val = os.getenv('PRICE_STORE_ENABLED', '1').strip().lower()
+        if env_val not in ('1', 'true', 'yes'):
+            logger.info("Persistent price bar store is disabled")
+            return None
+        try:
+            path = os.getenv('PRICE_STORE_PATH') or os.path.join(self.cache_dir, 'price_bars.sqlite3')
+            retention_days = int(os.getenv('PRICE_STORE_RETENTION_DAYS', '30'))
+            return PriceBarStore(path, retention_days=retention_days)
+        except Exception as e:
+            logger.error(f"Failed to initialize price bar store: {e}")
+            return None
+
     def _respect_rate_limit(self):
-        """Sleep if needed to respect min interval and cooldown."""
-        import time as _time
-        import random as _random
-        now = _time.time()
-        if now < self._cooldown_until_ts:
-            sleep_for = max(0.0, self._cooldown_until_ts - now)
-            logger.info(f"yfinance cooldown in effect; sleeping {sleep_for:.1f}s to avoid 429")
-            _time.sleep(sleep_for)
-        elapsed = now - self._last_request_ts
-        if elapsed < self._min_request_interval_sec:
-            jitter = _random.uniform(0, 0.5)
-            sleep_for = self._min_request_interval_sec - elapsed + jitter
-            _time.sleep(sleep_for)
-        self._last_request_ts = _time.time()
-
-    def _enter_cooldown(self, seconds: float = 60.0):
-        """Enter a cooldown period to avoid hammering Yahoo after 429s."""
-        import time as _time
-        import random as _random
-        jitter = _random.uniform(0, seconds * 0.25)
-        self._cooldown_until_ts = _time.time() + seconds + jitter
-        # Increase spacing between requests
-        self._min_request_interval_sec = max(self._min_request_interval_sec, 3.0)
-        logger.warning(f"Entering yfinance cooldown for ~{seconds + jitter:.1f}s due to rate limiting")
+        """Block until the shared Yahoo rate limiter grants a request slot."""
+        self.rate_limiter.acquire()
+
+    def _enter_cooldown(self, seconds: Optional[float] = None):
+        """Report a Yahoo 429 so the shared limiter backs off (optionally for Retry-After seconds)."""
+        self.rate_limiter.penalize(seconds)
 
     def _is_in_cooldown(self) -> bool:
-        import time as _time
-        return _time.time() < self._cooldown_until_ts
+        return self.rate_limiter.in_cooldown()
 
     def _ensure_cache_dir(self):
         """Ensure the cache directory exists."""
@@ -205,8 +295,10 @@ class ChartService:
         """Get cached price data if available and fresh."""
         cache_key = f"{symbol}_{start_time.strftime('%Y%m%d_%H%M')}_{end_time.strftime('%Y%m%d_%H%M')}"
 
-        if cache_key in self._price_cache:
-            cached_data, cache_time = self._price_cache[cache_key]
+        with self._price_cache_lock:
+            entry = self._price_cache.get(cache_key)
+        if entry is not None:
+            cached_data, cache_time = entry
             if datetime.now() - cache_time < self._cache_ttl:
                 logger.info(f"Using cached data for {symbol}")
                 return cached_data
@@ -216,16 +308,22 @@ class ChartService:
     def _cache_data(self, symbol: str, data: pd.DataFrame, start_time: datetime, end_time: datetime):
         """Cache price data with timestamp."""
         cache_key = f"{symbol}_{start_time.strftime('%Y%m%d_%H%M')}_{end_time.strftime('%Y%m%d_%H%M')}"
-        self._price_cache[cache_key] = (data, datetime.now())
-
+        with self._price_cache_lock:
+            self._price_cache[cache_key] = (data, datetime.now())
         # Clean up old cache entries
+        self._evict_cached_data()
+
+    def _evict_cached_data(self) -> int:
+        """Drop in-memory price cache entries older than an hour; returns how many went."""
         cutoff_time = datetime.now() - timedelta(hours=1)
-        old_keys = [
-            key for key, (_, cache_time) in self._price_cache.items()
-            if cache_time < cutoff_time
-        ]
-        for key in old_keys:
-            del self._price_cache[key]
+        with self._price_cache_lock:
+            old_keys = [
+                key for key, (_, cache_time) in list(self._price_cache.items())
+                if cache_time < cutoff_time
+            ]
+            for key in old_keys:
+                self._price_cache.pop(key, None)
+        return len(old_keys)
 
     def _fetch_with_retry(self, symbol: str, start_time: datetime, end_time: datetime, interval: str = '1h') -> Optional[pd.DataFrame]:
         """Fetch data directly from Yahoo's unofficial chart API with retries and backoff."""
@@ -247,14 +345,17 @@ class ChartService:
                 if data is not None and not data.empty:
                     logger.info(f"Successfully fetched {len(data)} data points for {symbol}")
                     return data
-                else:
+                if data is not None:
+                    # Yahoo answered but has no bars for this window; retrying will not change that
                     logger.warning(f"Empty data received for {symbol} with {interval} interval from Yahoo chart API")
+                    return data
+                logger.warning(f"No response data for {symbol} with {interval} interval from Yahoo chart API")
 
             except Exception as e:
                 error_msg = str(e)
                 logger.warning(f"Attempt {attempt + 1} failed for {symbol}: {error_msg}")
                 if '429' in error_msg or 'Too Many Requests' in error_msg:
-                    self._enter_cooldown(90.0)
+                    self._enter_cooldown()
                     break
                 # Retry on network-type issues
                 if any(keyword in error_msg.lower() for keyword in ['timeout', 'connection', 'network']):
@@ -266,6 +367,88 @@ class ChartService:
         # No other sources if Alpha Vantage disabled and alternatives off; return None
         return None
 
+    def _plan_intervals(self, symbol: str, start_time: datetime, end_time: datetime, intervals: List[str]) -> List[str]:
+        """Pick the intervals worth requesting: within Yahoo's retention and not known to be empty."""
+        feasible = _feasible_intervals(start_time, end_time, intervals)
+        start_ts = start_time.timestamp()
+        end_ts = end_time.timestamp()
+        now = time.time()
+        planned = []
+        with self._empty_lock:
+            if self._unknown_symbols.get(symbol, 0) > now:
+                logger.info(f"Skipping Yahoo for {symbol}: symbol recently reported as not found")
+                return []
+            for interval in feasible:
+                key = (symbol, interval)
+                windows = [w for w in self._empty_windows.get(key, []) if w[2] > now]
+                if windows:
+                    self._empty_windows[key] = windows
+                else:
+                    self._empty_windows.pop(key, None)
+                if any(ws <= start_ts and we >= end_ts for ws, we, _ in windows):
+                    continue
+                planned.append(interval)
+        skipped = [i for i in intervals if i not in planned]
+        if skipped:
+            logger.info(f"Interval plan for {symbol}: {', '.join(planned) or 'none'} (skipping {', '.join(skipped)})")
+        return planned
+
+    def _remember_empty_window(self, symbol: str, interval: str, start_ts: float, end_ts: float):
+        """Remember that Yahoo returned no bars for this window so it is not requested again soon."""
+        now = time.time()
+        # Windows reaching into the last hour may still fill in; older ones will not
+        ttl = self._empty_recent_ttl_sec if end_ts > now - 3600 else self._empty_history_ttl_sec
+        with self._empty_lock:
+            self._empty_windows.setdefault((symbol, interval), []).append((start_ts, end_ts, now + ttl))
+
+    def _remember_unknown_symbol(self, symbol: str):
+        with self._empty_lock:
+            self._unknown_symbols[symbol] = time.time() + self._empty_history_ttl_sec
+
+    def _fetch_interval_bars(self, symbol: str, start_time: datetime, end_time: datetime, interval: str) -> Optional[pd.DataFrame]:
+        """Serve a window from the bar store, fetching only the gaps it does not cover yet."""
+        if self.price_store is None:
+            data = self._fetch_with_retry(symbol, start_time, end_time, interval)
+            if data is not None and data.empty:
+                self._remember_empty_window(symbol, interval, start_time.timestamp(), end_time.timestamp())
+            return data if data is not None and not data.empty else None
+
+        start_ts = int(start_time.timestamp())
+        end_ts = int(end_time.timestamp())
+        gaps = self.price_store.missing_ranges(symbol, interval, start_ts, end_ts)
+        if gaps:
+            # Only bars that can no longer change upstream are marked as covered
+            settled_ts = int(time.time() - _INTERVAL_SECONDS.get(interval, 3600) - self._bar_settle_sec)
+            for gap_start, gap_end in gaps:
+                logger.info(f"Fetching missing {interval} bars for {symbol}: "
+                            f"{datetime.fromtimestamp(gap_start, tz=pytz.UTC)} -> {datetime.fromtimestamp(gap_end, tz=pytz.UTC)}")
+                data = self._fetch_with_retry(
+                    symbol,
+                    datetime.fromtimestamp(gap_start, tz=pytz.UTC),
+                    datetime.fromtimestamp(gap_end, tz=pytz.UTC),
+                    interval,
+                )
+                full_window = (gap_start, gap_end) == (start_ts, end_ts)
+                if data is None:
+                    # Transport failure: leave the gap uncovered so it is retried later
+                    if full_window:
+                        return None
+                    continue
+                if data.empty:
+                    if full_window:
+                        # Nothing stored and nothing upstream for this interval
+                        self._remember_empty_window(symbol, interval, start_time.timestamp(), end_time.timestamp())
+                        return None
+                    # Yahoo confirmed there are no bars here (e.g. market closed)
+                    self.price_store.store_bars(symbol, interval, None, gap_start, min(gap_end, settled_ts))
+                    continue
+                self.price_store.store_bars(symbol, interval, data, gap_start, min(gap_end, settled_ts))
+        else:
+            logger.info(f"Serving {symbol} {interval} bars from persistent store")
+
+        data = self.price_store.load_bars(symbol, interval, start_ts, end_ts)
+        return data if not data.empty else None
+
     def _fetch_from_yahoo_chart_api(self, symbol: str, start_time: datetime, end_time: datetime, interval: str) -> Optional[pd.DataFrame]:
         """Fetch OHLCV data from Yahoo's unofficial chart API."""
         try:
@@ -287,19 +470,27 @@ class ChartService:
             self._respect_rate_limit()
             resp = self._yf_session.get(url, params=params, timeout=20)
             if resp.status_code == 429:
-                self._enter_cooldown(90.0)
+                retry_after = resp.headers.get('Retry-After')
+                self._enter_cooldown(float(retry_after) if retry_after and retry_after.isdigit() else None)
                 return None
+            if resp.status_code in (400, 404, 422):
+                # Out-of-retention windows and unknown symbols come back as chart errors
+                logger.info(f"Yahoo has no {interval} data for {symbol} in this window (HTTP {resp.status_code})")
+                if resp.status_code == 404:
+                    self._remember_unknown_symbol(symbol)
+                return pd.DataFrame(columns=_OHLCV_COLUMNS)
             resp.raise_for_status()
+            self.rate_limiter.record_success()
             payload = resp.json()
 
             chart = payload.get('chart', {})
             result_list = chart.get('result', [])
             if not result_list:
-                return None
+                return pd.DataFrame(columns=_OHLCV_COLUMNS)
             result = result_list[0]
             timestamps = result.get('timestamp', [])
             if not timestamps:
-                return None
+                return pd.DataFrame(columns=_OHLCV_COLUMNS)
             indicators = result.get('indicators', {})
             quote_list = indicators.get('quote', [{}])
             quote = quote_list[0] if quote_list else {}
@@ -313,7 +504,7 @@ class ChartService:
             # Build DataFrame, align lengths safely
             size = min(len(timestamps), len(closes))
             if size == 0:
-                return None
+                return pd.DataFrame(columns=_OHLCV_COLUMNS)
             ts = pd.to_datetime(timestamps[:size], unit='s', utc=True)
             data = pd.DataFrame({
                 'Open': pd.Series(opens[:size], index=ts),
@@ -551,49 +742,189 @@ class ChartService:
             return None
 
     def fetch_price_data(self, symbol: str, start_time: datetime, end_time: datetime) -> Optional[pd.DataFrame]:
-        """Fetch historical price data for a given symbol and time range."""
+        """Fetch historical price data for a given symbol and time range.
+
+        Concurrent calls are coalesced per symbol: a window covered by an in-flight
+        fetch waits for it and shares its DataFrame, while a partially overlapping
+        window waits first so the overlap is already in the bar store. A covered
+        window still fetches on its own when the shared frame has no bars for it
+        or is coarser than the interval the window would get by itself.
+        """
+        # Check cache first
+        cached_data = self._get_cached_data(symbol, start_time, end_time)
+        if cached_data is not None:
+            return cached_data
+
+        start_ts = start_time.timestamp()
+        end_ts = end_time.timestamp()
+        with self._inflight_lock:
+            flights = self._inflight_fetches.setdefault(symbol, [])
+            covering = next((f for f in flights if f[0] <= start_ts and f[1] >= end_ts), None)
+            overlapping = [] if covering else [f[2] for f in flights if f[0] < end_ts and f[1] > start_ts]
+            if covering is None:
+                flight = (start_ts, end_ts, Future())
+                flights.append(flight)
+
+        if covering is not None:
+            logger.info(f"Joining in-flight price fetch for {symbol}")
+            try:
+                shared = covering[2].result(timeout=self._inflight_wait_sec)
+            except Exception as e:
+                logger.warning(f"Waiting for in-flight fetch of {symbol} failed: {e}")
+                return None
+            sliced = self._slice_window(shared, start_time, end_time)
+            if sliced is not None and not sliced.empty and not self._coarser_than_planned(symbol, shared, start_time, end_time):
+                return sliced
+            # The leader fell back to a broader range or a coarser interval than this window
+            # gets on its own, so fetch it directly (the overlap is already in the bar store)
+            logger.info(f"In-flight fetch of {symbol} does not serve this window at full resolution; fetching it")
+            with self._inflight_lock:
+                flight = (start_ts, end_ts, Future())
+                self._inflight_fetches.setdefault(symbol, []).append(flight)
+            overlapping = []
+
+        data = None
         try:
-            # Check cache first
-            cached_data = self._get_cached_data(symbol, start_time, end_time)
-            if cached_data is not None:
-                return cached_data
+            for pending in overlapping:
+                try:
+                    pending.result(timeout=self._inflight_wait_sec)
+                except Exception:
+                    pass
+            data = self._fetch_price_data_uncoalesced(symbol, start_time, end_time)
+        finally:
+            with self._inflight_lock:
+                flights = self._inflight_fetches.get(symbol, [])
+                if flight in flights:
+                    flights.remove(flight)
+                if not flights:
+                    self._inflight_fetches.pop(symbol, None)
+            flight[2].set_result(data)
+        return data
+
+    def fetch_price_data_many(self, symbols: List[str], windows) -> Dict[str, Optional[pd.DataFrame]]:
+        """Fetch several symbols concurrently and return a dict of DataFrames keyed by symbol.
+
+        ``windows`` is either one (start, end) pair applied to every symbol or a list
+        of pairs aligned with ``symbols``. Windows for the same symbol are merged so
+        each symbol is fetched once; its DataFrame covers the union of its windows.
+        """
+        if isinstance(windows, tuple) and len(windows) == 2 and isinstance(windows[0], datetime):
+            windows = [windows] * len(symbols)
+        if len(windows) != len(symbols):
+            raise ValueError("windows must be a single (start, end) pair or one pair per symbol")
+
+        plan: Dict[str, Tuple[datetime, datetime]] = {}
+        for symbol, (start_time, end_time) in zip(symbols, windows):
+            if symbol in plan:
+                planned_start, planned_end = plan[symbol]
+                start_time = min(planned_start, start_time, key=lambda d: d.timestamp())
+                end_time = max(planned_end, end_time, key=lambda d: d.timestamp())
+            plan[symbol] = (start_time, end_time)
+        if not plan:
+            return {}
+
+        results: Dict[str, Optional[pd.DataFrame]] = {}
+        workers = min(len(plan), self._fetch_concurrency)
+        if workers <= 1:
+            for symbol, (start_time, end_time) in plan.items():
+                results[symbol] = self.fetch_price_data(symbol, start_time, end_time)
+        else:
+            logger.info(f"Fetching {len(plan)} symbols concurrently: {', '.join(plan)}")
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='price-fetch') as pool:
+                futures = {
+                    pool.submit(self.fetch_price_data, symbol, start_time, end_time): symbol
+                    for symbol, (start_time, end_time) in plan.items()
+                }
+                for future in as_completed(futures):
+                    symbol = futures[future]
+                    try:
+                        results[symbol] = future.result()
+                    except Exception as e:
+                        logger.warning(f"Batch fetch failed for {symbol}: {e}")
+                        results[symbol] = None
+        return {symbol: results.get(symbol) for symbol in plan}
+
+    def _first_available(self, symbols: List[str], start_time: datetime, end_time: datetime,
+                         prefetched: Optional[Dict[str, Optional[pd.DataFrame]]] = None) -> Tuple[Optional[str], Optional[pd.DataFrame]]:
+        """Return the first symbol (in preference order) that has non-empty data.
+
+        Symbols are fetched one at a time, and only while the previous ones came back
+        empty; data already in ``prefetched`` is used without fetching again.
+        """
+        for symbol in symbols:
+            if prefetched is not None and symbol in prefetched:
+                data = prefetched[symbol]
+            else:
+                data = self.fetch_price_data(symbol, start_time, end_time)
+            if data is not None and not data.empty:
+                return symbol, data
+            logger.warning(f"No price data available for {symbol}")
+        return None, None
 
+    def _slice_window(self, data: Optional[pd.DataFrame], start_time: datetime, end_time: datetime) -> Optional[pd.DataFrame]:
+        """Trim a shared DataFrame to the caller's window; empty if no bar falls inside it."""
+        if data is None or data.empty:
+            return data
+        try:
+            start = pd.Timestamp(start_time.timestamp(), unit='s', tz='UTC')
+            end = pd.Timestamp(end_time.timestamp(), unit='s', tz='UTC')
+            index = data.index if data.index.tz is not None else data.index.tz_localize('UTC')
+            sliced = data.loc[(index >= start) & (index <= end)]
+            return sliced
+        except Exception:
+            return data
+
+    def _coarser_than_planned(self, symbol: str, data: pd.DataFrame, start_time: datetime, end_time: datetime) -> bool:
+        """True when the bars are spaced wider than the finest interval planned for this window."""
+        planned = self._plan_intervals(symbol, start_time, end_time, ['1m', '5m', '15m', '1h'])
+        if not planned or len(data) < 2:
+            return False
+        try:
+            spacing = pd.Series(data.index).diff().dropna().median().total_seconds()
+        except Exception:
+            return False
+        # Half a bar of slack so missing bars or DST shifts do not count as a coarser interval
+        return spacing > _INTERVAL_SECONDS[planned[0]] * 1.5
+
+    def _fetch_price_data_uncoalesced(self, symbol: str, start_time: datetime, end_time: datetime) -> Optional[pd.DataFrame]:
+        """Fetch price data through the interval ladder and fallbacks (no coalescing)."""
+        try:
             logger.info(f"Fetching price data for {symbol} from {start_time} to {end_time}")
 
-            # Try different intervals if 1m fails
-            intervals = ['1m', '5m', '15m', '1h']
+            # Only try intervals Yahoo can serve for this window and that are not known to be empty
+            intervals = self._plan_intervals(symbol, start_time, end_time, ['1m', '5m', '15m', '1h'])
 
             for interval in intervals:
                 try:
-                    data = self._fetch_with_retry(symbol, start_time, end_time, interval)
-
-                    if data is not None and not data.empty:
-                        # Cache the data
-                        self._cache_data(symbol, data, start_time, end_time)
-                        return data
-                    else:
-                        logger.warning(f"No data found for {symbol} with {interval} interval")
-
+                    data = self._fetch_interval_bars(symbol, start_time, end_time, interval)
                 except Exception as e:
                     logger.warning(f"Failed to fetch data for {symbol} with {interval} interval: {e}")
                     continue
 
+                if data is not None and not data.empty:
+                    # Cache the data outside the fetch try so bookkeeping can never discard the bars
+                    self._cache_data(symbol, data, start_time, end_time)
+                    return data
+                logger.warning(f"No data found for {symbol} with {interval} interval")
+
             # If all intervals fail, try with a broader time range
             logger.info(f"Trying broader time range for {symbol}")
+            data = None
             try:
                 broader_start = start_time - timedelta(days=1)
                 broader_end = end_time + timedelta(days=1)
 
-                data = self._fetch_with_retry(symbol, broader_start, broader_end, '1d')
-
-                if data is not None and not data.empty:
-                    logger.info(f"Successfully fetched {len(data)} data points for {symbol} with broader range")
-                    self._cache_data(symbol, data, start_time, end_time)
-                    return data
+                if self._plan_intervals(symbol, broader_start, broader_end, ['1d']):
+                    data = self._fetch_interval_bars(symbol, broader_start, broader_end, '1d')
 
             except Exception as e:
                 logger.error(f"Failed to fetch data with broader range for {symbol}: {e}")
 
+            if data is not None and not data.empty:
+                logger.info(f"Successfully fetched {len(data)} data points for {symbol} with broader range")
+                self._cache_data(symbol, data, start_time, end_time)
+                return data
+
             # Try alternative data sources
             logger.info(f"Trying alternative data sources for {symbol}")
             data = self._try_alternative_data_source(symbol, start_time, end_time)
@@ -671,19 +1002,11 @@ class ChartService:
                 end_time = now.astimezone(event_time.tzinfo)
                 logger.info(f"Adjusted end time to current time: {end_time}")
 
-            # Try each currency pair until we find one with data
-            price_data = None
-            successful_symbol = None
-
-            for symbol in symbols:
-                logger.info(f"Trying currency pair: {symbol}")
-                price_data = self.fetch_price_data(symbol, start_time, end_time)
-                if price_data is not None and not price_data.empty:
-                    successful_symbol = symbol
-                    logger.info(f"Successfully found data for {symbol}")
-                    break
-                else:
-                    logger.warning(f"No price data available for {symbol} around {event_time}")
+            # Use the first pair (in preference order) with data; fallbacks are only fetched when needed
+            logger.info(f"Trying currency pairs: {', '.join(symbols)}")
+            successful_symbol, price_data = self._first_available(symbols, start_time, end_time)
+            if successful_symbol:
+                logger.info(f"Successfully found data for {successful_symbol}")
 
             if price_data is None or price_data.empty:
                 logger.warning(f"No price data available for any currency pairs for {currency} around {event_time}")
@@ -713,100 +1036,38 @@ class ChartService:
                        impact_level: str,
                        window_hours: int) -> BytesIO:
         """Generate a matplotlib chart with the price data and event marker."""
+        key_parts = ('event', symbol, window_hours, self._bar_interval_seconds(price_data),
+                     event_time.isoformat(), event_name, currency, impact_level)
+        return self._render_cached(
+            key_parts, price_data,
+            lambda: self._render_event_chart(price_data, event_time, event_name, currency,
+                                             symbol, impact_level, window_hours))
+
+    def _render_event_chart(self,
+                            price_data: pd.DataFrame,
+                            event_time: datetime,
+                            event_name: str,
+                            currency: str,
+                            symbol: str,
+                            impact_level: str,
+                            window_hours: int) -> Optional[BytesIO]:
+        """Render the single-pair event chart in the render pool."""
+        png = chart_render_pool.render(render_event_chart_png, price_data, event_time, event_name,
+                                       currency, symbol, impact_level, self.display_tz.zone)
+        if not png:
+            logger.error(f"Error generating chart for {currency} event: {event_name}")
+            return None
+
+        img_buffer = BytesIO(png)
+        logger.info(f"Successfully generated chart for {currency} event: {event_name}")
+        # Persist chart to disk and prune old ones
         try:
-            # Set up the plot
-            plt.style.use('default')
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), height_ratios=[3, 1])
-            # Format the event date for display (in local/display TZ)
-            event_date_str = event_time.astimezone(self.display_tz).strftime('%Y-%m-%d')
-            fig.suptitle(f'{currency} News Event: {event_name}\n{event_date_str}', fontsize=14, fontweight='bold')
-
-            # Convert data and event time to display timezone for plotting
-            local_index = price_data.index.tz_convert(self.display_tz) if price_data.index.tzinfo else price_data.index.tz_localize(self.display_tz)
             event_time_local = event_time.astimezone(self.display_tz)
-
-            # Plot price data as candlesticks when OHLC is available
-            try:
-                ohlc = price_data[['Open', 'High', 'Low', 'Close']].copy()
-                ohlc.index = local_index
-                self._plot_candlesticks(ax1, ohlc, f'{currency}/{symbol.split("=")[0][-3:]}')
-            except Exception as e:
-                logger.warning(f"Candlestick plot failed; synthesizing OHLC: {e}")
-                try:
-                    synth = self._synthesize_ohlc_from_close(price_data)
-                    synth.index = local_index
-                    self._plot_candlesticks(ax1, synth, f'{currency}/{symbol.split("=")[0][-3:]}')
-                except Exception as e2:
-                    logger.error(f"Failed to synthesize candlesticks: {e2}")
-            ax1.set_ylabel('Price', fontsize=12)
-            ax1.grid(True, alpha=0.3)
-
-            # Add event marker
-            ax1.axvline(x=event_time_local, color='red', linestyle='--', linewidth=2, alpha=0.8, label='Event Time')
-
-            # Add impact level indicator
-            impact_colors = {'high': '#d62728', 'medium': '#ff7f0e', 'low': '#2ca02c'}
-            impact_color = impact_colors.get(impact_level, '#ff7f0e')
-
-            # Add shaded area around event time
-            event_window = timedelta(minutes=30)
-            ax1.axvspan(
-                event_time_local - event_window,
-                event_time_local + event_window,
-                alpha=0.2,
-                color=impact_color,
-                label=f'{impact_level.title()} Impact'
-            )
-
-            # Plot volume
-            if 'Volume' in price_data.columns:
-                ax2.bar(local_index, price_data['Volume'], alpha=0.6, color='#2ca02c')
-                ax2.set_ylabel('Volume', fontsize=12)
-                ax2.grid(True, alpha=0.3)
-
-            # Format x-axis
-            # X-axis: show ticks every 30 minutes for consistency
-            major_interval = 30
-            for ax in [ax1, ax2]:
-                ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=self.display_tz))
-                ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=major_interval))
-                plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
-
-            # Add legend
-            ax1.legend(loc='upper right')
-
-            # Add price change annotation
-            if len(price_data) > 1:
-                start_price = price_data['Close'].iloc[0]
-                end_price = price_data['Close'].iloc[-1]
-                price_change = end_price - start_price
-                price_change_pct = (price_change / start_price) * 100
-
-                change_text = f"Change: {price_change:.4f} ({price_change_pct:+.2f}%)"
-                ax1.text(0.02, 0.98, change_text, transform=ax1.transAxes,
-                        verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
-
-            plt.tight_layout()
-
-            # Save to BytesIO
-            img_buffer = BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            plt.close()
-
-            logger.info(f"Successfully generated chart for {currency} event: {event_name}")
-            # Persist chart to disk and prune old ones
-            try:
-                filename = f"{event_time_local.strftime('%Y%m%d_%H%M')}_{currency}_{symbol}_w{window_hours}h_{self._slugify(event_name)}.png"
-                self._save_chart_buffer(img_buffer, filename)
-            except Exception as e:
-                logger.warning(f"Failed to persist chart image: {e}")
-            return img_buffer
-
+            filename = f"{event_time_local.strftime('%Y%m%d_%H%M')}_{currency}_{symbol}_w{window_hours}h_{self._slugify(event_name)}.png"
+            self._save_chart_buffer(img_buffer, filename)
         except Exception as e:
-            logger.error(f"Error generating chart: {e}")
-            plt.close()  # Ensure plot is closed even on error
-            return None
+            logger.warning(f"Failed to persist chart image: {e}")
+        return img_buffer
 
     def create_multi_pair_chart(self,
                                currency: str,
@@ -842,8 +1103,7 @@ class ChartService:
             start_time = event_time - timedelta(hours=window_hours)
             end_time = event_time + timedelta(hours=window_hours)
 
-            for pair in context_pairs:
-                data = self.fetch_price_data(pair, start_time, end_time)
+            for pair, data in self.fetch_price_data_many(context_pairs, (start_time, end_time)).items():
                 if data is not None and not data.empty:
                     all_data[pair] = data
 
@@ -857,7 +1117,8 @@ class ChartService:
                 event_time,
                 event_name,
                 currency,
-                impact_level
+                impact_level,
+                window_hours
             )
 
         except Exception as e:
@@ -872,8 +1133,26 @@ class ChartService:
                                    impact_level: str,
                                    window_hours: int) -> BytesIO:
         """Generate a chart showing multiple currency pairs."""
+        pairs = list(all_data.keys())
+        combined = pd.concat(list(all_data.values()), keys=pairs) if pairs else None
+        key_parts = ('multi', tuple(pairs), window_hours,
+                     tuple(self._bar_interval_seconds(d) for d in all_data.values()),
+                     event_time.isoformat(), event_name, currency, impact_level)
+        return self._render_cached(
+            key_parts, combined,
+            lambda: self._render_multi_pair_chart(all_data, event_time, event_name, currency,
+                                                  impact_level, window_hours))
+
+    def _render_multi_pair_chart(self,
+                                 all_data: Dict[str, pd.DataFrame],
+                                 event_time: datetime,
+                                 event_name: str,
+                                 currency: str,
+                                 impact_level: str,
+                                 window_hours: int) -> BytesIO:
+        """Render the multi-pair event chart."""
         try:
-            fig, ax = plt.subplots(figsize=(12, 8))
+            fig, (ax,) = PAIR_CHART_TEMPLATE.new_figure(self.display_tz)
 
             # Plot each currency pair as candlesticks in small multiples for clarity
             colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
@@ -912,21 +1191,10 @@ class ChartService:
 
             ax.set_title(f'{currency} News Event: {event_name}', fontsize=14, fontweight='bold')
             ax.set_ylabel('Normalized Price (Base=100)', fontsize=12)
-            ax.grid(True, alpha=0.3)
             ax.legend(loc='upper right')
 
-            # Format x-axis
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=self.display_tz))
-            ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=30))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
-
-            plt.tight_layout()
-
-            # Save to BytesIO
-            img_buffer = BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            plt.close()
+            fig.tight_layout()
+            img_buffer = BytesIO(figure_to_png(fig))
 
             try:
                 filename = f"{event_time_local.strftime('%Y%m%d_%H%M')}_{currency}_multi_w{window_hours}h_{self._slugify(event_name)}.png"
@@ -938,9 +1206,20 @@ class ChartService:
 
         except Exception as e:
             logger.error(f"Error generating multi-pair chart: {e}")
-            plt.close()
             return None
 
+    def direct_pair_candidates(self, primary_currency: str, secondary_currency: str) -> List[Tuple[str, bool]]:
+        """Direct Yahoo pairs for two currencies in the order charts try them.
+
+        Each entry is ``(symbol, inverted)``; the major pair comes first, whichever
+        way round it is quoted.
+        """
+        candidate1 = f"{primary_currency}{secondary_currency}=X"
+        candidate2 = f"{secondary_currency}{primary_currency}=X"
+        if candidate2 in _MAJOR_PAIRS:
+            return [(candidate2, True), (candidate1, False)]
+        return [(candidate1, False), (candidate2, True)]
+
     def create_multi_currency_chart(self,
                                    primary_currency: str,
                                    secondary_currency: str,
@@ -986,85 +1265,32 @@ class ChartService:
 
             # Try to find a direct pair between the two currencies
             direct_pair = None
+            direct_data = None
             data_is_inverted = False
 
             if primary_currency != secondary_currency:
-                # Create candidates but prioritize major pairs
-                candidate1 = f"{primary_currency}{secondary_currency}=X"
-                candidate2 = f"{secondary_currency}{primary_currency}=X"
-
-                # Major pairs that are more likely to have data
-                major_pairs = ['EURUSD=X', 'GBPUSD=X', 'USDJPY=X', 'AUDUSD=X', 'USDCAD=X', 'USDCHF=X', 'NZDUSD=X']
-
-                # Prioritize the major pair if available
-                if candidate2 in major_pairs:
-                    # Try major pair first (inverted)
-                    logger.info(f"Trying major pair (inverted): {candidate2}")
-                    data = self.fetch_price_data(candidate2, start_time, end_time)
-                    if data is not None and not data.empty:
-                        direct_pair = candidate2
-                        data_is_inverted = True
-                        logger.info(f"Found major pair data (will invert): {candidate2}")
-                    else:
-                        # Try the original pair
-                        logger.info(f"Trying direct pair: {candidate1}")
-                        data = self.fetch_price_data(candidate1, start_time, end_time)
-                        if data is not None and not data.empty:
-                            direct_pair = candidate1
-                            data_is_inverted = False
-                            logger.info(f"Found direct pair data: {candidate1}")
-                elif candidate1 in major_pairs:
-                    # Try major pair first (direct)
-                    logger.info(f"Trying major pair (direct): {candidate1}")
-                    data = self.fetch_price_data(candidate1, start_time, end_time)
+                for candidate, inverted in self.direct_pair_candidates(primary_currency, secondary_currency):
+                    logger.info(f"Trying {'inverted' if inverted else 'direct'} pair: {candidate}")
+                    data = self.fetch_price_data(candidate, start_time, end_time)
                     if data is not None and not data.empty:
-                        direct_pair = candidate1
-                        data_is_inverted = False
-                        logger.info(f"Found major pair data: {candidate1}")
-                    else:
-                        # Try the inverted pair
-                        logger.info(f"Trying inverted pair: {candidate2}")
-                        data = self.fetch_price_data(candidate2, start_time, end_time)
-                        if data is not None and not data.empty:
-                            direct_pair = candidate2
-                            data_is_inverted = True
-                            logger.info(f"Found inverted pair data: {candidate2}")
-                else:
-                    # Try both candidates
-                    for candidate in [candidate1, candidate2]:
-                        logger.info(f"Trying direct pair: {candidate}")
-                        data = self.fetch_price_data(candidate, start_time, end_time)
-                        if data is not None and not data.empty:
-                            direct_pair = candidate
-                            data_is_inverted = (candidate == candidate2)
-                            logger.info(f"Found direct pair data: {candidate}")
-                            break
+                        direct_pair = candidate
+                        direct_data = data
+                        data_is_inverted = inverted
+                        logger.info(f"Found {'inverted' if inverted else 'direct'} pair data: {candidate}")
+                        break
 
             # If no direct pair found, try to construct it from individual currencies
             if direct_pair is None:
                 logger.info("No direct pair found, trying to construct from individual currencies")
 
-                # Fetch data for primary currency (against USD)
-                primary_data = None
-                primary_symbol = None
-                for symbol in primary_symbols:
-                    logger.info(f"Trying primary currency pair: {symbol}")
-                    primary_data = self.fetch_price_data(symbol, start_time, end_time)
-                    if primary_data is not None and not primary_data.empty:
-                        primary_symbol = symbol
-                        logger.info(f"Successfully found data for primary {symbol}")
-                        break
-
-                # Fetch data for secondary currency (against USD)
-                secondary_data = None
-                secondary_symbol = None
-                for symbol in secondary_symbols:
-                    logger.info(f"Trying secondary currency pair: {symbol}")
-                    secondary_data = self.fetch_price_data(symbol, start_time, end_time)
-                    if secondary_data is not None and not secondary_data.empty:
-                        secondary_symbol = symbol
-                        logger.info(f"Successfully found data for secondary {symbol}")
-                        break
+                # Both legs are needed: fetch their preferred pairs concurrently, then fall back per leg
+                legs = self.fetch_price_data_many([primary_symbols[0], secondary_symbols[0]], (start_time, end_time))
+                primary_symbol, primary_data = self._first_available(primary_symbols, start_time, end_time, legs)
+                secondary_symbol, secondary_data = self._first_available(secondary_symbols, start_time, end_time, legs)
+                if primary_symbol:
+                    logger.info(f"Successfully found data for primary {primary_symbol}")
+                if secondary_symbol:
+                    logger.info(f"Successfully found data for secondary {secondary_symbol}")
 
                 if primary_data is None or primary_data.empty:
                     logger.warning(f"No price data available for primary currency {primary_currency}")
@@ -1087,11 +1313,10 @@ class ChartService:
                     impact_level
                 )
             else:
-                # Use direct pair data
-                data = self.fetch_price_data(direct_pair, start_time, end_time)
-                if data is not None and not data.empty:
+                # Use direct pair data already fetched above
+                if direct_data is not None and not direct_data.empty:
                     return self._generate_direct_pair_chart(
-                        data,
+                        direct_data,
                         direct_pair,
                         primary_currency,
                         secondary_currency,
@@ -1116,117 +1341,28 @@ class ChartService:
                                   secondary_currency: str,
                                   event_time: datetime,
                                   event_name: str,
-                                  impact_level: str) -> BytesIO:
+                                  impact_level: str) -> Optional[BytesIO]:
         """Generate a chart showing cross-rate between two currencies."""
-        try:
-            # Calculate cross-rate (primary/secondary)
-            # We need to align the data by time index
-            common_index = primary_data.index.intersection(secondary_data.index)
-
-            if len(common_index) == 0:
-                logger.warning("No common time points between primary and secondary currency data")
-                return None
-
-            # Get aligned data
-            primary_aligned = primary_data.loc[common_index]
-            secondary_aligned = secondary_data.loc[common_index]
-
-            # Calculate cross-rate: primary_currency / secondary_currency
-            # This gives us the price of primary currency in terms of secondary currency
-            cross_rate = primary_aligned['Close'] / secondary_aligned['Close']
+        if len(primary_data.index.intersection(secondary_data.index)) == 0:
+            logger.warning("No common time points between primary and secondary currency data")
+            return None
 
-            # Create the chart
-            fig, ax = plt.subplots(figsize=(12, 8))
+        png = chart_render_pool.render(render_cross_rate_chart_png, primary_data, secondary_data,
+                                       primary_currency, secondary_currency, event_time, event_name,
+                                       impact_level, self.display_tz.zone)
+        if not png:
+            logger.error(f"Error generating cross-rate chart for {primary_currency}/{secondary_currency}")
+            return None
 
-            # Convert event time to display timezone for plotting
+        img_buffer = BytesIO(png)
+        logger.info(f"Successfully generated cross-rate chart for {primary_currency}/{secondary_currency} event: {event_name}")
+        try:
             event_time_local = event_time.astimezone(self.display_tz)
-
-            # Create cross-rate candlestick chart if we have OHLC data
-            if len(common_index) >= 4 and all(col in primary_aligned.columns for col in ['Open', 'High', 'Low', 'Close']):
-                try:
-                    # Calculate cross-rate OHLC
-                    cross_ohlc = pd.DataFrame(index=common_index)
-                    cross_ohlc['Open'] = primary_aligned['Open'] / secondary_aligned['Open']
-                    cross_ohlc['High'] = primary_aligned['High'] / secondary_aligned['Low']  # Max when secondary is lowest
-                    cross_ohlc['Low'] = primary_aligned['Low'] / secondary_aligned['High']   # Min when secondary is highest
-                    cross_ohlc['Close'] = primary_aligned['Close'] / secondary_aligned['Close']
-
-                    # Plot candlesticks
-                    self._plot_candlesticks(ax, cross_ohlc, f'{primary_currency}/{secondary_currency}')
-
-                except Exception as e:
-                    logger.warning(f"Failed to create cross-rate candlestick chart, using line chart: {e}")
-                    # Fallback to line chart
-                    cross_rate = primary_aligned['Close'] / secondary_aligned['Close']
-                    ax.plot(common_index, cross_rate, linewidth=2, color='#1f77b4', alpha=0.8,
-                           label=f'{primary_currency}/{secondary_currency}')
-            else:
-                # Use line chart for cross-rate
-                cross_rate = primary_aligned['Close'] / secondary_aligned['Close']
-                ax.plot(common_index, cross_rate, linewidth=2, color='#1f77b4', alpha=0.8,
-                       label=f'{primary_currency}/{secondary_currency}')
-
-            ax.set_ylabel(f'{primary_currency} Price (in {secondary_currency})', fontsize=12)
-            ax.set_xlabel('Time', fontsize=12)
-            ax.grid(True, alpha=0.3)
-
-            # Add event marker
-            ax.axvline(x=event_time_local, color='red', linestyle='--', linewidth=2, alpha=0.8, label='Event Time')
-
-            # Add impact level shading
-            impact_colors = {'high': '#d62728', 'medium': '#ff7f0e', 'low': '#2ca02c'}
-            impact_color = impact_colors.get(impact_level, '#ff7f0e')
-
-            event_window = timedelta(minutes=30)
-            ax.axvspan(
-                event_time_local - event_window,
-                event_time_local + event_window,
-                alpha=0.2,
-                color=impact_color,
-                label=f'{impact_level.title()} Impact'
-            )
-
-            # Set title
-            event_date_str = event_time.strftime('%Y-%m-%d')
-            ax.set_title(f'{primary_currency}/{secondary_currency} News Event: {event_name}\n{event_date_str}',
-                        fontsize=14, fontweight='bold')
-
-            # Format x-axis
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=self.display_tz))
-            ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=30))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
-
-            # Add price change annotation
-            if len(cross_rate) > 1:
-                start_price = cross_rate.iloc[0]
-                end_price = cross_rate.iloc[-1]
-                price_change = end_price - start_price
-                price_change_pct = (price_change / start_price) * 100
-
-                change_text = f"Change: {price_change:.4f} ({price_change_pct:+.2f}%)"
-                ax.text(0.02, 0.98, change_text, transform=ax.transAxes,
-                       verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
-
-            plt.tight_layout()
-
-            # Save to BytesIO
-            img_buffer = BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            plt.close()
-
-            logger.info(f"Successfully generated cross-rate chart for {primary_currency}/{secondary_currency} event: {event_name}")
-            try:
-                filename = f"{event_time_local.strftime('%Y%m%d_%H%M')}_{primary_currency}_{secondary_currency}_cross_{self._slugify(event_name)}.png"
-                self._save_chart_buffer(img_buffer, filename)
-            except Exception as e:
-                logger.warning(f"Failed to persist cross-rate chart image: {e}")
-            return img_buffer
-
+            filename = f"{event_time_local.strftime('%Y%m%d_%H%M')}_{primary_currency}_{secondary_currency}_cross_{self._slugify(event_name)}.png"
+            self._save_chart_buffer(img_buffer, filename)
         except Exception as e:
-            logger.error(f"Error generating cross-rate chart: {e}")
-            plt.close()  # Ensure plot is closed even on error
-            return None
+            logger.warning(f"Failed to persist cross-rate chart image: {e}")
+        return img_buffer
 
     def _generate_direct_pair_chart(self,
                                    data: pd.DataFrame,
@@ -1240,7 +1376,7 @@ class ChartService:
         """Generate a chart for a direct currency pair."""
         try:
             # Create the chart
-            fig, ax = plt.subplots(figsize=(12, 8))
+            fig, (ax,) = PAIR_CHART_TEMPLATE.new_figure(self.display_tz)
 
             # Work in display timezone for user-friendly axes/labels
             event_time_local = event_time.astimezone(self.display_tz)
@@ -1276,7 +1412,6 @@ class ChartService:
                 self._plot_candlesticks(ax, candlestick_data, f'{primary_currency}/{secondary_currency}')
                 ax.set_ylabel(f'{primary_currency} Price (in {secondary_currency})', fontsize=12)
                 ax.set_xlabel('Time', fontsize=12)
-                ax.grid(True, alpha=0.3)
             except Exception as e:
                 logger.warning(f"Failed to create candlestick chart; synthesizing OHLC: {e}")
                 try:
@@ -1293,7 +1428,6 @@ class ChartService:
                     self._plot_candlesticks(ax, synth, f'{primary_currency}/{secondary_currency}')
                     ax.set_ylabel(f'{primary_currency} Price (in {secondary_currency})', fontsize=12)
                     ax.set_xlabel('Time', fontsize=12)
-                    ax.grid(True, alpha=0.3)
                 except Exception as e2:
                     logger.error(f"Failed to synthesize candlesticks for direct pair: {e2}")
 
@@ -1318,11 +1452,6 @@ class ChartService:
             ax.set_title(f'{primary_currency}/{secondary_currency} News Event: {event_name}\n{event_date_str}',
                         fontsize=14, fontweight='bold')
 
-            # Format x-axis
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=self.display_tz))
-            ax.xaxis.set_major_locator(mdates.MinuteLocator(interval=30))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
-
             # Add price change annotation
             if len(plot_data) > 1:
                 start_price = plot_data['Close'].iloc[0]
@@ -1334,13 +1463,8 @@ class ChartService:
                 ax.text(0.02, 0.98, change_text, transform=ax.transAxes,
                        verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
 
-            plt.tight_layout()
-
-            # Save to BytesIO
-            img_buffer = BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            plt.close()
+            fig.tight_layout()
+            img_buffer = BytesIO(figure_to_png(fig))
 
             logger.info(f"Successfully generated direct pair chart for {primary_currency}/{secondary_currency} event: {event_name}")
             try:
@@ -1352,83 +1476,16 @@ class ChartService:
 
         except Exception as e:
             logger.error(f"Error generating direct pair chart: {e}")
-            plt.close()  # Ensure plot is closed even on error
             return None
 
     def _plot_candlesticks(self, ax, ohlc_data: pd.DataFrame, pair_name: str):
         """Plot candlestick chart on the given axes."""
-        try:
-            # Convert datetime index to matplotlib dates
-            dates = ohlc_data.index
-            opens = ohlc_data['Open'].values
-            highs = ohlc_data['High'].values
-            lows = ohlc_data['Low'].values
-            closes = ohlc_data['Close'].values
-
-            # Calculate colors (green for up, red for down)
-            colors = ['green' if close >= open else 'red'
-                     for open, close in zip(opens, closes)]
-
-            # Plot candlesticks manually
-            for i, (date, open_price, high, low, close, color) in enumerate(
-                zip(dates, opens, highs, lows, closes, colors)
-            ):
-                # Body of the candlestick
-                body_height = abs(close - open_price)
-                body_bottom = min(close, open_price)
-
-                # Width based on time interval
-                if len(dates) > 1:
-                    time_diff = (dates[1] - dates[0]).total_seconds() / 3600  # hours
-                    width = time_diff / 24 * 0.6  # Fraction of a day
-                else:
-                    width = 0.02  # Default width
-
-                # Draw the high-low line
-                ax.plot([date, date], [low, high], color='black', linewidth=1, alpha=0.8)
-
-                # Draw the body rectangle
-                body = Rectangle((date - timedelta(hours=width*12), body_bottom),
-                               timedelta(hours=width*24), body_height,
-                               facecolor=color, alpha=0.7, edgecolor='black', linewidth=0.5)
-                ax.add_patch(body)
-
-            # Set labels and title
-            ax.set_title(f'Candlestick Chart: {pair_name}', fontsize=12, fontweight='bold')
-
-            # Format the price axis
-            ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'{x:.4f}'))
-
-        except Exception as e:
-            logger.error(f"Error plotting candlesticks: {e}")
-            # As a last resort, try synthesizing from Close and replot
-            try:
-                synth = self._synthesize_ohlc_from_close(ohlc_data)
-                self._plot_candlesticks(ax, synth, pair_name)
-            except Exception:
-                # Give up silently to avoid infinite recursion; caller handles logging
-                pass
+        plot_candlesticks(ax, ohlc_data, pair_name)
 
     def _synthesize_ohlc_from_close(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Build a minimal OHLC frame from Close (ensures candlestick rendering).
-
-        - Open: previous close (first equals close)
-        - High/Low: max/min of Open/Close per bar
-        """
+        """Build a minimal OHLC frame from Close (ensures candlestick rendering)."""
         try:
-            if 'Close' not in data.columns:
-                raise ValueError('No Close column available to synthesize OHLC')
-            closes = data['Close']
-            opens = closes.shift(1).fillna(closes)
-            highs = pd.concat([opens, closes], axis=1).max(axis=1)
-            lows = pd.concat([opens, closes], axis=1).min(axis=1)
-            synth = pd.DataFrame({
-                'Open': opens,
-                'High': highs,
-                'Low': lows,
-                'Close': closes
-            }, index=data.index)
-            return synth
+            return synthesize_ohlc_from_close(data)
         except Exception as e:
             logger.error(f"Failed to synthesize OHLC: {e}")
             raise
@@ -1437,19 +1494,49 @@ class ChartService:
         """Clean up old cached data."""
         try:
             # Clean up memory cache
-            cutoff_time = datetime.now() - timedelta(hours=1)
-            old_keys = [
-                key for key, (_, cache_time) in self._price_cache.items()
-                if cache_time < cutoff_time
-            ]
-            for key in old_keys:
-                del self._price_cache[key]
+            removed = self._evict_cached_data()
+
+            logger.info(f"Cleaned up {removed} cached price data entries")
 
-            logger.info(f"Cleaned up {len(old_keys)} cached price data entries")
+            # Drop stored bars beyond the retention window
+            if self.price_store is not None:
+                self.price_store.prune()
 
         except Exception as e:
             logger.error(f"Error cleaning up cache: {e}")
 
+    def _bar_interval_seconds(self, data: Optional[pd.DataFrame]) -> Optional[int]:
+        """Median bar spacing in seconds (the effective interval of the data)."""
+        try:
+            if data is None or len(data.index) < 2:
+                return None
+            return int(pd.Series(data.index).diff().dropna().median().total_seconds())
+        except Exception:
+            return None
+
+    def _render_cached(self, key_parts: tuple, data: Optional[pd.DataFrame], render) -> Optional[BytesIO]:
+        """Serve an identical chart from the rendered-chart cache or render and store it.
+
+        The key covers the chart parameters, the display timezone, the style version and a
+        fingerprint of the plotted data; the returned buffer carries it as ``chart_cache_key``.
+        """
+        try:
+            key = self.rendered_charts.make_key(*key_parts, self.display_timezone_name, _CHART_STYLE_VERSION, data=data)
+        except Exception as e:
+            logger.warning(f"Could not build chart cache key: {e}")
+            return render()
+
+        cached = self.rendered_charts.get(key)
+        if cached is not None:
+            logger.info(f"Rendered chart cache hit for {key_parts[0]} chart {key[:12]}")
+            return cached
+
+        img_buffer = render()
+        if img_buffer is not None:
+            self.rendered_charts.put(key, img_buffer.getvalue())
+            img_buffer.chart_cache_key = key
+        return img_buffer
+
     def _slugify(self, text_val: str) -> str:
         """Make a safe filename component from text."""
         try:
@@ -1490,6 +1577,8 @@ class ChartService:
                 return
             self._last_chart_prune = now
             self.prune_old_charts()
+            if self.price_store is not None:
+                self.price_store.prune()
         except Exception as e:
             logger.warning(f"Chart prune check failed: {e}")
 
@@ -1544,252 +1633,14 @@ class ChartService:
                 logger.warning(f"No price data for {symbol} to render GPT analysis chart")
                 return None
 
-            # Ensure timezone-local index for plotting
-            try:
-                local_index = data.index.tz_convert(self.display_tz) if data.index.tzinfo else data.index.tz_localize(self.display_tz)
-            except Exception:
-                local_index = data.index
-
-            # Compute EMAs on Close (ensure alignment with price)
-            ema20 = data['Close'].ewm(span=20, adjust=False).mean()
-            ema50 = data['Close'].ewm(span=50, adjust=False).mean()
-
-            plt.style.use('default')
-            fig, ax = plt.subplots(figsize=(13, 8))
-
-            # Prepare OHLC for candlesticks
-            try:
-                ohlc = data[['Open', 'High', 'Low', 'Close']].copy()
-                ohlc.index = local_index
-                self._plot_candlesticks(ax, ohlc, pair_name=self._pretty_pair_name(symbol))
-            except Exception as e:
-                logger.warning(f"Candlestick plot failed in GPT chart; synthesizing: {e}")
-                try:
-                    synth = self._synthesize_ohlc_from_close(data)
-                    synth.index = local_index
-                    self._plot_candlesticks(ax, synth, pair_name=self._pretty_pair_name(symbol))
-                except Exception as e2:
-                    logger.error(f"Failed to synthesize candlesticks in GPT chart: {e2}")
-
-            # Overlay EMAs
-            try:
-                ax.plot(local_index, ema20.values, color='#1f77b4', linewidth=1.3, label='EMA20')
-                ax.plot(local_index, ema50.values, color='#ff7f0e', linewidth=1.3, label='EMA50')
-            except Exception:
-                pass
-
-            # Helper: draw horizontal level
-            def hline(y, color, lw=1.0, ls='--', alpha=0.8, label=None):
-                try:
-                    ax.axhline(y=float(y), color=color, linewidth=lw, linestyle=ls, alpha=alpha, label=label)
-                except Exception:
-                    pass
-
-            # Current price
-            try:
-                last_price = float(features.get('last_price')) if features.get('last_price') is not None else float(data['Close'].iloc[-1])
-                hline(last_price, color='#2ca02c', lw=1.2, ls='-', alpha=0.8, label='Last Price')
-            except Exception:
-                pass
-
-            # Prior session open
-            po = features.get('prior_session_open')
-            if po is not None:
-                hline(po, color='#9467bd', lw=1.0, ls=':', alpha=0.9, label='Prev Session Open')
-
-            # Round levels
-            rlevels = features.get('round_levels') or []
-            for lvl in rlevels:
-                hline(lvl, color='#7f7f7f', lw=0.8, ls='--', alpha=0.6)
-
-            # Recent swing high/low
-            if features.get('recent_swing_high') is not None:
-                hline(features.get('recent_swing_high'), color='#d62728', lw=1.0, ls='--', alpha=0.85, label='Recent High')
-            if features.get('recent_swing_low') is not None:
-                hline(features.get('recent_swing_low'), color='#17becf', lw=1.0, ls='--', alpha=0.85, label='Recent Low')
-
-            # Annotate swing high/low with labels and arrows
-            try:
-                swing_hi = features.get('recent_swing_high')
-                swing_hi_t = features.get('recent_swing_high_time')
-                swing_lo = features.get('recent_swing_low')
-                swing_lo_t = features.get('recent_swing_low_time')
-                # Helper to convert ISO time to local tz
-                def _to_local(ts_iso):
-                    import pandas as _pd
-                    try:
-                        ts = _pd.to_datetime(ts_iso, utc=True)
-                        return ts.tz_convert(self.display_tz)
-                    except Exception:
-                        return None
-                if swing_hi is not None and swing_hi_t:
-                    ts_loc = _to_local(swing_hi_t)
-                    if ts_loc is not None:
-                        ax.annotate(f"Swing High: {swing_hi:.4f}",
-                                    xy=(ts_loc, float(swing_hi)),
-                                    xytext=(ts_loc + timedelta(hours=6), float(swing_hi) + (abs(float(swing_hi))*0.0002)),
-                                    arrowprops=dict(arrowstyle="->", color='#d62728', lw=1.0),
-                                    fontsize=9, color='#d62728', bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.6))
-                if swing_lo is not None and swing_lo_t:
-                    ts_loc = _to_local(swing_lo_t)
-                    if ts_loc is not None:
-                        ax.annotate(f"Swing Low: {swing_lo:.4f}",
-                                    xy=(ts_loc, float(swing_lo)),
-                                    xytext=(ts_loc + timedelta(hours=6), float(swing_lo) - (abs(float(swing_lo))*0.0002)),
-                                    arrowprops=dict(arrowstyle="->", color='#17becf', lw=1.0),
-                                    fontsize=9, color='#17becf', bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.6))
-            except Exception:
-                pass
-
-            # Equal highs/lows clusters as bands (liquidity)
-            try:
-                eq_hi = features.get('equal_highs') or []
-                eq_lo = features.get('equal_lows') or []
-                if len(eq_hi) >= 1:
-                    ax.axhspan(min(eq_hi), max(eq_hi), color='#ff9896', alpha=0.15, label='Equal Highs Zone')
-                if len(eq_lo) >= 1:
-                    ax.axhspan(min(eq_lo), max(eq_lo), color='#98df8a', alpha=0.15, label='Equal Lows Zone')
-            except Exception:
-                pass
-
-            # FVG bands (price-only, spanning full x-range)
-            try:
-                fvgs = features.get('fvgs') or []
-                for g in fvgs:
-                    start_p = g.get('start')
-                    end_p = g.get('end')
-                    if start_p is None or end_p is None:
-                        continue
-                    low = min(float(start_p), float(end_p))
-                    high = max(float(start_p), float(end_p))
-                    ax.axhspan(low, high, color='#c5b0d5', alpha=0.18, label='FVG')
-            except Exception:
-                pass
-
-            ax.set_ylabel('Price', fontsize=12)
-            ax.grid(True, alpha=0.3)
-            ax.legend(loc='upper left', ncol=3, fontsize=8)
-
-            # Psychological levels (round numbers) across visible range
-            try:
-                # Determine decimals/step by symbol
-                dec = 2 if ('JPY' in symbol or '/JPY' in self._pretty_pair_name(symbol)) else 4
-                step = 0.5 if dec == 2 else 0.005
-                # Determine min/max from plotted data and overlays
-                y_candidates = [
-                    float(data['Low'].min()), float(data['High'].max()),
-                    *(rlevels or []),
-                ]
-                if po is not None:
-                    y_candidates.append(float(po))
-                if swing_hi is not None:
-                    y_candidates.append(float(swing_hi))
-                if swing_lo is not None:
-                    y_candidates.append(float(swing_lo))
-                for g in (fvgs or []):
-                    if g.get('start') is not None and g.get('end') is not None:
-                        y_candidates.append(float(min(g['start'], g['end'])))
-                        y_candidates.append(float(max(g['start'], g['end'])))
-                y_min = min(y_candidates) if y_candidates else float(data['Low'].min())
-                y_max = max(y_candidates) if y_candidates else float(data['High'].max())
-                # Draw psych levels within range (coarse grid)
-                from math import floor, ceil
-                start_level = floor(y_min / step) * step
-                end_level = ceil(y_max / step) * step
-                lvl = start_level
-                while lvl <= end_level:
-                    ax.axhline(y=float(lvl), color='#cccccc', linewidth=0.6, linestyle=':', alpha=0.6)
-                    lvl = round(lvl + step, dec + 1)
-            except Exception:
-                pass
-
-            # X-axis formatting (will apply after zoom range)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M', tz=self.display_tz))
-            ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
-
-            # Title
             pair_title = self._pretty_pair_name(symbol)
-            fig.suptitle(f'{pair_title} — GPT Analysis (5m, last {window_hours}h)', fontsize=14, fontweight='bold')
-
-            # Scenario annotations based on swings
-            try:
-                x_pos = local_index[int(len(local_index) * 0.8)] if len(local_index) > 0 else None
-                if x_pos is not None:
-                    if features.get('recent_swing_low') is not None:
-                        lo = float(features['recent_swing_low'])
-                        ax.annotate('📉 Break below ' + f"{lo:.4f}" + ' → bearish continuation',
-                                    xy=(x_pos, lo), xytext=(x_pos, lo - (abs(lo) * 0.0015)),
-                                    arrowprops=dict(arrowstyle='->', color='#d62728', lw=1.0),
-                                    fontsize=9, color='#d62728', bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.6))
-                    if features.get('recent_swing_high') is not None:
-                        hi = float(features['recent_swing_high'])
-                        ax.annotate('📈 Break above ' + f"{hi:.4f}" + ' → possible reversal',
-                                    xy=(x_pos, hi), xytext=(x_pos, hi + (abs(hi) * 0.0015)),
-                                    arrowprops=dict(arrowstyle='->', color='#2ca02c', lw=1.0),
-                                    fontsize=9, color='#2ca02c', bbox=dict(boxstyle='round,pad=0.2', fc='white', alpha=0.6))
-            except Exception:
-                pass
-
-            # Fit view to full 48h range (x) and auto-fit Y-axis to full price range
-            try:
-                # Full x-range
-                ax.set_xlim(local_index[0], local_index[-1])
-
-                # Choose a source for highs/lows aligned to local_index
-                price_source = None
-                try:
-                    price_source = ohlc
-                except NameError:
-                    try:
-                        price_source = synth
-                    except NameError:
-                        import pandas as _pd
-                        price_source = _pd.DataFrame({
-                            'High': data['High'].values,
-                            'Low': data['Low'].values,
-                        }, index=local_index)
-
-                p_low = float(price_source['Low'].min())
-                p_high = float(price_source['High'].max())
-
-                # Include overlays in Y fit
-                if po is not None:
-                    p_low = min(p_low, float(po))
-                    p_high = max(p_high, float(po))
-                if features.get('recent_swing_low') is not None:
-                    p_low = min(p_low, float(features['recent_swing_low']))
-                if features.get('recent_swing_high') is not None:
-                    p_high = max(p_high, float(features['recent_swing_high']))
-                for g in (fvgs or []):
-                    if g.get('start') is not None and g.get('end') is not None:
-                        gl = float(min(g['start'], g['end']))
-                        gh = float(max(g['start'], g['end']))
-                        p_low = min(p_low, gl)
-                        p_high = max(p_high, gh)
-                for lvl in (rlevels or []):
-                    try:
-                        p_low = min(p_low, float(lvl))
-                        p_high = max(p_high, float(lvl))
-                    except Exception:
-                        pass
-
-                # Buffer by pair type
-                is_jpy = ('JPY' in symbol) or ('/JPY' in pair_title)
-                base_buffer = 0.1 if is_jpy else 0.0015
-                y_range = max(1e-12, p_high - p_low)
-                y_margin = max(y_range * 0.10, base_buffer)
-                ax.set_ylim(p_low - y_margin, p_high + y_margin)
-            except Exception:
-                pass
-
-            plt.tight_layout(rect=[0, 0.03, 1, 0.97])
+            png = chart_render_pool.render(render_gpt_analysis_chart_png, data, symbol, pair_title,
+                                           dict(features or {}), window_hours, self.display_tz.zone)
+            if not png:
+                logger.error(f"Error generating GPT analysis chart for {symbol}")
+                return None
 
-            # Save to buffer and persist
-            buf = BytesIO()
-            plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-            buf.seek(0)
-            plt.close()
+            buf = BytesIO(png)
             try:
                 filename = f"gpt_{pair_title.replace('/', '')}_{end_time.strftime('%Y%m%d_%H%M')}_w{window_hours}h.png"
                 self._save_chart_buffer(buf, filename)
@@ -1798,7 +1649,6 @@ class ChartService:
             return buf
         except Exception as e:
             logger.error(f"Error generating GPT analysis chart for {symbol}: {e}")
-            plt.close()
             return None
 
     def create_gpt_full_view_chart(self,
@@ -1829,8 +1679,7 @@ class ChartService:
             ema20 = data['Close'].ewm(span=20, adjust=False).mean()
             ema50 = data['Close'].ewm(span=50, adjust=False).mean()
 
-            plt.style.use('default')
-            fig, ax = plt.subplots(figsize=(13, 8))
+            fig, (ax,) = ANALYSIS_CHART_TEMPLATE.new_figure(self.display_tz)
 
             # Candlesticks
             ohlc = None
@@ -1854,7 +1703,6 @@ class ChartService:
                 pass
 
             ax.set_ylabel('Price', fontsize=12)
-            ax.grid(True, alpha=0.3)
             ax.legend(loc='upper left', ncol=2, fontsize=9)
 
             # Full range fit
@@ -1869,19 +1717,11 @@ class ChartService:
             except Exception:
                 pass
 
-            # Axes
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M', tz=self.display_tz))
-            ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
-
             title = f"{self._pretty_pair_name(symbol)} — EMAs (5m, last {window_hours}h)"
             fig.suptitle(title, fontsize=14, fontweight='bold')
 
-            plt.tight_layout(rect=[0, 0.03, 1, 0.97])
-            buf = BytesIO()
-            plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-            buf.seek(0)
-            plt.close()
+            fig.tight_layout(rect=[0, 0.03, 1, 0.97])
+            buf = BytesIO(figure_to_png(fig))
             try:
                 filename = f"gpt_full_{self._pretty_pair_name(symbol).replace('/', '')}_{end_time.strftime('%Y%m%d_%H%M')}_w{window_hours}h.png"
                 self._save_chart_buffer(buf, filename)
@@ -1890,7 +1730,6 @@ class ChartService:
             return buf
         except Exception as e:
             logger.error(f"Error generating full-view chart for {symbol}: {e}")
-            plt.close()
             return None
 
     def create_gpt_zoom_view_chart(self,
@@ -1918,8 +1757,7 @@ class ChartService:
             ema20 = data['Close'].ewm(span=20, adjust=False).mean()
             ema50 = data['Close'].ewm(span=50, adjust=False).mean()
 
-            plt.style.use('default')
-            fig, ax = plt.subplots(figsize=(13, 8))
+            fig, (ax,) = ANALYSIS_CHART_TEMPLATE.new_figure(self.display_tz)
 
             # Candlesticks
             ohlc = None
@@ -2078,18 +1916,11 @@ class ChartService:
 
             # Axes and title
             ax.set_ylabel('Price', fontsize=12)
-            ax.grid(True, alpha=0.3)
             ax.legend(loc='upper left', ncol=3, fontsize=8)
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%m-%d %H:%M', tz=self.display_tz))
-            ax.xaxis.set_major_locator(mdates.HourLocator(interval=2))
-            plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
             fig.suptitle(f"{self._pretty_pair_name(symbol)} — Zoomed View (5m, last {zoom_hours}h)", fontsize=14, fontweight='bold')
 
-            plt.tight_layout(rect=[0, 0.03, 1, 0.97])
-            buf = BytesIO()
-            plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-            buf.seek(0)
-            plt.close()
+            fig.tight_layout(rect=[0, 0.03, 1, 0.97])
+            buf = BytesIO(figure_to_png(fig))
             try:
                 filename = f"gpt_zoom_{self._pretty_pair_name(symbol).replace('/', '')}_{end_time.strftime('%Y%m%d_%H%M')}_z{zoom_hours}h.png"
                 self._save_chart_buffer(buf, filename)
@@ -2098,7 +1929,6 @@ class ChartService:
             return buf
         except Exception as e:
             logger.error(f"Error generating zoom-view chart for {symbol}: {e}")
-            plt.close()
             return None
 
     def _pretty_pair_name(self, symbol: str) -> str:
@@ -2137,7 +1967,8 @@ def get_pair_and_poll(currency: str) -> tuple[str, str, list[str]]:
 def fetch_prices_with_backoff(symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
     """
     Guarantees non-empty OHLCV for [start, end]. Clamps `end` to now.
-    Tries intervals in order: 1m → 5m → 15m → 60m, with 3 retries each.
+    Tries the intervals Yahoo can serve for the window in order (1m → 5m → 15m → 60m),
+    retrying errors up to 3 times each.
     Returns trimmed DataFrame with columns Open, High, Low, Close, Volume.
     """
     if start.tzinfo is None:
@@ -2145,32 +1976,38 @@ def fetch_prices_with_backoff(symbol: str, start: datetime, end: datetime) -> pd
     now = datetime.now(tz=start.tzinfo)
     end = min(end, now)
 
-    intervals = ["1m", "5m", "15m", "60m"]
+    intervals = _feasible_intervals(start, end, ["1m", "5m", "15m", "60m"])
+    if not intervals:
+        raise RuntimeError(f"Window {start}–{end} for {symbol} is older than Yahoo intraday retention")
     last_err = None
 
     for itv in intervals:
         for _ in range(3):
             try:
+                yahoo_rate_limiter.acquire()
                 df = yf.download(symbol, start=start, end=end, interval=itv, progress=False)
-                if df is not None and not df.empty:
-                    df = df.rename(columns=str.title)
-                    for col in ["Open", "High", "Low", "Close", "Volume"]:
-                        if col not in df.columns:
-                            raise ValueError(f"Missing column {col} in downloaded data")
-                    df = df[(df.index >= start) & (df.index <= end)]
-                    if not df.empty:
-                        return df
+                if df is None or df.empty:
+                    # An empty answer is not transient; move on to the next interval
+                    break
+                yahoo_rate_limiter.record_success()
+                df = df.rename(columns=str.title)
+                for col in ["Open", "High", "Low", "Close", "Volume"]:
+                    if col not in df.columns:
+                        raise ValueError(f"Missing column {col} in downloaded data")
+                df = df[(df.index >= start) & (df.index <= end)]
+                if df.empty:
+                    # Bars outside the window only: retrying this interval returns the same
+                    break
+                return df
             except Exception as e:
                 last_err = e
+                if '429' in str(e) or 'Too Many Requests' in str(e) or 'Rate limit' in str(e):
+                    yahoo_rate_limiter.penalize()
                 continue
 
     raise RuntimeError(f"No data for {symbol} in window {start}–{end}: {last_err}")
 
 
-from io import BytesIO
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-
 def render_event_chart(
     ohlc: pd.DataFrame,
     title: str,
@@ -2183,20 +2020,10 @@ def render_event_chart(
     """
     Renders candles; optional thin event line; optional Change badge.
     """
-    fig, ax = plt.subplots(figsize=(12, 8))
-
-    # Expect ohlc index tz-aware; if not, treat as UTC
-    idx = ohlc.index
-    # Minimal candlesticks
-    for t, row in ohlc.iterrows():
-        o, h, l, c = row["Open"], row["High"], row["Low"], row["Close"]
-        color = "green" if c >= o else "red"
-        # wick
-        ax.plot([t, t], [l, h], color="black", linewidth=0.7, alpha=0.8)
-        # body
-        ax.add_patch(Rectangle((mdates.date2num(t) - 0.0015, min(o, c)),
-                               0.003, abs(c - o),
-                               facecolor=color, edgecolor="black", linewidth=0.4, alpha=0.8))
+    fig, (ax,) = POST_EVENT_CHART_TEMPLATE.new_figure()
+
+    # Minimal candlesticks (two collections for all bars)
+    draw_candlesticks(ax, ohlc, wick_width=0.7, body_alpha=0.8, edge_width=0.4)
 
     # Thin or hidden event line
     if event_time and show_event_line != "none":
@@ -2214,16 +2041,9 @@ def render_event_chart(
         )
 
     ax.set_title("Candlestick Chart", fontsize=12, fontweight="bold")
-    plt.suptitle(f"{title}\n{subtitle}", fontsize=14, fontweight="bold")
-    ax.grid(True, alpha=0.3)
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
-    plt.tight_layout()
-
-    buf = BytesIO()
-    plt.savefig(buf, format="png", dpi=150, bbox_inches="tight")
-    buf.seek(0)
-    plt.close(fig)
-    return buf
+    fig.suptitle(f"{title}\n{subtitle}", fontsize=14, fontweight="bold")
+    fig.tight_layout()
+    return BytesIO(figure_to_png(fig))
 
 
 def create_chart_2h_after_event(currency: str, event_time: datetime, event_name: str, display_tz: str = "Europe/Prague") -> BytesIO:
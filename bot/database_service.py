@@ -1,10 +1,15 @@
 from datetime import datetime, date
+import os
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, text
+from sqlalchemy import and_, func, or_, text
 import logging
 
-from .models import DatabaseManager, ForexNews, User
+from .models import DatabaseManager, ForexNews, User, dialect_insert
+from .schema_capabilities import SchemaCapabilities, USER_OPTIONAL_COLUMNS
+from .preference_cache import (
+    PREFERENCES_CHANNEL, PreferenceInvalidationListener, UserPreferenceCache, UserPreferences
+)
 
 logger = logging.getLogger(__name__)
 
@@ -15,22 +20,32 @@ class ForexNewsService:
     def __init__(self, database_url: Optional[str] = None):
         self.db_manager = DatabaseManager(database_url)
         self.db_manager.create_tables()
+        # Which optional columns exist; refresh after migrations that alter tables
+        self.schema = SchemaCapabilities(self.db_manager.engine)
+        self.news_upsert_enabled = self._news_upsert_available()
+
+        # Read-through cache of user settings for keyboards and callbacks
+        self.preference_cache = UserPreferenceCache(
+            int(os.getenv('USER_PREFS_CACHE_SIZE', '1024')),
+            float(os.getenv('USER_PREFS_CACHE_TTL_SEC', '300'))
+        )
+        # Cross-process invalidation when several workers share a PostgreSQL database
+        self.preference_notify = (
+            self.db_manager.engine.dialect.name == 'postgresql'
+            and os.getenv('USER_PREFS_LISTEN', 'false').lower() == 'true'
+        )
+        self.preference_listener = None
+        if self.preference_notify:
+            self.preference_listener = PreferenceInvalidationListener(self.db_manager.engine, self.preference_cache)
+            self.preference_listener.start()
 
     # User management methods
     def get_or_create_user(self, telegram_id: int) -> User:
         """Get existing user or create a new one."""
         try:
             with self.db_manager.get_session() as session:
-                # Check if all required columns exist (notification + chart + timezone)
-                result = session.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN (
-                        'notifications_enabled', 'notification_minutes', 'notification_impact_levels',
-                        'charts_enabled', 'chart_type', 'chart_window_hours', 'timezone'
-                    )
-                """))
-                all_columns = [row[0] for row in result]
+                # Optional user columns present in this database (cached schema view)
+                all_columns = self.schema.present('users', USER_OPTIONAL_COLUMNS)
 
                 # Check if we have all required columns
                 required_columns = [
@@ -45,6 +60,8 @@ class ForexNewsService:
                         user = User(telegram_id=telegram_id)
                         session.add(user)
                         session.commit()
+                        # Reload so the instance stays usable once the session closes
+                        session.refresh(user)
                         logger.info(f"Created new user with telegram_id: {telegram_id}")
                     return user
                 else:
@@ -125,20 +142,29 @@ class ForexNewsService:
             logger.error(f"Error getting/creating user {telegram_id}: {e}")
             raise
 
+    def get_cached_preferences(self, telegram_id: int) -> UserPreferences:
+        """Get a user's settings snapshot, loading (and creating the user) on a cache miss."""
+        preferences = self.preference_cache.get(telegram_id)
+        if preferences is not None:
+            return preferences
+
+        generation = self.preference_cache.begin_load()
+        preferences = UserPreferences.from_user(self.get_or_create_user(telegram_id))
+        self.preference_cache.put(preferences, generation)
+        return preferences
+
+    def _preferences_changed(self, session: Session, telegram_id: int):
+        """Queue a NOTIFY for other workers; delivered when the session commits."""
+        if self.preference_notify:
+            session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                            {'channel': PREFERENCES_CHANNEL, 'payload': str(telegram_id)})
+
     def update_user_preferences(self, telegram_id: int, **kwargs) -> bool:
         """Update user preferences."""
         try:
             with self.db_manager.get_session() as session:
-                # Check if all required columns exist (notification + chart + timezone)
-                result = session.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN (
-                        'notifications_enabled', 'notification_minutes', 'notification_impact_levels',
-                        'charts_enabled', 'chart_type', 'chart_window_hours', 'timezone'
-                    )
-                """))
-                all_columns = [row[0] for row in result]
+                # Optional user columns present in this database (cached schema view)
+                all_columns = self.schema.present('users', USER_OPTIONAL_COLUMNS)
 
                 # Check if we have all required columns
                 required_columns = [
@@ -161,7 +187,9 @@ class ForexNewsService:
                                 # Skip updating these fields if they don't exist in the database
                                 continue
 
+                    self._preferences_changed(session, telegram_id)
                     session.commit()
+                    self.preference_cache.invalidate(telegram_id)
                     logger.info(f"Updated preferences for user {telegram_id}")
                     return True
                 else:
@@ -210,7 +238,9 @@ class ForexNewsService:
                         """
 
                         session.execute(text(update_sql), update_values)
+                        self._preferences_changed(session, telegram_id)
                         session.commit()
+                        self.preference_cache.invalidate(telegram_id)
                         logger.info(f"Updated preferences for user {telegram_id}")
                         return True
                     else:
@@ -225,16 +255,8 @@ class ForexNewsService:
         """Get user by telegram ID."""
         try:
             with self.db_manager.get_session() as session:
-                # Check if all required columns exist (notification + chart + timezone)
-                result = session.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN (
-                        'notifications_enabled', 'notification_minutes', 'notification_impact_levels',
-                        'charts_enabled', 'chart_type', 'chart_window_hours', 'timezone'
-                    )
-                """))
-                all_columns = [row[0] for row in result]
+                # Optional user columns present in this database (cached schema view)
+                all_columns = self.schema.present('users', USER_OPTIONAL_COLUMNS)
 
                 # Check if we have all required columns
                 required_columns = [
@@ -302,16 +324,8 @@ class ForexNewsService:
         """Get user preferences by telegram ID."""
         try:
             with self.db_manager.get_session() as session:
-                # Check if all required columns exist (notification + chart + timezone)
-                result = session.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN (
-                        'notifications_enabled', 'notification_minutes', 'notification_impact_levels',
-                        'charts_enabled', 'chart_type', 'chart_window_hours', 'timezone'
-                    )
-                """))
-                all_columns = [row[0] for row in result]
+                # Optional user columns present in this database (cached schema view)
+                all_columns = self.schema.present('users', USER_OPTIONAL_COLUMNS)
 
                 # Check if we have all required columns
                 required_columns = [
@@ -388,16 +402,8 @@ class ForexNewsService:
         """Get all users."""
         try:
             with self.db_manager.get_session() as session:
-                # Check if all required columns exist (notification + chart + timezone)
-                result = session.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN (
-                        'notifications_enabled', 'notification_minutes', 'notification_impact_levels',
-                        'charts_enabled', 'chart_type', 'chart_window_hours', 'timezone'
-                    )
-                """))
-                all_columns = [row[0] for row in result]
+                # Optional user columns present in this database (cached schema view)
+                all_columns = self.schema.present('users', USER_OPTIONAL_COLUMNS)
 
                 # Check if we have all required columns
                 required_columns = [
@@ -461,16 +467,8 @@ class ForexNewsService:
         """Get all users who have notifications enabled."""
         try:
             with self.db_manager.get_session() as session:
-                # Check if all required columns exist (notification + chart + timezone)
-                result = session.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN (
-                        'notifications_enabled', 'notification_minutes', 'notification_impact_levels',
-                        'charts_enabled', 'chart_type', 'chart_window_hours', 'timezone'
-                    )
-                """))
-                all_columns = [row[0] for row in result]
+                # Optional user columns present in this database (cached schema view)
+                all_columns = self.schema.present('users', USER_OPTIONAL_COLUMNS)
 
                 if 'notifications_enabled' not in all_columns:
                     # Notification columns don't exist, return empty list
@@ -607,8 +605,27 @@ class ForexNewsService:
             logger.error(f"Error checking news existence for date {target_date}: {e}")
             return False
 
+    # Columns a re-import may change for an existing event (times get rescheduled, titles edited)
+    _NEWS_VALUE_COLUMNS = ('time', 'currency', 'event', 'actual', 'forecast', 'previous', 'impact_level', 'analysis')
+
+    def _news_upsert_available(self) -> bool:
+        """True when forex_news has the event key from migrations/add_news_event_key.py (read-only check)."""
+        if dialect_insert(self.db_manager.engine) is None:
+            return False
+        if self.schema.has_index('forex_news', 'uq_forex_news_event_id'):
+            return True
+        if self.schema.has_index('forex_news', 'uq_forex_news_event'):
+            # Index from an earlier release: too narrow for holidays sharing currency, time and title
+            logger.warning("forex_news still has the legacy uq_forex_news_event index; "
+                           "run migrations/add_news_event_key.py")
+        return False
+
     def store_news_items(self, news_items: List[Dict[str, Any]], target_date: date, impact_level: str = "high") -> bool:
         """Store news items in the database."""
+        # Upserts need every item's event id; scrapes without them take the delete + insert path
+        if self.news_upsert_enabled and all(item.get("event_id") for item in news_items):
+            return self._upsert_news_items(news_items, target_date, impact_level)
+        store_event_id = self.schema.has_column('forex_news', 'event_id')
         try:
             with self.db_manager.get_session() as session:
                 # Delete existing news for this date. If impact_level == 'all', remove all rows for the date
@@ -626,20 +643,25 @@ class ForexNewsService:
                     delete_query = delete_query.filter(ForexNews.impact_level == impact_level)
                 delete_query.delete(synchronize_session=False)
 
-                # Insert new news items
+                # Insert new news items; event_id is left out until the table has been migrated
+                records = []
                 for item in news_items:
-                    news_record = ForexNews(
-                        date=target_date,
-                        time=item.get("time", "N/A"),
-                        currency=item.get("currency", "N/A"),
-                        event=item.get("event", "N/A"),
-                        actual=item.get("actual", "N/A"),
-                        forecast=item.get("forecast", "N/A"),
-                        previous=item.get("previous", "N/A"),
-                        impact_level=item.get("impact", impact_level),  # Use per-item impact if present
-                        analysis=item.get("analysis", None)
-                    )
-                    session.add(news_record)
+                    record = {
+                        'date': target_date,
+                        'time': item.get("time", "N/A"),
+                        'currency': item.get("currency", "N/A"),
+                        'event': item.get("event", "N/A"),
+                        'actual': item.get("actual", "N/A"),
+                        'forecast': item.get("forecast", "N/A"),
+                        'previous': item.get("previous", "N/A"),
+                        'impact_level': item.get("impact", impact_level),  # Use per-item impact if present
+                        'analysis': item.get("analysis", None),
+                    }
+                    if store_event_id:
+                        record['event_id'] = item.get("event_id")
+                    records.append(record)
+                if records:
+                    session.execute(ForexNews.__table__.insert(), records)
 
                 session.commit()
                 logger.info(f"Stored {len(news_items)} news items for {target_date} with impact level {impact_level}")
@@ -649,6 +671,68 @@ class ForexNewsService:
             logger.error(f"Error storing news for date {target_date}: {e}")
             return False
 
+    def _upsert_news_items(self, news_items: List[Dict[str, Any]], target_date: date, impact_level: str) -> bool:
+        """Upsert news by (date, ForexFactory event id) and drop events no longer listed.
+
+        One batched INSERT ... ON CONFLICT DO UPDATE writes new events and touches
+        existing rows only when a value changed, so created_at survives re-imports.
+        """
+        try:
+            day = datetime.combine(target_date, datetime.min.time())
+            now = datetime.utcnow()
+
+            # One row per event id; later duplicates in the scrape win
+            rows = {}
+            for item in news_items:
+                row = {
+                    'date': day,
+                    'time': item.get("time", "N/A"),
+                    'currency': item.get("currency", "N/A"),
+                    'event': item.get("event", "N/A"),
+                    'actual': item.get("actual", "N/A"),
+                    'forecast': item.get("forecast", "N/A"),
+                    'previous': item.get("previous", "N/A"),
+                    'impact_level': item.get("impact", impact_level),  # Use per-item impact if present
+                    'analysis': item.get("analysis", None),
+                    'event_id': str(item["event_id"]),
+                    'created_at': now,
+                    'updated_at': now,
+                }
+                rows[row['event_id']] = row
+
+            table = ForexNews.__table__
+            with self.db_manager.get_session() as session:
+                if rows:
+                    stmt = dialect_insert(self.db_manager.engine)(table)
+                    excluded = stmt.excluded
+                    updates = {col: excluded[col] for col in self._NEWS_VALUE_COLUMNS}
+                    # A re-import without analysis keeps the stored one
+                    updates['analysis'] = func.coalesce(excluded.analysis, table.c.analysis)
+                    updates['updated_at'] = excluded.updated_at
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[table.c.date, table.c.event_id],
+                        set_=updates,
+                        where=or_(*[table.c[col].is_distinct_from(updates[col]) for col in self._NEWS_VALUE_COLUMNS])
+                    )
+                    session.execute(stmt, list(rows.values()))
+
+                # Events that disappeared from the calendar (same scope the old delete used)
+                existing = session.query(ForexNews.id, ForexNews.event_id).filter(ForexNews.date == day)
+                if impact_level != "all":
+                    existing = existing.filter(ForexNews.impact_level == impact_level)
+                stale_ids = [r.id for r in existing if r.event_id not in rows]
+                if stale_ids:
+                    session.query(ForexNews).filter(ForexNews.id.in_(stale_ids)).delete(synchronize_session=False)
+
+                session.commit()
+                logger.info(f"Upserted {len(rows)} news items for {target_date} with impact level {impact_level} "
+                            f"(removed {len(stale_ids)} stale)")
+                return True
+
+        except Exception as e:
+            logger.error(f"Error storing news for date {target_date}: {e}")
+            return False
+
     def get_date_range_stats(self, start_date: date, end_date: date) -> Dict[str, Any]:
         """Get statistics for a date range."""
         try:
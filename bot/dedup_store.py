@@ -0,0 +1,213 @@
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from .models import NotificationDedup, dialect_insert
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryDedupBackend:
+    """Process-local dedup markers with expiry grouped into time buckets.
+
+    Each marker sits in the bucket of its expiry time; expiring pops whole buckets
+    off a heap, so cleanup costs O(1) per marker instead of periodic full scans.
+    """
+
+    name = 'memory'
+
+    def __init__(self, bucket_seconds: int = 300):
+        self.bucket_seconds = bucket_seconds
+        self._lock = threading.Lock()
+        # (namespace, key) -> (stored_at, expires_at) as epoch seconds
+        self._entries: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._buckets: Dict[int, Set[Tuple[str, str]]] = {}
+        self._bucket_heap: List[int] = []
+        self._counts: Dict[str, int] = {}
+        self.last_purge = datetime.now()
+
+    def _bucket_of(self, ts: float) -> int:
+        return int(ts // self.bucket_seconds)
+
+    def _expire(self, now: float):
+        current = self._bucket_of(now)
+        if self._bucket_heap and self._bucket_heap[0] < current:
+            self.last_purge = datetime.now()
+        while self._bucket_heap and self._bucket_heap[0] < current:
+            bucket = heapq.heappop(self._bucket_heap)
+            for entry_key in self._buckets.pop(bucket, ()):
+                entry = self._entries.get(entry_key)
+                # Markers refreshed since then live in a later bucket
+                if entry is not None and self._bucket_of(entry[1]) == bucket:
+                    del self._entries[entry_key]
+                    self._counts[entry_key[0]] -= 1
+
+    def _store(self, entry_key: Tuple[str, str], now: float, ttl_sec: float):
+        if entry_key not in self._entries:
+            self._counts[entry_key[0]] = self._counts.get(entry_key[0], 0) + 1
+        expires_at = now + ttl_sec
+        self._entries[entry_key] = (now, expires_at)
+        bucket = self._bucket_of(expires_at)
+        if bucket not in self._buckets:
+            self._buckets[bucket] = set()
+            heapq.heappush(self._bucket_heap, bucket)
+        self._buckets[bucket].add(entry_key)
+
+    def add_if_absent(self, namespace: str, key: str, ttl_sec: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[1] > now:
+                return False
+            self._store((namespace, key), now, ttl_sec)
+            return True
+
+    def seconds_since(self, namespace: str, key: str) -> Optional[float]:
+        """Seconds since the live marker was stored, or None."""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._entries.get((namespace, key))
+            if entry is None or entry[1] <= now:
+                return None
+            return now - entry[0]
+
+    def touch(self, namespace: str, key: str, ttl_sec: float):
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self._store((namespace, key), now, ttl_sec)
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            self._expire(time.time())
+            return self._counts.get(namespace, 0)
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            before = len(self._entries)
+            self._expire(time.time())
+            return before - len(self._entries)
+
+
+class SQLDedupBackend:
+    """Dedup markers in the ``notification_dedup`` table, shared across gunicorn workers.
+
+    ``add_if_absent`` is a single upsert that only takes over expired rows, so two
+    workers racing for the same notification cannot both win. Works on PostgreSQL
+    and SQLite; other dialects fall back to insert-then-conditional-update.
+    """
+
+    name = 'database'
+
+    def __init__(self, engine: Engine, purge_interval_sec: float = 3600):
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self.purge_interval_sec = purge_interval_sec
+        self._last_purge = time.monotonic()
+        self.last_purge = datetime.now()
+        self._insert = dialect_insert(engine)
+        NotificationDedup.__table__.create(bind=engine, checkfirst=True)
+
+    def _maybe_purge(self):
+        if time.monotonic() - self._last_purge >= self.purge_interval_sec:
+            self._last_purge = time.monotonic()
+            self.purge_expired()
+
+    def add_if_absent(self, namespace: str, key: str, ttl_sec: float) -> bool:
+        self._maybe_purge()
+        now = datetime.utcnow()
+        values = {'namespace': namespace, 'key': key, 'created_at': now,
+                  'expires_at': now + timedelta(seconds=ttl_sec)}
+        table = NotificationDedup.__table__
+        with self.Session() as session:
+            if self._insert is not None:
+                stmt = self._insert(table).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.namespace, table.c.key],
+                    set_={'created_at': stmt.excluded.created_at, 'expires_at': stmt.excluded.expires_at},
+                    where=table.c.expires_at <= now
+                )
+                inserted = session.execute(stmt).rowcount == 1
+                session.commit()
+                return inserted
+
+            try:
+                session.execute(table.insert().values(**values))
+                session.commit()
+                return True
+            except IntegrityError:
+                session.rollback()
+                result = session.execute(
+                    table.update()
+                    .where(and_(table.c.namespace == namespace, table.c.key == key, table.c.expires_at <= now))
+                    .values(created_at=values['created_at'], expires_at=values['expires_at'])
+                )
+                session.commit()
+                return result.rowcount == 1
+
+    def seconds_since(self, namespace: str, key: str) -> Optional[float]:
+        """Seconds since the live marker was stored, or None."""
+        now = datetime.utcnow()
+        with self.Session() as session:
+            row = session.query(NotificationDedup.created_at).filter(
+                NotificationDedup.namespace == namespace,
+                NotificationDedup.key == key,
+                NotificationDedup.expires_at > now
+            ).first()
+        if row is None:
+            return None
+        return (now - row[0]).total_seconds()
+
+    def touch(self, namespace: str, key: str, ttl_sec: float):
+        now = datetime.utcnow()
+        values = {'namespace': namespace, 'key': key, 'created_at': now,
+                  'expires_at': now + timedelta(seconds=ttl_sec)}
+        table = NotificationDedup.__table__
+        with self.Session() as session:
+            if self._insert is not None:
+                stmt = self._insert(table).values(**values)
+                session.execute(stmt.on_conflict_do_update(
+                    index_elements=[table.c.namespace, table.c.key],
+                    set_={'created_at': stmt.excluded.created_at, 'expires_at': stmt.excluded.expires_at}
+                ))
+            else:
+                updated = session.execute(
+                    table.update()
+                    .where(and_(table.c.namespace == namespace, table.c.key == key))
+                    .values(created_at=values['created_at'], expires_at=values['expires_at'])
+                ).rowcount
+                if not updated:
+                    session.execute(table.insert().values(**values))
+            session.commit()
+
+    def count(self, namespace: str) -> int:
+        with self.Session() as session:
+            return session.query(func.count()).select_from(NotificationDedup).filter(
+                NotificationDedup.namespace == namespace,
+                NotificationDedup.expires_at > datetime.utcnow()
+            ).scalar() or 0
+
+    def purge_expired(self) -> int:
+        try:
+            with self.Session() as session:
+                deleted = session.query(NotificationDedup).filter(
+                    NotificationDedup.expires_at <= datetime.utcnow()
+                ).delete(synchronize_session=False)
+                session.commit()
+            self.last_purge = datetime.now()
+            if deleted:
+                logger.info(f"Purged {deleted} expired notification dedup markers")
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to purge notification dedup markers: {e}")
+            return 0
@@ -1,14 +1,17 @@
 import logging
 import os
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Callable, Dict, Any, Optional, List, Tuple
 
 import numpy as np
 import pandas as pd
 import pytz
-import requests
 
+from .analysis_cache import AnalysisCache, hash_text
 from .chart_service import chart_service
+from .indicator_state import EMA_PERIODS, IndicatorStateStore
+from .openai_client import openai_client
 from .utils import escape_markdown_v2
 
 logger = logging.getLogger(__name__)
@@ -16,6 +19,13 @@ logger = logging.getLogger(__name__)
 # Simple in-memory rate limiter for GPT calls
 _LAST_GPT_CALLS: Dict[str, float] = {}
 
+# Features and GPT text shared by every user asking for the same symbol within one bar
+ANALYSIS_CACHE_BAR_SEC = int(os.getenv("ANALYSIS_CACHE_BAR_SEC", "300"))
+_cache_ttl_sec = float(os.getenv("ANALYSIS_CACHE_TTL_SEC", "300"))
+_cache_max_entries = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "256"))
+feature_cache = AnalysisCache('features', max_entries=_cache_max_entries, ttl_sec=_cache_ttl_sec)
+gpt_response_cache = AnalysisCache('gpt_responses', max_entries=_cache_max_entries, ttl_sec=_cache_ttl_sec)
+
 
 def _get_symbol_from_currencies(base_currency: str, quote_currency: str) -> str:
     base = (base_currency or '').upper()
@@ -54,38 +64,43 @@ def _atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) ->
 
 
 def _find_swings(data: pd.DataFrame, lookback: int = 3) -> Tuple[List[Tuple[pd.Timestamp, float]], List[Tuple[pd.Timestamp, float]]]:
-    highs: List[Tuple[pd.Timestamp, float]] = []
-    lows: List[Tuple[pd.Timestamp, float]] = []
-    for i in range(lookback, len(data) - lookback):
-        window = data.iloc[i - lookback:i + lookback + 1]
-        if data['High'].iloc[i] == window['High'].max():
-            highs.append((data.index[i], float(data['High'].iloc[i])))
-        if data['Low'].iloc[i] == window['Low'].min():
-            lows.append((data.index[i], float(data['Low'].iloc[i])))
+    """Bars whose high/low is the extreme of the centered ``2 * lookback + 1`` window."""
+    window = 2 * lookback + 1
+    if len(data) < window:
+        return [], []
+    high = data['High']
+    low = data['Low']
+    # Centered rolling extremes; edge bars without a full window never qualify
+    inner = np.zeros(len(data), dtype=bool)
+    inner[lookback:len(data) - lookback] = True
+    is_high = inner & (high.to_numpy() == high.rolling(window, center=True, min_periods=1).max().to_numpy())
+    is_low = inner & (low.to_numpy() == low.rolling(window, center=True, min_periods=1).min().to_numpy())
+    highs = list(zip(data.index[is_high], high.to_numpy()[is_high].tolist()))
+    lows = list(zip(data.index[is_low], low.to_numpy()[is_low].tolist()))
     return highs, lows
 
 
 def _detect_bos(data: pd.DataFrame, swings_hi: List[Tuple[pd.Timestamp, float]], swings_lo: List[Tuple[pd.Timestamp, float]]) -> Dict[str, Any]:
-    bos: Optional[Dict[str, Any]] = None
-    last_break: Optional[str] = None
-    last_break_time: Optional[pd.Timestamp] = None
-
+    """Last bar breaking above all earlier swing highs or below all earlier swing lows."""
     hi_levels = [v for _, v in swings_hi]
     lo_levels = [v for _, v in swings_lo]
-
-    for t, row in data.iterrows():
-        high = row.get('High')
-        low = row.get('Low')
-        if len(hi_levels) > 0 and high is not None and high > max(hi_levels[:-1] or [hi_levels[-1]]):
-            last_break = 'BOS_UP'
-            last_break_time = t
-        if len(lo_levels) > 0 and low is not None and low < min(lo_levels[:-1] or [lo_levels[-1]]):
-            last_break = 'BOS_DOWN'
-            last_break_time = t
-
-    if last_break and last_break_time:
-        bos = {"type": last_break, "time": last_break_time.isoformat()}
-    return bos or {"type": None, "time": None}
+    last_up = last_down = -1
+    if hi_levels and 'High' in data:
+        # The most recent swing is excluded unless it is the only one
+        threshold = max(hi_levels[:-1] or [hi_levels[-1]])
+        breaks = np.flatnonzero(data['High'].to_numpy() > threshold)
+        last_up = int(breaks[-1]) if len(breaks) else -1
+    if lo_levels and 'Low' in data:
+        threshold = min(lo_levels[:-1] or [lo_levels[-1]])
+        breaks = np.flatnonzero(data['Low'].to_numpy() < threshold)
+        last_down = int(breaks[-1]) if len(breaks) else -1
+
+    if last_up < 0 and last_down < 0:
+        return {"type": None, "time": None}
+    # A bar breaking both ways counts as a break down
+    if last_down >= last_up:
+        return {"type": "BOS_DOWN", "time": data.index[last_down].isoformat()}
+    return {"type": "BOS_UP", "time": data.index[last_up].isoformat()}
 
 
 def _find_last_order_block(data: pd.DataFrame, bos: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -118,46 +133,47 @@ def _find_last_order_block(data: pd.DataFrame, bos: Dict[str, Any]) -> Optional[
 
 
 def _find_fvgs(data: pd.DataFrame, limit: int = 3) -> List[Dict[str, Any]]:
+    """The last ``limit`` three-candle fair value gaps, oldest first."""
+    if len(data) < 3:
+        return []
+    high = data['High'].to_numpy()
+    low = data['Low'].to_numpy()
+    # Upside FVG: low of c2 > high of c0; downside FVG: high of c2 < low of c0
+    up = np.flatnonzero(low[2:] > high[:-2])
+    down = np.flatnonzero(high[2:] < low[:-2])
+    # Only the newest ``limit`` of each side can make the cut; at equal bars the up gap comes first
+    keep = limit if limit > 0 else len(data)
+    candidates = sorted([(int(i), 0) for i in up[-keep:]] + [(int(i), 1) for i in down[-keep:]])
     gaps: List[Dict[str, Any]] = []
-    for i in range(len(data) - 2):
-        c0 = data.iloc[i]
-        c2 = data.iloc[i + 2]
-        # Upside FVG: low of c2 > high of c0
-        if c2['Low'] > c0['High']:
-            gaps.append({
-                "dir": "up",
-                "start": float(c0['High']),
-                "end": float(c2['Low']),
-                "time0": data.index[i].isoformat(),
-                "time2": data.index[i + 2].isoformat()
-            })
-        # Downside FVG: high of c2 < low of c0
-        if c2['High'] < c0['Low']:
-            gaps.append({
-                "dir": "down",
-                "start": float(c2['High']),
-                "end": float(c0['Low']),
-                "time0": data.index[i].isoformat(),
-                "time2": data.index[i + 2].isoformat()
-            })
-    gaps = gaps[-limit:]
+    for i, direction in candidates[-keep:]:
+        if direction == 0:
+            start, end = float(high[i]), float(low[i + 2])
+        else:
+            start, end = float(high[i + 2]), float(low[i])
+        gaps.append({
+            "dir": "up" if direction == 0 else "down",
+            "start": start,
+            "end": end,
+            "time0": data.index[i].isoformat(),
+            "time2": data.index[i + 2].isoformat()
+        })
     return gaps
 
 
 def _find_equal_highs_lows(data: pd.DataFrame, decimals: int) -> Dict[str, List[float]]:
+    """Highs/lows within one pip of the previous 5-bar extreme."""
     tol = 10 ** (-decimals)
-    highs = []
-    lows = []
-    rolling_max = data['High'].rolling(5).max()
-    rolling_min = data['Low'].rolling(5).min()
-    for i in range(5, len(data)):
-        h = data['High'].iloc[i]
-        if abs(h - rolling_max.iloc[i - 1]) <= tol:
-            highs.append(float(round(h, decimals)))
-        l = data['Low'].iloc[i]
-        if abs(l - rolling_min.iloc[i - 1]) <= tol:
-            lows.append(float(round(l, decimals)))
-    return {"equal_highs": sorted(list(set(highs)))[-3:], "equal_lows": sorted(list(set(lows)))[-3:]}
+    high = data['High']
+    low = data['Low']
+    # Comparing against the previous bar's 5-bar extreme; the first full window ends at bar 4
+    prev_max = high.rolling(5).max().shift(1).to_numpy()
+    prev_min = low.rolling(5).min().shift(1).to_numpy()
+    high_values = high.to_numpy()
+    low_values = low.to_numpy()
+    highs = np.round(high_values[np.abs(high_values - prev_max) <= tol], decimals)
+    lows = np.round(low_values[np.abs(low_values - prev_min) <= tol], decimals)
+    return {"equal_highs": [float(v) for v in np.unique(highs)[-3:]],
+            "equal_lows": [float(v) for v in np.unique(lows)[-3:]]}
 
 
 def _round_levels_near(price: float, decimals: int) -> List[float]:
@@ -169,25 +185,49 @@ def _round_levels_near(price: float, decimals: int) -> List[float]:
 def _daily_ranges_from_intraday(df_1h: pd.DataFrame) -> pd.DataFrame:
     daily = df_1h.resample('1D').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'})
     daily.dropna(inplace=True)
+    # A frame starting mid-day has only part of its first day
+    first = df_1h.index[0]
+    if len(daily) and first != first.normalize() and daily.index[0] == first.normalize():
+        daily = daily.iloc[1:]
     return daily
 
 
+# Per-symbol EMA/ATR/daily range state, advanced by the bars each call adds
+indicator_states = IndicatorStateStore(chart_service.price_store)
+
+
+def _full_indicator_snapshot(df_1h: pd.DataFrame) -> Dict[str, Any]:
+    """Indicator values recomputed over the whole frame, shaped like an IndicatorStateStore snapshot."""
+    def _last(series: pd.Series, offset: int = 1) -> Optional[float]:
+        if len(series) < offset or np.isnan(series.iloc[-offset]):
+            return None
+        return float(series.iloc[-offset])
+
+    emas = {period: _ema(df_1h['Close'], period) for period in EMA_PERIODS}
+    atr14 = _atr(df_1h['High'], df_1h['Low'], df_1h['Close'], 14)
+    daily = _daily_ranges_from_intraday(df_1h)
+    return {
+        'ema': {period: _last(series) for period, series in emas.items()},
+        'ema_prev': {period: _last(series, 2) for period, series in emas.items()},
+        'atr': _last(atr14),
+        'daily_ranges': [(ts.strftime('%Y-%m-%d'), float(row.High), float(row.Low)) for ts, row in daily.iterrows()],
+        'swing_high': None,
+        'swing_low': None,
+    }
+
+
 def compute_local_features(symbol: str, tz: str = 'Europe/Prague') -> Optional[Dict[str, Any]]:
     try:
         display_tz = pytz.timezone(tz)
         end_time = datetime.now(display_tz)
         start_time_1h = end_time - timedelta(days=2)
-        start_time_5m = end_time - timedelta(days=2)
 
         data_1h = chart_service.fetch_price_data(symbol, start_time_1h, end_time)
-        data_5m = chart_service.fetch_price_data(symbol, start_time_5m, end_time)
         if data_1h is None or data_1h.empty:
             return None
-        if data_5m is None or data_5m.empty:
-            data_5m = data_1h.copy()
 
         decimals = _infer_price_decimals(symbol)
-        last_price = float(round(data_5m['Close'].iloc[-1], decimals))
+        last_price = float(round(data_1h['Close'].iloc[-1], decimals))
 
         prior_session_open = None
         try:
@@ -210,34 +250,47 @@ def compute_local_features(symbol: str, tz: str = 'Europe/Prague') -> Optional[D
         fvgs = _find_fvgs(data_1h, limit=3)
         lz = _find_equal_highs_lows(data_1h, decimals)
 
-        ema20 = _ema(data_1h['Close'], 20)
-        ema50 = _ema(data_1h['Close'], 50)
-        ema20_dist = float(round(last_price - float(ema20.iloc[-1]), decimals)) if not np.isnan(ema20.iloc[-1]) else None
-        ema50_dist = float(round(last_price - float(ema50.iloc[-1]), decimals)) if not np.isnan(ema50.iloc[-1]) else None
-        ema20_slope = None
-        ema50_slope = None
+        indicators = None
         try:
-            if len(ema20) >= 2 and not (np.isnan(ema20.iloc[-1]) or np.isnan(ema20.iloc[-2])):
-                ema20_slope = float(round(float(ema20.iloc[-1] - ema20.iloc[-2]), decimals))
-            if len(ema50) >= 2 and not (np.isnan(ema50.iloc[-1]) or np.isnan(ema50.iloc[-2])):
-                ema50_slope = float(round(float(ema50.iloc[-1] - ema50.iloc[-2]), decimals))
-        except Exception:
-            pass
+            indicators = indicator_states.update(symbol, data_1h)
+        except Exception as e:
+            logger.warning(f"Incremental indicators failed for {symbol}, recomputing: {e}")
+        if indicators is None:
+            indicators = _full_indicator_snapshot(data_1h)
+
+        def _dist(period):
+            value = indicators['ema'].get(period)
+            return float(round(last_price - value, decimals)) if value is not None else None
 
-        atr14 = _atr(data_1h['High'], data_1h['Low'], data_1h['Close'], 14)
-        atr_val = float(round(atr14.iloc[-1], decimals)) if not np.isnan(atr14.iloc[-1]) else None
+        def _slope(period):
+            value, previous = indicators['ema'].get(period), indicators['ema_prev'].get(period)
+            return float(round(value - previous, decimals)) if value is not None and previous is not None else None
 
-        daily = _daily_ranges_from_intraday(data_1h)
+        ema20_dist, ema50_dist = _dist(20), _dist(50)
+        ema20_slope, ema50_slope = _slope(20), _slope(50)
+        atr_val = float(round(indicators['atr'], decimals)) if indicators['atr'] is not None else None
+
+        # Per-day ranges accumulate in the indicator state, so ADR covers more than the fetched window
+        daily = indicators['daily_ranges']
         if len(daily) >= 5:
-            daily['range'] = daily['High'] - daily['Low']
-            adr = float(round(daily['range'].tail(5).mean(), decimals))
-            prev_day_high = float(round(daily['High'].iloc[-2], decimals)) if len(daily) >= 2 else None
-            prev_day_low = float(round(daily['Low'].iloc[-2], decimals)) if len(daily) >= 2 else None
+            adr = float(round(float(np.mean([high - low for _, high, low in daily[-5:]])), decimals))
+            prev_day_high = float(round(daily[-2][1], decimals))
+            prev_day_low = float(round(daily[-2][2], decimals))
         else:
             adr = None
             prev_day_high = None
             prev_day_low = None
 
+        def _recent_swing(swings, state_swing):
+            if swings:
+                return swings[-1][1], swings[-1][0].isoformat()
+            if state_swing:
+                return state_swing[1], pd.Timestamp(state_swing[0], unit='s', tz='UTC').isoformat()
+            return None, None
+
+        swing_high, swing_high_time = _recent_swing(swings_hi, indicators.get('swing_high'))
+        swing_low, swing_low_time = _recent_swing(swings_lo, indicators.get('swing_low'))
+
         round_levels = _round_levels_near(last_price, decimals)
 
         features: Dict[str, Any] = {
@@ -249,10 +302,10 @@ def compute_local_features(symbol: str, tz: str = 'Europe/Prague') -> Optional[D
             "prior_session_open": prior_session_open,
             "change": price_change,
             "change_pct": price_change_pct,
-            "recent_swing_high": swings_hi[-1][1] if swings_hi else None,
-            "recent_swing_high_time": swings_hi[-1][0].isoformat() if swings_hi else None,
-            "recent_swing_low": swings_lo[-1][1] if swings_lo else None,
-            "recent_swing_low_time": swings_lo[-1][0].isoformat() if swings_lo else None,
+            "recent_swing_high": swing_high,
+            "recent_swing_high_time": swing_high_time,
+            "recent_swing_low": swing_low,
+            "recent_swing_low_time": swing_low_time,
             "last_bos": bos,
             "last_order_block": order_block,
             "fvgs": fvgs,
@@ -307,49 +360,28 @@ def format_features_for_gpt(features: Dict[str, Any]) -> str:
     return " | ".join(parts)
 
 
-def call_openai_gpt(summary: str, api_key: Optional[str]) -> Optional[str]:
+def _openai_model_params() -> Dict[str, Any]:
+    return {
+        "model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.25")),
+        "max_tokens": int(os.getenv("OPENAI_MAX_TOKENS", "500")),
+    }
+
+
+def call_openai_gpt(summary: str, api_key: Optional[str],
+                    on_delta: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """Ask the model for an analysis of ``summary``; ``on_delta`` streams the partial text."""
     if not api_key:
         return None
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
     prompt = (
         "You are a concise FX market analyst. Given the numeric features, write a compact analysis (max 8 bullets) "
         "covering structure (BOS/CHOCH), key levels, OB/FVG, liquidity, and momentum. Avoid fluff."
     )
-    data = {
-        "model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        "temperature": float(os.getenv("OPENAI_TEMPERATURE", "0.25")),
-        "max_tokens": int(os.getenv("OPENAI_MAX_TOKENS", "500")),
-        "messages": [
-            {"role": "system", "content": prompt},
-            {"role": "user", "content": f"Features: {summary}"},
-        ],
-    }
-    url = "https://api.openai.com/v1/chat/completions"
-    # Simple token- and error-aware retry with backoff
-    backoffs = [0.5, 1.0, 2.0]
-    for attempt, delay in enumerate(backoffs, start=1):
-        try:
-            resp = requests.post(url, headers=headers, json=data, timeout=20)
-            if resp.status_code in (429, 500, 502, 503, 504):
-                logger.warning(f"OpenAI transient error {resp.status_code}; attempt {attempt}/{len(backoffs)}")
-                if attempt < len(backoffs):
-                    import time as _t
-                    _t.sleep(delay)
-                    continue
-            resp.raise_for_status()
-            j = resp.json()
-            return j.get("choices", [{}])[0].get("message", {}).get("content", "").strip() or None
-        except Exception as e:
-            logger.warning(f"OpenAI call failed on attempt {attempt}: {e}")
-            if attempt < len(backoffs):
-                import time as _t
-                _t.sleep(delay)
-                continue
-            return None
-    return None
+    messages = [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": f"Features: {summary}"},
+    ]
+    return openai_client.chat(api_key, messages, on_delta=on_delta, **_openai_model_params())
 
 
 def build_user_output(features: Dict[str, Any], gpt_text: Optional[str]) -> str:
@@ -532,9 +564,32 @@ def build_user_output(features: Dict[str, Any], gpt_text: Optional[str]) -> str:
     return "\n".join(lines)
 
 
+def cached_local_features(symbol: str, tz: str = 'Europe/Prague') -> Optional[Dict[str, Any]]:
+    """``compute_local_features`` shared across callers within the same bar; treat the result as read-only."""
+    bar = int(time.time() // ANALYSIS_CACHE_BAR_SEC)
+    return feature_cache.get_or_compute((symbol, tz, bar), lambda: compute_local_features(symbol, tz))
+
+
+def cached_gpt_text(symbol: str, summary: str, api_key: Optional[str], allow_call: bool = True,
+                    on_delta: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """GPT text for a feature summary, reused for identical summaries and model settings.
+
+    With ``allow_call`` False (caller is rate-limited) only an already cached answer is returned.
+    ``on_delta`` only fires for the caller that actually makes the request.
+    """
+    if not api_key:
+        return None
+    params = _openai_model_params()
+    key = (symbol, hash_text(summary), params["model"], params["temperature"], params["max_tokens"])
+    if not allow_call:
+        return gpt_response_cache.get(key)
+    return gpt_response_cache.get_or_compute(key, lambda: call_openai_gpt(summary, api_key, on_delta=on_delta))
+
+
 def run_pair_analysis(base_currency: str, quote_currency: str, openai_api_key: Optional[str], tz: str, user_id: Optional[int] = None) -> Optional[str]:
     symbol = _get_symbol_from_currencies(base_currency, quote_currency)
     # Rate limit: per user+symbol cooldown
+    rate_limited = False
     try:
         import time as _t
         cooldown_sec = float(os.getenv("OPENAI_RATE_LIMIT_SECONDS", "15"))
@@ -544,29 +599,32 @@ def run_pair_analysis(base_currency: str, quote_currency: str, openai_api_key: O
             now = _t.time()
             if now - last < cooldown_sec:
                 logger.info(f"GPT rate-limited for {key}; skipping external call")
-                openai_api_key = None  # force local-only output
+                rate_limited = True  # cached GPT text only, else local-only output
             else:
                 _LAST_GPT_CALLS[key] = now
     except Exception:
         pass
-    features = compute_local_features(symbol, tz)
+    features = cached_local_features(symbol, tz)
     if not features:
         return None
     summary = format_features_for_gpt(features)
     # Runtime toggle
     if os.getenv("OPENAI_ENABLED", "true").strip().lower() not in ("1", "true", "yes", "on"):
         openai_api_key = None
-    gpt_text = call_openai_gpt(summary, openai_api_key)
+    gpt_text = cached_gpt_text(symbol, summary, openai_api_key, allow_call=not rate_limited)
     return build_user_output(features, gpt_text)
 
 
-def run_pair_analysis_with_features(base_currency: str, quote_currency: str, openai_api_key: Optional[str], tz: str, user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+def run_pair_analysis_with_features(base_currency: str, quote_currency: str, openai_api_key: Optional[str], tz: str, user_id: Optional[int] = None,
+                                    on_gpt_delta: Optional[Callable[[str], None]] = None) -> Optional[Dict[str, Any]]:
     """Compute features and GPT text for a pair and return both for charting.
 
-    Returns dict with keys: text (str), features (dict), symbol (str).
+    Returns dict with keys: text (str), gpt_text (str or None), features (dict), symbol (str).
+    ``on_gpt_delta`` receives the GPT text received so far while it streams.
     """
     symbol = _get_symbol_from_currencies(base_currency, quote_currency)
     # Rate limit handling mirrors run_pair_analysis
+    rate_limited = False
     try:
         import time as _t
         cooldown_sec = float(os.getenv("OPENAI_RATE_LIMIT_SECONDS", "15"))
@@ -576,18 +634,18 @@ def run_pair_analysis_with_features(base_currency: str, quote_currency: str, ope
             now = _t.time()
             if now - last < cooldown_sec:
                 logger.info(f"GPT rate-limited for {key}; skipping external call")
-                openai_api_key = None
+                rate_limited = True
             else:
                 _LAST_GPT_CALLS[key] = now
     except Exception:
         pass
-    features = compute_local_features(symbol, tz)
+    features = cached_local_features(symbol, tz)
     if not features:
         return None
     summary = format_features_for_gpt(features)
     if os.getenv("OPENAI_ENABLED", "true").strip().lower() not in ("1", "true", "yes", "on"):
         openai_api_key = None
-    gpt_text = call_openai_gpt(summary, openai_api_key)
+    gpt_text = cached_gpt_text(symbol, summary, openai_api_key, allow_call=not rate_limited, on_delta=on_gpt_delta)
     text = build_user_output(features, gpt_text)
     try:
         # Prepare Telegram Markdown facts-only message
@@ -595,7 +653,7 @@ def run_pair_analysis_with_features(base_currency: str, quote_currency: str, ope
         telegram_text = format_analysis_for_telegram(analysis_contract)
     except Exception:
         telegram_text = text
-    return {"text": text, "telegram_text": telegram_text, "features": features, "symbol": symbol}
+    return {"text": text, "telegram_text": telegram_text, "gpt_text": gpt_text, "features": features, "symbol": symbol}
 
 # === Telegram Markdown Formatter (facts-only) ===
 
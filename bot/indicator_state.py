@@ -0,0 +1,221 @@
+import copy
+import json
+import logging
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+EMA_PERIODS = (20, 50)
+ATR_PERIOD = 14
+SWING_LOOKBACK = 3
+# Per-day high/low kept for ADR and previous-day levels
+DAILY_HISTORY = 10
+STATE_VERSION = 2
+
+
+def _finite(value) -> bool:
+    return value is not None and not (isinstance(value, float) and math.isnan(value))
+
+
+class IndicatorState:
+    """EMA, ATR, daily range and last swing values for one symbol's bar series, updated per bar.
+
+    Bars are committed in order and each costs O(1). The newest bar of a frame may
+    still be forming, so it is never committed; ``snapshot`` applies it to a copy.
+    A state started mid-day has only part of its first day, which is left out of
+    the daily ranges.
+    """
+
+    def __init__(self, symbol: str, interval_sec: int):
+        self.symbol = symbol
+        self.interval_sec = interval_sec
+        self.last_ts: Optional[int] = None
+        self.last_close: Optional[float] = None
+        self.ema: Dict[int, Optional[float]] = {period: None for period in EMA_PERIODS}
+        self.true_ranges: deque = deque(maxlen=ATR_PERIOD)
+        # UTC day -> [high, low]
+        self.daily: Dict[str, List[float]] = {}
+        self.partial_day: Optional[str] = None
+        # (ts, high, low) of the last 2 * SWING_LOOKBACK + 1 bars
+        self.recent: deque = deque(maxlen=2 * SWING_LOOKBACK + 1)
+        self.swing_high: Optional[Tuple[int, float]] = None
+        self.swing_low: Optional[Tuple[int, float]] = None
+        self.bars = 0
+
+    def apply(self, ts: int, high: float, low: float, close: float):
+        """Fold one bar into the state."""
+        if _finite(close):
+            for period, value in self.ema.items():
+                alpha = 2.0 / (period + 1)
+                self.ema[period] = close if value is None else value + alpha * (close - value)
+
+        candidates = [abs(high - low)]
+        if self.last_close is not None:
+            candidates += [abs(high - self.last_close), abs(low - self.last_close)]
+        candidates = [c for c in candidates if _finite(c)]
+        self.true_ranges.append(max(candidates) if candidates else float('nan'))
+
+        if _finite(high) and _finite(low):
+            stamp = pd.Timestamp(ts, unit='s', tz='UTC')
+            day = stamp.strftime('%Y-%m-%d')
+            if not self.daily and stamp != stamp.normalize():
+                self.partial_day = day
+            entry = self.daily.get(day)
+            if entry is None:
+                self.daily[day] = [high, low]
+                for stale in sorted(self.daily)[:-DAILY_HISTORY]:
+                    del self.daily[stale]
+            else:
+                entry[0] = max(entry[0], high)
+                entry[1] = min(entry[1], low)
+
+        self.recent.append((ts, high, low))
+        if len(self.recent) == self.recent.maxlen:
+            center_ts, center_high, center_low = self.recent[SWING_LOOKBACK]
+            if center_high == max(bar[1] for bar in self.recent if _finite(bar[1])):
+                self.swing_high = (center_ts, center_high)
+            if center_low == min(bar[2] for bar in self.recent if _finite(bar[2])):
+                self.swing_low = (center_ts, center_low)
+
+        if _finite(close):
+            self.last_close = close
+        self.last_ts = ts
+        self.bars += 1
+
+    def atr(self) -> Optional[float]:
+        if len(self.true_ranges) < ATR_PERIOD or not all(_finite(v) for v in self.true_ranges):
+            return None
+        return float(sum(self.true_ranges) / ATR_PERIOD)
+
+    def daily_ranges(self) -> List[Tuple[str, float, float]]:
+        return [(day, high, low) for day, (high, low) in sorted(self.daily.items()) if day != self.partial_day]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': STATE_VERSION,
+            'symbol': self.symbol,
+            'interval_sec': self.interval_sec,
+            'last_ts': self.last_ts,
+            'last_close': self.last_close,
+            'ema': {str(period): value for period, value in self.ema.items()},
+            'true_ranges': list(self.true_ranges),
+            'daily': self.daily,
+            'partial_day': self.partial_day,
+            'recent': [list(bar) for bar in self.recent],
+            'swing_high': list(self.swing_high) if self.swing_high else None,
+            'swing_low': list(self.swing_low) if self.swing_low else None,
+            'bars': self.bars,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional['IndicatorState']:
+        if data.get('version') != STATE_VERSION:
+            return None
+        state = cls(data['symbol'], int(data['interval_sec']))
+        state.last_ts = data.get('last_ts')
+        state.last_close = data.get('last_close')
+        for period in EMA_PERIODS:
+            state.ema[period] = data.get('ema', {}).get(str(period))
+        state.true_ranges.extend(data.get('true_ranges', []))
+        state.daily = {day: list(values) for day, values in data.get('daily', {}).items()}
+        state.partial_day = data.get('partial_day')
+        state.recent.extend(tuple(bar) for bar in data.get('recent', []))
+        state.swing_high = tuple(data['swing_high']) if data.get('swing_high') else None
+        state.swing_low = tuple(data['swing_low']) if data.get('swing_low') else None
+        state.bars = int(data.get('bars', 0))
+        return state
+
+
+def _bars_of(data: pd.DataFrame) -> List[Tuple[int, float, float, float]]:
+    index = pd.to_datetime(data.index, utc=True)
+    epoch = (index.asi8 // 10**9).tolist()
+    return list(zip(epoch, data['High'].astype(float).tolist(), data['Low'].astype(float).tolist(),
+                    data['Close'].astype(float).tolist()))
+
+
+def _interval_of(data: pd.DataFrame) -> int:
+    index = pd.to_datetime(data.index, utc=True)
+    if len(index) < 2:
+        return 0
+    return int(np.median(np.diff(index.asi8)) // 10**9)
+
+
+class IndicatorStateStore:
+    """Per-symbol indicator states, kept in memory and persisted to the price bar store."""
+
+    def __init__(self, price_store=None):
+        self.price_store = price_store
+        self._states: Dict[Tuple[str, int], IndicatorState] = {}
+        self._lock = threading.Lock()
+        self.stats = {'updates': 0, 'bars_applied': 0, 'rebuilds': 0, 'stale': 0}
+
+    def _load(self, symbol: str, interval_sec: int) -> Optional[IndicatorState]:
+        state = self._states.get((symbol, interval_sec))
+        if state is None and self.price_store is not None:
+            raw = self.price_store.load_indicator_state(symbol, str(interval_sec))
+            if raw:
+                try:
+                    state = IndicatorState.from_dict(json.loads(raw))
+                except Exception as e:
+                    logger.warning(f"Discarding unreadable indicator state for {symbol}: {e}")
+                    state = None
+        return state
+
+    def update(self, symbol: str, data: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Advance the symbol's state with ``data`` and return the indicator values at its last bar.
+
+        Returns None when the state is already past the frame's last bar; callers
+        then recompute over the frame.
+        """
+        if data is None or data.empty or not {'High', 'Low', 'Close'} <= set(data.columns):
+            return None
+        interval_sec = _interval_of(data)
+        bars = _bars_of(data)
+        with self._lock:
+            state = self._load(symbol, interval_sec)
+            # Bars between the saved state and this frame are unknown: start over from the frame
+            if state is None or state.last_ts is None or state.last_ts < bars[0][0] - interval_sec:
+                state = IndicatorState(symbol, interval_sec)
+                self.stats['rebuilds'] += 1
+            elif bars[-1][0] <= state.last_ts:
+                self.stats['stale'] += 1
+                return None
+
+            committed = [bar for bar in bars[:-1] if bar[0] > state.last_ts] if state.last_ts is not None else bars[:-1]
+            for bar in committed:
+                state.apply(*bar)
+            self._states[(symbol, interval_sec)] = state
+            self.stats['updates'] += 1
+            self.stats['bars_applied'] += len(committed)
+            snapshot = self._snapshot(state, bars[-1])
+            saved = state.to_dict() if committed else None
+
+        if saved is not None and self.price_store is not None:
+            self.price_store.store_indicator_state(symbol, str(interval_sec), json.dumps(saved))
+        return snapshot
+
+    @staticmethod
+    def _snapshot(state: IndicatorState, last_bar: Tuple[int, float, float, float]) -> Dict[str, Any]:
+        # The newest bar may still be forming; apply it to a copy only
+        current = copy.deepcopy(state)
+        current.apply(*last_bar)
+        return {
+            'interval_sec': state.interval_sec,
+            'ema': dict(current.ema),
+            'ema_prev': dict(state.ema),
+            'atr': current.atr(),
+            'daily_ranges': current.daily_ranges(),
+            'swing_high': current.swing_high,
+            'swing_low': current.swing_low,
+            'bars': current.bars,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'symbols': len(self._states)}
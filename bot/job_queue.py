@@ -0,0 +1,266 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def telegram_update_key(update) -> str:
+    """Per-user key for an update, so one user's updates run one at a time and in order."""
+    for attr in ('callback_query', 'message', 'edited_message', 'inline_query'):
+        item = getattr(update, attr, None)
+        user = getattr(item, 'from_user', None) if item is not None else None
+        if user is not None:
+            return f"user:{user.id}"
+    return "global"
+
+
+class JobJournal:
+    """SQLite record of queued jobs so a restart can pick up what was not finished."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS telegram_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    update_id INTEGER UNIQUE,
+                    user_key TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at INTEGER NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def add(self, update_id: Optional[int], user_key: str, payload: str) -> Optional[int]:
+        """Record a job; returns its id, or None if this update is already recorded."""
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO telegram_jobs (update_id, user_key, payload, created_at) VALUES (?, ?, ?, ?)",
+                (update_id, user_key, payload, int(time.time())),
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def started(self, job_id: int):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE telegram_jobs SET attempts = attempts + 1 WHERE id = ?", (job_id,))
+
+    def done(self, job_id: int):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM telegram_jobs WHERE id = ?", (job_id,))
+
+    def pending(self, max_attempts: int) -> List[Tuple[int, Optional[int], str, str]]:
+        """Unfinished jobs in arrival order; jobs that already failed ``max_attempts`` times are dropped."""
+        with self._lock, self._connect() as conn:
+            dropped = conn.execute("DELETE FROM telegram_jobs WHERE attempts >= ?", (max_attempts,)).rowcount
+            rows = conn.execute(
+                "SELECT id, update_id, user_key, payload FROM telegram_jobs ORDER BY id"
+            ).fetchall()
+        if dropped:
+            logger.warning(f"Dropped {dropped} queued update(s) that failed {max_attempts} times")
+        return [(int(r[0]), r[1], r[2], r[3]) for r in rows]
+
+
+class UpdateJobQueue:
+    """Runs webhook updates on background worker threads so the webhook can answer at once.
+
+    Each job carries a user key; at most ``per_user_limit`` jobs of one user run at
+    a time (the default of 1 also keeps each user's updates in order), while other
+    users' jobs proceed on the remaining workers. Updates Telegram re-delivers are
+    dropped by ``update_id``. When ``max_pending`` jobs are waiting ``submit``
+    returns False and the caller handles the update itself. With a ``journal``,
+    jobs are recorded until they finish and re-queued on ``start``.
+    """
+
+    def __init__(self, handler: Callable[[str], Any], workers: Optional[int] = None,
+                 per_user_limit: Optional[int] = None, max_pending: Optional[int] = None,
+                 journal: Optional[JobJournal] = None, max_attempts: int = 3):
+        self.handler = handler
+        self.workers = max(1, workers if workers is not None else int(os.getenv('JOB_QUEUE_WORKERS', '4')))
+        self.per_user_limit = max(1, per_user_limit if per_user_limit is not None
+                                  else int(os.getenv('JOB_QUEUE_PER_USER', '1')))
+        self.max_pending = max(1, max_pending if max_pending is not None
+                               else int(os.getenv('JOB_QUEUE_MAX_PENDING', '200')))
+        self.journal = journal
+        self.max_attempts = max_attempts
+
+        self._cond = threading.Condition()
+        self._pending: 'OrderedDict[str, Deque[Tuple[Optional[int], str, float]]]' = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._pending_count = 0
+        self._recent_updates: Deque[int] = deque(maxlen=1000)
+        self._threads: List[threading.Thread] = []
+        self._stop = False
+
+        # Metrics
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._duplicates = 0
+        self._rejected = 0
+        self._recovered = 0
+        self._max_wait_sec = 0.0
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._stop = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'update-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        if self.journal is not None:
+            try:
+                for job_id, update_id, user_key, payload in self.journal.pending(self.max_attempts):
+                    self._enqueue(user_key, job_id, payload, update_id)
+                    self._recovered += 1
+            except Exception as e:
+                logger.error(f"Failed to recover queued updates: {e}")
+        logger.info(f"Started update job queue with {self.workers} worker(s), {self.per_user_limit} per user")
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def _enqueue(self, user_key: str, job_id: Optional[int], payload: str, update_id: Optional[int] = None):
+        with self._cond:
+            if update_id is not None and update_id not in self._recent_updates:
+                self._recent_updates.append(update_id)
+            self._pending.setdefault(user_key, deque()).append((job_id, payload, time.monotonic()))
+            self._pending_count += 1
+            self._submitted += 1
+            self._cond.notify()
+
+    def submit(self, payload: str, user_key: str = "global", update_id: Optional[int] = None) -> bool:
+        """Queue an update for the workers. True if queued (or a duplicate), False if the caller must run it."""
+        if not self._threads:
+            self.start()
+        with self._cond:
+            if update_id is not None and update_id in self._recent_updates:
+                self._duplicates += 1
+                return True
+            if self._pending_count >= self.max_pending:
+                self._rejected += 1
+                logger.warning(f"Update queue full ({self._pending_count} waiting); handling update inline")
+                return False
+            if update_id is not None:
+                self._recent_updates.append(update_id)
+        job_id = None
+        if self.journal is not None:
+            try:
+                job_id = self.journal.add(update_id, user_key, payload)
+                if job_id is None:
+                    with self._cond:
+                        self._duplicates += 1
+                    return True
+            except Exception as e:
+                logger.warning(f"Update journal write failed, queueing in memory only: {e}")
+        self._enqueue(user_key, job_id, payload)
+        return True
+
+    def _next_job(self):
+        """Oldest job of the first user below the per-user limit; call with the condition held."""
+        for user_key, jobs in self._pending.items():
+            if self._running.get(user_key, 0) < self.per_user_limit:
+                job = jobs.popleft()
+                if not jobs:
+                    del self._pending[user_key]
+                self._pending_count -= 1
+                self._running[user_key] = self._running.get(user_key, 0) + 1
+                return user_key, job
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                picked = None
+                while not self._stop:
+                    picked = self._next_job()
+                    if picked is not None:
+                        break
+                    self._cond.wait()
+                if picked is None:
+                    return
+                user_key, (job_id, payload, queued_at) = picked
+                self._max_wait_sec = max(self._max_wait_sec, time.monotonic() - queued_at)
+            if job_id is not None:
+                self._journal_call('started', job_id)
+            failed = False
+            try:
+                self.handler(payload)
+            except Exception as e:
+                failed = True
+                logger.error(f"Queued update for {user_key} failed: {e}")
+            if job_id is not None:
+                self._journal_call('done', job_id)
+            with self._cond:
+                self._running[user_key] -= 1
+                if not self._running[user_key]:
+                    del self._running[user_key]
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                self._cond.notify_all()
+
+    def _journal_call(self, method: str, job_id: int):
+        try:
+            getattr(self.journal, method)(job_id)
+        except Exception as e:
+            logger.warning(f"Update journal {method} failed for job {job_id}: {e}")
+
+    def join(self, timeout: float = 10.0) -> bool:
+        """Wait until no job is pending or running; True if the queue drained in time."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending_count or self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'workers': self.workers,
+                'per_user_limit': self.per_user_limit,
+                'pending': self._pending_count,
+                'running': sum(self._running.values()),
+                'max_pending': self.max_pending,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+                'duplicates': self._duplicates,
+                'rejected': self._rejected,
+                'recovered': self._recovered,
+                'max_wait_sec': round(self._max_wait_sec, 3),
+                'durable': self.journal is not None,
+            }
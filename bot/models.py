@@ -1,5 +1,5 @@
 from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean, Index, text, Time
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import declarative_base, deferred
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 import os
@@ -23,6 +23,9 @@ class ForexNews(Base):
     previous = Column(String(100))
     impact_level = Column(String(20), nullable=False)  # high, medium, low
     analysis = Column(Text)
+    # ForexFactory's data-event-id. Added by migrations/add_news_event_key.py; deferred so
+    # databases that have not run it yet can still load news rows.
+    event_id = deferred(Column(String(32)))
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -30,6 +33,8 @@ class ForexNews(Base):
     __table_args__ = (
         Index('idx_date_currency_time', 'date', 'currency', 'time'),
         Index('idx_date_impact', 'date', 'impact_level'),
+        # Event key; re-imports upsert against it instead of delete + insert
+        Index('uq_forex_news_event_id', 'date', 'event_id', unique=True),
     )
 
     def __repr__(self):
@@ -145,6 +150,30 @@ class User(Base):
             self.timezone = timezone
 
 
+class NotificationDedup(Base):
+    """Sent-notification markers shared by every worker process."""
+    __tablename__ = 'notification_dedup'
+
+    namespace = Column(String(32), primary_key=True)  # notification, group or chart
+    key = Column(String(128), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # When it was (last) sent
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<NotificationDedup(namespace={self.namespace}, key={self.key})>"
+
+
+def dialect_insert(engine: Engine):
+    """The dialect's ``insert`` construct with ON CONFLICT support, or None if unsupported."""
+    if engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if engine.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+
 class DatabaseManager:
     """Manages database connections and operations."""
 
@@ -0,0 +1,132 @@
+import bisect
+import logging
+from collections import defaultdict
+from datetime import datetime, time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+# Tolerance around the exact "N minutes before" instant, matching the 2-minute check interval
+MATCH_WINDOW_MINUTES = 2.5
+# Tolerance for runs fired by a date trigger at the exact instant
+TRIGGER_WINDOW_MINUTES = 0.5
+
+
+def parse_event_clock(time_str: str) -> Optional[time]:
+    """Parse a calendar time such as '8:30am' or '14:00' into a wall-clock time."""
+    try:
+        time_str = time_str.strip().lower()
+        if "am" in time_str or "pm" in time_str:
+            # 12-hour format
+            return datetime.strptime(time_str.replace("am", " AM").replace("pm", " PM"), "%I:%M %p").time()
+        # 24-hour format
+        return datetime.strptime(time_str, "%H:%M").time()
+    except Exception as e:
+        logger.error(f"Error parsing time '{time_str}': {e}")
+        return None
+
+
+def resolve_timezone(timezone_name: str):
+    """Return the pytz timezone, falling back to UTC for unknown names."""
+    try:
+        return pytz.timezone(timezone_name)
+    except Exception as e:
+        logger.error(f"Error getting user timezone {timezone_name}: {e}")
+        return pytz.UTC
+
+
+class NotificationMatcher:
+    """Matches one day's events against many users in a single pass.
+
+    Event times are parsed once. For every timezone in use the events are localized
+    once and kept sorted per impact level, so each (timezone, minutes, impacts)
+    bucket of users is answered with a bisect instead of a scan.
+    """
+
+    def __init__(self, news_items: Iterable[Dict[str, Any]], target_date: datetime):
+        self.target_date = target_date.date() if isinstance(target_date, datetime) else target_date
+        self._events: List[Tuple[int, Dict[str, Any], time]] = []
+        for item in news_items or []:
+            time_str = item.get('time', '')
+            if not time_str or time_str == 'N/A':
+                continue
+            clock = parse_event_clock(time_str)
+            if clock is not None:
+                self._events.append((len(self._events), item, clock))
+        # timezone name -> impact -> (sorted timestamps, [(position, event_time, item)])
+        self._by_timezone: Dict[str, Dict[str, Tuple[List[float], List[Tuple[int, datetime, Dict[str, Any]]]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _index_for(self, timezone_name: str):
+        index = self._by_timezone.get(timezone_name)
+        if index is None:
+            tz = resolve_timezone(timezone_name)
+            rows = defaultdict(list)
+            for position, item, clock in self._events:
+                event_time = tz.localize(datetime.combine(self.target_date, clock))
+                rows[item.get('impact')].append((event_time.timestamp(), position, event_time, item))
+            index = {}
+            for impact, entries in rows.items():
+                entries.sort(key=lambda entry: entry[0])
+                index[impact] = ([entry[0] for entry in entries], [entry[1:] for entry in entries])
+            self._by_timezone[timezone_name] = index
+        return index
+
+    def event_times(self, timezone_name: str) -> List[datetime]:
+        """Distinct event instants of the day, read as wall-clock times in ``timezone_name``."""
+        instants = {}
+        for _, events in self._index_for(timezone_name).values():
+            for _, event_time, _ in events:
+                instants[event_time.timestamp()] = event_time
+        return [instants[ts] for ts in sorted(instants)]
+
+    def match(self, timezone_name: str, minutes_before: int, impact_levels: Iterable[str],
+              now: Optional[datetime] = None, window_minutes: float = MATCH_WINDOW_MINUTES) -> List[Dict[str, Any]]:
+        """Events starting ``minutes_before`` minutes from ``now`` (within ``window_minutes``)."""
+        if now is None:
+            now = datetime.now(pytz.UTC)
+        index = self._index_for(timezone_name)
+        target = now.timestamp() + minutes_before * 60
+        low, high = target - window_minutes * 60, target + window_minutes * 60
+
+        matched = []
+        for impact in set(impact_levels):
+            entry = index.get(impact)
+            if entry is None:
+                continue
+            timestamps, events = entry
+            for i in range(bisect.bisect_left(timestamps, low), bisect.bisect_right(timestamps, high)):
+                position, event_time, item = events[i]
+                matched.append((position, {
+                    'item': item,
+                    'minutes_until': int((timestamps[i] - now.timestamp()) / 60),
+                    'event_time': event_time
+                }))
+        # Same order as the day's news list, whatever order the impact levels came in
+        matched.sort(key=lambda entry: entry[0])
+        return [event for _, event in matched]
+
+    def match_users(self, users: Iterable[Any], now: Optional[datetime] = None,
+                    window_minutes: float = MATCH_WINDOW_MINUTES) -> Dict[Any, List[Dict[str, Any]]]:
+        """Map each user to their due events, resolving each preference bucket once."""
+        if now is None:
+            now = datetime.now(pytz.UTC)
+        buckets: Dict[Tuple[str, int, FrozenSet[str]], List[Any]] = defaultdict(list)
+        for user in users:
+            key = (user.get_timezone(), user.notification_minutes, frozenset(user.get_notification_impact_levels_list()))
+            buckets[key].append(user)
+
+        matches = {}
+        for (timezone_name, minutes_before, impacts), bucket_users in buckets.items():
+            if minutes_before is None:
+                continue
+            events = self.match(timezone_name, minutes_before, impacts, now, window_minutes)
+            if events:
+                for user in bucket_users:
+                    matches[user] = events
+        logger.debug(f"Matched {len(matches)} users across {len(buckets)} preference buckets")
+        return matches
@@ -4,22 +4,47 @@ import asyncio
 import subprocess
 import sys
 import os
+import threading
 from datetime import datetime, timedelta, date
 import os
 from typing import Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
-from sqlalchemy import text
+from apscheduler.triggers.date import DateTrigger
 
 import pytz
 from .notification_service import NotificationService, notification_deduplication
 from .database_service import ForexNewsService
 from .config import Config
 from .chart_service import chart_service
+from .notification_matcher import NotificationMatcher, TRIGGER_WINDOW_MINUTES
+from .preference_cache import UserPreferences
+from .user_settings import NOTIFICATION_MINUTES
 
 logger = logging.getLogger(__name__)
 
+# Currency pair used by the channel post-event charts for each event currency
+_POST_EVENT_PAIRS = {
+    'USD': ('USD', 'JPY'),
+    'EUR': ('EUR', 'USD'),
+    'GBP': ('GBP', 'USD'),
+    'CAD': ('USD', 'CAD'),
+    'AUD': ('AUD', 'USD'),
+}
+
+# One-shot jobs registered by refresh_event_triggers share this id prefix
+_TRIGGER_JOB_PREFIX = 'event_trigger_'
+# How late a one-shot job may still run (also covers instants just passed at planning time)
+_TRIGGER_GRACE_SECONDS = 150
+
+
+def _in_window(minutes: float, target: float, low: float, high: float, exact: bool) -> bool:
+    """Polling runs accept [low, high]; trigger runs only a tight band around the target."""
+    if exact:
+        return abs(minutes - target) <= TRIGGER_WINDOW_MINUTES
+    return low <= minutes <= high
+
 
 class NotificationScheduler:
     """Scheduler for handling notification checks and sending."""
@@ -30,6 +55,12 @@ class NotificationScheduler:
         self.config = config
         self.notification_service = NotificationService(db_service, bot, config)
         self.scheduler = None
+        # Exact one-shot jobs per event instead of 1-10 minute polling
+        self.event_triggers_enabled = os.getenv('EVENT_TRIGGERS_ENABLED', '1').strip().lower() in ('1', 'true', 'yes')
+        # Trigger job ids that already ran, so a replan does not schedule them again
+        self._fired_triggers = {}
+        # Trigger jobs record themselves from scheduler worker threads while a replan prunes the dict
+        self._fired_lock = threading.Lock()
         self._setup_scheduler()
 
     def _setup_scheduler(self):
@@ -37,14 +68,6 @@ class NotificationScheduler:
         try:
             self.scheduler = BackgroundScheduler()
 
-            # Check for notifications every 2 minutes for more precise timing
-            self.scheduler.add_job(
-                self._check_notifications,
-                IntervalTrigger(minutes=2),
-                id='notification_check',
-                name='Check for upcoming news events'
-            )
-
             # Schedule bulk import every day at 03:00 in configured local timezone
             self.scheduler.add_job(
                 self._run_bulk_import,
@@ -54,12 +77,57 @@ class NotificationScheduler:
             )
 
             self.scheduler.start()
-            logger.info("Notification scheduler started - checking every 2 minutes")
             logger.info("Bulk import scheduled for daily at 03:00")
 
         except Exception as e:
             logger.error(f"Error setting up notification scheduler: {e}")
 
+        if self.event_triggers_enabled:
+            # Re-plan hourly so new days, on-demand imports and preference changes are picked up
+            try:
+                self.scheduler.add_job(
+                    self.refresh_event_triggers,
+                    CronTrigger(minute=0),
+                    id='event_trigger_refresh',
+                    name='Plan one-shot jobs for today\'s events'
+                )
+                self.refresh_event_triggers()
+                logger.info("Notifications, channel alerts and post-event charts scheduled at exact event times")
+            except Exception as e:
+                logger.error(f"Error adding event trigger jobs: {e}")
+        else:
+            self._setup_polling_jobs()
+
+        # Pre-warm price bars for today's high-impact event pairs so post-event charts
+        # only need the last few minutes when they fire
+        env_val = os.getenv('PRICE_PREWARM_ENABLED', '1').strip().lower()
+        if env_val in ('1', 'true', 'yes'):
+            try:
+                prewarm_minutes = int(os.getenv('PRICE_PREWARM_INTERVAL_MIN', '2'))
+                self.scheduler.add_job(
+                    self._prewarm_event_prices,
+                    IntervalTrigger(minutes=max(1, prewarm_minutes)),
+                    id='prewarm_event_prices',
+                    name='Pre-warm price bars around high impact events'
+                )
+                logger.info(f"Scheduled event price pre-warming every {prewarm_minutes} minute(s)")
+            except Exception as e:
+                logger.error(f"Error adding price pre-warm job: {e}")
+
+    def _setup_polling_jobs(self):
+        """Interval jobs used when EVENT_TRIGGERS_ENABLED is off."""
+        try:
+            # Check for notifications every 2 minutes for more precise timing
+            self.scheduler.add_job(
+                self._check_notifications,
+                IntervalTrigger(minutes=2),
+                id='notification_check',
+                name='Check for upcoming news events'
+            )
+            logger.info("Notification scheduler started - checking every 2 minutes")
+        except Exception as e:
+            logger.error(f"Error adding notification check job: {e}")
+
         # Schedule a periodic job to send post-event charts for high impact events
         try:
             self.scheduler.add_job(
@@ -96,26 +164,116 @@ class NotificationScheduler:
         except Exception as e:
             logger.error(f"Error adding channel high-impact alerts job: {e}")
 
-    def _check_notifications(self):
+    def _channel_alert_minutes(self) -> int:
+        try:
+            return int(os.getenv('CHANNEL_ALERT_MINUTES_BEFORE', '30'))
+        except Exception:
+            return 30
+
+    def refresh_event_triggers(self):
+        """Register one-shot jobs at the exact instants today's events need work.
+
+        Covers user notifications (every lead time and timezone in use), channel
+        alerts, and the 15m and 2h post-event charts. Yesterday's events are planned
+        too, so post-event charts of late-evening events still fire after midnight.
+        Jobs that are no longer wanted are removed; jobs already registered or
+        already run are left alone.
+        """
+        try:
+            if not self.scheduler:
+                return
+
+            today = date.today()
+            now = datetime.now(pytz.UTC)
+            planned = {}
+
+            def plan(kind, func, fire_at, **kwargs):
+                job_id = f"{_TRIGGER_JOB_PREFIX}{kind}_{fire_at.astimezone(pytz.UTC):%Y%m%d%H%M}"
+                planned[job_id] = (func, fire_at, kwargs)
+
+            # Channel alerts and post-event charts, in the configured timezone
+            if getattr(self.config, 'telegram_chat_id', None):
+                tz_name = getattr(self.config, 'timezone', 'Europe/Prague')
+                alert_minutes = self._channel_alert_minutes()
+                for event_date in (today - timedelta(days=1), today):
+                    high_items = self.db_service.get_news_for_date(event_date, 'high') or []
+                    for event_time in NotificationMatcher(high_items, event_date).event_times(tz_name):
+                        plan('channel_alert', self._send_channel_high_impact_alerts,
+                             event_time - timedelta(minutes=alert_minutes), event_date=event_date)
+                        plan('post_event_short_chart', self._send_post_event_short_charts,
+                             event_time + timedelta(minutes=15), event_date=event_date)
+                        plan('post_event_chart', self._send_post_event_charts,
+                             event_time + timedelta(hours=2), event_date=event_date)
+
+            # User notifications: event times are read in each subscriber's timezone
+            if self.db_service.schema.notifications_available:
+                users = [UserPreferences.from_user(u) for u in self.db_service.get_users_with_notifications_enabled()]
+                if users:
+                    matcher = NotificationMatcher(self.db_service.get_news_for_date(today, 'all') or [], datetime.now())
+                    # Every offered lead time, so a changed preference is covered before the next replan
+                    lead_times = set(NOTIFICATION_MINUTES) | {u.notification_minutes for u in users if u.notification_minutes}
+                    for timezone_name in {u.get_timezone() for u in users}:
+                        for event_time in matcher.event_times(timezone_name):
+                            for minutes in lead_times:
+                                plan('user_notifications', self._check_notifications,
+                                     event_time - timedelta(minutes=minutes))
+
+            existing = {job.id for job in self.scheduler.get_jobs() if job.id.startswith(_TRIGGER_JOB_PREFIX)}
+            for job_id in existing - planned.keys():
+                self.scheduler.remove_job(job_id)
+
+            # Forget fired jobs from previous days
+            cutoff = now - timedelta(days=1)
+            with self._fired_lock:
+                self._fired_triggers = {k: v for k, v in self._fired_triggers.items() if v > cutoff}
+                fired = set(self._fired_triggers)
+
+            added = 0
+            for job_id, (func, fire_at, kwargs) in planned.items():
+                if job_id in existing or job_id in fired:
+                    continue
+                # Instants that passed moments ago still run (within the grace time)
+                if (now - fire_at).total_seconds() > _TRIGGER_GRACE_SECONDS:
+                    continue
+                self.scheduler.add_job(
+                    self._run_event_trigger,
+                    DateTrigger(run_date=fire_at),
+                    args=[job_id, func, fire_at],
+                    kwargs=kwargs,
+                    id=job_id,
+                    name=f"{func.__name__} at {fire_at.isoformat()}",
+                    misfire_grace_time=_TRIGGER_GRACE_SECONDS,
+                    replace_existing=True
+                )
+                added += 1
+
+            logger.info(f"Event triggers: {added} added, {len(existing - planned.keys())} removed, "
+                        f"{len(planned)} planned for {today}")
+        except Exception as e:
+            logger.error(f"Error refreshing event triggers: {e}")
+
+    def _run_event_trigger(self, job_id: str, func, fire_at: datetime, **kwargs):
+        with self._fired_lock:
+            self._fired_triggers[job_id] = fire_at
+        func(fire_at=fire_at, **kwargs)
+
+    def _check_notifications(self, fire_at: Optional[datetime] = None):
         """Check for upcoming events and send notifications."""
         try:
             logger.info("Checking for upcoming news events...")
 
             # Check if notification columns exist
-            with self.db_service.db_manager.get_session() as session:
-                result = session.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN ('notifications_enabled', 'notification_minutes', 'notification_impact_levels')
-                """))
-                notification_columns = [row[0] for row in result]
-
-                if len(notification_columns) < 3:
-                    logger.info("Notification columns not fully available, skipping notification check")
-                    return
+            if not self.db_service.schema.notifications_available:
+                logger.info("Notification columns not fully available, skipping notification check")
+                return
 
-            # Check notifications for all users
-            notifications_sent = self.notification_service.check_and_send_notifications_for_all_users()
+            # Check notifications for all users (trigger runs match their exact instant)
+            if fire_at is not None:
+                notifications_sent = self.notification_service.check_and_send_notifications_for_all_users(
+                    now=fire_at, window_minutes=TRIGGER_WINDOW_MINUTES
+                )
+            else:
+                notifications_sent = self.notification_service.check_and_send_notifications_for_all_users()
 
             if notifications_sent > 0:
                 logger.info(f"Sent {notifications_sent} notifications")
@@ -125,7 +283,7 @@ class NotificationScheduler:
         except Exception as e:
             logger.error(f"Error checking notifications: {e}")
 
-    def _send_post_event_charts(self):
+    def _send_post_event_charts(self, fire_at: Optional[datetime] = None, event_date: Optional[date] = None):
         """Send charts 2 hours after high-impact events to the configured channel.
 
         Symbol rules:
@@ -140,7 +298,7 @@ class NotificationScheduler:
                 return
 
             # We will consider today's events and send charts exactly ~2 hours after event time
-            today = date.today()
+            today = event_date or date.today()
             # Include both high and red-AUD (AUD high-impact) events
             news_items = self.db_service.get_news_for_date(today, 'high')
             if not news_items:
@@ -152,7 +310,7 @@ class NotificationScheduler:
                 tz = pytz.timezone(tz_name)
             except Exception:
                 tz = pytz.UTC
-            now = datetime.now(tz)
+            now = fire_at.astimezone(tz) if fire_at else datetime.now(tz)
 
             for item in news_items:
                 time_str = item.get('time', '')
@@ -173,7 +331,7 @@ class NotificationScheduler:
 
                 minutes_after = (now - event_dt).total_seconds() / 60.0
                 # Send near 2 hours after (within a window) and only once (dedup via caption hash)
-                if 110 <= minutes_after <= 140:
+                if _in_window(minutes_after, 120, 110, 140, fire_at is not None):
                     # Map currency to required pair
                     pair_map = {
                         'USD': 'USDJPY=X',
@@ -249,11 +407,12 @@ class NotificationScheduler:
         except Exception as e:
             logger.error(f"Error in post-event charts job: {e}")
 
-    def _send_channel_high_impact_alerts(self):
-        """Send channel notifications near the time of high-impact events.
+    def _prewarm_event_prices(self):
+        """Incrementally fetch bars for the pairs of today's high-impact events.
 
-        Lead time can be configured with env var CHANNEL_ALERT_MINUTES_BEFORE (default 30).
-        A window of ±2.5 minutes is allowed to accommodate scheduler granularity.
+        Runs from one hour before each event until the 2h post-event chart has gone
+        out. Each run only downloads bars missing from the persistent bar store, so
+        when a post-event chart fires just the last few minutes are fetched.
         """
         try:
             chat_id = getattr(self.config, 'telegram_chat_id', None)
@@ -271,10 +430,74 @@ class NotificationScheduler:
             except Exception:
                 tz = pytz.UTC
             now = datetime.now(tz)
+
+            windows = {}
+            for item in items:
+                t = item.get('time') or ''
+                currency = (item.get('currency') or '').upper()
+                if not t or not currency:
+                    continue
+                try:
+                    if 'am' in t.lower() or 'pm' in t.lower():
+                        base_dt = datetime.strptime(t.lower().replace('am', ' AM').replace('pm', ' PM'), "%I:%M %p")
+                    else:
+                        base_dt = datetime.strptime(t, "%H:%M")
+                    event_dt = tz.localize(datetime.combine(today, base_dt.time()))
+                except Exception:
+                    continue
+
+                minutes_until = (event_dt - now).total_seconds() / 60.0
+                # Active from 60m before the event until the 2h chart window has closed
+                if not (-145 <= minutes_until <= 60):
+                    continue
+
+                symbol = self._post_event_symbol(currency)
+                # Widest window any post-event chart uses: 2h before the event, up to now
+                start_time = event_dt - timedelta(hours=2)
+                end_time = min(now, event_dt + timedelta(hours=2))
+                if symbol in windows:
+                    start_time = min(start_time, windows[symbol][0])
+                    end_time = max(end_time, windows[symbol][1])
+                windows[symbol] = (start_time, end_time)
+
+            if not windows:
+                return
+
+            symbols = list(windows)
+            results = chart_service.fetch_price_data_many(symbols, [windows[s] for s in symbols])
+            warmed = [s for s, data in results.items() if data is not None and not data.empty]
+            logger.info(f"Pre-warmed price bars for {len(warmed)}/{len(symbols)} event pair(s): {', '.join(warmed)}")
+        except Exception as e:
+            logger.error(f"Error pre-warming event prices: {e}")
+
+    def _post_event_symbol(self, currency: str) -> str:
+        """Yahoo symbol the post-event charts end up fetching for an event currency."""
+        primary_cur, secondary_cur = _POST_EVENT_PAIRS.get(currency, (currency, 'USD'))
+        return chart_service.direct_pair_candidates(primary_cur, secondary_cur)[0][0]
+
+    def _send_channel_high_impact_alerts(self, fire_at: Optional[datetime] = None, event_date: Optional[date] = None):
+        """Send channel notifications near the time of high-impact events.
+
+        Lead time can be configured with env var CHANNEL_ALERT_MINUTES_BEFORE (default 30).
+        Polling runs allow ±2.5 minutes; trigger runs match their exact instant.
+        """
+        try:
+            chat_id = getattr(self.config, 'telegram_chat_id', None)
+            if not chat_id:
+                return
+
+            today = event_date or date.today()
+            items = self.db_service.get_news_for_date(today, 'high')
+            if not items:
+                return
+
+            tz_name = getattr(self.config, 'timezone', 'Europe/Prague')
             try:
-                minutes_before = int(os.getenv('CHANNEL_ALERT_MINUTES_BEFORE', '30'))
+                tz = pytz.timezone(tz_name)
             except Exception:
-                minutes_before = 30
+                tz = pytz.UTC
+            now = fire_at.astimezone(tz) if fire_at else datetime.now(tz)
+            minutes_before = self._channel_alert_minutes()
 
             # Group channel items happening at the same time into a single alert
             grouped: dict = {}
@@ -292,7 +515,7 @@ class NotificationScheduler:
                     continue
 
                 minutes_until = (event_dt - now).total_seconds() / 60.0
-                if abs(minutes_until - minutes_before) <= 2.5:
+                if _in_window(minutes_until, minutes_before, minutes_before - 2.5, minutes_before + 2.5, fire_at is not None):
                     grouped.setdefault(t, []).append({
                         'item': item,
                         'minutes_until': max(int(round(minutes_until)), 0),
@@ -344,14 +567,14 @@ class NotificationScheduler:
         except Exception as e:
             logger.error(f"Error in channel high-impact alerts: {e}")
 
-    def _send_post_event_short_charts(self):
+    def _send_post_event_short_charts(self, fire_at: Optional[datetime] = None, event_date: Optional[date] = None):
         """Send charts 15 minutes after high-impact events (−60m, +15m) with brief comment."""
         try:
             chat_id = getattr(self.config, 'telegram_chat_id', None)
             if not chat_id:
                 return
 
-            today = date.today()
+            today = event_date or date.today()
             items = self.db_service.get_news_for_date(today, 'high')
             if not items:
                 return
@@ -361,7 +584,7 @@ class NotificationScheduler:
                 tz = pytz.timezone(tz_name)
             except Exception:
                 tz = pytz.UTC
-            now = datetime.now(tz)
+            now = fire_at.astimezone(tz) if fire_at else datetime.now(tz)
 
             for item in items:
                 t = item.get('time') or ''
@@ -379,19 +602,12 @@ class NotificationScheduler:
                     continue
 
                 minutes_after = (now - event_dt).total_seconds() / 60.0
-                if 12.5 <= minutes_after <= 17.5:
+                if _in_window(minutes_after, 15, 12.5, 17.5, fire_at is not None):
                     if not notification_deduplication.should_send_notification(
                         'post_event_short_chart', currency=currency, event=event_name, event_time_iso=event_dt.isoformat()
                     ):
                         continue
-                    pair_map = {
-                        'USD': ('USD', 'JPY'),
-                        'EUR': ('EUR', 'USD'),
-                        'GBP': ('GBP', 'USD'),
-                        'CAD': ('USD', 'CAD'),
-                        'AUD': ('AUD', 'USD'),
-                    }
-                    primary_cur, secondary_cur = pair_map.get(currency, (currency, 'USD'))
+                    primary_cur, secondary_cur = _POST_EVENT_PAIRS.get(currency, (currency, 'USD'))
 
                     img = chart_service.create_multi_currency_chart(
                         primary_currency=primary_cur,
@@ -485,6 +701,9 @@ class NotificationScheduler:
             if result.returncode == 0:
                 logger.info("Bulk import completed successfully")
                 logger.info(f"Output: {result.stdout}")
+                # Event times may have moved; re-plan today's one-shot jobs
+                if self.event_triggers_enabled:
+                    self.refresh_event_triggers()
             else:
                 logger.error(f"Bulk import failed with return code {result.returncode}")
                 logger.error(f"Error: {result.stderr}")
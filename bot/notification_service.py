@@ -7,111 +7,125 @@ import threading
 import html
 
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton
-from sqlalchemy import text
-import pytz
 
 from .database_service import ForexNewsService
 from .config import Config
 from .chart_service import chart_service
+from .dedup_store import MemoryDedupBackend
+from .notification_matcher import MATCH_WINDOW_MINUTES, NotificationMatcher, parse_event_clock, resolve_timezone
+from .preference_cache import UserPreferences
 
 logger = logging.getLogger(__name__)
 
 
 class NotificationDeduplicationService:
-    """Service to handle notification deduplication and tracking."""
-
-    def __init__(self):
-        self.sent_notifications: Dict[str, datetime] = {}
-        # Track group notifications with timestamps for cleanup
-        self.group_notifications: Dict[str, datetime] = {}
-        # Track last chart sent per target (user/channel) to rate-limit charts
-        self.last_chart_sent: Dict[str, datetime] = {}
-        self.cleanup_interval = timedelta(hours=24)  # Clean up old notifications every 24 hours
-        self.last_cleanup = datetime.now()
+    """Service to handle notification deduplication and tracking.
+
+    Markers live in a pluggable backend: ``MemoryDedupBackend`` (default, per
+    process) or ``SQLDedupBackend`` (shared table that survives restarts and is
+    consistent across workers), attached with ``use_backend``.
+    """
+
+    # Namespaces and how long their markers are kept
+    NOTIFICATION_TTL = timedelta(hours=24)
+    GROUP_TTL = timedelta(hours=24)
+    CHART_TTL = timedelta(hours=12)
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryDedupBackend()
+        # Used while a shared backend is unreachable, so duplicates stay suppressed locally
+        self._fallback = MemoryDedupBackend()
         self._lock = threading.Lock()
 
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._charts_throttled = 0
+        self._backend_errors = 0
+
+    def use_backend(self, backend):
+        """Switch to another backend (e.g. the database once it is available)."""
+        self.backend = backend
+        logger.info(f"Notification deduplication now uses the {backend.name} backend")
+
+    def _call(self, method: str, *args):
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception as e:
+            with self._lock:
+                self._backend_errors += 1
+            logger.error(f"Dedup backend {self.backend.name} failed on {method}, using memory: {e}")
+            return getattr(self._fallback, method)(*args)
+
+    def _record(self, approved: bool):
+        with self._lock:
+            if approved:
+                self._misses += 1
+            else:
+                self._hits += 1
+
     def _generate_notification_id(self, event_type: str, **kwargs) -> str:
         """Generate a unique ID for a notification based on its parameters."""
         # Create a string representation of the notification parameters
         params_str = f"{event_type}:{':'.join(f'{k}={v}' for k, v in sorted(kwargs.items()))}"
         return hashlib.md5(params_str.encode()).hexdigest()
 
-    def _cleanup_old_notifications(self):
-        """Remove notifications older than the cleanup interval."""
-        now = datetime.now()
-        if now - self.last_cleanup > self.cleanup_interval:
-            cutoff_time = now - self.cleanup_interval
-            old_notifications = [
-                notification_id for notification_id, timestamp in self.sent_notifications.items()
-                if timestamp < cutoff_time
-            ]
-            for notification_id in old_notifications:
-                del self.sent_notifications[notification_id]
-
-            old_group = [key for key, ts in self.group_notifications.items() if ts < cutoff_time]
-            for key in old_group:
-                del self.group_notifications[key]
-
-            # Cleanup old chart rate-limit records (older than 12 hours)
-            chart_cutoff = now - timedelta(hours=12)
-            old_charts = [key for key, ts in self.last_chart_sent.items() if ts < chart_cutoff]
-            for key in old_charts:
-                del self.last_chart_sent[key]
-
-            self.last_cleanup = now
-            logger.info(f"Cleaned up {len(old_notifications)} old notifications and {len(old_group)} old group notifications")
-
     def should_send_notification(self, event_type: str, **kwargs) -> bool:
         """Check if a notification should be sent (prevents duplicates)."""
-        with self._lock:
-            self._cleanup_old_notifications()
-
-            notification_id = self._generate_notification_id(event_type, **kwargs)
-
-            if notification_id in self.sent_notifications:
-                logger.info(f"Notification already sent for {event_type} with params {kwargs}")
-                return False
+        notification_id = self._generate_notification_id(event_type, **kwargs)
+        approved = self._call('add_if_absent', 'notification', notification_id,
+                              self.NOTIFICATION_TTL.total_seconds())
+        self._record(approved)
+        if not approved:
+            logger.info(f"Notification already sent for {event_type} with params {kwargs}")
+            return False
 
-            # Mark as sent
-            self.sent_notifications[notification_id] = datetime.now()
-            logger.info(f"New notification approved for {event_type} with params {kwargs}")
-            return True
+        logger.info(f"New notification approved for {event_type} with params {kwargs}")
+        return True
 
     def should_send_group_notification(self, group_id: str, user_id: str, message_hash: str) -> bool:
         """Check if a group notification should be sent (prevents spam)."""
         group_key = f"{group_id}:{user_id}:{message_hash}"
+        approved = self._call('add_if_absent', 'group', group_key, self.GROUP_TTL.total_seconds())
+        self._record(approved)
+        if not approved:
+            logger.info(f"Group notification already sent for {group_key}")
+            return False
 
-        with self._lock:
-            if group_key in self.group_notifications:
-                logger.info(f"Group notification already sent for {group_key}")
-                return False
-
-            # Mark as sent with timestamp
-            self.group_notifications[group_key] = datetime.now()
-            logger.info(f"New group notification approved for {group_key}")
-            return True
+        logger.info(f"New group notification approved for {group_key}")
+        return True
 
     def get_notification_stats(self) -> Dict:
         """Get notification statistics."""
         with self._lock:
-            return {
-                "active_notifications": len(self.sent_notifications),
-                "group_notifications": len(self.group_notifications),
-                "chart_rate_limits": len(self.last_chart_sent),
-                "last_cleanup": self.last_cleanup.isoformat()
+            hits, misses = self._hits, self._misses
+            metrics = {
+                "dedup_hits": hits,
+                "dedup_misses": misses,
+                "dedup_hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "charts_throttled": self._charts_throttled,
+                "backend_errors": self._backend_errors,
             }
+        return {
+            "backend": self.backend.name,
+            "active_notifications": self._call('count', 'notification'),
+            "group_notifications": self._call('count', 'group'),
+            "chart_rate_limits": self._call('count', 'chart'),
+            "last_cleanup": self.backend.last_purge.isoformat(),
+            **metrics
+        }
 
     def can_send_chart(self, target_id: str, min_minutes: int = 120) -> bool:
         """Return True if we can send a chart to this target based on cooldown."""
+        elapsed = self._call('seconds_since', 'chart', str(target_id))
+        if elapsed is None or elapsed >= min_minutes * 60:
+            return True
         with self._lock:
-            last = self.last_chart_sent.get(str(target_id))
-            if not last:
-                return True
-            return (datetime.now() - last) >= timedelta(minutes=min_minutes)
+            self._charts_throttled += 1
+        return False
 
     def mark_chart_sent(self, target_id: str):
-        with self._lock:
-            self.last_chart_sent[str(target_id)] = datetime.now()
+        self._call('touch', 'chart', str(target_id), self.CHART_TTL.total_seconds())
 
 
 # Global notification deduplication service instance
@@ -217,6 +231,29 @@ class NotificationService:
             logger.error(f"Failed to send direction poll: {e}")
             return False
 
+    def _send_chart_photo(self, chat_id: int, chart_buffer: BytesIO, **kwargs):
+        """Send a chart, reusing the Telegram file_id when the same chart was uploaded before."""
+        cache = chart_service.rendered_charts
+        key = getattr(chart_buffer, 'chart_cache_key', None)
+        file_id = cache.get_file_id(key)
+        if file_id:
+            try:
+                return self.bot.send_photo(chat_id, file_id, **kwargs)
+            except Exception as e:
+                logger.warning(f"Cached chart file_id rejected, uploading again: {e}")
+                cache.forget_file_id(key)
+                chart_buffer.seek(0)
+
+        sent = self.bot.send_photo(chat_id, chart_buffer, **kwargs)
+        try:
+            photos = getattr(sent, 'photo', None)
+            if key and isinstance(photos, list) and photos:
+                # Telegram returns several sizes; the last one is the original upload
+                cache.set_file_id(key, photos[-1].file_id)
+        except Exception as e:
+            logger.debug(f"Could not record chart file_id: {e}")
+        return sent
+
     def get_upcoming_events(self, target_date: datetime, impact_levels: List[str],
                            minutes_before: int, user_timezone: str = "Europe/Prague") -> List[Dict[str, Any]]:
         """Get events that are coming up within the specified time window."""
@@ -226,51 +263,8 @@ class NotificationService:
             if not news_items:
                 return []
 
-            upcoming_events = []
-
-            # Get current time in user's timezone
-            try:
-                user_tz = pytz.timezone(user_timezone)
-                current_time = datetime.now(user_tz)
-            except Exception as e:
-                logger.error(f"Error getting user timezone {user_timezone}: {e}")
-                # Fallback to UTC
-                current_time = datetime.now(pytz.UTC)
-
-            for item in news_items:
-                # Check if this item matches the impact levels we're looking for
-                if item.get('impact') not in impact_levels:
-                    continue
-
-                # Parse the event time
-                try:
-                    time_str = item.get('time', '')
-                    if not time_str or time_str == 'N/A':
-                        continue
-
-                    # Parse time string to datetime
-                    event_time = self._parse_event_time(target_date, time_str, user_timezone)
-                    if not event_time:
-                        continue
-
-                    # Calculate time difference
-                    time_diff = event_time - current_time
-                    minutes_diff = time_diff.total_seconds() / 60
-
-                    # Check if event is within the notification window (exactly at the notification time)
-                    # Only send notification when we're exactly at the notification time (e.g., 30 minutes before)
-                    if abs(minutes_diff - minutes_before) <= 2.5:  # Allow 2.5 minute window for scheduling
-                        upcoming_events.append({
-                            'item': item,
-                            'minutes_until': int(minutes_diff),
-                            'event_time': event_time
-                        })
-
-                except Exception as e:
-                    logger.error(f"Error processing event time: {e}")
-                    continue
-
-            return upcoming_events
+            # Only due exactly at the notification time (e.g., 30 minutes before), within the match window
+            return NotificationMatcher(news_items, target_date).match(user_timezone, minutes_before, impact_levels)
 
         except Exception as e:
             logger.error(f"Error getting upcoming events: {e}")
@@ -278,34 +272,11 @@ class NotificationService:
 
     def _parse_event_time(self, target_date: datetime, time_str: str, user_timezone: str = "Europe/Prague") -> Optional[datetime]:
         """Parse event time string to datetime object."""
-        try:
-            # Handle various time formats
-            time_str = time_str.strip().lower()
-
-            if "am" in time_str or "pm" in time_str:
-                # 12-hour format
-                time_obj = datetime.strptime(time_str.replace("am", " AM").replace("pm", " PM"), "%I:%M %p")
-            else:
-                # 24-hour format
-                time_obj = datetime.strptime(time_str, "%H:%M")
-
-            # Combine with target date
-            event_datetime = datetime.combine(target_date.date(), time_obj.time())
-
-            # Convert to user's timezone
-            try:
-                user_tz = pytz.timezone(user_timezone)
-                event_datetime = user_tz.localize(event_datetime)
-            except Exception as e:
-                logger.error(f"Error localizing event time to {user_timezone}: {e}")
-                # Fallback to UTC
-                event_datetime = pytz.UTC.localize(event_datetime)
-
-            return event_datetime
-
-        except Exception as e:
-            logger.error(f"Error parsing time '{time_str}': {e}")
+        clock = parse_event_clock(time_str)
+        if clock is None:
             return None
+        # Combine with target date in the user's timezone
+        return resolve_timezone(user_timezone).localize(datetime.combine(target_date.date(), clock))
 
     def _group_events_by_time(self, events: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
         """Group events by their time to identify events happening at the same time."""
@@ -338,18 +309,27 @@ class NotificationService:
                 target_date = datetime.now()
 
             # Get upcoming events
-            impact_levels = user.get_notification_impact_levels_list()
-            user_timezone = user.get_timezone()
             upcoming_events = self.get_upcoming_events(
                 target_date,
-                impact_levels,
+                user.get_notification_impact_levels_list(),
                 user.notification_minutes,
-                user_timezone
+                user.get_timezone()
             )
 
             if not upcoming_events:
                 return True  # No events to notify about
 
+            return self._deliver_notifications(user, upcoming_events)
+
+        except Exception as e:
+            logger.error(f"Error sending notifications to user {user_id}: {e}")
+            return False
+
+    def _deliver_notifications(self, user, upcoming_events: List[Dict[str, Any]]) -> bool:
+        """Send already-matched upcoming events to one user, grouping events at the same time."""
+        user_id = user.telegram_id
+        user_timezone = user.get_timezone()
+        try:
             # Group events by time
             grouped_events = self._group_events_by_time(upcoming_events)
 
@@ -379,7 +359,7 @@ class NotificationService:
                             chart_buffer = self._generate_event_chart(item, user)
                             if chart_buffer and self.deduplication.can_send_chart(user_id):
                                 # Send message with chart
-                                self.bot.send_photo(user_id, chart_buffer, caption=message, parse_mode="HTML")
+                                self._send_chart_photo(user_id, chart_buffer, caption=message, parse_mode="HTML")
                                 logger.info(f"Sent notification with chart to user {user_id} for event at {item.get('time')}")
                                 # Mark chart sent for rate limit
                                 try:
@@ -480,34 +460,45 @@ class NotificationService:
             logger.error(f"Error generating chart for event {news_item.get('id')}: {e}")
             return None
 
-    def check_and_send_notifications_for_all_users(self, target_date: datetime = None) -> int:
-        """Check and send notifications for all users with notifications enabled."""
+    def check_and_send_notifications_for_all_users(self, target_date: datetime = None, now: datetime = None,
+                                                   window_minutes: float = MATCH_WINDOW_MINUTES) -> int:
+        """Check and send notifications for all users with notifications enabled.
+
+        ``now`` and ``window_minutes`` let trigger-driven runs match against their
+        scheduled instant with a tight tolerance instead of the polling window.
+        """
         try:
             if not self.db_service:
                 logger.error("Database service not available")
                 return 0
 
             # Check if notification columns exist
-            with self.db_service.db_manager.get_session() as session:
-                result = session.execute(text("""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = 'users' AND column_name IN ('notifications_enabled', 'notification_minutes', 'notification_impact_levels')
-                """))
-                notification_columns = [row[0] for row in result]
-
-                if len(notification_columns) < 3:
-                    logger.info("Notification columns not fully available, skipping notifications")
-                    return 0
+            if not self.db_service.schema.notifications_available:
+                logger.info("Notification columns not fully available, skipping notifications")
+                return 0
+
+            if not self.bot:
+                logger.error("Bot not available for notifications")
+                return 0
 
             # Get all users with notifications enabled
             users = self.db_service.get_users_with_notifications_enabled()
             if not users:
                 return 0
 
+            if target_date is None:
+                target_date = datetime.now()
+
+            # Load and parse the day's events once, then resolve users bucket by bucket
+            news_items = self.db_service.get_news_for_date(target_date.date(), 'all')
+            if not news_items:
+                return 0
+            matcher = NotificationMatcher(news_items, target_date)
+            due = matcher.match_users((UserPreferences.from_user(user) for user in users), now, window_minutes)
+
             notifications_sent = 0
-            for user in users:
-                if self.send_notifications(user.telegram_id, target_date):
+            for user, upcoming_events in due.items():
+                if self._deliver_notifications(user, upcoming_events):
                     notifications_sent += 1
 
             logger.info(f"Sent notifications to {notifications_sent} users")
@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class OpenAIDeadlineExceeded(Exception):
+    """Raised internally when a call runs past its deadline."""
+    pass
+
+
+class OpenAIClient:
+    """Chat completions over one pooled HTTP session shared by all callers.
+
+    At most ``max_concurrency`` requests run at once; further callers queue for
+    a slot. Every call has a deadline covering the wait for a slot, retries and
+    the response itself, so a slow model cannot hold a worker thread longer
+    than that. With ``on_delta`` the response is streamed and the callback gets
+    the text received so far after each chunk.
+    """
+
+    def __init__(self, api_url: str = OPENAI_CHAT_URL):
+        self.api_url = api_url
+        self.max_concurrency = max(1, int(os.getenv("OPENAI_MAX_CONCURRENCY", "2")))
+        self.deadline_sec = float(os.getenv("OPENAI_DEADLINE_SEC", "30"))
+        self.connect_timeout = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+        self.backoffs = [0.5, 1.0, 2.0]
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._stats_lock = threading.Lock()
+        self.stats = {'calls': 0, 'streamed': 0, 'failed': 0, 'retries': 0, 'deadline_exceeded': 0, 'busy': 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise OpenAIDeadlineExceeded()
+        return remaining
+
+    def chat(self, api_key: Optional[str], messages: List[Dict[str, str]], model: str,
+             temperature: float, max_tokens: int, deadline_sec: Optional[float] = None,
+             on_delta: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """Return the completion text, or None on failure or when the deadline passes."""
+        if not api_key:
+            return None
+        deadline = time.monotonic() + (self.deadline_sec if deadline_sec is None else deadline_sec)
+        self._count('calls')
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            logger.warning(f"OpenAI call gave up waiting for one of {self.max_concurrency} slots")
+            self._count('busy')
+            return None
+        try:
+            return self._request(api_key, messages, model, temperature, max_tokens, deadline, on_delta)
+        except OpenAIDeadlineExceeded:
+            logger.warning("OpenAI call cancelled at its deadline")
+            self._count('deadline_exceeded')
+            return None
+        finally:
+            self._slots.release()
+
+    def _request(self, api_key, messages, model, temperature, max_tokens, deadline, on_delta) -> Optional[str]:
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        data = {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "messages": messages,
+        }
+        if on_delta is not None:
+            data["stream"] = True
+
+        for attempt, delay in enumerate(self.backoffs, start=1):
+            timeout = (min(self.connect_timeout, self._remaining(deadline)), self._remaining(deadline))
+            try:
+                with self.session.post(self.api_url, headers=headers, json=data, timeout=timeout,
+                                       stream=on_delta is not None) as resp:
+                    if resp.status_code in _RETRY_STATUSES and attempt < len(self.backoffs):
+                        logger.warning(f"OpenAI transient error {resp.status_code}; attempt {attempt}/{len(self.backoffs)}")
+                    else:
+                        resp.raise_for_status()
+                        if on_delta is not None:
+                            self._count('streamed')
+                            return self._read_stream(resp, deadline, on_delta)
+                        j = resp.json()
+                        return j.get("choices", [{}])[0].get("message", {}).get("content", "").strip() or None
+            except OpenAIDeadlineExceeded:
+                raise
+            except requests.Timeout:
+                if deadline <= time.monotonic():
+                    raise OpenAIDeadlineExceeded()
+                logger.warning(f"OpenAI call timed out on attempt {attempt}")
+                if attempt == len(self.backoffs):
+                    self._count('failed')
+                    return None
+            except Exception as e:
+                logger.warning(f"OpenAI call failed on attempt {attempt}: {e}")
+                if attempt == len(self.backoffs):
+                    self._count('failed')
+                    return None
+            self._count('retries')
+            time.sleep(min(delay, self._remaining(deadline)))
+        return None
+
+    def _read_stream(self, resp, deadline: float, on_delta: Callable[[str], None]) -> Optional[str]:
+        """Accumulate server-sent ``data:`` chunks until ``[DONE]``."""
+        parts: List[str] = []
+        for line in resp.iter_lines(decode_unicode=True):
+            self._remaining(deadline)
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            try:
+                chunk = json.loads(payload)
+            except ValueError:
+                logger.debug(f"Skipping malformed stream chunk: {payload[:80]}")
+                continue
+            delta = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+            if not delta:
+                continue
+            parts.append(delta)
+            try:
+                on_delta("".join(parts))
+            except Exception as e:
+                logger.debug(f"Stream callback failed: {e}")
+        return "".join(parts).strip() or None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {**self.stats, 'max_concurrency': self.max_concurrency, 'deadline_sec': self.deadline_sec}
+
+
+openai_client = OpenAIClient()
@@ -0,0 +1,206 @@
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import time as dt_time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Postgres NOTIFY channel used to invalidate cached preferences in other processes
+PREFERENCES_CHANNEL = 'user_preferences_changed'
+
+
+@dataclass(frozen=True)
+class UserPreferences:
+    """Read-only snapshot of a user's settings.
+
+    Mirrors the read side of the ``User`` model so keyboards and handlers can use
+    either one. Change settings through ``update_user_preferences``, never here.
+    """
+
+    telegram_id: int
+    preferred_currencies: Optional[str] = ""
+    impact_levels: Optional[str] = "high,medium"
+    analysis_required: Optional[bool] = True
+    digest_time: Optional[dt_time] = None
+    notifications_enabled: Optional[bool] = False
+    notification_minutes: Optional[int] = 30
+    notification_impact_levels: Optional[str] = "high"
+    charts_enabled: Optional[bool] = False
+    chart_type: Optional[str] = "single"
+    chart_window_hours: Optional[int] = 2
+    timezone: Optional[str] = "Europe/Prague"
+
+    @classmethod
+    def from_user(cls, user) -> 'UserPreferences':
+        """Snapshot a ``User`` (ORM or manually built on older schemas)."""
+        return cls(
+            telegram_id=user.telegram_id,
+            preferred_currencies=user.preferred_currencies,
+            impact_levels=user.impact_levels,
+            analysis_required=user.analysis_required,
+            digest_time=user.digest_time,
+            notifications_enabled=getattr(user, 'notifications_enabled', None),
+            notification_minutes=getattr(user, 'notification_minutes', None),
+            notification_impact_levels=getattr(user, 'notification_impact_levels', None),
+            charts_enabled=getattr(user, 'charts_enabled', None),
+            chart_type=getattr(user, 'chart_type', None),
+            chart_window_hours=getattr(user, 'chart_window_hours', None),
+            timezone=getattr(user, 'timezone', None),
+        )
+
+    def get_currencies_list(self) -> List[str]:
+        """Get preferred currencies as a list."""
+        if not self.preferred_currencies:
+            return []
+        return [c.strip() for c in self.preferred_currencies.split(",") if c.strip()]
+
+    def get_impact_levels_list(self) -> List[str]:
+        """Get impact levels as a list."""
+        if not self.impact_levels:
+            return ["high", "medium"]
+        return [i.strip() for i in self.impact_levels.split(",") if i.strip()]
+
+    def get_notification_impact_levels_list(self) -> List[str]:
+        """Get notification impact levels as a list."""
+        if not self.notification_impact_levels:
+            return ["high"]
+        return [i.strip() for i in self.notification_impact_levels.split(",") if i.strip()]
+
+    def get_timezone(self) -> str:
+        """Get user's timezone."""
+        return self.timezone or 'Europe/Prague'
+
+
+class UserPreferenceCache:
+    """Bounded LRU of ``UserPreferences`` with a time-to-live per entry.
+
+    Loads capture a generation with ``begin_load`` and hand it back to ``put``; an
+    invalidation in between bumps the generation so a stale load is not stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_sec: float = 300.0):
+        self.max_entries = max(1, max_entries)
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[int, tuple[float, UserPreferences]]' = OrderedDict()
+        self._generation = 0
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get(self, telegram_id: int) -> Optional[UserPreferences]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(telegram_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[telegram_id]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(telegram_id)
+            self._hits += 1
+            return entry[1]
+
+    def begin_load(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def put(self, preferences: UserPreferences, generation: Optional[int] = None) -> bool:
+        """Store a snapshot unless an invalidation happened since ``generation``."""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._entries[preferences.telegram_id] = (time.monotonic() + self.ttl_sec, preferences)
+            self._entries.move_to_end(preferences.telegram_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, telegram_id: int):
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._entries.pop(telegram_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_sec': self.ttl_sec,
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations,
+            }
+
+
+class PreferenceInvalidationListener:
+    """Background LISTEN on ``PREFERENCES_CHANNEL`` that evicts entries changed by other processes.
+
+    PostgreSQL only. Holds one dedicated connection and reconnects with a delay
+    if it drops; entries still expire through the cache TTL in the meantime.
+    """
+
+    def __init__(self, engine, cache: UserPreferenceCache, channel: str = PREFERENCES_CHANNEL,
+                 poll_interval_sec: float = 5.0, reconnect_delay_sec: float = 10.0):
+        self.engine = engine
+        self.cache = cache
+        self.channel = channel
+        self.poll_interval_sec = poll_interval_sec
+        self.reconnect_delay_sec = reconnect_delay_sec
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='preference-listener', daemon=True)
+        self._thread.start()
+        logger.info(f"Listening for preference changes on '{self.channel}'")
+
+    def stop(self):
+        self._stop.set()
+
+    def _handle_payload(self, payload: str):
+        try:
+            self.cache.invalidate(int(payload))
+        except ValueError:
+            logger.warning(f"Ignoring malformed preference notification: {payload!r}")
+
+    def _listen_once(self):
+        raw = self.engine.raw_connection()
+        try:
+            conn = raw.driver_connection
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            # Anything cached before LISTEN started may have missed a notification
+            self.cache.clear()
+            while not self._stop.is_set():
+                if select.select([conn], [], [], self.poll_interval_sec) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._handle_payload(conn.notifies.pop(0).payload)
+        finally:
+            raw.invalidate()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen_once()
+            except Exception as e:
+                logger.error(f"Preference listener connection failed: {e}")
+                self.cache.clear()
+                self._stop.wait(self.reconnect_delay_sec)
@@ -0,0 +1,225 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class PriceBarStore:
+    """Persistent per-symbol/per-interval OHLC bar store backed by SQLite.
+
+    Bars are keyed by (symbol, interval, bar timestamp). Alongside the bars the
+    store records which time ranges were already fetched, so callers can ask for
+    the gaps of a requested window and only download what is missing.
+    """
+
+    def __init__(self, path: str, retention_days: int = 30):
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection; SQLite connections are not shared across threads."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _init_schema(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_bars (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    ts INTEGER NOT NULL,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL,
+                    PRIMARY KEY (symbol, interval, ts)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_coverage (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    start_ts INTEGER NOT NULL,
+                    end_ts INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_price_coverage_lookup
+                ON price_coverage (symbol, interval, start_ts)
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS indicator_state (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    updated_at INTEGER NOT NULL,
+                    PRIMARY KEY (symbol, interval)
+                )
+            """)
+
+    def _load_coverage(self, conn, symbol: str, interval: str, start_ts: int, end_ts: int) -> List[Tuple[int, int]]:
+        rows = conn.execute(
+            "SELECT start_ts, end_ts FROM price_coverage "
+            "WHERE symbol = ? AND interval = ? AND end_ts >= ? AND start_ts <= ? "
+            "ORDER BY start_ts",
+            (symbol, interval, start_ts, end_ts),
+        ).fetchall()
+        return [(int(r[0]), int(r[1])) for r in rows]
+
+    def missing_ranges(self, symbol: str, interval: str, start_ts: int, end_ts: int) -> List[Tuple[int, int]]:
+        """Return the sub-ranges of [start_ts, end_ts] (epoch seconds) not yet fetched."""
+        if end_ts <= start_ts:
+            return []
+        try:
+            with self._lock, self._connect() as conn:
+                covered = self._load_coverage(conn, symbol, interval, start_ts, end_ts)
+        except Exception as e:
+            logger.warning(f"Price store coverage lookup failed for {symbol} {interval}: {e}")
+            return [(start_ts, end_ts)]
+
+        gaps = []
+        cursor = start_ts
+        for cov_start, cov_end in covered:
+            if cov_start > cursor:
+                gaps.append((cursor, min(cov_start, end_ts)))
+            cursor = max(cursor, cov_end)
+            if cursor >= end_ts:
+                break
+        if cursor < end_ts:
+            gaps.append((cursor, end_ts))
+        return gaps
+
+    def load_bars(self, symbol: str, interval: str, start_ts: int, end_ts: int) -> pd.DataFrame:
+        """Load stored bars within [start_ts, end_ts] as a UTC-indexed OHLCV DataFrame."""
+        columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        try:
+            with self._lock, self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT ts, open, high, low, close, volume FROM price_bars "
+                    "WHERE symbol = ? AND interval = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+                    (symbol, interval, start_ts, end_ts),
+                ).fetchall()
+        except Exception as e:
+            logger.warning(f"Price store read failed for {symbol} {interval}: {e}")
+            return pd.DataFrame(columns=columns)
+
+        if not rows:
+            return pd.DataFrame(columns=columns)
+        frame = pd.DataFrame.from_records(rows, columns=['ts'] + columns)
+        frame.index = pd.to_datetime(frame.pop('ts'), unit='s', utc=True)
+        frame.index.name = None
+        return frame.astype(float)
+
+    def store_bars(self, symbol: str, interval: str, data: Optional[pd.DataFrame],
+                   covered_start_ts: Optional[int] = None, covered_end_ts: Optional[int] = None):
+        """Upsert bars and mark [covered_start_ts, covered_end_ts] as fetched."""
+        records = []
+        if data is not None and not data.empty:
+            index = pd.to_datetime(data.index, utc=True)
+            epoch = (index.asi8 // 10**9).tolist()
+
+            def _col(name):
+                if name not in data.columns:
+                    return [None] * len(data)
+                values = pd.to_numeric(data[name], errors='coerce').astype(object)
+                return values.where(pd.notna(values), None).tolist()
+
+            records = list(zip(
+                [symbol] * len(epoch), [interval] * len(epoch), epoch,
+                _col('Open'), _col('High'), _col('Low'), _col('Close'), _col('Volume'),
+            ))
+
+        try:
+            with self._lock, self._connect() as conn:
+                if records:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO price_bars "
+                        "(symbol, interval, ts, open, high, low, close, volume) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        records,
+                    )
+                if covered_start_ts is not None and covered_end_ts is not None and covered_end_ts > covered_start_ts:
+                    self._merge_coverage(conn, symbol, interval, int(covered_start_ts), int(covered_end_ts))
+        except Exception as e:
+            logger.warning(f"Price store write failed for {symbol} {interval}: {e}")
+
+    def _merge_coverage(self, conn, symbol: str, interval: str, start_ts: int, end_ts: int):
+        overlapping = self._load_coverage(conn, symbol, interval, start_ts, end_ts)
+        if overlapping:
+            start_ts = min(start_ts, overlapping[0][0])
+            end_ts = max(end_ts, max(r[1] for r in overlapping))
+            conn.execute(
+                "DELETE FROM price_coverage WHERE symbol = ? AND interval = ? AND end_ts >= ? AND start_ts <= ?",
+                (symbol, interval, start_ts, end_ts),
+            )
+        conn.execute(
+            "INSERT INTO price_coverage (symbol, interval, start_ts, end_ts) VALUES (?, ?, ?, ?)",
+            (symbol, interval, start_ts, end_ts),
+        )
+
+    def load_indicator_state(self, symbol: str, interval: str) -> Optional[str]:
+        """Return the serialized indicator state saved for symbol/interval, if any."""
+        try:
+            with self._lock, self._connect() as conn:
+                row = conn.execute(
+                    "SELECT state FROM indicator_state WHERE symbol = ? AND interval = ?",
+                    (symbol, interval),
+                ).fetchone()
+        except Exception as e:
+            logger.warning(f"Indicator state read failed for {symbol} {interval}: {e}")
+            return None
+        return row[0] if row else None
+
+    def store_indicator_state(self, symbol: str, interval: str, state: str):
+        """Save the serialized indicator state for symbol/interval, replacing the previous one."""
+        try:
+            with self._lock, self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO indicator_state (symbol, interval, state, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (symbol, interval, state, int(time.time())),
+                )
+        except Exception as e:
+            logger.warning(f"Indicator state write failed for {symbol} {interval}: {e}")
+
+    def prune(self, retention_days: Optional[int] = None) -> int:
+        """Delete bars and coverage older than the retention window. Returns bars removed."""
+        days = self.retention_days if retention_days is None else retention_days
+        cutoff = int(time.time()) - int(days * 86400)
+        try:
+            with self._lock, self._connect() as conn:
+                removed = conn.execute("DELETE FROM price_bars WHERE ts < ?", (cutoff,)).rowcount
+                conn.execute("DELETE FROM price_coverage WHERE end_ts < ?", (cutoff,))
+                conn.execute("DELETE FROM indicator_state WHERE updated_at < ?", (cutoff,))
+                conn.execute(
+                    "UPDATE price_coverage SET start_ts = ? WHERE start_ts < ?",
+                    (cutoff, cutoff),
+                )
+            if removed:
+                logger.info(f"Pruned {removed} stored price bars older than {days} days")
+            return removed
+        except Exception as e:
+            logger.warning(f"Price store prune failed: {e}")
+            return 0
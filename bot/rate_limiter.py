@@ -0,0 +1,145 @@
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketRateLimiter:
+    """Thread-safe token bucket with adaptive backoff on upstream throttling.
+
+    Tokens refill continuously at ``rate_per_sec`` up to ``burst``. A 429 from the
+    upstream halves the refill rate and starts a cooldown (honouring Retry-After
+    when given); successful calls restore the rate gradually.
+    """
+
+    def __init__(self, name: str, rate_per_sec: float, burst: int = 1,
+                 cooldown_sec: float = 90.0, max_cooldown_sec: float = 600.0,
+                 min_rate_per_sec: Optional[float] = None):
+        self.name = name
+        self.base_rate = max(0.001, float(rate_per_sec))
+        self.rate = self.base_rate
+        self.min_rate = min_rate_per_sec if min_rate_per_sec is not None else self.base_rate / 8
+        self.capacity = max(1, int(burst))
+        self.cooldown_sec = cooldown_sec
+        self.max_cooldown_sec = max_cooldown_sec
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._cooldown_until = 0.0
+        self._throttle_streak = 0
+
+        # Metrics
+        self._acquired = 0
+        self._waited = 0
+        self._total_wait_sec = 0.0
+        self._max_wait_sec = 0.0
+        self._timeouts = 0
+        self._throttled = 0
+        self._last_throttle_ts: Optional[float] = None
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is available. Returns False if ``timeout`` expires first."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(0.0, self._cooldown_until - now)
+                if wait <= 0:
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        self._record_acquire(now - started)
+                        return True
+                    wait = (1.0 - self._tokens) / self.rate
+
+            if timeout is not None and (time.monotonic() - started) + wait > timeout:
+                with self._lock:
+                    self._timeouts += 1
+                return False
+            if wait > 5:
+                logger.info(f"{self.name} rate limiter: waiting {wait:.1f}s for a request slot")
+            time.sleep(wait)
+
+    def _record_acquire(self, waited: float):
+        self._acquired += 1
+        if waited > 0.001:
+            self._waited += 1
+            self._total_wait_sec += waited
+            self._max_wait_sec = max(self._max_wait_sec, waited)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Register an upstream 429: slow the refill rate and enter a cooldown."""
+        with self._lock:
+            self._throttled += 1
+            self._throttle_streak += 1
+            self._last_throttle_ts = time.time()
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after is not None and retry_after > 0:
+                seconds = float(retry_after)
+            else:
+                seconds = min(self.max_cooldown_sec, self.cooldown_sec * (2 ** (self._throttle_streak - 1)))
+                seconds += random.uniform(0, seconds * 0.25)
+            now = time.monotonic()
+            self._cooldown_until = max(self._cooldown_until, now + seconds)
+            self._tokens = 0.0
+            self._last_refill = now
+        logger.warning(f"{self.name} rate limiter: throttled upstream, cooling down ~{seconds:.1f}s "
+                       f"(rate now {self.rate:.3f}/s)")
+
+    def record_success(self):
+        """Register a successful call; recovers the refill rate additively."""
+        with self._lock:
+            self._throttle_streak = 0
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+    def in_cooldown(self) -> bool:
+        with self._lock:
+            return time.monotonic() < self._cooldown_until
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return limiter configuration and wait-time metrics."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'name': self.name,
+                'rate_per_sec': round(self.rate, 4),
+                'base_rate_per_sec': round(self.base_rate, 4),
+                'burst': self.capacity,
+                'tokens_available': round(min(self.capacity, self._tokens + max(0.0, now - self._last_refill) * self.rate), 2),
+                'cooldown_remaining_sec': round(max(0.0, self._cooldown_until - now), 1),
+                'acquired': self._acquired,
+                'waited': self._waited,
+                'total_wait_sec': round(self._total_wait_sec, 2),
+                'avg_wait_sec': round(self._total_wait_sec / self._acquired, 3) if self._acquired else 0.0,
+                'max_wait_sec': round(self._max_wait_sec, 2),
+                'timeouts': self._timeouts,
+                'throttled': self._throttled,
+                'last_throttle_at': self._last_throttle_ts,
+            }
+
+
+def _yahoo_limiter_from_env() -> TokenBucketRateLimiter:
+    min_interval = float(os.getenv('YF_MIN_REQUEST_INTERVAL_SEC', '3.0'))
+    default_rate = 1.0 / min_interval if min_interval > 0 else 1.0
+    return TokenBucketRateLimiter(
+        name='yahoo',
+        rate_per_sec=float(os.getenv('YF_RATE_LIMIT_PER_SEC', str(default_rate))),
+        burst=int(os.getenv('YF_RATE_LIMIT_BURST', '2')),
+        cooldown_sec=float(os.getenv('YF_COOLDOWN_SEC', '90')),
+    )
+
+
+# Shared limiter for every outbound Yahoo market-data request in the process
+yahoo_rate_limiter = _yahoo_limiter_from_env()
@@ -0,0 +1,216 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _init_render_worker():
+    """Load the headless backend and the chart code once per worker process."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from . import chart_render  # noqa: F401
+
+
+class ChartRenderPool:
+    """Renders charts in worker processes so request threads only wait on a future.
+
+    Jobs are module-level functions returning PNG bytes. At most ``max_pending`` jobs
+    are queued or running; ``render`` waits ``timeout_sec`` for a result and gives up
+    (returning None) after that, recycling the pool so the stuck worker is killed and
+    its slot freed. With ``workers=0`` or a broken pool, jobs run inline.
+
+    Workers use the spawn start method and re-import the parent's ``__main__``; the
+    production entry point is gunicorn, for ad-hoc scripts keep work under a
+    ``__main__`` guard or set CHART_RENDER_WORKERS=0.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 timeout_sec: Optional[float] = None, queue_wait_sec: Optional[float] = None):
+        if workers is None:
+            workers = int(os.getenv('CHART_RENDER_WORKERS', str(min(2, os.cpu_count() or 1))))
+        self.workers = max(0, workers)
+        if max_pending is None:
+            max_pending = int(os.getenv('CHART_RENDER_QUEUE_SIZE', str(max(1, self.workers) * 4)))
+        self.max_pending = max(1, max_pending)
+        self.timeout_sec = timeout_sec if timeout_sec is not None else float(os.getenv('CHART_RENDER_TIMEOUT_SEC', '60'))
+        self.queue_wait_sec = queue_wait_sec if queue_wait_sec is not None else float(os.getenv('CHART_RENDER_QUEUE_WAIT_SEC', '10'))
+        self.max_tasks_per_child = int(os.getenv('CHART_RENDER_MAX_TASKS_PER_CHILD', '100'))
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Futures still holding a queue slot, with the executor running them
+        self._held: Dict[Future, ProcessPoolExecutor] = {}
+        self._broken = False
+
+        # Metrics
+        self._submitted = 0
+        self._completed = 0
+        self._inline = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._failures = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0 and not self._broken
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that runs gunicorn/APScheduler threads is unsafe
+                kwargs = {}
+                if self.max_tasks_per_child > 0:
+                    kwargs['max_tasks_per_child'] = self.max_tasks_per_child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_render_worker,
+                    **kwargs,
+                )
+                logger.info(f"Started chart render pool with {self.workers} worker(s)")
+            return self._executor
+
+    def _release_slot(self, future: Future):
+        with self._lock:
+            if self._held.pop(future, None) is None:
+                return
+        self._slots.release()
+
+    def _reset_executor(self, expected: Optional[ProcessPoolExecutor] = None):
+        """Drop the current executor, kill its workers and free the slots its jobs held.
+
+        With ``expected`` the reset only happens if that executor is still the current one,
+        so a job failing on an executor that was already replaced leaves the new one alone.
+        """
+        with self._lock:
+            if expected is not None and self._executor is not expected:
+                return
+            executor, self._executor = self._executor, None
+            orphaned = [f for f, owner in self._held.items() if owner is executor]
+        if executor is None:
+            return
+        # A running job cannot be cancelled; terminating its process is the only way to stop it
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            try:
+                process.terminate()
+            except Exception as e:
+                logger.warning(f"Could not terminate chart render worker: {e}")
+        executor.shutdown(wait=False, cancel_futures=True)
+        for future in orphaned:
+            self._release_slot(future)
+
+    def _run_inline(self, fn: Callable, *args, **kwargs) -> Future:
+        future: Future = Future()
+        with self._lock:
+            self._inline += 1
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """Queue a render job. Returns None when the queue stays full for ``queue_wait_sec``."""
+        if not self.enabled:
+            return self._run_inline(fn, *args, **kwargs)
+
+        if not self._slots.acquire(timeout=self.queue_wait_sec):
+            with self._lock:
+                self._rejected += 1
+            logger.warning(f"Chart render queue full ({self.max_pending} pending), dropping {fn.__name__}")
+            return None
+
+        try:
+            executor = self._get_executor()
+            future = executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self._slots.release()
+            logger.warning("Chart render pool is broken; restarting it")
+            self._reset_executor()
+            try:
+                if not self._slots.acquire(timeout=self.queue_wait_sec):
+                    return None
+                executor = self._get_executor()
+                future = executor.submit(fn, *args, **kwargs)
+            except Exception as e:
+                self._slots.release()
+                logger.error(f"Chart render pool unavailable, rendering inline from now on: {e}")
+                self._broken = True
+                return self._run_inline(fn, *args, **kwargs)
+        except Exception as e:
+            self._slots.release()
+            logger.error(f"Failed to submit chart render job, rendering inline from now on: {e}")
+            self._broken = True
+            return self._run_inline(fn, *args, **kwargs)
+
+        with self._lock:
+            self._submitted += 1
+            self._held[future] = executor
+        # The slot is held until the worker finishes (or is killed), even if the caller stopped waiting
+        future.add_done_callback(self._release_slot)
+        return future
+
+    def render(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Optional[Any]:
+        """Run ``fn(*args, **kwargs)`` in the pool and wait for its result (None on failure)."""
+        future = self.submit(fn, *args, **kwargs)
+        if future is None:
+            return None
+        with self._lock:
+            executor = self._held.get(future)
+        try:
+            result = future.result(timeout=timeout if timeout is not None else self.timeout_sec)
+            with self._lock:
+                self._completed += 1
+            return result
+        except FutureTimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            if not future.cancel():
+                logger.error(f"Chart render job {fn.__name__} timed out; restarting the render pool")
+                self._reset_executor(executor)
+            else:
+                logger.error(f"Chart render job {fn.__name__} timed out before it started")
+            return None
+        except BrokenProcessPool as e:
+            with self._lock:
+                self._failures += 1
+            logger.error(f"Chart render worker died during {fn.__name__}: {e}")
+            if executor is not None:
+                self._reset_executor(executor)
+            return None
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+            logger.error(f"Chart render job {fn.__name__} failed: {e}")
+            return None
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'enabled': self.workers > 0 and not self._broken,
+                'max_pending': self.max_pending,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'inline': self._inline,
+                'rejected': self._rejected,
+                'timeouts': self._timeouts,
+                'failures': self._failures,
+            }
+
+
+# Shared pool for all chart rendering in the process
+chart_render_pool = ChartRenderPool()
@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from typing import Dict, FrozenSet, Iterable, List
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# User columns added by later migrations; older databases may lack some of them
+USER_OPTIONAL_COLUMNS = (
+    'notifications_enabled', 'notification_minutes', 'notification_impact_levels',
+    'charts_enabled', 'chart_type', 'chart_window_hours', 'timezone'
+)
+NOTIFICATION_COLUMNS = ('notifications_enabled', 'notification_minutes', 'notification_impact_levels')
+CHART_COLUMNS = ('charts_enabled', 'chart_type', 'chart_window_hours')
+
+
+class SchemaCapabilities:
+    """In-memory view of which tables and columns exist in the database.
+
+    Loaded once via SQLAlchemy's inspector (works on PostgreSQL and SQLite) and
+    reloaded with ``refresh()`` after schema migrations, so request paths never
+    query the catalog themselves.
+    """
+
+    def __init__(self, engine: Engine, retry_interval_sec: float = 60.0):
+        self.engine = engine
+        self.retry_interval_sec = retry_interval_sec
+        self._lock = threading.Lock()
+        self._tables: Dict[str, FrozenSet[str]] = {}
+        self._indexes: Dict[str, FrozenSet[str]] = {}
+        self._loaded = False
+        self._last_attempt = 0.0
+        self.refresh()
+
+    def refresh(self) -> bool:
+        """Reload the table and column catalog. Keeps the previous view on failure."""
+        self._last_attempt = time.monotonic()
+        try:
+            inspector = inspect(self.engine)
+            table_names = inspector.get_table_names()
+            tables = {
+                name: frozenset(col['name'] for col in inspector.get_columns(name))
+                for name in table_names
+            }
+            indexes = {
+                name: frozenset(idx['name'] for idx in inspector.get_indexes(name) if idx.get('name'))
+                for name in table_names
+            }
+        except Exception as e:
+            logger.error(f"Failed to inspect database schema: {e}")
+            return False
+
+        with self._lock:
+            self._tables = tables
+            self._indexes = indexes
+            self._loaded = True
+        logger.info(f"Schema capabilities loaded: users has {len(tables.get('users', ()))} columns")
+        return True
+
+    def _ensure_loaded(self):
+        # Startup inspection may fail while the database is unreachable; retry lazily
+        if not self._loaded and time.monotonic() - self._last_attempt >= self.retry_interval_sec:
+            self.refresh()
+
+    def columns(self, table: str) -> FrozenSet[str]:
+        self._ensure_loaded()
+        with self._lock:
+            return self._tables.get(table, frozenset())
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column in self.columns(table)
+
+    def has_columns(self, table: str, columns: Iterable[str]) -> bool:
+        available = self.columns(table)
+        return all(col in available for col in columns)
+
+    def has_index(self, table: str, index: str) -> bool:
+        self._ensure_loaded()
+        with self._lock:
+            return index in self._indexes.get(table, frozenset())
+
+    def present(self, table: str, columns: Iterable[str]) -> List[str]:
+        """Return the given columns that exist, in the given order."""
+        available = self.columns(table)
+        return [col for col in columns if col in available]
+
+    @property
+    def users_complete(self) -> bool:
+        """True when every optional user column exists, so the ORM model can be used as-is."""
+        return self.has_columns('users', USER_OPTIONAL_COLUMNS)
+
+    @property
+    def notifications_available(self) -> bool:
+        return self.has_columns('users', NOTIFICATION_COLUMNS)
@@ -1,12 +1,16 @@
 import asyncio
 import logging
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Dict, Any
 
+import requests
 from bs4 import BeautifulSoup
 from pytz import timezone
 from .config import Config
 from .utils import escape_markdown_v2, send_long_message
+from .browser_session import BrowserSession
+from .calendar_parser import FIELD_CLASSES as CALENDAR_FIELD_CLASSES, parse_calendar_rows, select_day_rows
+from .openai_client import openai_client
 import re
 
 logger = logging.getLogger(__name__)
@@ -21,6 +25,7 @@ import time
 import os
 import sys
 import subprocess
+import threading
 
 class CloudflareBypassError(Exception):
     """Custom exception for Cloudflare challenge detection."""
@@ -31,7 +36,6 @@ class ChatGPTAnalyzer:
 
     def __init__(self, api_key: Optional[str]):
         self.api_key = api_key
-        self.api_url = "https://api.openai.com/v1/chat/completions"
         if not self.api_key:
             logger.warning("ChatGPT API key not configured. Analysis will be skipped.")
 
@@ -40,25 +44,16 @@ class ChatGPTAnalyzer:
             return "⚠️ ChatGPT analysis skipped: API key not configured."
 
         try:
-            import requests
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            }
             prompt = self._create_analysis_prompt(news_item)
-            data = {
-                "model": "gpt-4",
-                "messages": [
-                    {"role": "system", "content": "You are a financial analyst specializing in Forex markets."},
-                    {"role": "user", "content": prompt},
-                ],
-                "max_tokens": 150,
-                "temperature": 0.7,
-            }
-            response = requests.post(self.api_url, headers=headers, json=data, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            analysis = result["choices"][0]["message"]["content"].strip()
+            messages = [
+                {"role": "system", "content": "You are a financial analyst specializing in Forex markets."},
+                {"role": "user", "content": prompt},
+            ]
+            # Pooled client with a deadline instead of a fresh connection per call
+            analysis = openai_client.chat(self.api_key, messages, model="gpt-4", temperature=0.7,
+                                          max_tokens=150, deadline_sec=10)
+            if not analysis:
+                raise RuntimeError("no analysis returned")
             return escape_markdown_v2(analysis)
         except Exception as e:
             logger.error("ChatGPT analysis failed: %s", e)
@@ -88,31 +83,45 @@ class ForexNewsScraper:
         'icon--ff-impact-yel': 'low',    # Yellow (dash, fallback)
     }
 
+    # Chrome binary and version lookups, shared by every scraper in the process
+    _chrome_discovery: Dict[str, str] = {}
+
     def __init__(self, config: Config, analyzer: ChatGPTAnalyzer):
         self.config = config
         self.analyzer = analyzer
         self.base_url = "https://www.forexfactory.com/calendar"
+        # Warm browser reused across scrapes, recycled after N pages, max age or a failure
+        self.browser = BrowserSession(
+            self._create_driver,
+            max_pages=int(os.getenv("BROWSER_SESSION_MAX_PAGES", "50")),
+            max_age_sec=float(os.getenv("BROWSER_SESSION_MAX_AGE_SEC", "1800"))
+        )
+        # Plain HTTP tier that replays the browser's cookies before a browser is used
+        self.http_fetch_enabled = os.getenv("HTTP_FETCH_ENABLED", "true").lower() == "true"
+        self.http_fetch_timeout = float(os.getenv("HTTP_FETCH_TIMEOUT", "15"))
+        self.http_session = requests.Session()
+        self.http_session.headers.update({
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        })
+        # Cookies and headers built from one browser clearance, passed per request so
+        # concurrent fetches never see the shared session half way through a swap
+        self._http_clearance_lock = threading.Lock()
+        self._http_clearance_version = 0
+        self._http_clearance = None
+        self._stats_lock = threading.Lock()
+        self.fetch_stats = {'http': 0, 'http_blocked': 0, 'browser': 0}
+
+    def close(self):
+        """Shut down the warm browser session."""
+        self.browser.close()
 
     async def scrape_news(self, target_date: Optional[datetime] = None, analysis_required: bool = False, debug: bool = False) -> List[Dict[str, Any]]:
         if target_date is None:
             target_date = datetime.now(timezone(self.config.timezone))
         url = self._build_url(target_date)
         logger.info(f"Fetching URL: {url}")
-
-        # Try the new Selenium approach with Cloudflare challenge handling
-        try:
-            html = await self._scrape_with_selenium(url)
-            logger.info("Successfully scraped with Selenium")
-        except Exception as e:
-            logger.error(f"Selenium scraping failed: {e}")
-            # Fallback to the old method if Selenium fails
-            try:
-                logger.info("Trying fallback method...")
-                html = await asyncio.to_thread(self._fetch_with_undetected_chromedriver, url)
-                logger.info("Successfully scraped with fallback method")
-            except Exception as fallback_e:
-                logger.error(f"Fallback method also failed: {fallback_e}")
-                raise CloudflareBypassError(f"All scraping methods failed: {e}, fallback: {fallback_e}")
+        html = await self._fetch_html(url)
 
         news_items = self._parse_news_from_html(html)
         # Disable ChatGPT analysis globally
@@ -148,66 +157,179 @@ class ForexNewsScraper:
         logger.info("Collected %s news items", len(news_items))
         return news_items
 
+    async def scrape_week(self, week_start: date) -> Dict[date, List[Dict[str, Any]]]:
+        """Scrape a whole calendar week with one page load, keyed by day.
+
+        Only days whose date header appeared on the page are returned, so callers
+        can fall back to the day view for anything missing.
+        """
+        url = self._build_week_url(week_start)
+        logger.info(f"Fetching URL: {url}")
+        html = await self._fetch_html(url)
+        days = self._parse_week_from_html(html, week_start)
+        for news_items in days.values():
+            for item in news_items:
+                item['analysis'] = None
+                item['group_analysis'] = False
+        logger.info("Collected %s news items over %s days", sum(len(v) for v in days.values()), len(days))
+        return days
+
+    async def _fetch_html(self, url: str) -> str:
+        # Cheap tier first: replay the browser's clearance over plain HTTP
+        if self.http_fetch_enabled and self.browser.clearance:
+            html = await asyncio.to_thread(self._fetch_with_http, url)
+            if html is not None:
+                return html
+
+        # Try the new Selenium approach with Cloudflare challenge handling
+        self._count_fetch('browser')
+        try:
+            html = await self._scrape_with_selenium(url)
+            logger.info("Successfully scraped with Selenium")
+        except Exception as e:
+            logger.error(f"Selenium scraping failed: {e}")
+            # Fallback to the old method if Selenium fails
+            try:
+                logger.info("Trying fallback method...")
+                html = await asyncio.to_thread(self._fetch_with_undetected_chromedriver, url)
+                logger.info("Successfully scraped with fallback method")
+            except Exception as fallback_e:
+                logger.error(f"Fallback method also failed: {fallback_e}")
+                raise CloudflareBypassError(f"All scraping methods failed: {e}, fallback: {fallback_e}")
+        return html
+
+    def _count_fetch(self, key: str):
+        with self._stats_lock:
+            self.fetch_stats[key] += 1
+
+    def _http_request_state(self):
+        """Cookie jar and headers for the browser's latest clearance, rebuilt when it changes."""
+        with self._http_clearance_lock:
+            version = self.browser.clearance_version
+            if self._http_clearance is None or self._http_clearance_version != version:
+                clearance = self.browser.clearance
+                cookies = requests.cookies.RequestsCookieJar()
+                for cookie in clearance['cookies']:
+                    cookies.set(cookie['name'], cookie['value'],
+                                domain=cookie.get('domain'), path=cookie.get('path', '/'))
+                headers = {}
+                if clearance.get('user_agent'):
+                    headers['User-Agent'] = clearance['user_agent']
+                self._http_clearance = (cookies, headers)
+                self._http_clearance_version = version
+            return self._http_clearance
+
+    def _fetch_with_http(self, url: str) -> Optional[str]:
+        """GET the page with the last browser session's cookies; None when it gets blocked."""
+        try:
+            cookies, headers = self._http_request_state()
+            response = self.http_session.get(url, cookies=cookies, headers=headers,
+                                             timeout=self.http_fetch_timeout)
+            html = response.text
+            if response.status_code == 200 and self._is_calendar_page(html):
+                self._count_fetch('http')
+                logger.info(f"Fetched {url} over HTTP ({len(html)} bytes)")
+                return html
+            logger.info(f"HTTP fetch blocked (status {response.status_code}), escalating to browser")
+        except Exception as e:
+            logger.warning(f"HTTP fetch failed, escalating to browser: {e}")
+        self._count_fetch('http_blocked')
+        return None
+
+    def _is_calendar_page(self, html: str) -> bool:
+        # Cloudflare-proxied pages mention "cloudflare" in their script tags, so a page
+        # that carries the calendar table and no challenge is accepted as well
+        if 'calendar__table' in html and not self._is_challenge_page(html):
+            return True
+        return not self._is_blocked_content(html)
+
+    def get_fetch_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.fetch_stats)
+        return {**stats, 'browser_session': self.browser.get_stats()}
+
     def _build_url(self, target_date: datetime) -> str:
         date_str = target_date.strftime("%b%d.%Y").lower()
         return f"{self.base_url}?day={date_str}"
 
+    def _build_week_url(self, week_start: date) -> str:
+        date_str = week_start.strftime("%b%d.%Y").lower()
+        return f"{self.base_url}?week={date_str}"
+
     async def _scrape_with_selenium(self, url: str) -> str:
-        """Scrape using undetected-chromedriver with human-like behavior."""
+        """Scrape using the warm undetected-chromedriver session with human-like behavior."""
         try:
-            # Resolve Chrome binary cross-platform
-            chrome_binary = self._find_chrome_binary()
-            if chrome_binary:
-                logger.info(f"Using Chrome binary: {chrome_binary}")
-            else:
-                logger.warning("Chrome binary not found via known paths; proceeding without explicit binary_location")
+            # The driver blocks; keep it off the event loop
+            return await asyncio.to_thread(self._load_in_session, url)
+        except Exception as e:
+            logger.error(f"Selenium scraping failed: {e}")
+            raise CloudflareBypassError(f"Selenium error: {e}")
 
-            # Try to detect installed Chrome major version for matching driver
-            chrome_major_version = self._get_chrome_major_version(chrome_binary)
-            if chrome_major_version:
-                logger.info(f"Detected Chrome major version: {chrome_major_version}")
-            else:
-                logger.warning("Could not detect Chrome version; letting undetected-chromedriver decide")
-
-            options = uc.ChromeOptions()
-            if chrome_binary:
-                options.binary_location = chrome_binary
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--disable-web-security")
-            options.add_argument("--disable-features=VizDisplayCompositor")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-plugins")
-            # Don't disable images and JavaScript for Cloudflare challenge
-            # options.add_argument("--disable-images")
-            # options.add_argument("--disable-javascript")
-            options.add_argument("--disable-default-apps")
-            options.add_argument("--disable-sync")
-            options.add_argument("--disable-translate")
-            options.add_argument("--disable-background-timer-throttling")
-            options.add_argument("--disable-backgrounding-occluded-windows")
-            options.add_argument("--disable-renderer-backgrounding")
-            options.add_argument("--disable-field-trial-config")
-            options.add_argument("--disable-ipc-flooding-protection")
-            options.add_argument("--no-first-run")
-            options.add_argument("--no-default-browser-check")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            # Add headless mode
-            options.add_argument("--headless=new")
-            # Add user agent
-            options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-            # Remove problematic experimental options
-            # options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            # options.add_experimental_option("useAutomationExtension", False)
-
-            # Pin driver to installed Chrome major version when known to avoid mismatch
-            if chrome_major_version:
-                driver = uc.Chrome(options=options, version_main=int(chrome_major_version))
-            else:
-                driver = uc.Chrome(options=options)
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    def _create_driver(self):
+        """Start a headless undetected-chromedriver matching the installed Chrome."""
+        # Resolve Chrome binary cross-platform
+        chrome_binary = self._find_chrome_binary()
+        if chrome_binary:
+            logger.info(f"Using Chrome binary: {chrome_binary}")
+        else:
+            logger.warning("Chrome binary not found via known paths; proceeding without explicit binary_location")
+
+        # Try to detect installed Chrome major version for matching driver
+        chrome_major_version = self._get_chrome_major_version(chrome_binary)
+        if chrome_major_version:
+            logger.info(f"Detected Chrome major version: {chrome_major_version}")
+        else:
+            logger.warning("Could not detect Chrome version; letting undetected-chromedriver decide")
+
+        options = uc.ChromeOptions()
+        if chrome_binary:
+            options.binary_location = chrome_binary
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-web-security")
+        options.add_argument("--disable-features=VizDisplayCompositor")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-plugins")
+        # Don't disable images and JavaScript for Cloudflare challenge
+        # options.add_argument("--disable-images")
+        # options.add_argument("--disable-javascript")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-sync")
+        options.add_argument("--disable-translate")
+        options.add_argument("--disable-background-timer-throttling")
+        options.add_argument("--disable-backgrounding-occluded-windows")
+        options.add_argument("--disable-renderer-backgrounding")
+        options.add_argument("--disable-field-trial-config")
+        options.add_argument("--disable-ipc-flooding-protection")
+        options.add_argument("--no-first-run")
+        options.add_argument("--no-default-browser-check")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        # Add headless mode
+        options.add_argument("--headless=new")
+        # Add user agent
+        options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        # Remove problematic experimental options
+        # options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        # options.add_experimental_option("useAutomationExtension", False)
+
+        # Pin driver to installed Chrome major version when known to avoid mismatch
+        if chrome_major_version:
+            driver = uc.Chrome(options=options, version_main=int(chrome_major_version))
+        else:
+            driver = uc.Chrome(options=options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        return driver
 
+    @staticmethod
+    def _is_challenge_page(page_source: str) -> bool:
+        lowered = page_source.lower()
+        return "just a moment" in lowered or "verifying you are human" in lowered
+
+    def _load_in_session(self, url: str) -> str:
+        with self.browser.lock:
+            driver = self.browser.acquire()
+            fresh_session = self.browser.pages == 0
             try:
                 logger.info(f"Navigating to {url}")
                 driver.get(url)
@@ -215,13 +337,15 @@ class ForexNewsScraper:
                 # Wait for page to load and check for Cloudflare challenge
                 max_wait = 30
                 wait_time = 0
+                challenged = False
                 while wait_time < max_wait:
                     page_source = driver.page_source
 
                     # Check if we're still on Cloudflare challenge page
-                    if "just a moment" in page_source.lower() or "verifying you are human" in page_source.lower():
+                    if self._is_challenge_page(page_source):
                         logger.info("Cloudflare challenge detected, waiting...")
-                        await asyncio.sleep(2)
+                        challenged = True
+                        time.sleep(2)
                         wait_time += 2
                         continue
 
@@ -231,32 +355,33 @@ class ForexNewsScraper:
                         break
 
                     logger.info("Waiting for page to load...")
-                    await asyncio.sleep(1)
+                    time.sleep(1)
                     wait_time += 1
 
                 if wait_time >= max_wait:
                     logger.warning("Timeout waiting for page to load")
 
-                # Add human-like behavior
-                self._add_human_behavior(driver)
+                # Human-like behavior matters while earning clearance; a cleared session skips it
+                if fresh_session or challenged:
+                    self._add_human_behavior(driver)
 
                 # Get final page source
                 page_source = driver.page_source
 
                 # Final check for Cloudflare challenge
-                if "just a moment" in page_source.lower() or "verifying you are human" in page_source.lower():
+                if self._is_challenge_page(page_source):
                     logger.warning("Still on Cloudflare challenge page after waiting")
+                    # Clearance is lost for this profile; start over next time
+                    self.browser.recycle("Cloudflare challenge not cleared")
                     return page_source
 
+                self.browser.page_done()
                 logger.info("Scraping completed successfully")
                 return page_source
 
-            finally:
-                driver.quit()
-
-        except Exception as e:
-            logger.error(f"Selenium scraping failed: {e}")
-            raise CloudflareBypassError(f"Selenium error: {e}")
+            except Exception as e:
+                self.browser.recycle(f"page load failed: {e}")
+                raise
 
     def _add_human_behavior(self, driver):
         """Add human-like behavior to avoid detection."""
@@ -356,7 +481,12 @@ class ForexNewsScraper:
             driver.quit()
 
     def _find_chrome_binary(self) -> str:
-        """Attempt to find the Chrome/Chromium binary across platforms."""
+        """Attempt to find the Chrome/Chromium binary across platforms (cached per process)."""
+        if 'binary' not in self._chrome_discovery:
+            self._chrome_discovery['binary'] = self._discover_chrome_binary()
+        return self._chrome_discovery['binary']
+
+    def _discover_chrome_binary(self) -> str:
         candidate_paths: List[str] = []
         if sys.platform.startswith("linux"):
             candidate_paths = [
@@ -388,7 +518,13 @@ class ForexNewsScraper:
         return ""
 
     def _get_chrome_major_version(self, chrome_binary_path: Optional[str]) -> str:
-        """Return Chrome major version as string if detectable, else empty string."""
+        """Return Chrome major version as string if detectable, else empty string (cached per binary)."""
+        key = f"version:{chrome_binary_path or ''}"
+        if key not in self._chrome_discovery:
+            self._chrome_discovery[key] = self._probe_chrome_major_version(chrome_binary_path)
+        return self._chrome_discovery[key]
+
+    def _probe_chrome_major_version(self, chrome_binary_path: Optional[str]) -> str:
         try:
             version_output = ""
             if chrome_binary_path and os.path.exists(chrome_binary_path):
@@ -417,10 +553,18 @@ class ForexNewsScraper:
             return ""
 
     def _parse_news_from_html(self, html: str) -> List[Dict[str, str]]:
-        soup = BeautifulSoup(html, 'html.parser')
         # Cloudflare/fallback detection
         if "cloudflare" in html.lower() or "just a moment" in html.lower() or "attention required" in html.lower():
             logger.warning("Cloudflare or fallback content detected in page source!")
+        # Fast path: lxml over the calendar table only
+        table_rows = parse_calendar_rows(html)
+        if table_rows:
+            rows = select_day_rows(table_rows)
+            if rows:
+                logger.info(f"Found {len(rows)} rows in calendar table")
+                return self._collect_news_items(rows)
+
+        soup = BeautifulSoup(html, 'html.parser')
         # Try multiple selectors for event rows
         selectors = [
             'table.calendar__table tr.calendar__row[data-event-id]',
@@ -444,21 +588,79 @@ class ForexNewsScraper:
                     f.write(html)
             except Exception as e:
                 logger.warning(f"Failed to save debug HTML: {e}")
+        return self._collect_news_items([self._row_fields(row) for row in rows])
+
+    # Day headers in the week view read like "Mon Mar 10"
+    _DAY_HEADER_RE = re.compile(r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*(\d{1,2})')
+
+    def _parse_week_from_html(self, html: str, week_start: date) -> Dict[date, List[Dict[str, str]]]:
+        """Split a week-view calendar page into per-day news lists."""
+        rows = parse_calendar_rows(html)
+        if rows is None:
+            soup = BeautifulSoup(html, 'html.parser')
+            rows = [self._row_fields(row) for row in soup.select('tr.calendar__row')]
+        day_rows: Dict[date, list] = {}
+        current_day = None
+        for row in rows:
+            if row['date']:
+                match = self._DAY_HEADER_RE.search(row['date'])
+                if match:
+                    current_day = self._resolve_header_date(match.group(1), int(match.group(2)), week_start)
+                    day_rows.setdefault(current_day, [])
+            if current_day is not None and row['is_event_row']:
+                day_rows[current_day].append(row)
+        if not day_rows:
+            logger.warning("No day headers found in week view")
+        return {day: self._collect_news_items(day_list) for day, day_list in day_rows.items()}
+
+    @staticmethod
+    def _resolve_header_date(month_name: str, day_of_month: int, week_start: date) -> date:
+        month = datetime.strptime(month_name, "%b").month
+        year = week_start.year
+        # A week starting late December runs into January of the next year
+        if month < week_start.month - 6:
+            year += 1
+        elif month > week_start.month + 6:
+            year -= 1
+        return date(year, month, day_of_month)
+
+    @staticmethod
+    def _row_fields(row) -> Dict[str, Any]:
+        """Field dict for a BeautifulSoup row, shaped like ``calendar_parser`` output."""
+        fields: Dict[str, Any] = {}
+        for class_name, field in CALENDAR_FIELD_CLASSES.items():
+            element = row.select_one(f'.{class_name}')
+            if element is None:
+                fields[field] = None
+            elif field == 'date':
+                fields[field] = element.get_text(" ", strip=True)
+            else:
+                fields[field] = element.text.strip()
+        impact_element = (
+            row.select_one('.calendar__impact span.icon')
+            or row.select_one('.impact span.icon')
+        )
+        fields['impact_classes'] = impact_element.get('class', []) if impact_element else None
+        row_classes = row.get('class') or []
+        fields['event_id'] = row.get('data-event-id')
+        fields['has_event_id'] = fields['event_id'] is not None
+        fields['is_event_row'] = fields['has_event_id'] or fields['event'] is not None
+        fields['is_day_breaker'] = 'calendar__row--day-breaker' in row_classes
+        fields['is_calendar_row'] = 'calendar__row' in row_classes
+        if fields['is_day_breaker'] and fields['date'] is None:
+            fields['date'] = row.get_text(" ", strip=True)
+        return fields
+
+    def _collect_news_items(self, rows: List[Dict[str, Any]]) -> List[Dict[str, str]]:
         # First pass: collect all news items and track times
         news_items: List[Dict[str, str]] = []
         current_time = "N/A"
         all_classes = []
-        for row in rows:
-            logger.debug(f"EXTRACTING NEWS DATA for row: {str(row)}")
+        for fields in rows:
             # Collect all impact classes for debugging
-            impact_element = (
-                row.select_one('.calendar__impact span.icon')
-                or row.select_one('.impact span.icon')
-            )
-            if impact_element:
-                classes = impact_element.get('class', [])
-                all_classes.append(classes)
-            news_item = self._extract_news_data(row)
+            if fields['impact_classes'] is not None:
+                all_classes.append(fields['impact_classes'])
+            news_item = self._build_news_item(fields)
             if news_item["time"] != "N/A" and news_item["time"].strip():
                 current_time = news_item["time"]
             elif current_time != "N/A":
@@ -557,9 +759,12 @@ class ForexNewsScraper:
         return True
 
     def _extract_news_data(self, row) -> Dict[str, str]:
-        logger.debug(f"EXTRACTING NEWS DATA for row: {str(row)}")
-        time_elem = row.select_one('.calendar__time')
-        time = time_elem.text.strip() if time_elem else "N/A"
+        return self._build_news_item(self._row_fields(row))
+
+    def _build_news_item(self, fields: Dict[str, Any]) -> Dict[str, str]:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"EXTRACTING NEWS DATA for row: {fields}")
+        time = fields['time'] if fields['time'] is not None else "N/A"
         # Robust time to 24h
         time_24 = time
         try:
@@ -581,29 +786,15 @@ class ForexNewsScraper:
         except Exception as e:
             logger.debug(f"Time parse failed for '{time}': {e}")
             time_24 = time  # fallback
-        actual_elem = row.select_one('.calendar__actual')
-        actual = "N/A"
-        if actual_elem:
-            actual_text = actual_elem.text.strip()
-            if actual_text and actual_text != "":
-                actual = actual_text
-        currency_elem = row.select_one('.calendar__currency')
-        currency = currency_elem.text.strip() if currency_elem else "N/A"
-        event_elem = row.select_one('.calendar__event-title')
-        event = event_elem.text.strip() if event_elem else "N/A"
-        forecast_elem = row.select_one('.calendar__forecast')
-        forecast = forecast_elem.text.strip() if forecast_elem else "N/A"
-        previous_elem = row.select_one('.calendar__previous')
-        previous = previous_elem.text.strip() if previous_elem else "N/A"
+        actual = fields['actual'] or "N/A"
+        currency = fields['currency'] if fields['currency'] is not None else "N/A"
+        event = fields['event'] if fields['event'] is not None else "N/A"
+        forecast = fields['forecast'] if fields['forecast'] is not None else "N/A"
+        previous = fields['previous'] if fields['previous'] is not None else "N/A"
         # Impact detection (robust)
         impact = "unknown"
-        impact_element = (
-            row.select_one('.calendar__impact span.icon')
-            or row.select_one('.impact span.icon')
-        )
-        logger.debug(f"DEBUG: impact_element={impact_element}, row={str(row)}")
-        if impact_element:
-            classes = impact_element.get('class', [])
+        classes = fields['impact_classes']
+        if classes is not None:
             if isinstance(classes, str):
                 classes = classes.split()
             # Normalize to lowercase for robustness
@@ -642,7 +833,7 @@ class ForexNewsScraper:
             else:
                 impact = "none"
         if impact == "unknown":
-            logger.warning(f"Impact unknown for row: {str(row)}")
+            logger.warning(f"Impact unknown for row: {fields}")
         return {
             "time": escape_markdown_v2(time_24),
             "currency": escape_markdown_v2(currency),
@@ -651,6 +842,7 @@ class ForexNewsScraper:
             "forecast": escape_markdown_v2(forecast),
             "previous": escape_markdown_v2(previous),
             "impact": impact,
+            "event_id": fields.get('event_id'),
         }
 
 
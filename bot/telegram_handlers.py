@@ -199,6 +199,46 @@ class RenderKeepAlive:
             logger.error("Ping error: %s", e)
 
 
+class StreamingMessageEditor:
+    """Edits one message with text that grows while an answer streams in.
+
+    Telegram rate-limits edits, so at most one edit goes out per ``min_interval_sec``;
+    ``finish`` always shows the final text.
+    """
+
+    MAX_LENGTH = 4096
+
+    def __init__(self, bot, chat_id: int, message_id: int, header: str = "", min_interval_sec: float = 1.0):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.header = header
+        self.min_interval_sec = min_interval_sec
+        self._last_edit = 0.0
+        self._shown = None
+        self.edits = 0
+
+    def update(self, text: str):
+        if time.monotonic() - self._last_edit < self.min_interval_sec:
+            return
+        self._edit(text + " ▌")
+
+    def finish(self, text: str):
+        self._edit(text)
+
+    def _edit(self, text: str):
+        display = (self.header + text)[:self.MAX_LENGTH]
+        if display == self._shown:
+            return
+        self._last_edit = time.monotonic()
+        try:
+            self.bot.edit_message_text(display, chat_id=self.chat_id, message_id=self.message_id)
+            self._shown = display
+            self.edits += 1
+        except Exception as e:
+            logger.debug(f"Streaming edit failed: {e}")
+
+
 class TelegramHandlers:
     """Utility methods for Telegram calendar markup."""
 
@@ -463,7 +503,13 @@ def register_handlers(bot, process_news_func, config: Config, db_service=None, d
                 from .gpt_analysis import run_pair_analysis_with_features
                 from .gpt_analysis import _get_symbol_from_currencies  # reuse symbol mapping
                 api_key = os.getenv("OPENAI_API_KEY") or os.getenv("CHATGPT_API_KEY")
-                result = run_pair_analysis_with_features(base, quote, api_key, config.timezone, call.from_user.id)
+                stream_editor = StreamingMessageEditor(
+                    bot, call.message.chat.id, call.message.message_id,
+                    header=f"🤖 {base}/{quote} GPT view:\n\n",
+                    min_interval_sec=float(os.getenv("OPENAI_STREAM_EDIT_INTERVAL_SEC", "1.0")),
+                )
+                result = run_pair_analysis_with_features(base, quote, api_key, config.timezone, call.from_user.id,
+                                                         on_gpt_delta=stream_editor.update)
                 if not result:
                     bot.edit_message_text(
                         f"❌ Could not compute analysis for {base}/{quote}.",
@@ -471,6 +517,8 @@ def register_handlers(bot, process_news_func, config: Config, db_service=None, d
                         message_id=call.message.message_id
                     )
                     return
+                if result.get("gpt_text"):
+                    stream_editor.finish(result["gpt_text"])
                 text = result.get("telegram_text") or result.get("text")
                 features = result.get("features", {})
                 symbol = result.get("symbol") or _get_symbol_from_currencies(base, quote)
@@ -656,7 +704,7 @@ def register_handlers(bot, process_news_func, config: Config, db_service=None, d
         # Check if user has saved preferences
         if settings_handler and db_service:
             try:
-                user = db_service.get_or_create_user(call.from_user.id)
+                user = db_service.get_cached_preferences(call.from_user.id)
                 saved_impact = user.get_impact_levels_list()
                 saved_analysis = user.analysis_required
 
@@ -708,7 +756,7 @@ def register_handlers(bot, process_news_func, config: Config, db_service=None, d
             # Check if user has saved preferences
             if settings_handler and db_service:
                 try:
-                    user = db_service.get_or_create_user(call.from_user.id)
+                    user = db_service.get_cached_preferences(call.from_user.id)
                     saved_impact = user.get_impact_levels_list()
                     saved_analysis = user.analysis_required
 
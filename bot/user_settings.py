@@ -2,9 +2,9 @@ import logging
 from typing import List, Optional
 from telebot.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from datetime import datetime, time
-from sqlalchemy import text
 
 from .database_service import ForexNewsService
+from .schema_capabilities import NOTIFICATION_COLUMNS
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +39,7 @@ class UserSettingsHandler:
     def get_settings_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate settings keyboard with current user preferences."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             markup = InlineKeyboardMarkup(row_width=2)
 
             # Current preferences display
@@ -51,16 +51,10 @@ class UserSettingsHandler:
             # Check if notification columns exist in database
             notification_available = False
             try:
-                with self.db_service.db_manager.get_session() as session:
-                    result = session.execute(text("""
-                        SELECT column_name
-                    FROM information_schema.columns
-                        WHERE table_name = 'users' AND column_name IN ('notifications_enabled', 'notification_minutes', 'notification_impact_levels')
-                    """))
-                    notification_columns = [row[0] for row in result]
-                    # Show notification button if at least notifications_enabled column exists
-                    notification_available = 'notifications_enabled' in notification_columns
-                    logger.info(f"User {user_id}: Notification columns found: {notification_columns}, notification_available: {notification_available}")
+                notification_columns = self.db_service.schema.present('users', NOTIFICATION_COLUMNS)
+                # Show notification button if at least notifications_enabled column exists
+                notification_available = 'notifications_enabled' in notification_columns
+                logger.debug(f"User {user_id}: Notification columns found: {notification_columns}, notification_available: {notification_available}")
             except Exception as e:
                 logger.error(f"Error checking notification columns for user {user_id}: {e}")
                 notification_available = False
@@ -111,7 +105,7 @@ class UserSettingsHandler:
     def get_currencies_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate currencies selection keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             selected_currencies = set(user.get_currencies_list())
 
             markup = InlineKeyboardMarkup(row_width=4)
@@ -139,7 +133,7 @@ class UserSettingsHandler:
     def get_impact_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate impact levels selection keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             selected_impacts = set(user.get_impact_levels_list())
 
             markup = InlineKeyboardMarkup(row_width=2)
@@ -162,7 +156,7 @@ class UserSettingsHandler:
     def get_digest_time_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate custom time picker keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             current_time = user.digest_time if user.digest_time else time(8, 0)
             current_hour = current_time.hour
             current_minute = current_time.minute
@@ -184,7 +178,7 @@ class UserSettingsHandler:
     def get_hour_picker_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate hour picker keyboard (0-23)."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             current_time = user.digest_time if user.digest_time else time(8, 0)
             current_hour = current_time.hour
 
@@ -208,7 +202,7 @@ class UserSettingsHandler:
     def get_minute_picker_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate minute picker keyboard (0-59, in 5-minute intervals)."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             current_time = user.digest_time if user.digest_time else time(8, 0)
             current_minute = current_time.minute
 
@@ -232,7 +226,7 @@ class UserSettingsHandler:
     def get_timezone_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate timezone selection keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             current_timezone = user.get_timezone()
 
             markup = InlineKeyboardMarkup(row_width=2)
@@ -257,7 +251,7 @@ class UserSettingsHandler:
     def get_notifications_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate notifications settings keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
 
             # Check if notification fields exist
             if not hasattr(user, 'notifications_enabled'):
@@ -313,7 +307,7 @@ class UserSettingsHandler:
     def get_notification_timing_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate notification timing selection keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
 
             # Check if notification fields exist
             if not hasattr(user, 'notification_minutes'):
@@ -346,7 +340,7 @@ class UserSettingsHandler:
     def get_notification_impact_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate notification impact levels selection keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
 
             # Check if notification fields exist
             if not hasattr(user, 'notification_impact_levels'):
@@ -380,7 +374,7 @@ class UserSettingsHandler:
     def get_charts_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate chart settings keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
 
             # Check if chart fields exist
             if not hasattr(user, 'charts_enabled'):
@@ -426,7 +420,7 @@ class UserSettingsHandler:
     def get_chart_type_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate chart type selection keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             current_type = getattr(user, 'chart_type', 'single')
 
             markup = InlineKeyboardMarkup(row_width=2)
@@ -454,7 +448,7 @@ class UserSettingsHandler:
     def get_chart_window_keyboard(self, user_id: int) -> InlineKeyboardMarkup:
         """Generate chart window hours selection keyboard."""
         try:
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             current_hours = getattr(user, 'chart_window_hours', 2)
 
             markup = InlineKeyboardMarkup(row_width=3)
@@ -499,7 +493,7 @@ class UserSettingsHandler:
                 return True, "Select impact levels you want to receive:", markup
 
             elif data == "settings_analysis":
-                user = self.db_service.get_or_create_user(user_id)
+                user = self.db_service.get_cached_preferences(user_id)
                 new_analysis = not user.analysis_required
                 self.db_service.update_user_preferences(user_id, analysis_required=new_analysis)
                 status = "enabled" if new_analysis else "disabled"
@@ -523,7 +517,7 @@ class UserSettingsHandler:
                 return True, "Select your timezone:", markup
 
             elif data == "notification_toggle":
-                user = self.db_service.get_or_create_user(user_id)
+                user = self.db_service.get_cached_preferences(user_id)
                 if not hasattr(user, 'notifications_enabled'):
                     markup = self.get_notifications_keyboard(user_id)
                     return True, "⚠️ Notifications not available yet. Please run database migration first.", markup
@@ -565,7 +559,7 @@ class UserSettingsHandler:
                 try:
                     minutes = int(minutes_str)
                     if minutes in NOTIFICATION_MINUTES:
-                        user = self.db_service.get_or_create_user(user_id)
+                        user = self.db_service.get_cached_preferences(user_id)
                         if not hasattr(user, 'notification_minutes'):
                             markup = self.get_notification_timing_keyboard(user_id)
                             return True, "⚠️ Notifications not available yet. Please run database migration first.", markup
@@ -580,7 +574,7 @@ class UserSettingsHandler:
             elif data.startswith("notification_impact_"):
                 impact = data.replace("notification_impact_", "")
                 if impact in IMPACT_LEVELS:
-                    user = self.db_service.get_or_create_user(user_id)
+                    user = self.db_service.get_cached_preferences(user_id)
                     if not hasattr(user, 'notification_impact_levels'):
                         markup = self.get_notification_impact_keyboard(user_id)
                         return True, "⚠️ Notifications not available yet. Please run database migration first.", markup
@@ -590,7 +584,7 @@ class UserSettingsHandler:
                 return True, "Configure your chart settings:", markup
 
             elif data == "chart_toggle":
-                user = self.db_service.get_or_create_user(user_id)
+                user = self.db_service.get_cached_preferences(user_id)
                 if not hasattr(user, 'charts_enabled'):
                     markup = self.get_charts_keyboard(user_id)
                     return True, "⚠️ Chart settings not available yet. Please run database migration first.", markup
@@ -612,7 +606,7 @@ class UserSettingsHandler:
             elif data.startswith("chart_type_"):
                 chart_type = data.replace("chart_type_", "")
                 if chart_type in ['single', 'multi', 'none']:
-                    user = self.db_service.get_or_create_user(user_id)
+                    user = self.db_service.get_cached_preferences(user_id)
                     if not hasattr(user, 'chart_type'):
                         markup = self.get_chart_type_keyboard(user_id)
                         return True, "⚠️ Chart settings not available yet. Please run database migration first.", markup
@@ -626,7 +620,7 @@ class UserSettingsHandler:
                 try:
                     hours = int(hours_str)
                     if hours in [1, 2, 4, 6]:
-                        user = self.db_service.get_or_create_user(user_id)
+                        user = self.db_service.get_cached_preferences(user_id)
                         if not hasattr(user, 'chart_window_hours'):
                             markup = self.get_chart_window_keyboard(user_id)
                             return True, "⚠️ Chart settings not available yet. Please run database migration first.", markup
@@ -664,7 +658,7 @@ class UserSettingsHandler:
         try:
             data = call.data
             user_id = call.from_user.id
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             current_currencies = set(user.get_currencies_list())
 
             if data == "currency_select_all":
@@ -702,7 +696,7 @@ class UserSettingsHandler:
         try:
             data = call.data
             user_id = call.from_user.id
-            user = self.db_service.get_or_create_user(user_id)
+            user = self.db_service.get_cached_preferences(user_id)
             current_impacts = set(user.get_impact_levels_list())
 
             if data.startswith("impact_"):
@@ -743,7 +737,7 @@ class UserSettingsHandler:
                 return True, "Select minute (0-59, 5-minute intervals):", markup
 
             elif data == "time_current":
-                user = self.db_service.get_or_create_user(user_id)
+                user = self.db_service.get_cached_preferences(user_id)
                 current_time = user.digest_time if user.digest_time else time(8, 0)
                 markup = self.get_settings_keyboard(user_id)
                 return True, f"⏰ Current digest time: {current_time.strftime('%H:%M')}", markup
@@ -765,7 +759,7 @@ class UserSettingsHandler:
                 try:
                     hour = int(hour_str)
                     if 0 <= hour <= 23:
-                        user = self.db_service.get_or_create_user(user_id)
+                        user = self.db_service.get_cached_preferences(user_id)
                         current_time = user.digest_time if user.digest_time else time(8, 0)
                         new_time = time(hour, current_time.minute)
                         self.db_service.update_user_preferences(user_id, digest_time=new_time)
@@ -793,7 +787,7 @@ class UserSettingsHandler:
                 try:
                     minute = int(minute_str)
                     if 0 <= minute <= 59:
-                        user = self.db_service.get_or_create_user(user_id)
+                        user = self.db_service.get_cached_preferences(user_id)
                         current_time = user.digest_time if user.digest_time else time(8, 0)
                         new_time = time(current_time.hour, minute)
                         self.db_service.update_user_preferences(user_id, digest_time=new_time)
@@ -819,7 +813,7 @@ class UserSettingsHandler:
             if data.startswith("timezone_"):
                 timezone = data.replace("timezone_", "")
                 if timezone in AVAILABLE_TIMEZONES:
-                    user = self.db_service.get_or_create_user(user_id)
+                    user = self.db_service.get_cached_preferences(user_id)
                     if not hasattr(user, 'timezone'):
                         markup = self.get_timezone_keyboard(user_id)
                         return True, "⚠️ Timezone not available yet. Please run database migration first.", markup
@@ -5,20 +5,17 @@ import re
 logger = logging.getLogger(__name__)
 
 
+# Characters that need to be escaped in MarkdownV2
+_MARKDOWN_V2_ESCAPES = str.maketrans({char: f'\\{char}' for char in '\\_*[]()~`>#+-=|{}.!'})
+
+
 def escape_markdown_v2(text: str) -> str:
     """Escape only Telegram MarkdownV2 special characters in user-supplied text."""
     if not text or text.strip() == "":
         return "N/A"
 
-    # Define the characters that need to be escaped in MarkdownV2
-    special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-
-    # Escape backslashes first, then other special characters
-    escaped_text = text.replace('\\', '\\\\')
-    for char in special_chars:
-        escaped_text = escaped_text.replace(char, f'\\{char}')
-
-    return escaped_text
+    # Backslashes and the MarkdownV2 special characters, escaped in one pass
+    return text.translate(_MARKDOWN_V2_ESCAPES)
 
 
 def send_long_message(bot, chat_id, text, parse_mode="MarkdownV2"):
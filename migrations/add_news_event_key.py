@@ -0,0 +1,46 @@
+"""
+Migration script to key forex_news rows by ForexFactory event id.
+
+Adds the event_id column and the unique (date, event_id) index that news
+re-imports upsert against. Existing rows keep a NULL event_id (NULLs never
+conflict), so no rows are deleted; they are replaced by keyed rows the next
+time their date is imported. Also drops the uq_forex_news_event index created
+by an earlier release, whose (date, currency, time, event) key rejected
+distinct events such as holidays sharing currency, time and title.
+"""
+
+from sqlalchemy import create_engine, inspect, text
+import os
+
+def run_migration(database_url=None):
+    """Add forex_news.event_id and its unique index."""
+
+    database_url = database_url or os.getenv('DATABASE_URL')
+    if not database_url:
+        raise SystemExit("DATABASE_URL is not set")
+
+    engine = create_engine(database_url)
+    inspector = inspect(engine)
+    columns = {col['name'] for col in inspector.get_columns('forex_news')}
+    indexes = {idx['name'] for idx in inspector.get_indexes('forex_news')}
+
+    with engine.begin() as conn:
+        if 'uq_forex_news_event' in indexes:
+            conn.execute(text("DROP INDEX uq_forex_news_event"))
+            print("Dropped legacy uq_forex_news_event index")
+
+        if 'event_id' not in columns:
+            conn.execute(text("ALTER TABLE forex_news ADD COLUMN event_id VARCHAR(32)"))
+            print("Added event_id column")
+
+        if 'uq_forex_news_event_id' not in indexes:
+            conn.execute(text(
+                "CREATE UNIQUE INDEX uq_forex_news_event_id ON forex_news (date, event_id)"
+            ))
+            print("Created uq_forex_news_event_id index")
+
+    engine.dispose()
+    print("Migration completed successfully!")
+
+if __name__ == "__main__":
+    run_migration()
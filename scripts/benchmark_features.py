@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the smart-money features used by /gptanalysis.
+Usage: python benchmark_features.py [--bars 500 2000 5000] [--iterations 20]
+
+Runs swing, break-of-structure, fair value gap and equal high/low detection
+over synthetic 1m and 1h OHLC series and prints the best time per function.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the Python path so we can import from bot
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bot.gpt_analysis import _detect_bos, _find_equal_highs_lows, _find_fvgs, _find_swings
+
+
+def synthetic_bars(bars: int, freq: str, seed: int = 7) -> pd.DataFrame:
+    """Random-walk OHLC series at the given pandas frequency."""
+    rng = np.random.default_rng(seed)
+    close = 1.08 + np.cumsum(rng.normal(0, 0.0008, bars))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.0006, bars))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.0006, bars))
+    index = pd.date_range('2025-01-01', periods=bars, freq=freq, tz='UTC')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close}, index=index).round(5)
+
+
+def best_ms(func, iterations: int) -> float:
+    best = float("inf")
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark smart-money feature extraction")
+    parser.add_argument("--bars", type=int, nargs="+", default=[500, 2000, 5000], help="Series lengths")
+    parser.add_argument("--iterations", type=int, default=20, help="Runs per measurement (default: 20)")
+    args = parser.parse_args()
+
+    for freq in ("1min", "1h"):
+        for bars in args.bars:
+            data = synthetic_bars(bars, freq)
+            swings = _find_swings(data)
+            timings = {
+                "swings": best_ms(lambda: _find_swings(data), args.iterations),
+                "bos": best_ms(lambda: _detect_bos(data, *swings), args.iterations),
+                "fvgs": best_ms(lambda: _find_fvgs(data), args.iterations),
+                "equal_levels": best_ms(lambda: _find_equal_highs_lows(data, 5), args.iterations),
+            }
+            total = sum(timings.values())
+            parts = " | ".join(f"{name} {ms:.2f} ms" for name, ms in timings.items())
+            print(f"{freq:>4} x {bars:>5} bars: {parts} | total {total:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
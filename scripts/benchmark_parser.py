@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark calendar page parsing: lxml fast path vs the BeautifulSoup fallback.
+Usage: python benchmark_parser.py [--iterations 20] [page.html ...]
+
+Without arguments the saved fixture pages in tests/fixtures are used.
+"""
+
+import argparse
+import glob
+import logging
+import os
+import sys
+import time
+from unittest.mock import Mock, patch
+
+# Add the parent directory to the Python path so we can import from bot
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bot import scraper as scraper_module
+from bot.scraper import ForexNewsScraper
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures')
+
+
+def time_parse(scraper: ForexNewsScraper, html: str, iterations: int) -> float:
+    """Best wall time in milliseconds over the given number of runs."""
+    best = float("inf")
+    for _ in range(iterations):
+        started = time.perf_counter()
+        scraper._parse_news_from_html(html)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark calendar HTML parsing")
+    parser.add_argument("pages", nargs="*", help="Saved calendar pages (default: tests/fixtures/*.html)")
+    parser.add_argument("--iterations", type=int, default=20, help="Runs per parser (default: 20)")
+    args = parser.parse_args()
+
+    # Per-row warnings would dominate the timings
+    logging.basicConfig(level=logging.ERROR)
+    scraper = ForexNewsScraper(Mock(), Mock())
+    pages = args.pages or sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+
+    for path in pages:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        rows = len(scraper._parse_news_from_html(html))
+        fast = time_parse(scraper, html, args.iterations)
+        with patch.object(scraper_module, 'parse_calendar_rows', return_value=None):
+            soup = time_parse(scraper, html, max(1, args.iterations // 4))
+        print(f"{os.path.basename(path)}: {len(html) // 1024} KB, {rows} rows | "
+              f"lxml {fast:.1f} ms | BeautifulSoup {soup:.1f} ms | {soup / fast:.1f}x")
+    scraper.close()
+
+
+if __name__ == "__main__":
+    main()
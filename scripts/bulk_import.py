@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """
 Bulk import script for forex news data.
-Usage: python bulk_import.py --start-date 2025-01-01 --end-date 2025-01-31 --impact-level high
+Usage: python bulk_import.py --start-date 2025-01-01 --end-date 2025-01-31 --impact-level high --workers 3
 
 By default, this script skips dates where data already exists.
 Use --force flag to rewrite existing data.
+Use --checkpoint FILE to resume an interrupted import where it stopped.
 """
 
 import argparse
@@ -12,7 +13,7 @@ import asyncio
 import logging
 import os
 import sys
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 from typing import List, Optional
 
 # Add the parent directory to the Python path so we can import from bot
@@ -21,6 +22,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from bot.config import Config, setup_logging
 from bot.scraper import ForexNewsScraper, ChatGPTAnalyzer
 from bot.database_service import ForexNewsService
+from bot.bulk_importer import BulkNewsImporter
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +32,10 @@ async def bulk_import_news(
     end_date: date,
     impact_level: str = "high",
     database_url: Optional[str] = None,
-    force: bool = False
+    force: bool = False,
+    workers: int = 2,
+    checkpoint_path: Optional[str] = None,
+    use_week_view: bool = True
 ) -> None:
     """
     Bulk import forex news for a date range.
@@ -41,12 +46,14 @@ async def bulk_import_news(
         impact_level: Impact level filter (high, medium, low, all)
         database_url: Optional database URL override
         force: Force rewrite existing data
+        workers: Number of concurrent scraper workers (one browser each)
+        checkpoint_path: File recording finished dates so a rerun can resume
+        use_week_view: Fetch dense weeks with one week-view page load
     """
     try:
         # Initialize services
         config = Config()
         analyzer = ChatGPTAnalyzer(config.chatgpt_api_key)
-        scraper = ForexNewsScraper(config, analyzer)
         db_service = ForexNewsService(database_url or config.get_database_url())
 
         # Check database health
@@ -54,52 +61,19 @@ async def bulk_import_news(
             logger.error("Database health check failed. Exiting.")
             return
 
-        current_date = start_date
-        total_imported = 0
-        total_skipped = 0
-
         logger.info(f"Starting bulk import from {start_date} to {end_date} with impact level: {impact_level}")
         if force:
             logger.info("Force mode enabled - will rewrite existing data")
 
-        while current_date <= end_date:
-            try:
-                logger.info(f"Processing date: {current_date}")
-
-                # Check if data already exists (unless force mode is enabled)
-                if not force and db_service.has_news_for_date(current_date, impact_level):
-                    logger.info(f"Data already exists for {current_date}, skipping...")
-                    total_skipped += 1
-                    current_date += timedelta(days=1)
-                    continue
-
-                # Scrape news for the current date
-                logger.info(f"Scraping news for {current_date}...")
-                news_items = await scraper.scrape_news(
-                    target_date=datetime.combine(current_date, datetime.min.time()),
-                    debug=False
-                )
-
-                if news_items:
-                    # Store in database
-                    success = db_service.store_news_items(news_items, current_date, impact_level)
-                    if success:
-                        logger.info(f"Imported {len(news_items)} items for {current_date}")
-                        total_imported += len(news_items)
-                    else:
-                        logger.error(f"Failed to store news items for {current_date}")
-                else:
-                    logger.info(f"No news found for {current_date}")
-
-                # Add delay to avoid rate limiting
-                await asyncio.sleep(2)
-
-            except Exception as e:
-                logger.error(f"Error importing {current_date}: {e}")
-
-            current_date += timedelta(days=1)
-
-        logger.info(f"Bulk import completed. Total imported: {total_imported}")
+        importer = BulkNewsImporter(
+            lambda: ForexNewsScraper(config, analyzer),
+            db_service,
+            workers=workers,
+            use_week_view=use_week_view,
+            checkpoint_path=checkpoint_path
+        )
+        stats = await asyncio.to_thread(importer.run, start_date, end_date, impact_level, force)
+        logger.info(f"Bulk import completed. Total imported: {stats.get('imported_items', 0)}")
 
     except Exception as e:
         logger.error(f"Bulk import failed: {e}")
@@ -138,6 +112,22 @@ def main():
         "--database-url",
         help="Database URL override"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("BULK_IMPORT_WORKERS", "2")),
+        help="Number of concurrent browser workers (default: 2)"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Checkpoint file for resuming an interrupted import"
+    )
+    parser.add_argument(
+        "--no-week-view",
+        action="store_true",
+        help="Load every date separately instead of using the week view"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -166,7 +156,10 @@ def main():
         end_date=args.end_date,
         impact_level=args.impact_level,
         database_url=args.database_url,
-        force=args.force
+        force=args.force,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        use_week_view=not args.no_week_view
     ))
 
 
@@ -0,0 +1,110 @@
+"""Test script to verify the shared feature and GPT response cache."""
+
+import sys
+import os
+import logging
+import threading
+import time
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot import gpt_analysis
+from bot.analysis_cache import AnalysisCache
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEATURES = {
+    'symbol': 'EURUSD=X', 'timeframe': 'last 1-2 days on 1H & 5m', 'display_timezone': 'Europe/Prague',
+    'price_decimals': 5, 'last_price': 1.0851, 'prior_session_open': 1.083, 'change': 0.0021,
+    'change_pct': 0.19, 'last_bos': {}, 'fvgs': [], 'round_levels': [1.08, 1.085, 1.09],
+}
+
+
+def test_ttl_lru_and_stats():
+    """Entries expire after the TTL, the least recently used goes first, None is never stored."""
+    print("Testing analysis cache eviction...")
+
+    cache = AnalysisCache('test', max_entries=2, ttl_sec=0.05)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    time.sleep(0.06)
+    assert cache.get('a') is None
+
+    calls = []
+    assert cache.get_or_compute('d', lambda: calls.append(1)) is None
+    assert cache.get_or_compute('d', lambda: calls.append(1)) is None
+    assert len(calls) == 2
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 3 and stats['misses'] == 4
+    assert stats['hit_rate'] == round(3 / 7, 3)
+
+    print("✅ Analysis cache eviction tests passed!")
+
+
+def test_concurrent_requests_compute_once():
+    """A wave of identical requests runs the computation once and shares its result."""
+    print("Testing single-flight computation...")
+
+    cache = AnalysisCache('test', ttl_sec=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {'value': 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r == {'value': 42} for r in results) and len(results) == 8
+    assert cache.get_stats()['coalesced'] == 7
+
+    print("✅ Single-flight tests passed!")
+
+
+def test_pair_analysis_shares_features_and_gpt_text():
+    """Users asking for the same pair within one bar reuse features and the GPT answer."""
+    print("Testing shared pair analysis...")
+
+    gpt_analysis.feature_cache.clear()
+    gpt_analysis.gpt_response_cache.clear()
+    gpt_analysis._LAST_GPT_CALLS.clear()
+    with patch.object(gpt_analysis, 'compute_local_features', return_value=FEATURES) as features, \
+            patch.object(gpt_analysis, 'call_openai_gpt', return_value="Bullish bias") as gpt, \
+            patch.dict(os.environ, {'OPENAI_ENABLED': 'true'}):
+        first = gpt_analysis.run_pair_analysis_with_features('EUR', 'USD', 'key', 'Europe/Prague', user_id=1)
+        second = gpt_analysis.run_pair_analysis_with_features('EUR', 'USD', 'key', 'Europe/Prague', user_id=2)
+        # Within the cooldown the user still gets the cached answer, without a new call
+        third = gpt_analysis.run_pair_analysis('EUR', 'USD', 'key', 'Europe/Prague', user_id=1)
+
+        assert features.call_count == 1
+        assert gpt.call_count == 1
+        assert first['text'] == second['text']
+        assert "Bullish bias" in third
+
+        # Other model settings are a different prompt
+        with patch.dict(os.environ, {'OPENAI_MODEL': 'gpt-4o'}):
+            gpt_analysis.run_pair_analysis('EUR', 'USD', 'key', 'Europe/Prague', user_id=3)
+        assert gpt.call_count == 2
+
+    print("✅ Shared pair analysis tests passed!")
+
+
+if __name__ == "__main__":
+    test_ttl_lru_and_stats()
+    test_concurrent_requests_compute_once()
+    test_pair_analysis_shares_features_and_gpt_text()
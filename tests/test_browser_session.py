@@ -0,0 +1,159 @@
+"""Test script to verify the reusable browser session in the scraper."""
+
+import sys
+import os
+import asyncio
+import logging
+from unittest.mock import Mock, patch
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.browser_session import BrowserSession
+from bot.scraper import ForexNewsScraper
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CALENDAR_PAGE = "<html><title>Forex Factory</title><table class='calendar__table'></table></html>"
+CHALLENGE_PAGE = "<html><title>Just a moment...</title></html>"
+
+
+def _fake_driver(page_source=CALENDAR_PAGE):
+    driver = Mock()
+    driver.page_source = page_source
+    driver.execute_script.return_value = 1
+    return driver
+
+
+def test_session_reuse_and_recycling():
+    """One driver serves many pages and is replaced on page limit or failed health check."""
+    print("Testing browser session lifecycle...")
+
+    drivers = []
+
+    def factory():
+        drivers.append(_fake_driver())
+        return drivers[-1]
+
+    session = BrowserSession(factory, max_pages=3)
+    for _ in range(3):
+        assert session.acquire() is drivers[0]
+        session.page_done()
+    # The fourth page goes to a fresh driver
+    assert session.acquire() is drivers[1]
+    drivers[0].quit.assert_called_once()
+
+    drivers[1].execute_script.side_effect = Exception("chrome not reachable")
+    assert session.acquire() is drivers[2]
+
+    stats = session.get_stats()
+    assert stats['launches'] == 3
+    assert stats['recycles'] == 2
+    session.close()
+    assert not session.is_open
+
+    print("✅ Browser session lifecycle tests passed!")
+
+
+def test_scraper_keeps_browser_warm():
+    """Consecutive scrapes reuse the browser; challenges and errors force a new one."""
+    print("Testing warm scraper sessions...")
+
+    scraper = ForexNewsScraper(Mock(timezone="Europe/Prague"), Mock())
+    drivers = []
+
+    page = [CALENDAR_PAGE]
+
+    def factory():
+        drivers.append(_fake_driver(page[0]))
+        return drivers[-1]
+
+    scraper.browser.driver_factory = factory
+    with patch.object(scraper, '_add_human_behavior') as human:
+        for _ in range(3):
+            assert asyncio.run(scraper._scrape_with_selenium("https://example/calendar")) == CALENDAR_PAGE
+        assert len(drivers) == 1
+        # Human-like interaction only while a new session earns clearance
+        assert human.call_count == 1
+
+        drivers[0].get.side_effect = Exception("renderer crashed")
+        try:
+            asyncio.run(scraper._scrape_with_selenium("https://example/calendar"))
+            assert False, "expected CloudflareBypassError"
+        except Exception as e:
+            assert "renderer crashed" in str(e)
+        assert not scraper.browser.is_open
+
+        with patch('bot.scraper.time.sleep'):
+            page[0] = CHALLENGE_PAGE
+            assert asyncio.run(scraper._scrape_with_selenium("https://example/calendar")) == CHALLENGE_PAGE
+        assert not scraper.browser.is_open
+    scraper.close()
+
+    print("✅ Warm scraper session tests passed!")
+
+
+def test_http_tier_replays_clearance():
+    """After one browser load, pages come over plain HTTP until that gets blocked."""
+    print("Testing HTTP fetch tier...")
+
+    scraper = ForexNewsScraper(Mock(timezone="Europe/Prague"), Mock())
+    scraper.http_fetch_enabled = True
+    driver = _fake_driver()
+    driver.get_cookies.return_value = [{'name': 'cf_clearance', 'value': 'abc', 'domain': '.forexfactory.com', 'path': '/'}]
+    driver.execute_script.side_effect = lambda script: "Mozilla/5.0 Test" if "userAgent" in script else 1
+    scraper.browser.driver_factory = lambda: driver
+
+    with patch.object(scraper, '_add_human_behavior'), patch.object(scraper.http_session, 'get') as get:
+        # No clearance yet: straight to the browser
+        assert asyncio.run(scraper._fetch_html("https://example/calendar?day=a")) == CALENDAR_PAGE
+        get.assert_not_called()
+
+        served = CALENDAR_PAGE.replace("</html>", "<script src='/cdn-cgi/cloudflare.js'></script></html>")
+        get.return_value = Mock(status_code=200, text=served)
+        for _ in range(3):
+            assert asyncio.run(scraper._fetch_html("https://example/calendar?day=b")) == served
+        assert driver.get.call_count == 1
+        # Clearance travels with each request instead of being written into the shared session
+        kwargs = get.call_args.kwargs
+        assert kwargs['cookies'].get('cf_clearance') == 'abc'
+        assert kwargs['headers']['User-Agent'] == "Mozilla/5.0 Test"
+        assert scraper.http_session.cookies.get('cf_clearance') is None
+
+        get.return_value = Mock(status_code=403, text=CHALLENGE_PAGE)
+        assert asyncio.run(scraper._fetch_html("https://example/calendar?day=c")) == CALENDAR_PAGE
+        assert driver.get.call_count == 2
+
+    stats = scraper.get_fetch_stats()
+    assert (stats['http'], stats['http_blocked'], stats['browser']) == (3, 1, 2)
+    scraper.close()
+
+    print("✅ HTTP fetch tier tests passed!")
+
+
+def test_chrome_discovery_cached():
+    """Binary and version probes run once per process."""
+    print("Testing cached Chrome discovery...")
+
+    ForexNewsScraper._chrome_discovery.clear()
+    scraper = ForexNewsScraper(Mock(), Mock())
+    with patch.object(ForexNewsScraper, '_discover_chrome_binary', return_value='/usr/bin/chromium') as find, \
+            patch('bot.scraper.subprocess.run') as run, patch('bot.scraper.os.path.exists', return_value=True):
+        run.return_value = Mock(returncode=0, stdout="Chromium 120.0.6099.109", stderr="")
+        for _ in range(3):
+            binary = scraper._find_chrome_binary()
+            assert ForexNewsScraper(Mock(), Mock())._get_chrome_major_version(binary) == "120"
+        assert find.call_count == 1
+        assert run.call_count == 1
+    ForexNewsScraper._chrome_discovery.clear()
+
+    print("✅ Chrome discovery cache tests passed!")
+
+
+if __name__ == "__main__":
+    test_session_reuse_and_recycling()
+    test_scraper_keeps_browser_warm()
+    test_http_tier_replays_clearance()
+    test_chrome_discovery_cached()
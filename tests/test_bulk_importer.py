@@ -0,0 +1,198 @@
+"""Test script to verify the concurrent bulk news importer."""
+
+import sys
+import os
+import json
+import logging
+import tempfile
+import threading
+import time
+from datetime import date
+from unittest.mock import Mock
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.bulk_importer import BulkNewsImporter, ImportCheckpoint
+from bot.scraper import ForexNewsScraper
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WEEK_HTML = """
+<table class="calendar__table">
+  <tr class="calendar__row calendar__row--day-breaker"><td class="calendar__cell">Sun Dec 29</td></tr>
+  <tr class="calendar__row calendar__row--day-breaker"><td class="calendar__cell">Mon Dec 30</td></tr>
+  <tr class="calendar__row" data-event-id="1">
+    <td class="calendar__date">Mon <span>Dec 30</span></td>
+    <td class="calendar__time">8:30am</td><td class="calendar__currency">USD</td>
+    <td class="calendar__impact"><span class="icon icon--ff-impact-red"></span></td>
+    <td class="calendar__event"><span class="calendar__event-title">Pending Home Sales m/m</span></td>
+    <td class="calendar__actual">1.2%</td><td class="calendar__forecast">0.9%</td><td class="calendar__previous">2.0%</td>
+  </tr>
+  <tr class="calendar__row" data-event-id="2">
+    <td class="calendar__time"></td><td class="calendar__currency">USD</td>
+    <td class="calendar__impact"><span class="icon icon--ff-impact-yel"></span></td>
+    <td class="calendar__event"><span class="calendar__event-title">Crude Oil Inventories</span></td>
+    <td class="calendar__actual"></td><td class="calendar__forecast"></td><td class="calendar__previous"></td>
+  </tr>
+  <tr class="calendar__row calendar__row--day-breaker"><td class="calendar__cell">Thu Jan 2</td></tr>
+  <tr class="calendar__row" data-event-id="3">
+    <td class="calendar__date">Thu <span>Jan 2</span></td>
+    <td class="calendar__time">14:00</td><td class="calendar__currency">EUR</td>
+    <td class="calendar__impact"><span class="icon icon--ff-impact-ora"></span></td>
+    <td class="calendar__event"><span class="calendar__event-title">Final Manufacturing PMI</span></td>
+    <td class="calendar__actual"></td><td class="calendar__forecast">45.2</td><td class="calendar__previous">45.2</td>
+  </tr>
+</table>
+"""
+
+
+class FakeScraper:
+    """Records page loads and tracks how many scrapers are busy at once."""
+
+    live = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, fail_first=()):
+        self.fail_first = set(fail_first)
+        self.calls = []
+
+    def _busy(self):
+        with FakeScraper.lock:
+            FakeScraper.live += 1
+            FakeScraper.peak = max(FakeScraper.peak, FakeScraper.live)
+        time.sleep(0.02)
+        with FakeScraper.lock:
+            FakeScraper.live -= 1
+
+    async def scrape_news(self, target_date=None, analysis_required=False, debug=False):
+        day = target_date.date()
+        self.calls.append(('day', day))
+        self._busy()
+        if day in self.fail_first:
+            self.fail_first.discard(day)
+            raise RuntimeError("challenge page")
+        return [{'time': '10:00', 'currency': 'USD', 'event': f'Event {day}', 'impact': 'high'}]
+
+    async def scrape_week(self, week_start):
+        self.calls.append(('week', week_start))
+        self._busy()
+        return {date.fromordinal(week_start.toordinal() + i): [] for i in range(7)}
+
+
+def test_week_view_parsing():
+    """Week pages are split by day header, including across the year boundary."""
+    print("Testing week view parsing...")
+
+    scraper = ForexNewsScraper(Mock(), Mock())
+    days = scraper._parse_week_from_html(WEEK_HTML, date(2024, 12, 29))
+    assert sorted(days) == [date(2024, 12, 29), date(2024, 12, 30), date(2025, 1, 2)]
+    assert days[date(2024, 12, 29)] == []
+    assert [i['event'] for i in days[date(2024, 12, 30)]] == ['Pending Home Sales m/m', 'Crude Oil Inventories']
+    # The blank time inherits the previous row's time within the same day
+    assert {i['time'] for i in days[date(2024, 12, 30)]} == {'08:30'}
+    assert days[date(2025, 1, 2)][0]['impact'] == 'medium'
+
+    print("✅ Week view parsing tests passed!")
+
+
+def test_parallel_import_with_retries():
+    """Workers share a bounded scraper pool, weeks collapse to one load, failures retry."""
+    print("Testing parallel bulk import...")
+
+    FakeScraper.live = FakeScraper.peak = 0
+    created = []
+
+    def factory():
+        scraper = FakeScraper(fail_first={date(2025, 3, 20)})
+        created.append(scraper)
+        return scraper
+
+    db_service = Mock()
+    db_service.has_news_for_date.side_effect = lambda day, level: day == date(2025, 3, 3)
+    db_service.store_news_items.return_value = True
+
+    importer = BulkNewsImporter(factory, db_service, workers=2, retry_delay_sec=0, page_delay_sec=0)
+    # Mar 2-8 is one calendar week and Mar 3 is already stored
+    stats = importer.run(date(2025, 3, 2), date(2025, 3, 8), 'all')
+    assert stats['skipped'] == 1
+    assert stats['pages'] == 1
+    assert stats['imported_dates'] == 6
+
+    importer.use_week_view = False
+    stats = importer.run(date(2025, 3, 17), date(2025, 3, 21), 'all')
+    assert stats['imported_dates'] == 5
+    assert stats['retries'] == 1
+    assert stats['imported_items'] == 5
+    assert FakeScraper.peak <= 2
+    # Scrapers serve several pages each instead of one browser per date
+    assert len(created) <= 3
+    assert sum(len(s.calls) for s in created) == 7
+
+    print("✅ Parallel bulk import tests passed!")
+
+
+def test_checkpoint_resume():
+    """A rerun skips dates recorded in the checkpoint; a full success removes it."""
+    print("Testing bulk import checkpoints...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'import.json')
+        checkpoint = ImportCheckpoint(path, 'all')
+        checkpoint.mark_done(date(2025, 3, 17))
+        with open(path) as f:
+            assert json.load(f)['completed'] == ['2025-03-17']
+        # A checkpoint for another impact level does not apply
+        assert not ImportCheckpoint(path, 'high').is_done(date(2025, 3, 17))
+
+        db_service = Mock()
+        db_service.has_news_for_date.return_value = False
+        db_service.store_news_items.side_effect = lambda items, day, level: day != date(2025, 3, 19)
+        importer = BulkNewsImporter(FakeScraper, db_service, workers=2, page_delay_sec=0,
+                                    use_week_view=False, checkpoint_path=path)
+        stats = importer.run(date(2025, 3, 17), date(2025, 3, 19), 'all')
+        assert stats['resumed'] == 1
+        assert stats['failed_dates'] == 1
+        assert ImportCheckpoint(path, 'all').completed == {date(2025, 3, 17), date(2025, 3, 18)}
+
+        db_service.store_news_items.side_effect = None
+        db_service.store_news_items.return_value = True
+        stats = importer.run(date(2025, 3, 17), date(2025, 3, 19), 'all')
+        assert stats['resumed'] == 2
+        assert stats['imported_dates'] == 1
+        assert not os.path.exists(path)
+
+    print("✅ Checkpoint tests passed!")
+
+
+def test_scraper_factory_failure():
+    """A scraper that cannot be built fails its dates instead of hanging the run."""
+    print("Testing scraper factory failures...")
+
+    def factory():
+        raise ValueError("invalid BROWSER_SESSION_MAX_PAGES")
+
+    db_service = Mock()
+    db_service.has_news_for_date.return_value = False
+    importer = BulkNewsImporter(factory, db_service, workers=2, page_delay_sec=0, use_week_view=False)
+
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(importer.run(date(2025, 3, 17), date(2025, 3, 21), 'all')),
+                              daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive()
+    assert result['failed_dates'] == 5
+    assert not db_service.store_news_items.called
+
+    print("✅ Scraper factory failure tests passed!")
+
+
+if __name__ == "__main__":
+    test_week_view_parsing()
+    test_parallel_import_with_retries()
+    test_checkpoint_resume()
+    test_scraper_factory_failure()
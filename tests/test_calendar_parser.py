@@ -0,0 +1,101 @@
+"""Test script to verify the lxml calendar parser matches the BeautifulSoup path."""
+
+import sys
+import os
+import time
+import logging
+from datetime import date
+from unittest.mock import Mock, patch
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot import scraper as scraper_module
+from bot.calendar_parser import parse_calendar_rows, select_day_rows
+from bot.scraper import ForexNewsScraper
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'forexfactory_month.html')
+
+
+def _load_fixture() -> str:
+    with open(FIXTURE, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_fast_parser_matches_soup():
+    """Day and week parsing give the same items with and without lxml."""
+    print("Testing lxml parser equivalence...")
+
+    html = _load_fixture()
+    scraper = ForexNewsScraper(Mock(), Mock())
+    fast_day = scraper._parse_news_from_html(html)
+    fast_week = scraper._parse_week_from_html(html, date(2025, 3, 2))
+    with patch.object(scraper_module, 'parse_calendar_rows', return_value=None):
+        soup_day = scraper._parse_news_from_html(html)
+        soup_week = scraper._parse_week_from_html(html, date(2025, 3, 2))
+
+    assert len(fast_day) == 389
+    assert fast_day == soup_day
+    assert len(fast_week) == 35
+    assert fast_week == soup_week
+    assert {item['impact'] for item in fast_day} >= {'high', 'medium', 'low'}
+
+    print("✅ lxml parser equivalence tests passed!")
+
+
+def test_row_selection_and_strainer():
+    """Only the calendar table is parsed and rows without an event id are dropped."""
+    print("Testing calendar table strainer...")
+
+    html = """
+    <html><body><table class="nav"><tr class="calendar__row" data-event-id="9"><td class="calendar__time">1:00am</td></tr></table>
+    <table class="calendar__table"><tr class="calendar__row calendar__row--day-breaker"><td>Tue Mar 11</td></tr>
+    <tr class="calendar__row" data-event-id="1"><td class="calendar__time">8:30am</td>
+    <td class="calendar__impact"><table><tr><td><span class="icon icon--ff-impact-red"></span></td></tr></table></td>
+    <td class="calendar__event"><span class="calendar__event-title">CPI m/m</span></td></tr></table>
+    <div>trailing markup</div></body></html>
+    """
+    rows = parse_calendar_rows(html)
+    # The nested impact table is kept inside the calendar table
+    assert [row['time'] for row in rows if row['has_event_id']] == ['8:30am']
+    assert rows[0]['is_day_breaker'] and rows[0]['date'] == 'Tue Mar 11'
+    day_rows = select_day_rows(rows)
+    assert len(day_rows) == 1
+    assert day_rows[0]['impact_classes'] == ['icon', 'icon--ff-impact-red']
+    assert day_rows[0]['actual'] is None
+    assert parse_calendar_rows("<html><body>No table</body></html>") is None
+
+    print("✅ Calendar table strainer tests passed!")
+
+
+def test_fast_parser_speed():
+    """The month fixture parses well under the BeautifulSoup time."""
+    print("Testing parser speed...")
+
+    html = _load_fixture()
+    scraper = ForexNewsScraper(Mock(), Mock())
+    logging.getLogger('bot.scraper').setLevel(logging.ERROR)
+    try:
+        started = time.perf_counter()
+        scraper._parse_news_from_html(html)
+        fast = time.perf_counter() - started
+        with patch.object(scraper_module, 'parse_calendar_rows', return_value=None):
+            started = time.perf_counter()
+            scraper._parse_news_from_html(html)
+            soup = time.perf_counter() - started
+    finally:
+        logging.getLogger('bot.scraper').setLevel(logging.NOTSET)
+    print(f"lxml: {fast * 1000:.1f} ms, BeautifulSoup: {soup * 1000:.1f} ms")
+    assert fast < soup
+
+    print("✅ Parser speed tests passed!")
+
+
+if __name__ == "__main__":
+    test_fast_parser_matches_soup()
+    test_row_selection_and_strainer()
+    test_fast_parser_speed()
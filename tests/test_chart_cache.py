@@ -0,0 +1,128 @@
+"""Test script to verify the rendered-chart cache and Telegram file_id reuse."""
+
+import sys
+import os
+import logging
+import tempfile
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pandas as pd
+import pytz
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.chart_cache import RenderedChartCache
+from bot.chart_service import ChartService
+from bot.notification_service import NotificationService
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _make_ohlc(bars: int = 60, seed: int = 3) -> pd.DataFrame:
+    index = pd.date_range(datetime(2025, 1, 6, 12, 0), periods=bars, freq='5min', tz='UTC')
+    rng = np.random.default_rng(seed)
+    closes = 1.10 + np.cumsum(rng.normal(0, 0.0002, bars))
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    return pd.DataFrame({
+        'Open': opens,
+        'High': np.maximum(opens, closes) + 0.0001,
+        'Low': np.minimum(opens, closes) - 0.0001,
+        'Close': closes,
+        'Volume': np.zeros(bars),
+    }, index=index)
+
+
+def test_cache_keys_and_eviction():
+    """Keys follow the data fingerprint; evicted entries are served from disk."""
+    print("Testing rendered chart cache keys and eviction...")
+
+    data = _make_ohlc()
+    assert RenderedChartCache.make_key('event', 'EURUSD=X', 2, data=data) == \
+        RenderedChartCache.make_key('event', 'EURUSD=X', 2, data=data.copy())
+    changed = data.copy()
+    changed.iloc[-1, changed.columns.get_loc('Close')] += 0.001
+    assert RenderedChartCache.make_key('event', 'EURUSD=X', 2, data=data) != \
+        RenderedChartCache.make_key('event', 'EURUSD=X', 2, data=changed)
+    assert RenderedChartCache.make_key('event', 'EURUSD=X', 2, data=data) != \
+        RenderedChartCache.make_key('event', 'EURUSD=X', 4, data=data)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RenderedChartCache(tmp, max_entries=2)
+        for i in range(3):
+            cache.put(f'k{i}', f'png{i}'.encode())
+        assert cache.get_stats()['entries'] == 2
+        # k0 was evicted from memory but is still on disk
+        buf = cache.get('k0')
+        assert buf.getvalue() == b'png0'
+        assert buf.chart_cache_key == 'k0'
+        assert cache.get('missing') is None
+        stats = cache.get_stats()
+        assert stats['disk_hits'] == 1
+        assert stats['misses'] == 1
+
+    print("✅ Cache key and eviction tests passed!")
+
+
+def test_generate_chart_renders_once():
+    """Identical event charts for several users are rendered a single time."""
+    print("Testing shared rendering of identical charts...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ChartService(cache_dir=tmp)
+        data = _make_ohlc()
+        event_time = datetime(2025, 1, 6, 14, 30, tzinfo=pytz.UTC)
+        args = (data, event_time, 'Non-Farm Payrolls', 'USD', 'EURUSD=X', 'high', 2)
+
+        with patch.object(service, '_render_event_chart', wraps=service._render_event_chart) as render:
+            first = service._generate_chart(*args)
+            second = service._generate_chart(*args)
+            assert render.call_count == 1
+            assert first.getvalue() == second.getvalue()
+            assert first.chart_cache_key == second.chart_cache_key
+
+            # A different window is a different chart
+            service._generate_chart(data, event_time, 'Non-Farm Payrolls', 'USD', 'EURUSD=X', 'high', 4)
+            assert render.call_count == 2
+
+    print("✅ Shared rendering tests passed!")
+
+
+def test_send_chart_reuses_file_id():
+    """The first upload's file_id is reused for later sends of the same chart."""
+    print("Testing Telegram file_id reuse...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RenderedChartCache(tmp)
+        cache.put('chart-key', b'png-bytes')
+        bot = Mock()
+        bot.send_photo.return_value = Mock(photo=[Mock(file_id='thumb'), Mock(file_id='full-size')])
+        service = NotificationService(Mock(), bot, Mock())
+
+        with patch('bot.notification_service.chart_service') as mock_chart_service:
+            mock_chart_service.rendered_charts = cache
+            service._send_chart_photo(1, cache.get('chart-key'), caption='a', parse_mode='HTML')
+            service._send_chart_photo(2, cache.get('chart-key'), caption='b', parse_mode='HTML')
+
+            first_payload = bot.send_photo.call_args_list[0][0][1]
+            second_payload = bot.send_photo.call_args_list[1][0][1]
+            assert first_payload.getvalue() == b'png-bytes'
+            assert second_payload == 'full-size'
+
+            # A rejected file_id falls back to uploading the image again
+            bot.send_photo.side_effect = [Exception('wrong file identifier'), Mock(photo=[Mock(file_id='new')])]
+            service._send_chart_photo(3, cache.get('chart-key'), caption='c')
+            assert bot.send_photo.call_count == 4
+            assert cache.get_file_id('chart-key') == 'new'
+
+    print("✅ file_id reuse tests passed!")
+
+
+if __name__ == "__main__":
+    test_cache_keys_and_eviction()
+    test_generate_chart_renders_once()
+    test_send_chart_reuses_file_id()
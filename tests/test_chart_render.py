@@ -0,0 +1,125 @@
+"""Test script to verify the vectorized candlestick renderer."""
+
+import sys
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+import pytz
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.chart_render import EVENT_CHART_TEMPLATE, draw_candlesticks, render_event_chart_png
+from bot.chart_service import render_event_chart
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _make_ohlc(bars: int = 480, tz: str = 'Europe/Prague') -> pd.DataFrame:
+    index = pd.date_range(datetime(2025, 1, 6, 10, 0), periods=bars, freq='1min', tz='UTC').tz_convert(tz)
+    rng = np.random.default_rng(7)
+    closes = 1.10 + np.cumsum(rng.normal(0, 0.0002, bars))
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    return pd.DataFrame({
+        'Open': opens,
+        'High': np.maximum(opens, closes) + 0.0001,
+        'Low': np.minimum(opens, closes) - 0.0001,
+        'Close': closes,
+    }, index=index)
+
+
+def test_draws_two_artists():
+    """All bars are drawn as one wick collection and one body collection."""
+    print("Testing vectorized candlesticks...")
+
+    ohlc = _make_ohlc()
+    fig, ax = plt.subplots()
+    try:
+        wicks, bodies = draw_candlesticks(ax, ohlc)
+        assert len(ax.collections) == 2
+        assert len(ax.patches) == 0
+        assert len(ax.lines) == 0
+        assert len(wicks.get_segments()) == len(ohlc)
+        assert len(bodies.get_paths()) == len(ohlc)
+
+        # Data limits cover the full time and price range
+        x0, x1 = ax.get_xlim()
+        first = mdates.date2num(ohlc.index[0].tz_convert('UTC').tz_localize(None))
+        last = mdates.date2num(ohlc.index[-1].tz_convert('UTC').tz_localize(None))
+        assert x0 <= first and x1 >= last
+        y0, y1 = ax.get_ylim()
+        assert y0 <= ohlc['Low'].min() and y1 >= ohlc['High'].max()
+    finally:
+        plt.close(fig)
+
+    print("✅ Vectorized candlestick tests passed!")
+
+
+def test_skips_missing_bars():
+    """Rows with missing prices are skipped instead of breaking the render."""
+    print("Testing candlesticks with missing bars...")
+
+    ohlc = _make_ohlc(bars=20)
+    ohlc.iloc[3] = np.nan
+    fig, ax = plt.subplots()
+    try:
+        wicks, bodies = draw_candlesticks(ax, ohlc)
+        assert len(wicks.get_segments()) == 19
+        assert draw_candlesticks(ax, ohlc.iloc[0:0]) is None
+    finally:
+        plt.close(fig)
+
+    print("✅ Missing bar tests passed!")
+
+
+def test_render_event_chart():
+    """The module-level event chart renders through the shared renderer."""
+    print("Testing render_event_chart...")
+
+    ohlc = _make_ohlc(bars=120)
+    event_time = ohlc.index[60].to_pydatetime()
+    buf = render_event_chart(ohlc, 'USD Non-Farm Payrolls', 'EUR/USD', event_time,
+                             change_tuple=(0.0012, 0.11), y_decimals=4)
+    data = buf.getvalue()
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+
+    print("✅ render_event_chart tests passed!")
+
+
+def test_templates_bypass_pyplot():
+    """Template figures are independent of pyplot and render identically across threads."""
+    print("Testing figure templates...")
+
+    open_figures = plt.get_fignums()
+    fig, axes = EVENT_CHART_TEMPLATE.new_figure(pytz.timezone('Europe/Prague'))
+    assert len(axes) == 2
+    assert fig.canvas.__class__.__name__ == 'FigureCanvasAgg'
+    assert isinstance(axes[0].xaxis.get_major_formatter(), mdates.DateFormatter)
+
+    ohlc = _make_ohlc(bars=60, tz='UTC')
+    event_time = ohlc.index[30].to_pydatetime()
+    args = (ohlc, event_time, 'CPI m/m', 'USD', 'EURUSD=X', 'high', 'Europe/Prague')
+    expected = render_event_chart_png(*args)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: render_event_chart_png(*args), range(4)))
+    assert all(png == expected for png in results)
+    assert plt.get_fignums() == open_figures
+
+    print("✅ Figure template tests passed!")
+
+
+if __name__ == "__main__":
+    test_draws_two_artists()
+    test_skips_missing_bars()
+    test_render_event_chart()
+    test_templates_bypass_pyplot()
@@ -0,0 +1,111 @@
+"""Test script to verify the notification deduplication backends."""
+
+import sys
+import os
+import time
+import logging
+import tempfile
+from unittest.mock import Mock
+
+from sqlalchemy import create_engine
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.dedup_store import MemoryDedupBackend, SQLDedupBackend
+from bot.notification_service import NotificationDeduplicationService
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_memory_backend_expiry():
+    """Markers expire by bucket and refreshed markers survive their old bucket."""
+    print("Testing in-memory dedup backend...")
+
+    backend = MemoryDedupBackend(bucket_seconds=1)
+    assert backend.add_if_absent('notification', 'a', 0.5) is True
+    assert backend.add_if_absent('notification', 'a', 0.5) is False
+    assert backend.add_if_absent('notification', 'b', 60) is True
+    backend.touch('chart', 'channel', 0.5)
+    backend.touch('chart', 'channel', 60)
+    assert backend.count('notification') == 2
+
+    time.sleep(2.1)
+    assert backend.count('notification') == 1
+    assert backend.add_if_absent('notification', 'a', 60) is True
+    # The refreshed chart marker outlived the bucket of its first expiry
+    assert backend.seconds_since('chart', 'channel') >= 2
+    assert backend.seconds_since('chart', 'other') is None
+
+    print("✅ In-memory backend tests passed!")
+
+
+def test_sql_backend_shared_across_workers():
+    """Two engines on one database see each other's markers; expired rows are reused."""
+    print("Testing database dedup backend...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'dedup.db')}"
+        first_engine, second_engine = create_engine(url), create_engine(url)
+        first, second = SQLDedupBackend(first_engine), SQLDedupBackend(second_engine)
+
+        assert first.add_if_absent('notification', 'evt-1', 60) is True
+        assert second.add_if_absent('notification', 'evt-1', 60) is False
+
+        assert first.add_if_absent('notification', 'evt-2', 0.2) is True
+        time.sleep(0.3)
+        assert second.add_if_absent('notification', 'evt-2', 60) is True
+        assert first.count('notification') == 2
+
+        assert first.seconds_since('chart', '-100') is None
+        first.touch('chart', '-100', 3600)
+        first.touch('chart', '-100', 3600)
+        assert 0 <= second.seconds_since('chart', '-100') < 5
+
+        second.add_if_absent('group', 'stale', 0.01)
+        time.sleep(0.05)
+        assert first.purge_expired() == 1
+        first_engine.dispose()
+        second_engine.dispose()
+
+    print("✅ Database backend tests passed!")
+
+
+def test_service_metrics_and_fallback():
+    """Stats report hits and misses; backend failures fall back to memory."""
+    print("Testing dedup service metrics and fallback...")
+
+    dedup = NotificationDeduplicationService()
+    assert dedup.should_send_notification("test", event_id="1", user_id="2")
+    assert not dedup.should_send_notification("test", event_id="1", user_id="2")
+    assert dedup.should_send_group_notification("-100", "2", "hash")
+    assert dedup.can_send_chart("2")
+    dedup.mark_chart_sent("2")
+    assert not dedup.can_send_chart("2")
+
+    stats = dedup.get_notification_stats()
+    assert stats['backend'] == 'memory'
+    assert stats['dedup_hits'] == 1
+    assert stats['dedup_misses'] == 2
+    assert stats['active_notifications'] == 1
+    assert stats['group_notifications'] == 1
+    assert stats['chart_rate_limits'] == 1
+    assert stats['charts_throttled'] == 1
+
+    broken = Mock()
+    broken.name = 'database'
+    broken.add_if_absent.side_effect = Exception('connection refused')
+    dedup.use_backend(broken)
+    assert dedup.should_send_notification("test", event_id="9", user_id="2")
+    assert not dedup.should_send_notification("test", event_id="9", user_id="2")
+    assert dedup._backend_errors == 2
+
+    print("✅ Dedup service tests passed!")
+
+
+if __name__ == "__main__":
+    test_memory_backend_expiry()
+    test_sql_backend_shared_across_workers()
+    test_service_metrics_and_fallback()
@@ -0,0 +1,124 @@
+"""Test script to verify incremental indicator state against full recomputation."""
+
+import sys
+import os
+import logging
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.gpt_analysis import _full_indicator_snapshot
+from bot.indicator_state import IndicatorStateStore
+from bot.price_store import PriceBarStore
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _bars(count=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0008, count))
+    high = close + rng.uniform(0.0001, 0.001, count)
+    low = close - rng.uniform(0.0001, 0.001, count)
+    index = pd.date_range('2025-03-03', periods=count, freq='1h', tz='UTC')
+    return pd.DataFrame({'Open': close, 'High': high, 'Low': low, 'Close': close, 'Volume': 0.0}, index=index)
+
+
+def _assert_matches(snapshot, expected):
+    for period in (20, 50):
+        assert np.isclose(snapshot['ema'][period], expected['ema'][period], rtol=0, atol=1e-12)
+        assert np.isclose(snapshot['ema_prev'][period], expected['ema_prev'][period], rtol=0, atol=1e-12)
+    assert np.isclose(snapshot['atr'], expected['atr'], rtol=0, atol=1e-12)
+    assert snapshot['daily_ranges'][-5:] == expected['daily_ranges'][-5:]
+
+
+def test_incremental_matches_full_recompute():
+    """Feeding overlapping windows bar by bar gives the values of one pass over the whole series."""
+    print("Testing incremental indicators...")
+
+    bars = _bars()
+    store = IndicatorStateStore()
+    # Sliding 48-bar windows, like the two-day fetches of compute_local_features
+    for end in range(48, len(bars) + 1, 7):
+        snapshot = store.update('EURUSD', bars.iloc[end - 48:end])
+        _assert_matches(snapshot, _full_indicator_snapshot(bars.iloc[:end]))
+
+    # Windows cover two days, the state keeps enough days for ADR
+    assert len(snapshot['daily_ranges']) >= 5
+    assert store.stats['rebuilds'] == 1
+    assert store.stats['bars_applied'] == end - 1
+
+    print("✅ Incremental indicator tests passed!")
+
+
+def test_forming_bar_and_gaps():
+    """The newest bar is not committed until a later bar arrives; a gap rebuilds the state."""
+    print("Testing forming bar and gap handling...")
+
+    bars = _bars(120)
+    store = IndicatorStateStore()
+    store.update('EURUSD', bars.iloc[:60])
+
+    revised = bars.iloc[:61].copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] += 0.01
+    store.update('EURUSD', revised)
+    snapshot = store.update('EURUSD', bars.iloc[:61])
+    _assert_matches(snapshot, _full_indicator_snapshot(bars.iloc[:61]))
+
+    # Bars missing between calls cannot be replayed: start over from the new window
+    snapshot = store.update('EURUSD', bars.iloc[90:120])
+    assert store.stats['rebuilds'] == 2
+    _assert_matches(snapshot, _full_indicator_snapshot(bars.iloc[90:120]))
+
+    print("✅ Forming bar and gap tests passed!")
+
+
+def test_partial_first_day_and_stale_frames():
+    """A state started mid-day leaves that day out of ADR; a frame behind the state is recomputed."""
+    print("Testing partial first day and stale frames...")
+
+    bars = _bars(200)
+    store = IndicatorStateStore()
+    snapshot = store.update('USDJPY', bars.iloc[18:150])
+    days = [day for day, _, _ in snapshot['daily_ranges']]
+    assert '2025-03-03' not in days and days[0] == '2025-03-04'
+    assert snapshot['daily_ranges'] == _full_indicator_snapshot(bars.iloc[18:150])['daily_ranges']
+
+    # Older or already committed windows cannot be answered from the state
+    assert store.update('USDJPY', bars.iloc[80:120]) is None
+    assert store.update('USDJPY', bars.iloc[100:149]) is None
+    assert store.stats['stale'] == 2
+    snapshot = store.update('USDJPY', bars.iloc[140:160])
+    _assert_matches(snapshot, _full_indicator_snapshot(bars.iloc[18:160]))
+
+    print("✅ Partial first day and stale frame tests passed!")
+
+
+def test_state_persists_in_price_store():
+    """A new process resumes from the state saved next to the cached bars."""
+    print("Testing indicator state persistence...")
+
+    bars = _bars(200)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bars.db')
+        IndicatorStateStore(PriceBarStore(path)).update('GBPUSD', bars.iloc[:150])
+
+        restored = IndicatorStateStore(PriceBarStore(path))
+        snapshot = restored.update('GBPUSD', bars.iloc[140:200])
+        assert restored.stats['rebuilds'] == 0
+        assert restored.stats['bars_applied'] == 50
+        _assert_matches(snapshot, _full_indicator_snapshot(bars))
+
+    print("✅ Indicator state persistence tests passed!")
+
+
+if __name__ == "__main__":
+    test_incremental_matches_full_recompute()
+    test_forming_bar_and_gaps()
+    test_partial_first_day_and_stale_frames()
+    test_state_persists_in_price_store()
@@ -0,0 +1,132 @@
+"""Test script to verify the background queue for webhook updates."""
+
+import sys
+import os
+import logging
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.job_queue import JobJournal, UpdateJobQueue, telegram_update_key
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_update_key():
+    """Updates are keyed by the user who sent them."""
+    print("Testing update keys...")
+
+    callback = SimpleNamespace(callback_query=SimpleNamespace(from_user=SimpleNamespace(id=7)), message=None)
+    message = SimpleNamespace(callback_query=None, message=SimpleNamespace(from_user=SimpleNamespace(id=8)))
+    assert telegram_update_key(callback) == "user:7"
+    assert telegram_update_key(message) == "user:8"
+    assert telegram_update_key(SimpleNamespace()) == "global"
+
+    print("✅ Update key tests passed!")
+
+
+def test_per_user_order_and_parallel_users():
+    """One user's updates run one at a time and in order; other users are not blocked."""
+    print("Testing per-user limits...")
+
+    lock = threading.Lock()
+    running = {}
+    peak = {}
+    order = []
+
+    def handler(payload):
+        user, seq = payload.split(":")
+        with lock:
+            running[user] = running.get(user, 0) + 1
+            peak[user] = max(peak.get(user, 0), running[user])
+            order.append(payload)
+        time.sleep(0.03)
+        with lock:
+            running[user] -= 1
+
+    queue = UpdateJobQueue(handler, workers=4, per_user_limit=1, max_pending=50)
+    started = time.monotonic()
+    for seq in range(3):
+        for user in ("a", "b", "c"):
+            assert queue.submit(f"{user}:{seq}", f"user:{user}")
+    # The webhook returns right after queueing
+    assert time.monotonic() - started < 0.05
+    assert queue.join(5)
+    queue.stop()
+
+    assert peak == {"a": 1, "b": 1, "c": 1}
+    for user in ("a", "b", "c"):
+        assert [p for p in order if p.startswith(user)] == [f"{user}:0", f"{user}:1", f"{user}:2"]
+    # Three users in parallel: about three handler durations, not nine
+    assert time.monotonic() - started < 0.25
+    assert queue.get_stats()['completed'] == 9
+
+    print("✅ Per-user limit tests passed!")
+
+
+def test_duplicates_and_backpressure():
+    """Re-delivered updates run once; a full queue hands the update back to the caller."""
+    print("Testing duplicate updates and a full queue...")
+
+    release = threading.Event()
+    calls = []
+
+    def handler(payload):
+        calls.append(payload)
+        release.wait(2)
+
+    queue = UpdateJobQueue(handler, workers=1, per_user_limit=1, max_pending=1)
+    assert queue.submit("first", "user:1", update_id=100)
+    time.sleep(0.02)
+    assert queue.submit("first", "user:1", update_id=100)
+    assert queue.submit("second", "user:1", update_id=101)
+    assert not queue.submit("third", "user:2", update_id=102)
+    release.set()
+    assert queue.join(5)
+    queue.stop()
+
+    assert calls == ["first", "second"]
+    stats = queue.get_stats()
+    assert stats['duplicates'] == 1 and stats['rejected'] == 1
+
+    print("✅ Duplicate and backpressure tests passed!")
+
+
+def test_journal_recovers_unfinished_updates():
+    """Updates still journaled when the process stopped run again on the next start."""
+    print("Testing durable update journal...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'jobs.sqlite3')
+        journal = JobJournal(path)
+        assert journal.add(1, "user:1", "left over") is not None
+        assert journal.add(1, "user:1", "left over") is None
+        stuck = journal.add(2, "user:2", "keeps crashing")
+        for _ in range(3):
+            journal.started(stuck)
+
+        calls = []
+        queue = UpdateJobQueue(calls.append, workers=1, journal=JobJournal(path))
+        queue.start()
+        assert queue.submit("new", "user:3", update_id=3)
+        assert queue.join(5)
+        queue.stop()
+
+        assert calls == ["left over", "new"]
+        assert queue.get_stats()['recovered'] == 1
+        assert JobJournal(path).pending(3) == []
+
+    print("✅ Durable update journal tests passed!")
+
+
+if __name__ == "__main__":
+    test_update_key()
+    test_per_user_order_and_parallel_users()
+    test_duplicates_and_backpressure()
+    test_journal_recovers_unfinished_updates()
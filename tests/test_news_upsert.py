@@ -0,0 +1,140 @@
+"""Test script to verify the bulk upsert path for imported news."""
+
+import sys
+import os
+import time
+import logging
+import tempfile
+from datetime import date
+
+from sqlalchemy import create_engine, event, text
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.database_service import ForexNewsService
+from bot.models import ForexNews
+from migrations.add_news_event_key import run_migration
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TARGET_DATE = date(2025, 3, 11)
+
+
+def _items(count: int = 40, actual: str = ""):
+    return [{'time': f"{8 + i // 4:02d}:{(i % 4) * 15:02d}", 'currency': 'USD', 'event': f'Event {i}',
+             'actual': actual, 'forecast': '0.3%', 'previous': '0.2%', 'impact': 'high', 'event_id': str(1000 + i)}
+            for i in range(count)]
+
+
+def _rows(service):
+    with service.db_manager.get_session() as session:
+        return {r.event: (r.id, r.actual, r.created_at, r.updated_at) for r in session.query(ForexNews).all()}
+
+
+def test_reimport_keeps_rows():
+    """Re-imports keep ids and created_at, touch only changed rows and drop stale events."""
+    print("Testing news upsert re-imports...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ForexNewsService(f"sqlite:///{os.path.join(tmp, 'news.db')}")
+        assert service.news_upsert_enabled
+
+        assert service.store_news_items(_items(), TARGET_DATE, "high")
+        first = _rows(service)
+        assert len(first) == 40
+
+        statements = []
+        event.listen(service.db_manager.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        time.sleep(0.01)
+        items = _items()
+        items[0]['actual'] = '0.4%'
+        # A duplicate of the same event in one scrape is stored once
+        items.append(dict(items[1]))
+        assert service.store_news_items(items, TARGET_DATE, "high")
+        second = _rows(service)
+        assert len(second) == 40
+        assert all(second[name][0] == first[name][0] and second[name][2] == first[name][2] for name in first)
+        assert second['Event 0'][1] == '0.4%'
+        assert second['Event 0'][3] > first['Event 0'][3]
+        assert second['Event 5'][3] == first['Event 5'][3]
+        # Batched upsert plus the stale-row lookup, not one statement per item
+        assert len(statements) <= 5
+
+        assert service.store_news_items(_items(30), TARGET_DATE, "high")
+        third = _rows(service)
+        assert len(third) == 30
+        assert 'Event 35' not in third
+
+        # Distinct events may share currency, time and title; a rescheduled event keeps its row
+        holidays = [{'time': 'All Day', 'currency': 'EUR', 'event': 'Bank Holiday', 'impact': 'holiday',
+                     'event_id': event_id} for event_id in ('2001', '2002')]
+        assert service.store_news_items(holidays, TARGET_DATE, "holiday")
+        holidays[0]['time'] = '10:00'
+        assert service.store_news_items(holidays, TARGET_DATE, "holiday")
+        with service.db_manager.get_session() as session:
+            stored = session.query(ForexNews.time).filter(ForexNews.event == 'Bank Holiday').order_by(ForexNews.id).all()
+        assert [r.time for r in stored] == ['10:00', 'All Day']
+        service.db_manager.engine.dispose()
+
+    print("✅ News upsert tests passed!")
+
+
+def test_legacy_table_migrated_explicitly():
+    """Startup leaves an existing table alone; the migration adds the event key without deleting rows."""
+    print("Testing event key migration...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'legacy.db')}"
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE forex_news (
+                    id INTEGER PRIMARY KEY, date DATETIME NOT NULL, time VARCHAR(50) NOT NULL,
+                    currency VARCHAR(10) NOT NULL, event TEXT NOT NULL, actual VARCHAR(100),
+                    forecast VARCHAR(100), previous VARCHAR(100), impact_level VARCHAR(20) NOT NULL,
+                    analysis TEXT, created_at DATETIME, updated_at DATETIME
+                )
+            """))
+            # Index created on startup by an earlier release
+            conn.execute(text("CREATE UNIQUE INDEX uq_forex_news_event ON forex_news (date, currency, time, event)"))
+            for country in ('Germany', 'France'):
+                conn.execute(text(
+                    "INSERT INTO forex_news (date, time, currency, event, actual, impact_level) "
+                    "VALUES ('2025-03-11 00:00:00.000000', 'All Day', 'EUR', :event, '', 'holiday')"
+                ), {'event': f'Bank Holiday {country}'})
+        engine.dispose()
+
+        service = ForexNewsService(url)
+        assert not service.news_upsert_enabled
+        assert not service.schema.has_column('forex_news', 'event_id')
+        assert len(_rows(service)) == 2
+        # Without the event key, stores use delete + insert and reads still work
+        assert service.store_news_items(_items(2), TARGET_DATE, "high")
+        assert len(service.get_news_for_date(TARGET_DATE, 'all')) == 4
+        service.db_manager.engine.dispose()
+
+        run_migration(url)
+        run_migration(url)
+        service = ForexNewsService(url)
+        assert service.news_upsert_enabled
+        assert not service.schema.has_index('forex_news', 'uq_forex_news_event')
+        assert len(_rows(service)) == 4
+
+        # Rows stored before the migration have no event id and are replaced by keyed rows
+        assert service.store_news_items(_items(2, actual='1.0%'), TARGET_DATE, "high")
+        rows = _rows(service)
+        assert len(rows) == 4
+        assert rows['Event 0'][1] == '1.0%'
+        service.db_manager.engine.dispose()
+
+    print("✅ Event key migration tests passed!")
+
+
+if __name__ == "__main__":
+    test_reimport_keeps_rows()
+    test_legacy_table_migrated_explicitly()
@@ -0,0 +1,152 @@
+"""Test script to verify the set-based notification matcher."""
+
+import sys
+import os
+import random
+import logging
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pytz
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.notification_matcher import NotificationMatcher
+from bot.notification_service import NotificationService
+from bot.preference_cache import UserPreferences
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TIMEZONES = ['Europe/Prague', 'America/New_York', 'Asia/Tokyo', 'UTC']
+
+
+def _make_day(seed: int = 5, count: int = 120):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        hour, minute = rng.randrange(24), rng.choice([0, 15, 30, 45])
+        time_str = f"{hour:02d}:{minute:02d}" if i % 2 else f"{(hour % 12) or 12}:{minute:02d}{'am' if hour < 12 else 'pm'}"
+        items.append({'id': i, 'time': time_str, 'impact': rng.choice(['high', 'medium', 'low']),
+                      'currency': 'USD', 'event': f'Event {i}'})
+    items.append({'id': 'na', 'time': 'N/A', 'impact': 'high', 'currency': 'USD', 'event': 'All day'})
+    return items
+
+
+def _scan(service, items, target_date, timezone_name, minutes_before, impacts, now):
+    """The original per-user scan, used as the reference result."""
+    current_time = now.astimezone(pytz.timezone(timezone_name))
+    due = []
+    for item in items:
+        if item['impact'] not in impacts or item['time'] == 'N/A':
+            continue
+        event_time = service._parse_event_time(target_date, item['time'], timezone_name)
+        minutes_diff = (event_time - current_time).total_seconds() / 60
+        if abs(minutes_diff - minutes_before) <= 2.5:
+            due.append((item['id'], int(minutes_diff)))
+    return due
+
+
+def test_matches_per_user_scan():
+    """Bucketed lookups return exactly what the per-user scan returned."""
+    print("Testing matcher against the per-user scan...")
+
+    items = _make_day()
+    target_date = datetime(2025, 3, 11, 9, 0)
+    service = NotificationService(Mock(), Mock(), Mock())
+    matcher = NotificationMatcher(items, target_date)
+    assert len(matcher) == len(items) - 1
+
+    rng = random.Random(9)
+    checked = 0
+    for _ in range(300):
+        timezone_name = rng.choice(TIMEZONES)
+        minutes_before = rng.choice([15, 30, 60])
+        impacts = rng.sample(['high', 'medium', 'low'], rng.randint(1, 3))
+        now = pytz.timezone(timezone_name).localize(
+            datetime(2025, 3, 11, rng.randrange(24), rng.randrange(60), rng.randrange(60)))
+        expected = _scan(service, items, target_date, timezone_name, minutes_before, impacts, now)
+        got = [(e['item']['id'], e['minutes_until'])
+               for e in matcher.match(timezone_name, minutes_before, impacts, now)]
+        assert got == expected
+        checked += len(expected)
+    assert checked > 0
+
+    print("✅ Matcher equivalence tests passed!")
+
+
+def test_users_resolved_per_bucket():
+    """Users sharing timezone, lead time and impacts share one lookup."""
+    print("Testing preference buckets...")
+
+    now = pytz.UTC.localize(datetime(2025, 3, 11, 13, 30))
+    items = [
+        {'id': 1, 'time': '14:00', 'impact': 'high'},
+        {'id': 2, 'time': '14:00', 'impact': 'medium'},
+        {'id': 3, 'time': '15:00', 'impact': 'high'},
+    ]
+    matcher = NotificationMatcher(items, now)
+    users = [UserPreferences(telegram_id=i, notifications_enabled=True, notification_minutes=30,
+                             notification_impact_levels='high', timezone='UTC') for i in range(1000)]
+    users.append(UserPreferences(telegram_id=5000, notifications_enabled=True, notification_minutes=60,
+                                 notification_impact_levels='high,medium', timezone='UTC'))
+    users.append(UserPreferences(telegram_id=5001, notifications_enabled=True, notification_minutes=30,
+                                 notification_impact_levels='medium,high', timezone='UTC'))
+
+    with patch.object(matcher, 'match', wraps=matcher.match) as match:
+        due = matcher.match_users(users, now)
+        assert match.call_count == 3
+
+    assert len(due) == 1001
+    assert [e['item']['id'] for e in due[users[0]]] == [1]
+    assert [e['item']['id'] for e in due[users[-1]]] == [1, 2]
+    assert users[-2] not in due
+
+    print("✅ Preference bucket tests passed!")
+
+
+def test_all_users_loads_events_once():
+    """One tick reads the day's news once and only messages users with due events."""
+    print("Testing the all-users notification pass...")
+
+    now = datetime.now(pytz.UTC)
+    # Skip the edge around midnight where the event would fall on another date
+    if now.hour < 1 or now.hour > 22:
+        print("⏭️ Skipping all-users test near midnight")
+        return
+
+    db_service = Mock()
+    db_service.schema.notifications_available = True
+    db_service.get_news_for_date.return_value = [
+        {'id': 7, 'time': (now + timedelta(minutes=30)).strftime('%H:%M'), 'impact': 'high',
+         'currency': 'USD', 'event': 'CPI m/m', 'actual': '', 'forecast': '0.3%', 'previous': '0.2%'},
+    ]
+    users = []
+    for i in range(50):
+        user = Mock(telegram_id=100 + i, preferred_currencies='', impact_levels='high', analysis_required=False,
+                    digest_time=None, notifications_enabled=True, notification_minutes=30 if i % 2 else 60,
+                    notification_impact_levels='high', charts_enabled=False, chart_type='single',
+                    chart_window_hours=2, timezone='UTC')
+        users.append(user)
+    db_service.get_users_with_notifications_enabled.return_value = users
+    bot = Mock()
+    service = NotificationService(db_service, bot, Mock())
+    service.deduplication = Mock()
+    service.deduplication.should_send_notification.return_value = True
+
+    with patch.object(service, '_send_direction_poll'):
+        assert service.check_and_send_notifications_for_all_users(now) == 25
+
+    db_service.get_news_for_date.assert_called_once()
+    db_service.get_or_create_user.assert_not_called()
+    assert sorted(c[0][0] for c in bot.send_message.call_args_list) == [100 + i for i in range(1, 50, 2)]
+
+    print("✅ All-users notification tests passed!")
+
+
+if __name__ == "__main__":
+    test_matches_per_user_scan()
+    test_users_resolved_per_bucket()
+    test_all_users_loads_events_once()
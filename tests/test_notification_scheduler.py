@@ -0,0 +1,230 @@
+"""Test script to verify notification scheduler jobs without starting the scheduler."""
+
+import sys
+import os
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytz
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from bot.notification_scheduler import NotificationScheduler
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _make_scheduler(news_items):
+    """Build a scheduler instance with mocked dependencies and no running jobs."""
+    scheduler = NotificationScheduler.__new__(NotificationScheduler)
+    scheduler.db_service = Mock()
+    scheduler.db_service.get_news_for_date.return_value = news_items
+    scheduler.bot = Mock()
+    scheduler.config = Mock()
+    scheduler.config.telegram_chat_id = '-100123'
+    scheduler.config.timezone = 'Europe/Prague'
+    scheduler.notification_service = Mock()
+    scheduler.scheduler = None
+    scheduler._fired_triggers = {}
+    scheduler._fired_lock = threading.Lock()
+    return scheduler
+
+
+def test_prewarm_event_prices():
+    """Pairs of events within the pre-warm window are fetched once per symbol."""
+    print("Testing event price pre-warming...")
+
+    tz = pytz.timezone('Europe/Prague')
+    now = datetime.now(tz)
+    # Skip the edge around midnight where "today" events would fall on another date
+    if now.hour < 3 or now.hour > 21:
+        print("⏭️ Skipping pre-warm test near midnight")
+        return
+
+    def at(minutes_from_now):
+        return (now + timedelta(minutes=minutes_from_now)).strftime('%H:%M')
+
+    items = [
+        {'time': at(30), 'currency': 'USD', 'event': 'Non-Farm Payrolls'},
+        {'time': at(30), 'currency': 'USD', 'event': 'Unemployment Rate'},
+        {'time': at(-20), 'currency': 'EUR', 'event': 'ECB Press Conference'},
+        {'time': at(-170), 'currency': 'GBP', 'event': 'Already charted'},
+        {'time': at(120), 'currency': 'CAD', 'event': 'Too far ahead'},
+    ]
+    scheduler = _make_scheduler(items)
+
+    with patch('bot.notification_scheduler.chart_service') as mock_chart_service:
+        mock_chart_service.fetch_price_data_many.return_value = {
+            'USDJPY=X': pd.DataFrame({'Close': [150.0]}),
+            'EURUSD=X': None,
+        }
+        scheduler._prewarm_event_prices()
+
+        assert mock_chart_service.fetch_price_data_many.call_count == 1
+        symbols, windows = mock_chart_service.fetch_price_data_many.call_args[0]
+        assert sorted(symbols) == ['EURUSD=X', 'USDJPY=X']
+        for start_time, end_time in windows:
+            assert end_time <= datetime.now(tz)
+            assert start_time < end_time
+
+    print("✅ Pre-warm tests passed!")
+
+
+def test_post_event_symbol_mapping():
+    """Pre-warm symbols match the pairs the post-event charts fetch."""
+    print("Testing post-event symbol mapping...")
+
+    scheduler = _make_scheduler([])
+    assert scheduler._post_event_symbol('USD') == 'USDJPY=X'
+    assert scheduler._post_event_symbol('EUR') == 'EURUSD=X'
+    assert scheduler._post_event_symbol('CAD') == 'USDCAD=X'
+    assert scheduler._post_event_symbol('JPY') == 'USDJPY=X'
+    assert scheduler._post_event_symbol('NZD') == 'NZDUSD=X'
+
+    # The chart itself tries the pre-warmed symbol first
+    from bot.chart_service import chart_service
+    event_time = datetime.now(pytz.UTC) - timedelta(hours=3)
+    for currency, (primary, secondary) in (('USD', ('USD', 'JPY')), ('CAD', ('USD', 'CAD')), ('NZD', ('NZD', 'USD'))):
+        with patch.object(chart_service, 'fetch_price_data', return_value=None) as fetch, \
+                patch.object(chart_service, 'fetch_price_data_many', return_value={}):
+            chart_service.create_multi_currency_chart(primary, secondary, event_time, 'Event', 'high')
+        assert fetch.call_args_list[0].args[0] == scheduler._post_event_symbol(currency)
+
+    print("✅ Post-event symbol mapping tests passed!")
+
+
+def test_refresh_event_triggers():
+    """Today's events become one-shot jobs at their exact fire instants."""
+    print("Testing event trigger planning...")
+
+    tz = pytz.timezone('Europe/Prague')
+    now = datetime.now(tz).replace(second=0, microsecond=0)
+    # Skip the edge around midnight where "today" events would fall on another date
+    if now.hour < 2 or now.hour > 21:
+        print("⏭️ Skipping trigger planning test near midnight")
+        return
+
+    event_time = now + timedelta(minutes=90)
+    items = [{'id': 'trig-1', 'time': event_time.strftime('%H:%M'), 'impact': 'high',
+              'currency': 'USD', 'event': 'Retail Sales m/m'}]
+    scheduler = _make_scheduler(items)
+    scheduler.scheduler = BackgroundScheduler()
+    scheduler._fired_triggers = {}
+    scheduler.db_service.schema.notifications_available = True
+    scheduler.db_service.get_users_with_notifications_enabled.return_value = [
+        Mock(telegram_id=1, preferred_currencies='', impact_levels='high', analysis_required=False,
+             digest_time=None, notifications_enabled=True, notification_minutes=45,
+             notification_impact_levels='high', charts_enabled=False, chart_type='single',
+             chart_window_hours=2, timezone='Europe/Prague'),
+    ]
+
+    scheduler.refresh_event_triggers()
+    jobs = {job.id: job for job in scheduler.scheduler.get_jobs()}
+
+    def job_at(kind, when):
+        return jobs.get(f"event_trigger_{kind}_{when.astimezone(pytz.UTC):%Y%m%d%H%M}")
+
+    assert job_at('channel_alert', event_time - timedelta(minutes=30))
+    assert job_at('post_event_short_chart', event_time + timedelta(minutes=15))
+    assert job_at('post_event_chart', event_time + timedelta(hours=2))
+    # The user's own lead time plus every offered one
+    for minutes in (15, 30, 45, 60):
+        assert job_at('user_notifications', event_time - timedelta(minutes=minutes))
+    assert len(jobs) == 7
+
+    # Replanning keeps existing jobs and drops ones for events that went away
+    scheduler.refresh_event_triggers()
+    assert len(scheduler.scheduler.get_jobs()) == 7
+
+    # A trigger that already ran (recorded from a worker thread) is not planned again
+    fired_id = f"event_trigger_channel_alert_{(event_time - timedelta(minutes=30)).astimezone(pytz.UTC):%Y%m%d%H%M}"
+    scheduler.scheduler.remove_job(fired_id)
+    worker = threading.Thread(target=scheduler._run_event_trigger,
+                              args=(fired_id, lambda fire_at: None, event_time - timedelta(minutes=30)))
+    worker.start()
+    worker.join()
+    scheduler.refresh_event_triggers()
+    assert len(scheduler.scheduler.get_jobs()) == 6
+    scheduler.db_service.get_news_for_date.return_value = []
+    scheduler.refresh_event_triggers()
+    assert scheduler.scheduler.get_jobs() == []
+
+    print("✅ Event trigger planning tests passed!")
+
+
+def test_refresh_keeps_post_midnight_jobs_of_yesterday():
+    """The first replan of a new day keeps post-event jobs planned for yesterday's events."""
+    print("Testing event trigger replan across midnight...")
+
+    tz = pytz.timezone('Europe/Prague')
+    now = datetime.now(tz).replace(second=0, microsecond=0)
+    if now.hour < 2 or now.hour > 21:
+        print("⏭️ Skipping midnight replan test near midnight")
+        return
+
+    real_today = date.today()
+    event_time = now + timedelta(minutes=90)
+    items = [{'id': 'late-1', 'time': event_time.strftime('%H:%M'), 'impact': 'high',
+              'currency': 'USD', 'event': 'FOMC Statement'}]
+    scheduler = _make_scheduler(items)
+    scheduler.scheduler = BackgroundScheduler()
+    scheduler.db_service.schema.notifications_available = False
+    scheduler.db_service.get_news_for_date.side_effect = lambda day, level: items if day == real_today else []
+    scheduler.refresh_event_triggers()
+    assert len(scheduler.scheduler.get_jobs()) == 3
+
+    class NextDay(date):
+        @classmethod
+        def today(cls):
+            return real_today + timedelta(days=1)
+
+    # Replan as if the clock had just passed midnight: the events now belong to yesterday
+    with patch('bot.notification_scheduler.date', NextDay):
+        scheduler.refresh_event_triggers()
+    jobs = {job.id: job for job in scheduler.scheduler.get_jobs()}
+    post_id = f"event_trigger_post_event_chart_{(event_time + timedelta(hours=2)).astimezone(pytz.UTC):%Y%m%d%H%M}"
+    assert post_id in jobs
+    assert jobs[post_id].kwargs['event_date'] == real_today
+    assert len(jobs) == 3
+
+    print("✅ Midnight replan tests passed!")
+
+
+def test_trigger_runs_use_exact_instant():
+    """A triggered channel alert only covers events at its exact lead time."""
+    print("Testing trigger run precision...")
+
+    tz = pytz.timezone('Europe/Prague')
+    items = [
+        {'id': 'exact-1', 'time': '14:00', 'impact': 'high', 'currency': 'USD', 'event': 'CPI y/y'},
+        {'id': 'exact-2', 'time': '14:02', 'impact': 'high', 'currency': 'EUR', 'event': 'ZEW Sentiment'},
+    ]
+    scheduler = _make_scheduler(items)
+    scheduler.notification_service.format_group_notification_message.return_value = 'alert'
+
+    fire_at = tz.localize(datetime(2025, 3, 11, 13, 30))
+    scheduler._send_channel_high_impact_alerts(fire_at=fire_at, event_date=date(2025, 3, 11))
+
+    scheduler.db_service.get_news_for_date.assert_called_with(date(2025, 3, 11), 'high')
+    assert scheduler.bot.send_message.call_count == 1
+    events = scheduler.notification_service.format_group_notification_message.call_args[0][0]
+    assert [e['item']['id'] for e in events] == ['exact-1']
+    assert events[0]['minutes_until'] == 30
+
+    print("✅ Trigger precision tests passed!")
+
+
+if __name__ == "__main__":
+    test_prewarm_event_prices()
+    test_post_event_symbol_mapping()
+    test_refresh_event_triggers()
+    test_refresh_keeps_post_midnight_jobs_of_yesterday()
+    test_trigger_runs_use_exact_instant()
@@ -0,0 +1,150 @@
+"""Test script to verify the pooled, streaming OpenAI client."""
+
+import sys
+import os
+import json
+import logging
+import threading
+import time
+from unittest.mock import Mock
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.openai_client import OpenAIClient
+from bot.telegram_handlers import StreamingMessageEditor
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MESSAGES = [{"role": "user", "content": "Features: symbol=EURUSD"}]
+PARAMS = {"model": "gpt-4o-mini", "temperature": 0.25, "max_tokens": 500}
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, lines=(), line_delay=0.0):
+        self.status_code = status_code
+        self.body = body or {}
+        self.lines = lines
+        self.line_delay = line_delay
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.body
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self.lines:
+            time.sleep(self.line_delay)
+            yield line
+
+
+def _sse(*deltas):
+    lines = [f"data: {json.dumps({'choices': [{'delta': {'content': d}}]})}" for d in deltas]
+    return lines + ["", "data: [DONE]"]
+
+
+def _client():
+    client = OpenAIClient()
+    client.backoffs = [0.01, 0.01, 0.01]
+    client.session = Mock()
+    return client
+
+
+def test_pooled_call_with_retry():
+    """Transient statuses are retried on the shared session; the answer text is returned."""
+    print("Testing pooled OpenAI call...")
+
+    client = _client()
+    client.session.post.side_effect = [
+        FakeResponse(429),
+        FakeResponse(body={"choices": [{"message": {"content": " Bullish bias \n"}}]}),
+    ]
+    assert client.chat("key", MESSAGES, **PARAMS) == "Bullish bias"
+    assert client.session.post.call_count == 2
+    assert client.stats['retries'] == 1
+    assert 'stream' not in client.session.post.call_args.kwargs['json']
+    assert client.chat(None, MESSAGES, **PARAMS) is None
+
+    print("✅ Pooled OpenAI call tests passed!")
+
+
+def test_streaming_and_deadline():
+    """Streamed chunks reach the callback as they arrive; a stream past its deadline is cancelled."""
+    print("Testing streamed responses...")
+
+    client = _client()
+    client.session.post.return_value = FakeResponse(lines=_sse("Bull", "ish", " bias"))
+    seen = []
+    assert client.chat("key", MESSAGES, on_delta=seen.append, **PARAMS) == "Bullish bias"
+    assert seen == ["Bull", "Bullish", "Bullish bias"]
+    assert client.session.post.call_args.kwargs['json']['stream'] is True
+
+    slow = FakeResponse(lines=_sse(*["x"] * 20), line_delay=0.02)
+    client.session.post.return_value = slow
+    started = time.monotonic()
+    assert client.chat("key", MESSAGES, deadline_sec=0.1, on_delta=lambda text: None, **PARAMS) is None
+    assert time.monotonic() - started < 0.3
+    assert slow.closed
+    assert client.stats['deadline_exceeded'] == 1
+
+    print("✅ Streamed response tests passed!")
+
+
+def test_concurrency_limit():
+    """Calls beyond the slot limit wait, and give up when their deadline passes first."""
+    print("Testing OpenAI concurrency limit...")
+
+    client = _client()
+    client.max_concurrency = 1
+    client._slots = threading.BoundedSemaphore(1)
+    release = threading.Event()
+
+    def slow_post(*args, **kwargs):
+        release.wait(1)
+        return FakeResponse(body={"choices": [{"message": {"content": "ok"}}]})
+
+    client.session.post.side_effect = slow_post
+    holder = threading.Thread(target=lambda: client.chat("key", MESSAGES, **PARAMS))
+    holder.start()
+    time.sleep(0.02)
+    assert client.chat("key", MESSAGES, deadline_sec=0.05, **PARAMS) is None
+    assert client.stats['busy'] == 1
+    release.set()
+    holder.join()
+    assert client.chat("key", MESSAGES, **PARAMS) == "ok"
+
+    print("✅ Concurrency limit tests passed!")
+
+
+def test_streaming_message_editor():
+    """Edits are throttled while streaming and the final text is always shown."""
+    print("Testing streaming message edits...")
+
+    bot = Mock()
+    editor = StreamingMessageEditor(bot, 1, 2, header="GPT view:\n", min_interval_sec=60)
+    editor.update("Bull")
+    editor.update("Bullish")
+    editor.finish("Bullish bias")
+    editor.finish("Bullish bias")
+    texts = [c.args[0] for c in bot.edit_message_text.call_args_list]
+    assert texts == ["GPT view:\nBull ▌", "GPT view:\nBullish bias"]
+
+    print("✅ Streaming message edit tests passed!")
+
+
+if __name__ == "__main__":
+    test_pooled_call_with_retry()
+    test_streaming_and_deadline()
+    test_concurrency_limit()
+    test_streaming_message_editor()
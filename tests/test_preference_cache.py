@@ -0,0 +1,123 @@
+"""Test script to verify the user preference cache and its invalidation."""
+
+import sys
+import os
+import time
+import logging
+import tempfile
+import dataclasses
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import event
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.database_service import ForexNewsService
+from bot.preference_cache import (
+    PREFERENCES_CHANNEL, PreferenceInvalidationListener, UserPreferenceCache, UserPreferences
+)
+from bot.user_settings import UserSettingsHandler
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_cache_ttl_lru_and_generation():
+    """Entries expire, the oldest is evicted, and stale loads are not stored."""
+    print("Testing preference cache TTL, LRU and load generations...")
+
+    cache = UserPreferenceCache(max_entries=2, ttl_sec=0.2)
+    cache.put(UserPreferences(telegram_id=1))
+    cache.put(UserPreferences(telegram_id=2))
+    assert cache.get(1).telegram_id == 1
+    cache.put(UserPreferences(telegram_id=3))
+    # 2 was the least recently used
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+
+    time.sleep(0.25)
+    assert cache.get(1) is None
+
+    generation = cache.begin_load()
+    cache.invalidate(4)
+    assert cache.put(UserPreferences(telegram_id=4), generation) is False
+    assert cache.get(4) is None
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 2
+    assert stats['invalidations'] == 1
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        UserPreferences(telegram_id=5).chart_type = 'multi'
+
+    print("✅ Preference cache tests passed!")
+
+
+def test_settings_render_from_cache():
+    """Settings keyboards hit the database once, and updates invalidate the entry."""
+    print("Testing cached settings keyboards...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ForexNewsService(f"sqlite:///{os.path.join(tmp, 'prefs.db')}")
+        handler = UserSettingsHandler(service)
+
+        statements = []
+        event.listen(service.db_manager.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        handler.get_settings_keyboard(333)
+        warm = len(statements)
+        assert warm > 0
+
+        assert handler.get_settings_keyboard(333).keyboard
+        assert handler.get_currencies_keyboard(333).keyboard
+        assert handler.get_notifications_keyboard(333).keyboard
+        assert handler.get_charts_keyboard(333).keyboard
+        assert len(statements) == warm
+
+        assert service.update_user_preferences(333, preferred_currencies="USD,JPY", charts_enabled=True)
+        preferences = service.get_cached_preferences(333)
+        assert preferences.get_currencies_list() == ["USD", "JPY"]
+        assert preferences.charts_enabled is True
+        assert service.preference_cache.get_stats()['invalidations'] == 1
+        service.db_manager.engine.dispose()
+
+    print("✅ Cached settings keyboard tests passed!")
+
+
+def test_notify_and_listener_payloads():
+    """Updates queue a NOTIFY when enabled and the listener evicts the named user."""
+    print("Testing cross-process invalidation hooks...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ForexNewsService(f"sqlite:///{os.path.join(tmp, 'notify.db')}")
+        assert service.preference_listener is None
+
+        session = Mock()
+        service._preferences_changed(session, 42)
+        session.execute.assert_not_called()
+
+        service.preference_notify = True
+        service._preferences_changed(session, 42)
+        params = session.execute.call_args[0][1]
+        assert params == {'channel': PREFERENCES_CHANNEL, 'payload': '42'}
+        service.db_manager.engine.dispose()
+
+    cache = UserPreferenceCache()
+    cache.put(UserPreferences(telegram_id=42))
+    listener = PreferenceInvalidationListener(Mock(), cache)
+    listener._handle_payload('not-a-user')
+    assert cache.get(42) is not None
+    listener._handle_payload('42')
+    assert cache.get(42) is None
+
+    print("✅ Invalidation hook tests passed!")
+
+
+if __name__ == "__main__":
+    test_cache_ttl_lru_and_generation()
+    test_settings_render_from_cache()
+    test_notify_and_listener_payloads()
@@ -0,0 +1,382 @@
+"""Test script to verify the persistent price bar store and gap-only fetching."""
+
+import sys
+import os
+import tempfile
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pandas as pd
+import pytz
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.price_store import PriceBarStore
+from bot.chart_service import ChartService, fetch_prices_with_backoff
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _make_bars(start: datetime, end: datetime, freq: str = '1min') -> pd.DataFrame:
+    index = pd.date_range(start=start, end=end, freq=freq, tz='UTC')
+    closes = [1.1 + i * 0.0001 for i in range(len(index))]
+    return pd.DataFrame({
+        'Open': closes,
+        'High': [c + 0.0002 for c in closes],
+        'Low': [c - 0.0002 for c in closes],
+        'Close': closes,
+        'Volume': [0.0] * len(index),
+    }, index=index)
+
+
+def test_price_store_gaps_and_subranges():
+    """Stored ranges are served back and only uncovered gaps are reported."""
+    print("Testing price bar store coverage...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PriceBarStore(os.path.join(tmp, 'bars.sqlite3'))
+        start = datetime(2025, 1, 6, 10, 0, tzinfo=pytz.UTC)
+        end = start + timedelta(hours=1)
+        s_ts, e_ts = int(start.timestamp()), int(end.timestamp())
+
+        assert store.missing_ranges('EURUSD=X', '1m', s_ts, e_ts) == [(s_ts, e_ts)]
+
+        store.store_bars('EURUSD=X', '1m', _make_bars(start, end), s_ts, e_ts)
+        assert store.missing_ranges('EURUSD=X', '1m', s_ts, e_ts) == []
+        # Other intervals keep their own coverage
+        assert store.missing_ranges('EURUSD=X', '5m', s_ts, e_ts) == [(s_ts, e_ts)]
+
+        # Sub-range served from the store
+        sub = store.load_bars('EURUSD=X', '1m', s_ts + 600, s_ts + 1200)
+        assert len(sub) == 11
+        assert str(sub.index.tz) == 'UTC'
+        assert list(sub.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+        # Extending the window reports only the uncovered tail
+        later = e_ts + 1800
+        assert store.missing_ranges('EURUSD=X', '1m', s_ts, later) == [(e_ts, later)]
+
+        # Adjacent coverage merges into one range
+        store.store_bars('EURUSD=X', '1m', None, e_ts, later)
+        assert store.missing_ranges('EURUSD=X', '1m', s_ts - 60, later) == [(s_ts - 60, s_ts)]
+
+    print("✅ Price bar store coverage tests passed!")
+
+
+def test_fetch_price_data_fetches_only_gaps():
+    """A wider window reuses stored bars and downloads only the missing part."""
+    print("Testing gap-only fetching in ChartService...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ChartService(cache_dir=tmp)
+        start = datetime(2025, 1, 6, 10, 0, tzinfo=pytz.UTC)
+        end = start + timedelta(hours=1)
+        requested = []
+
+        def fake_fetch(symbol, start_time, end_time, interval='1h'):
+            requested.append((interval, start_time, end_time))
+            return _make_bars(start_time, end_time)
+
+        with patch.object(service, '_fetch_with_retry', side_effect=fake_fetch):
+            first = service.fetch_price_data('EURUSD=X', start, end)
+            assert first is not None and len(first) == 61
+            assert len(requested) == 1
+
+            # Drop the in-memory layer so the persistent store is exercised
+            service._price_cache.clear()
+            wider = service.fetch_price_data('EURUSD=X', start, end + timedelta(minutes=30))
+            assert wider is not None and len(wider) == 91
+            assert len(requested) == 2
+            assert requested[1][1] == end
+
+            service._price_cache.clear()
+            inner = service.fetch_price_data('EURUSD=X', start + timedelta(minutes=5), end)
+            assert inner is not None and len(inner) == 56
+            assert len(requested) == 2
+
+    print("✅ Gap-only fetching tests passed!")
+
+
+def test_concurrent_fetches_are_coalesced():
+    """Concurrent identical and contained windows share one upstream fetch."""
+    print("Testing single-flight coalescing of price fetches...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ChartService(cache_dir=tmp)
+        start = datetime(2025, 1, 6, 10, 0, tzinfo=pytz.UTC)
+        end = start + timedelta(hours=2)
+        calls = []
+        calls_lock = threading.Lock()
+
+        def slow_fetch(symbol, start_time, end_time, interval='1h'):
+            with calls_lock:
+                calls.append((symbol, start_time, end_time))
+            time.sleep(0.3)
+            return _make_bars(start_time, end_time)
+
+        windows = [(start, end), (start, end), (start + timedelta(minutes=30), end - timedelta(minutes=30))]
+        results = [None] * len(windows)
+
+        def worker(i, window):
+            results[i] = service.fetch_price_data('EURUSD=X', *window)
+
+        with patch.object(service, '_fetch_with_retry', side_effect=slow_fetch):
+            leader = threading.Thread(target=worker, args=(0, windows[0]))
+            leader.start()
+            time.sleep(0.05)
+            followers = [threading.Thread(target=worker, args=(i, windows[i])) for i in (1, 2)]
+            for t in followers:
+                t.start()
+            for t in [leader] + followers:
+                t.join()
+
+        assert len(calls) == 1
+        assert len(results[0]) == 121
+        assert len(results[1]) == 121
+        assert len(results[2]) == 61
+        assert service._inflight_fetches == {}
+
+        # A window with no bars in the shared frame gets an empty frame, not the whole frame
+        shared = _make_bars(start, end)
+        assert service._slice_window(shared, end + timedelta(hours=1), end + timedelta(hours=2)).empty
+
+    print("✅ Single-flight coalescing tests passed!")
+
+
+def test_covered_window_refetches_when_shared_bars_are_coarser():
+    """A short window inside a long in-flight fetch still gets its own finer bars."""
+    print("Testing coalescing with a coarser leader...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ChartService(cache_dir=tmp)
+        now = datetime.now(pytz.UTC).replace(second=0, microsecond=0)
+        leader_window = (now - timedelta(days=10), now - timedelta(days=1))
+        follower_window = (now - timedelta(days=3), now - timedelta(days=3) + timedelta(hours=1))
+        calls = []
+        calls_lock = threading.Lock()
+
+        def slow_fetch(symbol, start_time, end_time, interval='1h'):
+            with calls_lock:
+                calls.append(interval)
+            time.sleep(0.3)
+            return _make_bars(start_time, end_time, freq={'1m': '1min', '5m': '5min'}.get(interval, '1h'))
+
+        results = {}
+
+        def worker(name, window):
+            results[name] = service.fetch_price_data('EURUSD=X', *window)
+
+        with patch.object(service, '_fetch_with_retry', side_effect=slow_fetch):
+            leader = threading.Thread(target=worker, args=('leader', leader_window))
+            leader.start()
+            time.sleep(0.05)
+            follower = threading.Thread(target=worker, args=('follower', follower_window))
+            follower.start()
+            leader.join()
+            follower.join()
+
+        # The 10-day leader can only use 5m bars; the 1-hour follower fetched 1m itself
+        assert calls == ['5m', '1m']
+        assert len(results['follower']) == 61
+        assert service._inflight_fetches == {}
+
+    print("✅ Coarser leader coalescing tests passed!")
+
+
+def test_fetch_price_data_many_plans_and_runs_concurrently():
+    """Batch fetch merges windows per symbol and fetches symbols in parallel."""
+    print("Testing batch multi-symbol fetching...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ChartService(cache_dir=tmp)
+        start = datetime(2025, 1, 6, 10, 0, tzinfo=pytz.UTC)
+        end = start + timedelta(hours=1)
+        calls = []
+        calls_lock = threading.Lock()
+
+        def slow_fetch(symbol, start_time, end_time, interval='1h'):
+            with calls_lock:
+                calls.append((symbol, start_time, end_time))
+            time.sleep(0.3)
+            return _make_bars(start_time, end_time)
+
+        with patch.object(service, '_fetch_with_retry', side_effect=slow_fetch):
+            started = time.monotonic()
+            results = service.fetch_price_data_many(
+                ['EURUSD=X', 'GBPUSD=X', 'EURUSD=X'],
+                [(start, end), (start, end), (start - timedelta(minutes=30), end)],
+            )
+            elapsed = time.monotonic() - started
+
+        assert list(results) == ['EURUSD=X', 'GBPUSD=X']
+        assert len(results['EURUSD=X']) == 91
+        assert len(results['GBPUSD=X']) == 61
+        assert len(calls) == 2
+        assert elapsed < 0.55
+
+    print("✅ Batch fetching tests passed!")
+
+
+def test_price_cache_is_thread_safe():
+    """Batch worker threads can cache and evict price data at the same time."""
+    print("Testing concurrent price cache writes...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ChartService(cache_dir=tmp)
+        start = datetime(2025, 1, 6, 10, 0, tzinfo=pytz.UTC)
+        bars = _make_bars(start, start + timedelta(minutes=5))
+        stale = datetime.now() - timedelta(hours=2)
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(500):
+                    window_start = start + timedelta(minutes=n * 1000 + i)
+                    service._cache_data('EURUSD=X', bars, window_start, window_start + timedelta(hours=1))
+                    # Age every fourth entry so eviction runs alongside the inserts
+                    if i % 4 == 0:
+                        service._cache_data('GBPUSD=X', bars, window_start, window_start)
+                        key = f"GBPUSD=X_{window_start.strftime('%Y%m%d_%H%M')}_{window_start.strftime('%Y%m%d_%H%M')}"
+                        with service._price_cache_lock:
+                            service._price_cache[key] = (bars, stale)
+                    service._get_cached_data('EURUSD=X', window_start, window_start + timedelta(hours=1))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        service.cleanup_cache()
+        assert all(not key.startswith('GBPUSD=X') for key in service._price_cache)
+        assert len(service._price_cache) == 2000
+
+    print("✅ Concurrent price cache tests passed!")
+
+
+def test_fallback_pairs_fetched_only_when_needed():
+    """Fallback pairs are requested one at a time, and only after the preferred pair came back empty."""
+    print("Testing fallback pair fetching...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ChartService(cache_dir=tmp)
+        start = datetime(2025, 1, 6, 10, 0, tzinfo=pytz.UTC)
+        end = start + timedelta(hours=1)
+        available = {'EURUSD=X': None, 'GBPUSD=X': _make_bars(start, end), 'USDJPY=X': _make_bars(start, end)}
+
+        with patch.object(service, 'fetch_price_data', side_effect=lambda s, a, b: available[s]) as fetch:
+            symbol, data = service._first_available(['GBPUSD=X', 'USDJPY=X'], start, end)
+            assert symbol == 'GBPUSD=X' and data is not None
+            assert [c.args[0] for c in fetch.call_args_list] == ['GBPUSD=X']
+
+            fetch.reset_mock()
+            symbol, _ = service._first_available(['EURUSD=X', 'GBPUSD=X', 'USDJPY=X'], start, end)
+            assert symbol == 'GBPUSD=X'
+            assert [c.args[0] for c in fetch.call_args_list] == ['EURUSD=X', 'GBPUSD=X']
+
+            # Data already fetched for another leg is reused
+            fetch.reset_mock()
+            symbol, _ = service._first_available(['USDJPY=X'], start, end, {'USDJPY=X': available['USDJPY=X']})
+            assert symbol == 'USDJPY=X' and fetch.call_count == 0
+
+    print("✅ Fallback pair fetching tests passed!")
+
+
+def test_interval_planner_skips_infeasible_and_empty_intervals():
+    """Old windows skip intraday intervals; known-empty windows are not requested again."""
+    print("Testing interval planner...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = ChartService(cache_dir=tmp)
+        ladder = ['1m', '5m', '15m', '1h']
+        now = datetime.now(pytz.UTC)
+
+        recent = service._plan_intervals('EURUSD=X', now - timedelta(hours=3), now, ladder)
+        assert recent == ladder
+        month_old = service._plan_intervals('EURUSD=X', now - timedelta(days=40), now - timedelta(days=39), ladder)
+        assert month_old == ['5m', '15m', '1h']
+        year_old = service._plan_intervals('EURUSD=X', now - timedelta(days=300), now - timedelta(days=299), ladder)
+        assert year_old == ['1h']
+        long_span = service._plan_intervals('EURUSD=X', now - timedelta(days=10), now, ladder)
+        assert long_span == ['5m', '15m', '1h']
+
+        start = now - timedelta(days=3)
+        end = start + timedelta(hours=2)
+        calls = []
+
+        def fake_fetch(symbol, start_time, end_time, interval='1h'):
+            calls.append(interval)
+            if interval == '1m':
+                return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+            return _make_bars(start_time, end_time, freq='5min')
+
+        with patch.object(service, '_fetch_with_retry', side_effect=fake_fetch):
+            first = service.fetch_price_data('GBPUSD=X', start, end)
+            assert first is not None and not first.empty
+            assert calls == ['1m', '5m']
+
+            service._price_cache.clear()
+            calls.clear()
+            inner = service.fetch_price_data('GBPUSD=X', start + timedelta(minutes=10), end)
+            assert inner is not None and not inner.empty
+            # 1m is remembered as empty and 5m is served from the bar store
+            assert calls == []
+
+        service._remember_unknown_symbol('USDEUR=X')
+        assert service._plan_intervals('USDEUR=X', now - timedelta(hours=1), now, ladder) == []
+
+    print("✅ Interval planner tests passed!")
+
+
+def test_backoff_fetch_moves_on_from_empty_windows():
+    """Out-of-window bars move to the next interval; windows past retention fail up front."""
+    print("Testing backoff price fetch...")
+
+    now = datetime.now(pytz.UTC)
+    start = now - timedelta(days=3)
+    end = start + timedelta(hours=2)
+    calls = []
+
+    def fake_download(symbol, start, end, interval, progress):
+        calls.append(interval)
+        if interval == '1m':
+            # Bars, but none inside the requested window
+            return _make_bars(end + timedelta(hours=1), end + timedelta(hours=2))
+        return _make_bars(start, end, freq='5min')
+
+    with patch('bot.chart_service.yf.download', side_effect=fake_download), \
+            patch('bot.chart_service.yahoo_rate_limiter.acquire'):
+        df = fetch_prices_with_backoff('EURUSD=X', start, end)
+        assert not df.empty
+        assert calls == ['1m', '5m']
+
+        calls.clear()
+        try:
+            fetch_prices_with_backoff('EURUSD=X', now - timedelta(days=800), now - timedelta(days=799))
+            assert False, "expected a retention error"
+        except RuntimeError as e:
+            assert 'retention' in str(e)
+        assert calls == []
+
+    print("✅ Backoff price fetch tests passed!")
+
+
+if __name__ == "__main__":
+    test_price_store_gaps_and_subranges()
+    test_fetch_price_data_fetches_only_gaps()
+    test_concurrent_fetches_are_coalesced()
+    test_covered_window_refetches_when_shared_bars_are_coarser()
+    test_fetch_price_data_many_plans_and_runs_concurrently()
+    test_price_cache_is_thread_safe()
+    test_fallback_pairs_fetched_only_when_needed()
+    test_interval_planner_skips_infeasible_and_empty_intervals()
+    test_backoff_fetch_moves_on_from_empty_windows()
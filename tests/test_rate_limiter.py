@@ -0,0 +1,111 @@
+"""Test script to verify the shared token-bucket rate limiter."""
+
+import sys
+import os
+import time
+import threading
+import logging
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.rate_limiter import TokenBucketRateLimiter
+from bot.chart_service import ChartService
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def test_burst_then_refill():
+    """Burst tokens are granted immediately, later ones wait for the refill rate."""
+    print("Testing token bucket burst and refill...")
+
+    limiter = TokenBucketRateLimiter('test', rate_per_sec=20.0, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        assert limiter.acquire()
+    assert time.monotonic() - started < 0.05
+
+    assert limiter.acquire()
+    stats = limiter.get_stats()
+    assert stats['acquired'] == 4
+    assert stats['waited'] == 1
+    assert stats['max_wait_sec'] > 0
+
+    print("✅ Burst and refill tests passed!")
+
+
+def test_thread_safety():
+    """Concurrent callers never exceed burst + elapsed * rate grants."""
+    print("Testing token bucket under concurrency...")
+
+    limiter = TokenBucketRateLimiter('test', rate_per_sec=50.0, burst=5)
+    grants = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            limiter.acquire()
+            with lock:
+                grants.append(time.monotonic())
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    assert len(grants) == 30
+    # 5 burst tokens + 25 refilled at 50/s need at least ~0.5s
+    assert elapsed >= 0.45
+
+    print("✅ Concurrency tests passed!")
+
+
+def test_penalize_and_timeout():
+    """A 429 halves the rate and blocks acquisition until the cooldown ends."""
+    print("Testing adaptive backoff...")
+
+    limiter = TokenBucketRateLimiter('test', rate_per_sec=10.0, burst=2)
+    limiter.penalize(retry_after=0.3)
+    assert limiter.in_cooldown()
+    assert limiter.rate == 5.0
+    assert limiter.acquire(timeout=0.05) is False
+
+    assert limiter.acquire(timeout=2.0)
+    assert not limiter.in_cooldown()
+
+    limiter.record_success()
+    assert limiter.rate > 5.0
+    stats = limiter.get_stats()
+    assert stats['throttled'] == 1
+    assert stats['timeouts'] == 1
+
+    print("✅ Adaptive backoff tests passed!")
+
+
+def test_chart_services_share_limiter():
+    """All ChartService instances route Yahoo requests through one limiter."""
+    print("Testing shared limiter wiring...")
+
+    first = ChartService()
+    second = ChartService()
+    assert first.rate_limiter is second.rate_limiter
+
+    custom = TokenBucketRateLimiter('custom', rate_per_sec=1.0)
+    third = ChartService(rate_limiter=custom)
+    third._enter_cooldown(0.1)
+    assert third._is_in_cooldown()
+    assert first.rate_limiter is not custom
+
+    print("✅ Shared limiter wiring tests passed!")
+
+
+if __name__ == "__main__":
+    test_burst_then_refill()
+    test_thread_safety()
+    test_penalize_and_timeout()
+    test_chart_services_share_limiter()
@@ -0,0 +1,109 @@
+"""Test script to verify the process-pool chart renderer."""
+
+import sys
+import os
+import time
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.chart_render import render_event_chart_png
+from bot.render_pool import ChartRenderPool
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+
+
+def _make_ohlc(bars: int = 48) -> pd.DataFrame:
+    index = pd.date_range(datetime(2025, 1, 6, 12, 0), periods=bars, freq='5min', tz='UTC')
+    rng = np.random.default_rng(11)
+    closes = 1.10 + np.cumsum(rng.normal(0, 0.0002, bars))
+    opens = np.concatenate([[closes[0]], closes[:-1]])
+    return pd.DataFrame({
+        'Open': opens,
+        'High': np.maximum(opens, closes) + 0.0001,
+        'Low': np.minimum(opens, closes) - 0.0001,
+        'Close': closes,
+        'Volume': np.zeros(bars),
+    }, index=index)
+
+
+def _event_args():
+    return (_make_ohlc(), datetime(2025, 1, 6, 14, 0, tzinfo=pytz.UTC), 'CPI m/m', 'USD', 'EURUSD=X', 'high', 'Europe/Prague')
+
+
+def test_render_in_worker_process():
+    """Charts render in a worker process and come back as PNG bytes."""
+    print("Testing rendering in the process pool...")
+
+    pool = ChartRenderPool(workers=1, max_pending=2, timeout_sec=120)
+    try:
+        png = pool.render(render_event_chart_png, *_event_args())
+        assert png[:8] == PNG_MAGIC
+        stats = pool.get_stats()
+        assert stats['submitted'] == 1
+        assert stats['completed'] == 1
+        assert stats['inline'] == 0
+    finally:
+        pool.shutdown()
+
+    print("✅ Process pool rendering tests passed!")
+
+
+def test_inline_when_disabled():
+    """With no workers, jobs run inline on the calling thread."""
+    print("Testing inline rendering fallback...")
+
+    pool = ChartRenderPool(workers=0)
+    png = pool.render(render_event_chart_png, *_event_args())
+    assert png[:8] == PNG_MAGIC
+    assert pool.get_stats()['inline'] == 1
+    assert pool.render(int, 'not a number') is None
+    assert pool.get_stats()['failures'] == 1
+
+    print("✅ Inline fallback tests passed!")
+
+
+def test_timeout_and_bounded_queue():
+    """Slow jobs time out for the caller and a full queue rejects new work."""
+    print("Testing render timeouts and queue bound...")
+
+    pool = ChartRenderPool(workers=1, max_pending=1, timeout_sec=30, queue_wait_sec=0.1)
+    try:
+        # Warm the worker up so the timeout measures the job, not the process start
+        assert pool.render(abs, -1) == 1
+
+        # A queued job holds the only slot until it finishes
+        future = pool.submit(time.sleep, 1)
+        assert pool.submit(abs, -2) is None
+        future.result(timeout=30)
+
+        started = time.monotonic()
+        assert pool.render(time.sleep, 60, timeout=0.2) is None
+        assert time.monotonic() - started < 1.5
+        # The stuck worker was killed, so its slot is free and a fresh worker serves the next job
+        assert pool.render(abs, -3, timeout=30) == 3
+
+        stats = pool.get_stats()
+        assert stats['timeouts'] == 1
+        assert stats['rejected'] == 1
+        assert stats['completed'] == 2
+    finally:
+        pool.shutdown()
+
+    print("✅ Timeout and queue bound tests passed!")
+
+
+if __name__ == "__main__":
+    test_render_in_worker_process()
+    test_inline_when_disabled()
+    test_timeout_and_bounded_queue()
@@ -0,0 +1,122 @@
+"""Test script to verify the cached schema capability registry on SQLite."""
+
+import sys
+import os
+import logging
+import tempfile
+
+from sqlalchemy import create_engine, event, text
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.database_service import ForexNewsService
+from bot.schema_capabilities import SchemaCapabilities, USER_OPTIONAL_COLUMNS
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _create_legacy_users_table(url: str):
+    """A users table from before the notification/chart/timezone migrations."""
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE users (
+                id INTEGER PRIMARY KEY,
+                telegram_id INTEGER UNIQUE NOT NULL,
+                preferred_currencies TEXT DEFAULT '',
+                impact_levels TEXT DEFAULT 'high,medium',
+                analysis_required BOOLEAN DEFAULT 1,
+                digest_time TIME,
+                created_at DATETIME,
+                updated_at DATETIME
+            )
+        """))
+        conn.execute(text("INSERT INTO users (telegram_id, preferred_currencies) VALUES (111, 'USD')"))
+    engine.dispose()
+
+
+def test_legacy_schema_and_refresh():
+    """Legacy databases use the column-aware path until a migration and refresh."""
+    print("Testing schema capabilities on a legacy SQLite database...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'legacy.db')}"
+        _create_legacy_users_table(url)
+        service = ForexNewsService(url)
+
+        assert not service.schema.users_complete
+        assert not service.schema.notifications_available
+        assert service.schema.has_column('users', 'telegram_id')
+        assert service.schema.present('users', USER_OPTIONAL_COLUMNS) == []
+
+        users = service.get_all_users()
+        assert [u.telegram_id for u in users] == [111]
+        assert service.get_users_with_notifications_enabled() == []
+
+        # Migrate, then refresh the registry as /add_notification_columns does
+        with service.db_manager.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE users ADD COLUMN notifications_enabled BOOLEAN DEFAULT 0"))
+            conn.execute(text("ALTER TABLE users ADD COLUMN notification_minutes INTEGER DEFAULT 30"))
+            conn.execute(text("ALTER TABLE users ADD COLUMN notification_impact_levels TEXT DEFAULT 'high'"))
+            conn.execute(text("UPDATE users SET notifications_enabled = 1"))
+        assert not service.schema.notifications_available
+        assert service.schema.refresh()
+        assert service.schema.notifications_available
+        assert [u.telegram_id for u in service.get_users_with_notifications_enabled()] == [111]
+        service.db_manager.engine.dispose()
+
+    print("✅ Legacy schema tests passed!")
+
+
+def test_hot_paths_skip_catalog_queries():
+    """User lookups no longer query the catalog on every call."""
+    print("Testing that hot paths use the cached schema...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'fresh.db')}"
+        service = ForexNewsService(url)
+        assert service.schema.users_complete
+
+        statements = []
+        event.listen(service.db_manager.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement.lower()))
+
+        service.get_or_create_user(222)
+        assert service.get_user_by_telegram_id(222).telegram_id == 222
+        assert service.update_user_preferences(222, notifications_enabled=True)
+        assert len(service.get_users_with_notifications_enabled()) == 1
+        assert service.get_user_preferences(222)['notifications_enabled'] is True
+
+        assert statements
+        assert not any('information_schema' in s or 'pragma' in s for s in statements)
+        service.db_manager.engine.dispose()
+
+    print("✅ Catalog query tests passed!")
+
+
+def test_failed_inspection_keeps_previous_view():
+    """A failing refresh keeps the last known schema instead of forgetting it."""
+    print("Testing refresh failure handling...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'caps.db')}")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, timezone TEXT)"))
+        caps = SchemaCapabilities(engine)
+        assert caps.has_column('users', 'timezone')
+
+        caps.engine = None  # inspection now fails
+        assert caps.refresh() is False
+        assert caps.has_column('users', 'timezone')
+        engine.dispose()
+
+    print("✅ Refresh failure tests passed!")
+
+
+if __name__ == "__main__":
+    test_legacy_schema_and_refresh()
+    test_hot_paths_skip_catalog_queries()
+    test_failed_inspection_keeps_previous_view()
@@ -13,6 +13,7 @@ from unittest.mock import patch
 
 from bot.config import Config
 from bot.scraper import ForexNewsScraper, ChatGPTAnalyzer, MessageFormatter
+from bot.openai_client import openai_client
 
 
 def test_parse_news_from_html():
@@ -129,7 +130,9 @@ def test_chatgpt_analyzer_no_key():
 def test_chatgpt_analyzer_with_key():
     analyzer = ChatGPTAnalyzer("fake-key")
     news_item = {"time": "", "currency": "", "event": "", "forecast": "", "previous": ""}
-    with patch("requests.post") as mock_post:
+    with patch.object(openai_client.session, "post") as mock_post:
+        mock_post.return_value.__enter__.return_value = mock_post.return_value
+        mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = {"choices": [{"message": {"content": "Test analysis"}}]}
         mock_post.return_value.raise_for_status = lambda: None
         result = analyzer.analyze_news(news_item)
@@ -0,0 +1,128 @@
+"""Test script to verify the vectorized smart-money features in gpt_analysis."""
+
+import sys
+import os
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path so we can import the bot modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.gpt_analysis import _detect_bos, _find_equal_highs_lows, _find_fvgs, _find_swings
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _make_series(bars: int, freq: str, seed: int, decimals: int = 4) -> pd.DataFrame:
+    """Random-walk OHLC bars, rounded so that equal highs/lows and ties occur."""
+    rng = np.random.default_rng(seed)
+    close = 1.08 + np.cumsum(rng.normal(0, 0.0008, bars))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) + np.abs(rng.normal(0, 0.0006, bars))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0, 0.0006, bars))
+    index = pd.date_range('2025-03-03', periods=bars, freq=freq, tz='UTC')
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close}, index=index).round(decimals)
+
+
+# Reference implementations: the original per-bar loops
+def _loop_swings(data, lookback=3):
+    highs, lows = [], []
+    for i in range(lookback, len(data) - lookback):
+        window = data.iloc[i - lookback:i + lookback + 1]
+        if data['High'].iloc[i] == window['High'].max():
+            highs.append((data.index[i], float(data['High'].iloc[i])))
+        if data['Low'].iloc[i] == window['Low'].min():
+            lows.append((data.index[i], float(data['Low'].iloc[i])))
+    return highs, lows
+
+
+def _loop_bos(data, swings_hi, swings_lo):
+    last_break, last_break_time = None, None
+    hi_levels = [v for _, v in swings_hi]
+    lo_levels = [v for _, v in swings_lo]
+    for t, row in data.iterrows():
+        if len(hi_levels) > 0 and row.get('High') > max(hi_levels[:-1] or [hi_levels[-1]]):
+            last_break, last_break_time = 'BOS_UP', t
+        if len(lo_levels) > 0 and row.get('Low') < min(lo_levels[:-1] or [lo_levels[-1]]):
+            last_break, last_break_time = 'BOS_DOWN', t
+    if last_break and last_break_time:
+        return {"type": last_break, "time": last_break_time.isoformat()}
+    return {"type": None, "time": None}
+
+
+def _loop_fvgs(data, limit=3):
+    gaps = []
+    for i in range(len(data) - 2):
+        c0, c2 = data.iloc[i], data.iloc[i + 2]
+        if c2['Low'] > c0['High']:
+            gaps.append({"dir": "up", "start": float(c0['High']), "end": float(c2['Low']),
+                         "time0": data.index[i].isoformat(), "time2": data.index[i + 2].isoformat()})
+        if c2['High'] < c0['Low']:
+            gaps.append({"dir": "down", "start": float(c2['High']), "end": float(c0['Low']),
+                         "time0": data.index[i].isoformat(), "time2": data.index[i + 2].isoformat()})
+    return gaps[-limit:]
+
+
+def _loop_equal_levels(data, decimals):
+    tol = 10 ** (-decimals)
+    highs, lows = [], []
+    rolling_max = data['High'].rolling(5).max()
+    rolling_min = data['Low'].rolling(5).min()
+    for i in range(5, len(data)):
+        h = data['High'].iloc[i]
+        if abs(h - rolling_max.iloc[i - 1]) <= tol:
+            highs.append(float(round(h, decimals)))
+        low = data['Low'].iloc[i]
+        if abs(low - rolling_min.iloc[i - 1]) <= tol:
+            lows.append(float(round(low, decimals)))
+    return {"equal_highs": sorted(set(highs))[-3:], "equal_lows": sorted(set(lows))[-3:]}
+
+
+def test_features_match_loops():
+    """Vectorized features equal the per-bar loops on many random series."""
+    print("Testing vectorized features against the loops...")
+
+    for seed in range(12):
+        for bars, freq, decimals in [(300, '1h', 4), (400, '1min', 5), (250, '1h', 2), (5, '1h', 4), (2, '1h', 4)]:
+            data = _make_series(bars, freq, seed, decimals)
+            swings = _find_swings(data)
+            assert swings == _loop_swings(data)
+            assert _detect_bos(data, *swings) == _loop_bos(data, *swings)
+            for limit in (1, 3, 10):
+                assert _find_fvgs(data, limit) == _loop_fvgs(data, limit)
+            assert _find_equal_highs_lows(data, decimals) == _loop_equal_levels(data, decimals)
+
+    # Single-swing and no-swing cases for the break detection
+    data = _make_series(60, '1h', 3)
+    only = [(data.index[10], float(data['High'].iloc[10]))]
+    assert _detect_bos(data, only, []) == _loop_bos(data, only, [])
+    assert _detect_bos(data, [], []) == {"type": None, "time": None}
+
+    print("✅ Vectorized feature tests passed!")
+
+
+def test_features_are_fast():
+    """A few thousand bars are processed in milliseconds."""
+    print("Testing feature speed...")
+
+    data = _make_series(5000, '1min', 42, 5)
+    started = time.perf_counter()
+    swings = _find_swings(data)
+    _detect_bos(data, *swings)
+    _find_fvgs(data)
+    _find_equal_highs_lows(data, 5)
+    elapsed = time.perf_counter() - started
+    print(f"5000 bars: {elapsed * 1000:.1f} ms")
+    assert elapsed < 0.5
+
+    print("✅ Feature speed tests passed!")
+
+
+if __name__ == "__main__":
+    test_features_match_loops()
+    test_features_are_fast()
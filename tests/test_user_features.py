@@ -13,6 +13,7 @@ from bot.config import Config
 from bot.database_service import ForexNewsService
 from bot.user_settings import UserSettingsHandler
 from bot.daily_digest import DailyDigestScheduler
+from bot.models import User
 
 def test_user_features():
     """Test the new user features functionality."""
@@ -114,8 +115,8 @@ def test_user_features():
 
         # Clean up test user
         with db_service.db_manager.get_session() as session:
-            test_user = session.query(db_service.db_manager.Base.classes.User).filter(
-                db_service.db_manager.Base.classes.User.telegram_id == test_telegram_id
+            test_user = session.query(User).filter(
+                User.telegram_id == test_telegram_id
             ).first()
             if test_user:
                 session.delete(test_user)
@@ -195,8 +196,8 @@ def test_daily_digest_scheduler():
 
         # Clean up test user
         with db_service.db_manager.get_session() as session:
-            test_user = session.query(db_service.db_manager.Base.classes.User).filter(
-                db_service.db_manager.Base.classes.User.telegram_id == test_telegram_id
+            test_user = session.query(User).filter(
+                User.telegram_id == test_telegram_id
             ).first()
             if test_user:
                 session.delete(test_user)
@@ -170,6 +170,8 @@ def test_user_settings_handler():
                     digest_time=time(8, 0)
                 )
 
+            get_cached_preferences = get_or_create_user
+
             def update_user_preferences(self, user_id, **kwargs):
                 return True
 